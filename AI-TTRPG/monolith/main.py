@@ -1,10 +1,12 @@
 import logging
+import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
@@ -37,6 +39,10 @@ async def startup_event():
     await orch.start()
     logger.info("Monolith Orchestrator started via FastAPI.")
 
+    if os.environ.get("MONOLITH_HOT_RELOAD", "on").lower() not in ("0", "off", "false"):
+        from monolith.modules.hot_reload import get_hot_reloader
+        get_hot_reloader().start()
+
 # --- Pydantic Models for API ---
 class MapGenerationRequest(BaseModel):
     tags: List[str]
@@ -58,8 +64,8 @@ async def generate_map_endpoint(
     """
     logger.info(f"Map generation requested by user: {current_user.get('sub')}")
     try:
-        # Call the synchronous map module
-        result = map_module.generate_map(request.tags, request.seed)
+        # The map module is synchronous (numpy + a blocking LLM call): keep it off the event loop
+        result = await run_in_threadpool(map_module.generate_map, request.tags, request.seed)
         return result
     except Exception as e:
         logger.error(f"Map generation failed: {e}")
@@ -92,8 +98,7 @@ app.include_router(
     dependencies=[Depends(get_current_user)] # Apply auth to all character routes
 )
 
-from monolith.modules.map_pkg import data_loader as map_loader
-from monolith.modules.rules_pkg import data_loader as rules_loader
+from monolith.modules.hot_reload import get_hot_reloader
 
 # --- Admin Routes ---
 
@@ -103,21 +108,46 @@ async def reload_rules_endpoint(
 ):
     """
     Hot-reloads static game data (rules, items, map configs) from disk.
-    Requires Authentication.
+    Only changed files are re-read; invalid data is rejected and the running
+    version is kept. Requires Authentication.
     """
     logger.warning(f"Hot-reload triggered by user: {current_user.get('sub')}")
     try:
-        # Reload Map Data
-        map_loader.load_data()
-        
-        # Reload Rules Data
-        rules_loader.load_all_data()
-        
-        return {"status": "success", "message": "Game rules and map data reloaded successfully."}
+        result = get_hot_reloader().reload(force=True)
     except Exception as e:
         logger.error(f"Hot-reload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not result["success"]:
+        raise HTTPException(status_code=422, detail=result)
+    return {"status": "success", "message": "Game rules and map data reloaded successfully.", "details": result}
+
+@app.get("/admin/llm-cache", tags=["Admin"])
+async def llm_cache_stats_endpoint(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Size and hit/miss statistics of the persistent LLM response cache.
+    Requires Authentication.
+    """
+    from monolith.modules.ai_dm_pkg.llm_cache import get_llm_cache
+
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@app.get("/admin/prefetch", tags=["Admin"])
+async def prefetch_stats_endpoint(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Hit rates of the speculative narrative prefetcher, per prediction kind.
+    Requires Authentication.
+    """
+    from monolith.modules.ai_dm_pkg.prefetch import get_prefetcher
+
+    prefetcher = get_prefetcher()
+    return prefetcher.stats() if prefetcher else {"enabled": False}
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "monolith-api"}
@@ -1,12 +1,20 @@
 """
 Public API for the AI Dungeon Master module.
 """
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional, Tuple
 
 # Import from this module's own internal package
 from .ai_dm_pkg import keyword_handler
 from .ai_dm_pkg import llm_handler
+from .ai_dm_pkg.context_builder import character_changes
+from .ai_dm_pkg.narration_stream import NARRATION_CHUNK, NARRATION_DONE
+from .ai_dm_pkg.prefetch import get_prefetcher
+from .character_pkg.services import build_state_baseline
+from .state_history import get_in, get_state_history
+from ..event_bus import get_event_bus
 
 # Import monolith APIs to fetch context
 from . import character as character_api
@@ -14,6 +22,55 @@ from . import world as world_api
 
 logger = logging.getLogger("monolith.ai_dm")
 
+
+def _tracked_character_id(actor_id: str, char_context: Dict[str, Any]) -> Optional[str]:
+    """Return the id under which the live state history holds this actor, if any."""
+    head = get_state_history().head
+    if not head:
+        return None
+    for char_id in (actor_id, char_context.get("id")):
+        if char_id and get_in(head.state, ("characters", char_id)) is not None:
+            return char_id
+    return None
+
+
+def _changes_since_last_narration(char_id: str) -> Optional[Dict[str, Any]]:
+    """Per-turn diff from the state history; None until the actor has been narrated once."""
+    pair = get_state_history().character_since(char_id, f"narrated:{char_id}")
+    if pair is None:
+        return None
+    before, after = pair
+    if before is after:
+        return {}
+    return character_changes(build_state_baseline(before), build_state_baseline(after))
+
+def _narration_context(actor_id: str) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]:
+    """(character context, location context, tracked id, changes since the last narration) for an actor."""
+    char_context = character_api.get_character_context(actor_id)
+    if not char_context:
+        raise Exception(f"Could not get character context for {actor_id}")
+
+    loc_id = char_context.get('current_location_id')
+    loc_context = world_api.get_world_location_context(loc_id)
+    if not loc_context:
+         raise Exception(f"Could not get location context for {loc_id}")
+
+    tracked_id = _tracked_character_id(actor_id, char_context)
+    recent_changes = _changes_since_last_narration(tracked_id) if tracked_id else None
+    return char_context, loc_context, tracked_id, recent_changes
+
+def _mark_narrated(actor_id: str, tracked_id: Optional[str]) -> None:
+    # This ensures the next request only sees changes since this moment.
+    # With a live game loaded this is just a mark in the state history;
+    # the database 'previous_state' is only written when there is none.
+    try:
+        if tracked_id:
+            get_state_history().mark(f"narrated:{tracked_id}")
+        else:
+            character_api.snapshot_character_state(actor_id)
+    except Exception as snap_err:
+        logger.warning(f"Failed to snapshot state for {actor_id}: {snap_err}")
+
 def get_narrative_response(actor_id: str, prompt_text: str) -> Dict[str, Any]:
     """
     Generates a narrative response from the AI Dungeon Master based on a player's prompt.
@@ -29,17 +86,15 @@ def get_narrative_response(actor_id: str, prompt_text: str) -> Dict[str, Any]:
         Dict[str, Any]: A dictionary containing the success status and the generated message.
             - success (bool): True if the response was generated successfully, False otherwise.
             - message (str): The generated narrative response or an error message.
+
+    Blocks the calling thread; coroutines use aget_narrative_response.
     """
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetcher.record_request(actor_id, prompt_text)
     try:
         # 1. Fetch the necessary context
-        char_context = character_api.get_character_context(actor_id)
-        if not char_context:
-            raise Exception(f"Could not get character context for {actor_id}")
-
-        loc_id = char_context.get('current_location_id')
-        loc_context = world_api.get_world_location_context(loc_id)
-        if not loc_context:
-             raise Exception(f"Could not get location context for {loc_id}")
+        char_context, loc_context, tracked_id, recent_changes = _narration_context(actor_id)
 
         # 2. Call the LLM handler
         # We need to access the settings to get the API key.
@@ -72,33 +127,129 @@ def get_narrative_response(actor_id: str, prompt_text: str) -> Dict[str, Any]:
             prompt_text,
             char_context,
             loc_context,
-            api_key=api_key
+            api_key=api_key,
+            recent_changes=recent_changes
         )
 
         # 3. Snapshot the state for diff tracking
-        # This ensures the next request only sees changes since this moment
-        try:
-            character_api.snapshot_character_state(actor_id)
-        except Exception as snap_err:
-            logger.warning(f"Failed to snapshot state for {actor_id}: {snap_err}")
+        _mark_narrated(actor_id, tracked_id)
 
         return {"success": True, "message": response_message}
 
     except Exception as e:
         logger.exception(f"AI DM failed to generate response: {e}")
         return {"success": False, "message": "An error occurred in the AI DM."}
+    finally:
+        if prefetcher:
+            prefetcher.narration_done(actor_id)
+
+async def aget_narrative_response(actor_id: str, prompt_text: str) -> Dict[str, Any]:
+    """
+    get_narrative_response for coroutines: the context lookups run in a worker
+    thread and the generation is awaited, so the event loop is never blocked.
+
+    Returns:
+        Dict[str, Any]: success (bool) and message (str), as get_narrative_response.
+    """
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetcher.record_request(actor_id, prompt_text)
+    try:
+        char_context, loc_context, tracked_id, recent_changes = await asyncio.to_thread(_narration_context, actor_id)
+        response_message = await llm_handler.generate_dm_response_async(
+            prompt_text, char_context, loc_context, recent_changes=recent_changes)
+        await asyncio.to_thread(_mark_narrated, actor_id, tracked_id)
+        return {"success": True, "message": response_message}
+    except Exception as e:
+        logger.exception(f"AI DM failed to generate response: {e}")
+        return {"success": False, "message": "An error occurred in the AI DM."}
+    finally:
+        if prefetcher:
+            prefetcher.narration_done(actor_id)
+
+def get_keyword_response(actor_id: str, prompt_text: str) -> Dict[str, Any]:
+    """
+    Answers a prompt from the actor's game state with the keyword handler, without the LLM.
+
+    Used for prompts the intent classifier marks as deterministic and that
+    only report state (looking around, checking oneself).
+
+    Returns:
+        Dict[str, Any]: success (bool) and message (str), as get_narrative_response.
+    """
+    try:
+        char_context, loc_context, _, _ = _narration_context(actor_id)
+        return {"success": True, "message": keyword_handler.get_keyword_response(prompt_text, char_context, loc_context)}
+    except Exception as e:
+        logger.exception(f"Keyword response failed: {e}")
+        return {"success": False, "message": "An error occurred in the AI DM."}
+
+async def stream_narrative_response(actor_id: str, prompt_text: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Streaming variant of get_narrative_response.
+
+    The narration is published on the event bus while it is generated
+    (NARRATION_CHUNK events), followed by one NARRATION_DONE event with the
+    validated final message. Context lookups run in a worker thread, so the
+    event loop stays free for the whole request.
+
+    Args:
+        actor_id (str): The unique identifier of the actor (character) initiating the prompt.
+        prompt_text (str): The text of the prompt or action provided by the player.
+        request_id (str, optional): Echoed in every event so clients can match them to their request.
+
+    Returns:
+        Dict[str, Any]: The NARRATION_DONE payload (success, message and timings).
+    """
+    bus = get_event_bus()
+    started = time.perf_counter()
+    first_text_ms: Optional[float] = None
+
+    async def publish_text(text: str) -> None:
+        nonlocal first_text_ms
+        if first_text_ms is None:
+            first_text_ms = round((time.perf_counter() - started) * 1000, 1)
+        await bus.publish(NARRATION_CHUNK, {"request_id": request_id, "actor_id": actor_id, "text": text})
+
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetcher.record_request(actor_id, prompt_text)
+    try:
+        char_context, loc_context, tracked_id, recent_changes = await asyncio.to_thread(_narration_context, actor_id)
+        message = await llm_handler.stream_dm_response(
+            prompt_text, char_context, loc_context, publish_text, recent_changes=recent_changes)
+        await asyncio.to_thread(_mark_narrated, actor_id, tracked_id)
+        success = True
+    except Exception as e:
+        logger.exception(f"AI DM failed to generate response: {e}")
+        message, success = "An error occurred in the AI DM.", False
+    finally:
+        if prefetcher:
+            prefetcher.narration_done(actor_id)
+
+    result = {
+        "request_id": request_id,
+        "actor_id": actor_id,
+        "success": success,
+        "message": message,
+        "first_text_ms": first_text_ms,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    await bus.publish(NARRATION_DONE, result)
+    return result
 
 def register(orchestrator) -> None:
     """
     Registers the AI DM module with the orchestrator.
 
-    This function is called during the monolith startup sequence. Although this module
-    is primarily called directly via its API, registration allows for potential future
-    event subscriptions.
+    This function is called during the monolith startup sequence. The module is
+    primarily called directly via its API; the narrative prefetcher subscribes to
+    the game state events that make its speculations stale.
 
     Args:
-        orchestrator: The system orchestrator instance (not currently used but required by the interface).
+        orchestrator: The system orchestrator instance (its event bus feeds the prefetcher).
     """
-    # This module is called directly, but we register it
-    # to be consistent and allow it to subscribe to events later.
-    logger.info("[ai_dm] module registered (keyword-based handler)")
+    prefetcher = get_prefetcher()
+    if prefetcher:
+        prefetcher.attach(orchestrator.event_bus, _narration_context)
+    logger.info(f"[ai_dm] module registered (prefetch {'on' if prefetcher else 'off'})")
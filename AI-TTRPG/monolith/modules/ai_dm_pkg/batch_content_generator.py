@@ -1,136 +1,353 @@
 """
 Batch Content Generator Utility
 
-This script is designed to be run offline or periodically to bulk-generate
-flavor text, descriptions, and dialogue for game entities that lack them.
+Offline pipeline that pre-generates flavor content for world entities that
+lack it, so play does not pay LLM latency for it:
 
-It connects to the database, identifies entities with missing content,
-and uses the LLM Handler to generate high-quality text.
+    location  a 2-3 sentence description (Location.description)
+    npc       canned dialogue lines (NpcInstance.ai_annotations["canned_dialogue"])
+
+Run it overnight with:
+
+    python -m monolith.modules.ai_dm_pkg.batch_content_generator --kinds location,npc
+
+Work items are read from the world DB in pages (keyset pagination on id) and
+generated through the async LLM client with bounded concurrency, at
+speculative priority so a running game is never delayed. Responses go
+through the shared response cache. Results are written back in batched
+transactions. After every page the last id handled per kind is checkpointed,
+and an interrupted run resumes after it (`--restart` starts over, which also
+retries the entities that failed). Throughput and estimated token counts are
+logged per page and returned by `run()`.
 """
+import argparse
+import asyncio
+import json
 import logging
+import os
 import time
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.engine import Connection, Engine
 
 # Import modules
 from monolith.modules.world_pkg import database as world_db
 from monolith.modules.world_pkg import models as world_models
-from monolith.modules.ai_dm_pkg import llm_handler
+from monolith.modules.world_pkg import snapshots as world_snapshots
+from monolith.modules.ai_dm_pkg.llm_client import speculative
+from monolith.modules.ai_dm_pkg.llm_service import ai_client, clean_json_response
+from monolith.modules.ai_dm_pkg.schemas import CannedDialogue
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger("batch_generator")
+logger = logging.getLogger("monolith.ai_dm.batch_generator")
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parents[3] / ".cache" / "batch_content_checkpoint.json"
+
+
+@dataclass
+class ContentJob:
+    """One kind of content: which rows need it, how to ask for it, and how to store it."""
+    kind: str
+    model: Any
+    columns: Tuple[str, ...]
+    needs_content: Callable[[], Any]
+    prompt: Callable[[Dict[str, Any]], str]
+    parse: Callable[[str], Any]
+    write: Callable[[Connection, List[Tuple[Dict[str, Any], Any]]], Set[int]]
+    generation_config: Optional[Dict[str, Any]] = None
 
-def generate_location_descriptions(db: Session, limit: int = 10):
-    """
-    Finds locations without descriptions and generates them.
-    """
-    logger.info(f"Checking for locations without descriptions (Limit: {limit})...")
-    
-    locations = db.query(world_models.Location).filter(
-        (world_models.Location.description == None) | (world_models.Location.description == "")
-    ).limit(limit).all()
-    
-    if not locations:
-        logger.info("No locations found needing descriptions.")
-        return
-
-    for loc in locations:
-        logger.info(f"Generating description for Location {loc.id}: {loc.name}")
-        
-        try:
-            # Construct a prompt for the LLM
-            prompt = f"""
-            Generate a vivid, atmospheric description (2-3 sentences) for a fantasy location.
-            Name: {loc.name}
-            Tags: {', '.join(loc.tags)}
-            Region ID: {loc.region_id}
-            
-            Description:
-            """
-            
-            # Call LLM (using a simplified interface if available, or direct generate)
-            # Assuming llm_handler has a generate_text method or similar
-            # For now, we'll simulate or use a placeholder if the actual LLM call is complex
-            # response = llm_handler.generate_text(prompt) 
-            
-            # Placeholder for actual LLM call integration
-            # In a real scenario, we would await the async call or use a sync wrapper
-            description = f"A placeholder description for {loc.name}. The atmosphere is thick with {loc.tags[0] if loc.tags else 'mystery'}."
-            
-            loc.description = description
-            db.commit()
-            logger.info(f"Saved description for {loc.name}.")
-            
-            # Sleep to avoid rate limits if using real API
-            # time.sleep(1)
-            
-        except Exception as e:
-            logger.error(f"Failed to generate for {loc.name}: {e}")
-            db.rollback()
 
-def generate_npc_dialogue(db: Session, limit: int = 10):
+# --- Locations ---
+
+def _location_prompt(row: Dict[str, Any]) -> str:
+    return f"""
+    Generate a vivid, atmospheric description (2-3 sentences) for a fantasy location.
+    Name: {row['name']}
+    Tags: {', '.join(row['tags'] or [])}
+
+    Reply with the description only.
     """
-    Finds NPCs without dialogue samples and generates them.
+
+
+def _parse_description(text: str) -> str:
+    description = text.strip().strip('"').strip()
+    if description.lower().startswith("description:"):
+        description = description[len("description:"):].strip()
+    if len(description) < 20:
+        raise ValueError(f"description too short: {description!r}")
+    return description
+
+
+def _write_descriptions(conn: Connection, results: List[Tuple[Dict[str, Any], str]]) -> Set[int]:
+    table = world_models.Location.__table__
+    conn.execute(
+        update(table).where(table.c.id == bindparam("b_id")).values(description=bindparam("b_description")),
+        [{"b_id": row["id"], "b_description": description} for row, description in results],
+    )
+    return {row["id"] for row, _ in results}
+
+
+# --- NPCs ---
+
+def _npc_prompt(row: Dict[str, Any]) -> str:
+    name = row["name_override"] or row["template_id"].replace("_", " ")
+    return f"""
+    Generate 5 distinct dialogue lines for an NPC in a fantasy RPG.
+    Name: {name}
+    Type: {row['template_id']}
+    Tags: {', '.join(row['behavior_tags'] or [])}
+
+    The output MUST be a JSON object: {{"lines": ["string", "string", "string", "string", "string"]}}
     """
-    # This assumes we have a field for dialogue or we are storing it in ai_annotations
-    # For now, we'll check ai_annotations
-    logger.info(f"Checking for NPCs without dialogue (Limit: {limit})...")
-    
-    npcs = db.query(world_models.NpcInstance).limit(limit).all()
-    
-    for npc in npcs:
-        # Check if we already have dialogue
-        annotations = npc.ai_annotations or {}
-        if "canned_dialogue" in annotations:
-            continue
-            
-        logger.info(f"Generating dialogue for NPC {npc.id}: {npc.name}")
-        
+
+
+def _parse_dialogue(text: str) -> List[str]:
+    return CannedDialogue(**json.loads(clean_json_response(text))).lines
+
+
+def _write_dialogue(conn: Connection, results: List[Tuple[Dict[str, Any], List[str]]]) -> Set[int]:
+    table = world_models.NpcInstance.__table__
+    conn.execute(
+        update(table).where(table.c.id == bindparam("b_id")).values(ai_annotations=bindparam("b_annotations")),
+        [{"b_id": row["id"], "b_annotations": {**(row["ai_annotations"] or {}), "canned_dialogue": lines}}
+         for row, lines in results],
+    )
+    return {row["location_id"] for row, _ in results if row["location_id"] is not None}
+
+
+JOBS: Dict[str, ContentJob] = {
+    "location": ContentJob(
+        kind="location",
+        model=world_models.Location,
+        columns=("id", "name", "tags"),
+        needs_content=lambda: or_(world_models.Location.description.is_(None), world_models.Location.description == ""),
+        prompt=_location_prompt,
+        parse=_parse_description,
+        write=_write_descriptions,
+    ),
+    "npc": ContentJob(
+        kind="npc",
+        model=world_models.NpcInstance,
+        columns=("id", "template_id", "name_override", "behavior_tags", "location_id", "ai_annotations"),
+        needs_content=lambda: func.json_extract(world_models.NpcInstance.ai_annotations, "$.canned_dialogue").is_(None),
+        prompt=_npc_prompt,
+        parse=_parse_dialogue,
+        write=_write_dialogue,
+        generation_config={"response_mime_type": "application/json"},
+    ),
+}
+
+
+# --- Checkpoint ---
+
+class Checkpoint:
+    """Per-kind progress (last id handled, ids that failed), saved as JSON."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.data: Dict[str, Dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def after_id(self, kind: str) -> int:
+        return self.data.get(kind, {}).get("after_id", 0)
+
+    def advance(self, kind: str, after_id: int, failed: Iterable[int]) -> None:
+        entry = self.data.setdefault(kind, {"after_id": 0, "failed": []})
+        entry["after_id"] = after_id
+        entry["failed"] = sorted(set(entry["failed"]) | set(failed))
+        self.save()
+
+    def reset(self) -> None:
+        self.data = {}
+        self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2))
+        os.replace(tmp, self.path)
+
+
+# --- Pipeline ---
+
+@dataclass
+class _Metrics:
+    generated: int = 0
+    failed: int = 0
+    written: int = 0
+    batches: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "generated": self.generated,
+            "failed": self.failed,
+            "written": self.written,
+            "batches": self.batches,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "elapsed_s": round(elapsed, 2),
+            "items_per_s": round(self.generated / elapsed, 2) if elapsed else 0.0,
+            "tokens_per_s": round((self.prompt_tokens + self.response_tokens) / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+class BatchContentPipeline:
+    """Pages entities without content through the LLM and writes the results back in batches."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        service=None,
+        page_size: int = 100,
+        batch_size: int = 25,
+        concurrency: int = 8,
+        checkpoint_path: Optional[Path] = DEFAULT_CHECKPOINT,
+    ):
+        """
+        Args:
+            engine: World database engine (default: the game's world DB)
+            service: LLMService used for generation (default: the shared ai_client)
+            page_size: Work items read per query
+            batch_size: Results written per transaction
+            concurrency: Generations in flight at once (the LLM client's own
+                max_concurrency still applies)
+            checkpoint_path: Progress file; None disables resuming
+        """
+        self.engine = engine or world_db.engine
+        self.service = service or ai_client
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint = Checkpoint(checkpoint_path)
+
+    def _page(self, job: ContentJob, after_id: int) -> List[Dict[str, Any]]:
+        table = job.model.__table__
+        query = (
+            select(*(table.c[c] for c in job.columns))
+            .where(table.c.id > after_id, job.needs_content())
+            .order_by(table.c.id)
+            .limit(self.page_size)
+        )
+        with self.engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(query)]
+
+    def _flush(self, job: ContentJob, results: List[Tuple[Dict[str, Any], Any]], metrics: _Metrics) -> None:
+        if not results:
+            return
+        # One transaction per batch
+        with self.engine.begin() as conn:
+            touched = job.write(conn, results)
+        # Core updates bypass the ORM hooks that keep location snapshots current
+        world_snapshots.bump_location_versions(touched)
+        metrics.written += len(results)
+        metrics.batches += 1
+        results.clear()
+
+    async def _generate(self, job: ContentJob, row: Dict[str, Any], slots: asyncio.Semaphore, metrics: _Metrics):
+        """Returns (row, parsed content), or (row, None) if generation failed."""
+        prompt = job.prompt(row)
         try:
-            # Construct prompt
-            prompt = f"""
-            Generate 5 distinct dialogue lines for an NPC.
-            Name: {npc.name}
-            Tags: {', '.join(npc.behavior_tags)}
-            
-            Lines:
-            """
-            
-            # Placeholder generation
-            dialogue_lines = [
-                f"Greetings, traveler. I am {npc.name}.",
-                "Have you heard the rumors?",
-                "Stay safe out there.",
-                "I have wares if you have coin.",
-                "The winds are changing."
-            ]
-            
-            annotations["canned_dialogue"] = dialogue_lines
-            npc.ai_annotations = annotations
-            
-            # SQLAlchemy often needs a flag to detect JSON updates
-            from sqlalchemy.orm.attributes import flag_modified
-            flag_modified(npc, "ai_annotations")
-            
-            db.commit()
-            logger.info(f"Saved dialogue for {npc.name}.")
-            
+            async with slots:
+                with speculative():
+                    text = await self.service.agenerate(
+                        prompt, job.generation_config, category="content", validate=job.parse)
+            value = job.parse(text)
         except Exception as e:
-            logger.error(f"Failed to generate for {npc.name}: {e}")
-            db.rollback()
+            logger.warning(f"{job.kind} {row['id']}: generation failed: {e}")
+            metrics.failed += 1
+            return row, None
+        metrics.generated += 1
+        # Rough estimate: ~4 characters per token
+        metrics.prompt_tokens += len(prompt) // 4
+        metrics.response_tokens += len(text) // 4
+        return row, value
+
+    async def run_job(self, job: ContentJob, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Generate content of one kind for up to `limit` entities (all by default)."""
+        metrics = _Metrics()
+        slots = asyncio.Semaphore(self.concurrency)
+        after_id = self.checkpoint.after_id(job.kind)
+        remaining = limit
+
+        while remaining is None or remaining > 0:
+            rows = await asyncio.to_thread(self._page, job, after_id)
+            if remaining is not None:
+                rows = rows[:remaining]
+            if not rows:
+                break
+
+            results: List[Tuple[Dict[str, Any], Any]] = []
+            failed: List[int] = []
+            tasks = [asyncio.create_task(self._generate(job, row, slots, metrics)) for row in rows]
+            for done in asyncio.as_completed(tasks):
+                row, value = await done
+                if value is None:
+                    failed.append(row["id"])
+                    continue
+                results.append((row, value))
+                if len(results) >= self.batch_size:
+                    await asyncio.to_thread(self._flush, job, results, metrics)
+            await asyncio.to_thread(self._flush, job, results, metrics)
+
+            after_id = rows[-1]["id"]
+            self.checkpoint.advance(job.kind, after_id, failed)
+            if remaining is not None:
+                remaining -= len(rows)
+            logger.info(f"{job.kind}: up to id {after_id} - {metrics.report()}")
 
-def main():
+        report = metrics.report()
+        logger.info(f"{job.kind} done: {report}")
+        return report
+
+    async def run(self, kinds: Iterable[str] = tuple(JOBS), limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Run the jobs for `kinds` in turn; returns the metrics per kind."""
+        return {kind: await self.run_job(JOBS[kind], limit) for kind in kinds}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Pre-generate location descriptions and NPC dialogue.")
+    parser.add_argument("--kinds", default=",".join(JOBS), help="Comma-separated: " + ", ".join(JOBS))
+    parser.add_argument("--limit", type=int, default=None, help="Entities per kind (default: all)")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the beginning")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
     logger.info("--- Starting Batch Content Generation ---")
-    
-    session = world_db.SessionLocal()
+    if not ai_client.model:
+        raise SystemExit("No LLM configured (set GEMINI_API_KEY or USE_LOCAL_LLM=true)")
+
+    pipeline = BatchContentPipeline(
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint,
+    )
+    if args.restart:
+        pipeline.checkpoint.reset()
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
     try:
-        generate_location_descriptions(session)
-        generate_npc_dialogue(session)
+        report = asyncio.run(pipeline.run(kinds, args.limit))
     finally:
-        session.close()
-    
-    logger.info("--- Batch Generation Complete ---")
+        ai_client.close()
+    logger.info(f"--- Batch Generation Complete --- {report}")
+    return report
+
 
 if __name__ == "__main__":
     main()
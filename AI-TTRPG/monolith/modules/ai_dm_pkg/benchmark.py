@@ -0,0 +1,338 @@
+"""
+AI latency benchmark harness.
+
+Drives the AI entry points the game uses through a real HTTP client:
+
+    dm_response     llm_handler.generate_dm_response
+    dm_stream       llm_handler.stream_dm_response (also reports time to first text)
+    map_flavor      LLMService.generate_map_flavor
+    player_action   LLMService.process_player_action (tool calls + follow-up)
+    director        LocalCampaignDirector.generate_next_beat
+
+By default the calls go to an in-process `StubLLMServer`, so the harness
+runs offline (and in CI) with deterministic responses and simulated model
+timing; `--url` points it at a real Ollama instead. For each scenario it
+reports p50/p95 latency, throughput, LLM requests sent and prompt sizes:
+
+    python -m monolith.modules.ai_dm_pkg.benchmark --iterations 50 --concurrency 4 --latency 0.1
+
+The response cache is off unless `--cache` is given, so every call measures
+generation rather than cache hits.
+
+`--classifier` instead runs a micro-benchmark of the keyword intent
+classifier against the previous per-phrase implementation.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .keyword_handler import INTENT_KEYWORD_MAP, classify_intent
+from .llm_client import OllamaClient
+from .llm_service import ai_client
+from .stub_llm import StubLLMServer
+
+logger = logging.getLogger("monolith.ai_dm.benchmark")
+
+CHAR_CONTEXT = {
+    "name": "Ash", "kingdom": "Human", "level": 3,
+    "current_hp": 18, "max_hp": 24, "current_composure": 8, "max_composure": 10,
+    "status_effects": ["Tired"], "inventory": {"torch": 1, "rope": 1},
+}
+LOC_CONTEXT = {
+    "name": "Old Mill Road", "tags": ["forest", "road", "dusk"],
+    "description": "A rutted road winds past a burnt-out mill.",
+    "npcs": [{"template_id": "wandering_peddler", "current_hp": 6}],
+    "exits": {"north": 2, "east": 3},
+}
+ACTIONS = ["I search the mill.", "I light my torch.", "I call out to the peddler.", "I follow the road north."]
+TAG_SETS = [["forest", "dusk"], ["cave", "damp"], ["ruins", "haunted"], ["swamp", "fog"], ["road", "rain"]]
+
+DM_FAILURE = "The DM is having trouble thinking right now."
+
+
+class _MeteredClient(OllamaClient):
+    """OllamaClient that records the size of each prompt it sends."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompt_chars: List[int] = []
+
+    async def _generate(self, prompt, config, timeout):
+        self.prompt_chars.append(len(prompt))
+        return await super()._generate(prompt, config, timeout)
+
+    async def _stream(self, prompt, config, timeout):
+        self.prompt_chars.append(len(prompt))
+        async for chunk in super()._stream(prompt, config, timeout):
+            yield chunk
+
+
+# --- Scenarios ---
+# Each takes the iteration number and returns (ok, time to first text or None).
+# Inputs vary by iteration so concurrent calls are not coalesced into one request.
+
+def _dm_response(i: int):
+    from .llm_handler import generate_dm_response
+    text = generate_dm_response(f"{ACTIONS[i % len(ACTIONS)]} (turn {i})", CHAR_CONTEXT, LOC_CONTEXT)
+    return not text.startswith(DM_FAILURE), None
+
+
+def _dm_stream(i: int):
+    from .llm_handler import stream_dm_response
+    started = time.perf_counter()
+    first = []
+
+    async def on_text(text):
+        if not first:
+            first.append(time.perf_counter() - started)
+
+    text = asyncio.run(stream_dm_response(
+        f"{ACTIONS[i % len(ACTIONS)]} (turn {i})", CHAR_CONTEXT, LOC_CONTEXT, on_text))
+    return not text.startswith(DM_FAILURE), (first[0] if first else None)
+
+
+def _map_flavor(i: int):
+    flavor = ai_client.generate_map_flavor(TAG_SETS[i % len(TAG_SETS)] + [f"area-{i}"])
+    return flavor != ai_client._get_fallback_flavor(), None
+
+
+def _player_action(i: int):
+    result = asyncio.run(ai_client.process_player_action({
+        "player_id": "ash",
+        "action_type": ACTIONS[i % len(ACTIONS)],
+        "context_data": {"location": LOC_CONTEXT["name"], "turn": i},
+    }))
+    return result.get("narrative") not in (None, "Something happens, but the details are hazy.", "The DM is silent."), None
+
+
+def _director(i: int):
+    from ..save_schemas import SaveGameData
+    from ..story_pkg.local_director import FALLBACK_QUEST, LocalCampaignDirector
+    state = SaveGameData(characters=[], factions=[], regions=[], locations=[], npcs=[],
+                         items=[], traps=[], campaigns=[], quests=[])
+    return LocalCampaignDirector().generate_next_beat(state) != FALLBACK_QUEST, None
+
+
+SCENARIOS: Dict[str, Callable[[int], Any]] = {
+    "dm_response": _dm_response,
+    "dm_stream": _dm_stream,
+    "map_flavor": _map_flavor,
+    "player_action": _player_action,
+    "director": _director,
+}
+
+
+# --- Harness ---
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile (p in 0-100) of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+@contextmanager
+def _using(client: OllamaClient, use_cache: bool) -> Iterator[None]:
+    """Point the shared ai_client at `client` for the duration of the run."""
+    saved = ai_client.model, ai_client.cache
+    ai_client.model = client
+    if not use_cache:
+        ai_client.cache = None
+    try:
+        yield
+    finally:
+        ai_client.model, ai_client.cache = saved
+        client.close()
+
+
+def run_scenario(name: str, client: _MeteredClient, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Runs one scenario `iterations` times on `concurrency` threads; returns its report."""
+    scenario = SCENARIOS[name]
+    client.prompt_chars.clear()
+
+    def timed(i: int):
+        started = time.perf_counter()
+        try:
+            ok, first_text = scenario(i)
+        except Exception as e:
+            logger.warning(f"{name} #{i} raised: {e}")
+            ok, first_text = False, None
+        return time.perf_counter() - started, ok, first_text
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, _ in results]
+    prompts = list(client.prompt_chars)
+    report = {
+        "calls": iterations,
+        "errors": sum(1 for _, ok, _ in results if not ok),
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "mean_ms": _ms(statistics.fmean(latencies)),
+        "max_ms": _ms(max(latencies)),
+        "calls_per_s": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "llm_requests": len(prompts),
+        "prompt_chars_mean": round(statistics.fmean(prompts)) if prompts else 0,
+        "prompt_chars_max": max(prompts, default=0),
+        # Rough estimate: 1 token ~= 4 chars
+        "prompt_tokens_mean": round(statistics.fmean(prompts) / 4) if prompts else 0,
+    }
+    first_texts = [t for _, _, t in results if t is not None]
+    if first_texts:
+        report["first_text_p50_ms"] = _ms(percentile(first_texts, 50))
+        report["first_text_p95_ms"] = _ms(percentile(first_texts, 95))
+    return report
+
+
+def run_benchmark(
+    scenarios: Sequence[str] = tuple(SCENARIOS),
+    iterations: int = 20,
+    concurrency: int = 1,
+    url: Optional[str] = None,
+    model: str = "stub",
+    latency: float = 0.0,
+    tokens_per_s: float = 0.0,
+    use_cache: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmarks the given scenarios and returns a report per scenario.
+
+    Args:
+        scenarios: Names from SCENARIOS
+        iterations: Calls per scenario
+        concurrency: Calls in flight at once (threads)
+        url: Ollama base URL; None starts a StubLLMServer
+        model: Model name to request
+        latency, tokens_per_s: Simulated model timing of the stub server
+        use_cache: Keep the shared response cache on
+    """
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {sorted(unknown)}")
+
+    server = None
+    if url is None:
+        server = StubLLMServer(latency=latency, tokens_per_s=tokens_per_s, model=model).start()
+        url = server.url
+    try:
+        client = _MeteredClient(model=model, base_url=url, timeout=60.0, max_concurrency=max(4, concurrency))
+        with _using(client, use_cache):
+            return {name: run_scenario(name, client, iterations, concurrency) for name in scenarios}
+    finally:
+        if server:
+            server.stop()
+
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    """The report as an aligned text table."""
+    columns = ["calls", "errors", "p50_ms", "p95_ms", "mean_ms", "calls_per_s",
+               "llm_requests", "prompt_tokens_mean", "first_text_p50_ms"]
+    width = max([len("scenario")] + [len(name) for name in report])
+    lines = ["  ".join([f"{'scenario':<{width}}"] + columns)]
+    for name, row in report.items():
+        lines.append("  ".join([f"{name:<{width}}"] + [f"{row.get(c, '-'):>{len(c)}}" for c in columns]))
+    return "\n".join(lines)
+
+
+# --- Intent classifier ---
+
+CLASSIFIER_PROMPTS = [
+    "I attack the goblin with my sword.",
+    "Buy 2 healing potions",
+    "Can I talk to the old hermit about the missing children?",
+    "I look around the room carefully, listening for footsteps.",
+    "Tell me about the history of the Dragon's Spine mountains and the war of the three crowns.",
+    "I sing a quiet song to myself while the fire burns down.",
+    "examine door",
+    "What is that glowing symbol carved above the archway?",
+]
+
+
+def _legacy_classify_intent(prompt_text: str) -> Optional[str]:
+    """The classifier before it was compiled (same phrases): one regex per phrase, first match in map order."""
+    lowered = prompt_text.lower()
+    for phrase, tag in INTENT_KEYWORD_MAP.items():
+        if re.search(r"\b" + re.escape(phrase) + r"\b", lowered):
+            return tag
+    return None
+
+
+def benchmark_classifier(rounds: int = 2000, prompts: Sequence[str] = CLASSIFIER_PROMPTS) -> Dict[str, Any]:
+    """Microseconds per classification, compiled classifier vs the per-phrase one."""
+    def per_call_us(fn) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for prompt in prompts:
+                fn(prompt)
+        return round((time.perf_counter() - started) / (rounds * len(prompts)) * 1e6, 2)
+
+    # The old code built a pattern per phrase on every call; with re's compile
+    # cache purged that cost is measured (legacy_cached_us is its best case)
+    def legacy(prompt):
+        re.purge()
+        return _legacy_classify_intent(prompt)
+
+    compiled_us = per_call_us(classify_intent)
+    legacy_us = per_call_us(legacy)
+    legacy_cached_us = per_call_us(_legacy_classify_intent)
+    return {
+        "prompts": len(prompts),
+        "rounds": rounds,
+        "compiled_us": compiled_us,
+        "legacy_us": legacy_us,
+        "legacy_cached_us": legacy_cached_us,
+        "speedup": round(legacy_us / compiled_us, 1) if compiled_us else 0.0,
+        "speedup_vs_cached": round(legacy_cached_us / compiled_us, 1) if compiled_us else 0.0,
+        "deterministic": sum(classify_intent(p).is_deterministic for p in prompts),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark the AI DM entry points.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--url", help="Benchmark a running Ollama instead of the built-in stub")
+    parser.add_argument("--model", default="stub")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub: seconds to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0, help="Stub: generation rate")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--classifier", action="store_true", help="Benchmark the keyword intent classifier instead")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.classifier:
+        report = {"classifier": benchmark_classifier()}
+        print(json.dumps(report, indent=2))
+        return report
+    report = run_benchmark(
+        [s.strip() for s in args.scenarios.split(",") if s.strip()],
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        url=args.url,
+        model=args.model,
+        latency=args.latency,
+        tokens_per_s=args.tokens_per_s,
+        use_cache=args.cache,
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Context builder for minimal, efficient LLM prompts.
 Generates diff-based context snapshots to reduce token usage.
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 
 logger = logging.getLogger("monolith.ai_dm.context")
@@ -57,7 +57,8 @@ Recent Changes: {changes_str}
 def build_minimal_context(
     char_context: Dict[str, Any],
     loc_context: Dict[str, Any],
-    recent_log: List[str] = None
+    recent_log: List[str] = None,
+    recent_changes: Optional[Dict[str, Any]] = None
 ) -> ContextSnapshot:
     """Build a minimal context snapshot from full game state.
     
@@ -72,6 +73,8 @@ def build_minimal_context(
         char_context: Full character context dict
         loc_context: Full location context dict
         recent_log: Optional list of recent story log entries
+        recent_changes: Precomputed changes since the last turn (e.g. from
+            the state history); derived from 'previous_state' when omitted
     
     Returns:
         ContextSnapshot ready for LLM prompt injection
@@ -96,7 +99,8 @@ def build_minimal_context(
     events = recent_log[-5:] if recent_log else []
     
     # Recent changes - calculate actual diffs from context data
-    recent_changes = _calculate_state_diff(char_context)
+    if recent_changes is None:
+        recent_changes = _calculate_state_diff(char_context)
     
     return ContextSnapshot(
         player_name=char_context.get("name", "Unknown"),
@@ -125,8 +129,12 @@ def _calculate_state_diff(char_context: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary of recent changes for LLM context
     """
+    return character_changes(char_context.get("previous_state") or {}, char_context)
+
+
+def character_changes(prev_state: Dict[str, Any], char_context: Dict[str, Any]) -> Dict[str, Any]:
+    """Diff two character state dicts (see `_calculate_state_diff` for the tracked fields)."""
     changes = {}
-    prev_state = char_context.get("previous_state", {})
     
     # HP change
     current_hp = char_context.get("current_hp", 0)
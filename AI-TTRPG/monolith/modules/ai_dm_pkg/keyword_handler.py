@@ -4,12 +4,13 @@ Includes intent classification for deterministic routing.
 """
 import logging
 import re
-from dataclasses import dataclass
-from typing import Dict, Any, List
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger("monolith.ai_dm")
 
-# Simple keyword mapping to deterministic action tags
+# Simple keyword mapping to deterministic action tags.
+# When a prompt matches several intents, the one listed first wins.
 INTENT_KEYWORD_MAP = {
     "attack": "combat_action",
     "hit": "combat_action",
@@ -27,12 +28,110 @@ INTENT_KEYWORD_MAP = {
     "speak to": "dialogue_action",
     "persuade": "dialogue_action",
     "ask": "dialogue_action",
+    "look around": "look_around",
+    "inspect room": "look_around",
+    "check self": "self_status",
+    "look at myself": "self_status",
     "tell a story about": "narrative_request",
     "describe": "narrative_request",
     "what is": "narrative_request",
     "tell me about": "narrative_request",
 }
 
+# Intents in priority order (first listed in INTENT_KEYWORD_MAP first)
+INTENT_PRIORITY = tuple(dict.fromkeys(INTENT_KEYWORD_MAP.values()))
+
+# Words skipped before an argument, and words that end one
+_ARTICLES = r"(?:the|a|an|my|some|to|at|with|on|about)"
+_STOP_WORDS = (
+    r"(?:and|then|for|from|in|into|of|using|while|near|behind|so|but|or|is|are"
+    r"|the|a|an|my|some|his|their|your|its|with|to|at|on|about"
+    r"|against|over|under|through|across|toward|towards|inside|outside|by|past|around"
+    r"|up|down|off|out|beside|beneath|above|below|among|between|via|like|as|than)"
+)
+_PRONOUNS = r"(?:it|them|him|her|this|that|these|those|me|myself|you)"
+
+_ARGUMENT = re.compile(
+    rf"\s+(?:{_ARTICLES}\s+)*"
+    r"(?:(?P<quantity>\d+)\s+)?"
+    rf"(?P<target>(?!(?:{_STOP_WORDS}|{_PRONOUNS})\b)[a-z][\w'-]*(?:\s+(?!{_STOP_WORDS}\b)[a-z][\w'-]*){{0,2}})"
+)
+
+# (RuleSet the index was built from, folded name -> item/NPC template id)
+_target_ids: Tuple[Any, Dict[str, str]] = (None, {})
+
+
+def _fold_name(name: str) -> str:
+    return " ".join(name.lower().replace("_", " ").split())
+
+
+def _target_index() -> Dict[str, str]:
+    global _target_ids
+    from ..rules_pkg.ruleset import get_ruleset
+
+    rules = get_ruleset()
+    built_from, index = _target_ids
+    if built_from is not rules:
+        index = {}
+        for templates in (rules.item_templates, rules.npc_templates):
+            for template_id, template in templates.items():
+                name = template.get("name") if isinstance(template, dict) else None
+                for alias in (template_id, template_id.removeprefix("item_"), name):
+                    if alias:
+                        index.setdefault(_fold_name(alias), template_id)
+        _target_ids = (rules, index)
+    return index
+
+
+def _singular(word: str) -> List[str]:
+    if word.endswith("ies"):
+        return [word[:-3] + "y"]
+    if word.endswith("es"):
+        return [word[:-2], word[:-1]]
+    if word.endswith("s"):
+        return [word[:-1]]
+    return []
+
+
+def resolve_target_id(target: str) -> Optional[str]:
+    """The item or NPC template id a target names, or None if it names neither.
+
+    Matches template ids ("goblin_scout", "item_rope" or "rope") and template
+    names ("Small Health Potion"), case-insensitively and in the singular
+    ("2 ropes" -> "item_rope").
+    """
+    index = _target_index()
+    folded = _fold_name(target)
+    for candidate in (folded, *_singular(folded)):
+        if candidate in index:
+            return index[candidate]
+    return None
+
+
+def _compile_intents(phrases) -> "re.Pattern":
+    # Longest phrases first, so "look at myself" wins over "look at" at the same position
+    alternatives = sorted(phrases, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(r"\s+".join(map(re.escape, p.split())) for p in alternatives) + r")\b")
+
+
+_INTENT_PATTERN = _compile_intents(INTENT_KEYWORD_MAP)
+
+
+@dataclass
+class IntentMatch:
+    """One keyword phrase found in a prompt, with the argument that follows it."""
+    intent_type: str
+    phrase: str
+    start: int
+    target: Optional[str] = None  # e.g. "old hermit" in "talk to the old hermit"
+    quantity: Optional[int] = None  # e.g. 2 in "buy 2 potions"
+
+    @property
+    def target_id(self) -> Optional[str]:
+        """The item/NPC template id the target names, e.g. "goblin_scout", or None."""
+        return resolve_target_id(self.target) if self.target else None
+
+
 @dataclass
 class ActionIntent:
     """Represents the classified intent of a player's narrative prompt."""
@@ -40,12 +139,38 @@ class ActionIntent:
     is_deterministic: bool  # True if this can be handled by coded logic
     action_tags: List[str]  # Fallback tags for legacy AI gatekeeper
     payload: Dict[str, Any] = None  # Additional parsed data
+    matches: List[IntentMatch] = field(default_factory=list)  # Every match, highest priority first
+
+
+def match_intents(prompt_text: str) -> List[IntentMatch]:
+    """Every keyword phrase in the prompt, in priority order (then by position).
+
+    Matching is case-insensitive with word boundaries, in a single pass of one
+    compiled pattern over the prompt; the argument after each phrase is
+    parsed where the phrase ends.
+    """
+    lowered = prompt_text.lower()
+    matches = []
+    for found in _INTENT_PATTERN.finditer(lowered):
+        phrase = " ".join(found.group().split())
+        match = IntentMatch(INTENT_KEYWORD_MAP[phrase], phrase, found.start())
+        argument = _ARGUMENT.match(lowered, found.end())
+        if argument:
+            match.target = " ".join(argument.group("target").split())
+            if argument.group("quantity"):
+                match.quantity = int(argument.group("quantity"))
+        matches.append(match)
+    matches.sort(key=lambda m: (INTENT_PRIORITY.index(m.intent_type), m.start))
+    return matches
+
 
 def classify_intent(prompt_text: str) -> ActionIntent:
     """Lightweight deterministic intent classifier.
 
-    Scans the prompt for known keywords (case-insensitive) and returns the first match.
-    If no keyword is found, falls back to a generic narrative intent.
+    Scans the prompt for known keywords (case-insensitive, whole words) and
+    returns the highest-priority intent found, with the argument of its
+    keyword (target name/id, quantity) in the payload. If no keyword is
+    found, falls back to a generic narrative intent.
 
     This is the first line of defense in the AI gatekeeper, allowing deterministic
     actions to bypass expensive LLM calls entirely.
@@ -56,17 +181,24 @@ def classify_intent(prompt_text: str) -> ActionIntent:
     Returns:
         ActionIntent object with classified intent type and metadata
     """
-    lowered = prompt_text.lower()
-    
-    for phrase, tag in INTENT_KEYWORD_MAP.items():
-        if re.search(r"\b" + re.escape(phrase) + r"\b", lowered):
-            deterministic = tag != "narrative_request"
-            return ActionIntent(
-                intent_type=tag,
-                is_deterministic=deterministic,
-                action_tags=[tag],
-                payload={"matched_phrase": phrase},
-            )
+    matches = match_intents(prompt_text)
+    if matches:
+        best = matches[0]
+        payload: Dict[str, Any] = {"matched_phrase": best.phrase}
+        if best.target:
+            payload["target"] = best.target
+            target_id = best.target_id
+            if target_id:
+                payload["target_id"] = target_id
+        if best.quantity is not None:
+            payload["quantity"] = best.quantity
+        return ActionIntent(
+            intent_type=best.intent_type,
+            is_deterministic=best.intent_type != "narrative_request",
+            action_tags=list(dict.fromkeys(m.intent_type for m in matches)),
+            payload=payload,
+            matches=matches,
+        )
     
     # No known keyword – treat as narrative
     return ActionIntent(
@@ -0,0 +1,223 @@
+"""
+Persistent cache for LLM responses, shared by every AI entry point.
+
+Responses are stored in a local SQLite file keyed by a hash of the
+normalized prompt, the model and the generation config, so identical
+generations are served from disk across sessions and restarts.
+
+- Normalization only removes layout differences (indentation and blank
+  lines from the f-string prompts); any change in wording is a new key.
+- Each entry has a category ("map_flavor", "narrative", "director", ...)
+  whose TTL decides when it expires.
+- The file is bounded by size: least recently used entries are evicted
+  once the stored responses exceed `max_bytes`.
+- Hit/miss/eviction counts are kept per category (`stats()`).
+
+Configuration (environment):
+    MONOLITH_LLM_CACHE=off           disable the cache
+    MONOLITH_LLM_CACHE_PATH=<file>   SQLite file (default monolith/.cache/llm_responses.sqlite3)
+    MONOLITH_LLM_CACHE_MAX_MB=<n>    size bound (default 64)
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("monolith.ai_dm.llm_cache")
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / ".cache" / "llm_responses.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds an entry stays valid, per category
+DEFAULT_TTLS: Dict[str, float] = {
+    "map_flavor": 30 * DAY,  # keyed by tags + lore, safe to reuse for long
+    "content": 30 * DAY,
+    "combat": 7 * DAY,
+    "director": DAY,  # world state moves on
+    "narrative": HOUR,  # live DM replies
+    "general": 7 * DAY,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Strip indentation, trailing spaces and blank lines; keep the wording."""
+    return "\n".join(line.strip() for line in prompt.strip().splitlines() if line.strip())
+
+
+def make_key(prompt: str, model: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for a generation request."""
+    material = json.dumps(
+        [normalize_prompt(prompt), model, generation_config or {}],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed, size-bounded LRU cache with per-category TTLs."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            path: SQLite file (":memory:" for a throwaway cache)
+            max_bytes: Evict least recently used entries above this total size
+            ttls: Seconds to keep entries, per category ("general" is the default)
+        """
+        self.path = str(path or DEFAULT_PATH)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, category: str, event: str, n: int = 1) -> None:
+        counts = self._stats.setdefault(category, {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0})
+        counts[event] += n
+
+    def get(self, key: str, category: str = "general") -> Optional[str]:
+        """The cached response for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, size, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(category, "misses")
+                return None
+            response, size, expires = row
+            if expires <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                self._count(category, "expired")
+                self._count(category, "misses")
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._count(category, "hits")
+            return response
+
+    def put(self, key: str, response: str, category: str = "general", model: str = "") -> None:
+        """Store a response, then evict least recently used entries over the size bound."""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        ttl = self.ttls.get(category, self.ttls["general"])
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, category, model, response, size, created, last_used, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, category, model, response, size, now, now, now + ttl),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            self._count(category, "stores")
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Expired entries go first, then least recently used until under the bound
+        expired = self._conn.execute(
+            "SELECT key, size, category FROM responses WHERE expires <= ?", (time.time(),)).fetchall()
+        victims = list(expired)
+        excess = self._bytes - self.max_bytes - sum(size for _, size, _ in expired)
+        if excess > 0:
+            for key, size, category in self._conn.execute(
+                    "SELECT key, size, category FROM responses WHERE expires > ? ORDER BY last_used", (time.time(),)):
+                victims.append((key, size, category))
+                excess -= size
+                if excess <= 0:
+                    break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _, _ in victims])
+        for _, size, category in victims:
+            self._bytes -= size
+            self._count(category, "evicted")
+        logger.debug(f"LLM cache evicted {len(victims)} entries ({self._bytes} bytes kept)")
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and per-category hit/miss counts (this process)."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            categories = {name: dict(counts) for name, counts in self._stats.items()}
+        hits = sum(c["hits"] for c in categories.values())
+        misses = sum(c["misses"] for c in categories.values())
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "categories": categories,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Global singleton instance
+_cache_instance: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None if disabled or unavailable."""
+    global _cache_instance
+    if os.environ.get("MONOLITH_LLM_CACHE", "on").lower() in ("0", "off", "false"):
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                try:
+                    _cache_instance = LLMResponseCache(
+                        path=os.environ.get("MONOLITH_LLM_CACHE_PATH") or DEFAULT_PATH,
+                        max_bytes=int(float(os.environ.get("MONOLITH_LLM_CACHE_MAX_MB", 64)) * 1024 * 1024),
+                    )
+                except (sqlite3.Error, OSError) as e:
+                    logger.error(f"LLM response cache unavailable: {e}")
+                    return None
+    return _cache_instance
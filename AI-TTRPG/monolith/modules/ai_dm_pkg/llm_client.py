@@ -0,0 +1,512 @@
+"""
+Asyncio-native LLM clients.
+
+Both backends (Ollama over HTTP and Gemini through google.generativeai)
+implement `AsyncLLMClient`:
+
+    text = await client.generate_async(prompt, generation_config)
+    async for chunk in client.stream(prompt, generation_config): ...
+    client.generate_content(prompt, generation_config).text   # blocking, for sync callers
+
+All requests run on one background event loop owned by this module. The
+pooled keep-alive connections are therefore shared by sync callers (threads)
+and by coroutines on any other loop, and the caller's loop never waits on the
+network.
+
+Each request has a timeout. Transient failures (connection errors, timeouts,
+HTTP 429/5xx) are retried with exponential backoff, and each client allows
+at most `max_concurrency` requests in flight.
+
+Requests are interactive unless made inside `with speculative():`. A free
+slot always goes to the most urgent waiting request, and an interactive
+request that finds every slot taken preempts (cancels) a speculative one.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import itertools
+import json
+import logging
+import random
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, TypeVar
+
+import httpx
+
+try:
+    import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
+    HAS_GENAI = True
+except ImportError:
+    HAS_GENAI = False
+
+logger = logging.getLogger("monolith.ai_dm.llm_client")
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class LLMClientError(RuntimeError):
+    """A generation request failed (after any retries)."""
+
+
+class LLMTimeoutError(LLMClientError):
+    """A generation request did not finish within its timeout."""
+
+
+INTERACTIVE = 0
+SPECULATIVE = 1
+
+
+class RequestPriority:
+    """Priority of a request; raised when an interactive caller starts waiting for it."""
+
+    def __init__(self, level: int = INTERACTIVE):
+        self.level = level
+
+    def raise_to(self, level: int) -> None:
+        self.level = min(self.level, level)
+
+
+_priority: contextvars.ContextVar[Optional[RequestPriority]] = contextvars.ContextVar("llm_priority", default=None)
+
+
+def current_priority() -> RequestPriority:
+    """Priority of requests made in the current context."""
+    return _priority.get() or RequestPriority(INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[RequestPriority]:
+    """Requests made inside the block run with `priority`."""
+    token = _priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def speculative() -> Iterator[RequestPriority]:
+    """Requests made inside the block give way to interactive ones."""
+    with request_priority(RequestPriority(SPECULATIVE)) as priority:
+        yield priority
+
+
+class TextResponse:
+    """Minimal response object with the `.text` attribute of the Gemini SDK's responses."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _IOLoop:
+    """Background thread running the event loop that owns every LLM connection."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-io", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coro: Awaitable[T], priority: Optional[RequestPriority] = None) -> "concurrent.futures.Future[T]":
+        # The caller's request priority carries over to the task on the I/O loop
+        priority = priority or _priority.get()
+
+        async def run():
+            if priority is not None:
+                _priority.set(priority)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(run(), self.loop)
+
+    def in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+
+_io = _IOLoop()
+
+
+def submit(coro: Awaitable[T], priority: Optional[RequestPriority] = None) -> "concurrent.futures.Future[T]":
+    """
+    Schedule a coroutine on the LLM loop; the future can be waited on from any
+    thread or loop. Its requests run with `priority` (default: the caller's).
+    """
+    return _io.submit(coro, priority)
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the LLM loop and block the calling thread until it finishes."""
+    if _io.in_loop():
+        raise RuntimeError("run_sync() called from the LLM I/O loop")
+    return _io.submit(coro).result()
+
+
+async def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the LLM loop without blocking the caller's loop."""
+    if _io.in_loop():
+        return await coro
+    return await asyncio.wrap_future(_io.submit(coro))
+
+
+class _PrioritySlots:
+    """
+    Concurrency limit that serves the most urgent request first.
+
+    A released slot goes to the waiter with the highest priority (then the
+    longest waiting). An interactive request that finds no free slot cancels
+    one running speculative request to take its slot.
+    """
+
+    def __init__(self, size: int):
+        self._free = size
+        self._holders: Dict[asyncio.Task, RequestPriority] = {}
+        self._waiters: List[list] = []  # [priority, seq, future]
+        self._seq = itertools.count()
+        self.preempted = 0
+
+    @asynccontextmanager
+    async def hold(self):
+        priority = current_priority()
+        await self._acquire(priority)
+        task = asyncio.current_task()
+        self._holders[task] = priority
+        try:
+            yield
+        finally:
+            del self._holders[task]
+            self._release()
+
+    async def _acquire(self, priority: RequestPriority) -> None:
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        entry = [priority, next(self._seq), asyncio.get_running_loop().create_future()]
+        self._waiters.append(entry)
+        if priority.level == INTERACTIVE:
+            self._preempt()
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].done() and not entry[2].cancelled():
+                self._release()  # the slot was handed over just as we were cancelled
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            raise
+
+    def _release(self) -> None:
+        waiting = [entry for entry in self._waiters if not entry[2].done()]
+        if not waiting:
+            self._waiters = []
+            self._free += 1
+            return
+        entry = min(waiting, key=lambda e: (e[0].level, e[1]))
+        waiting.remove(entry)
+        self._waiters = waiting
+        entry[2].set_result(None)
+
+    def _preempt(self) -> None:
+        victims = [task for task, p in self._holders.items() if p.level > INTERACTIVE and not task.cancelling()]
+        if victims:
+            logger.info("Preempting a speculative LLM request for an interactive one")
+            self.preempted += 1
+            victims[-1].cancel()
+
+
+class AsyncLLMClient:
+    """
+    Common request handling for the LLM backends.
+
+    Subclasses implement `_complete` (one full response), `_chunks` (a
+    streamed response) and `_is_transient` (which errors are worth a retry);
+    the hooks always run on the LLM I/O loop.
+    """
+    backend = "llm"
+    timeout_errors: tuple = (asyncio.TimeoutError,)
+
+    def __init__(
+        self,
+        model: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """
+        Args:
+            model: Backend model name
+            timeout: Seconds per attempt (for streams: per chunk)
+            max_retries: Extra attempts after a transient failure
+            backoff: First retry delay in seconds, doubled on every retry
+            max_concurrency: Requests allowed in flight at once
+        """
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self._slots: Optional[_PrioritySlots] = None
+
+    @property
+    def model_id(self) -> str:
+        """Stable "<backend>/<model>" name, used in cache keys."""
+        return f"{self.backend}/{self.model}"
+
+    # --- Backend hooks ---
+
+    async def _complete(self, prompt: str, config: Optional[Dict[str, Any]], timeout: float) -> str:
+        raise NotImplementedError
+
+    def _chunks(self, prompt: str, config: Optional[Dict[str, Any]], timeout: float) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    def _is_transient(self, exc: BaseException) -> bool:
+        return isinstance(exc, asyncio.TimeoutError)
+
+    async def _close(self) -> None:
+        pass
+
+    # --- Request handling (on the I/O loop) ---
+
+    def _slot(self):
+        if self._slots is None:
+            self._slots = _PrioritySlots(self.max_concurrency)
+        return self._slots.hold()
+
+    async def _retry_or_raise(self, exc: Exception, attempt: int) -> None:
+        if attempt >= self.max_retries or not self._is_transient(exc):
+            if isinstance(exc, LLMClientError):
+                raise exc
+            if isinstance(exc, self.timeout_errors):
+                raise LLMTimeoutError(f"{self.model_id} timed out") from exc
+            raise LLMClientError(f"{self.model_id} request failed: {exc}") from exc
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.75, 1.25)
+        logger.warning(f"{self.model_id} attempt {attempt + 1} failed ({exc!r}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def _generate(self, prompt: str, config: Optional[Dict[str, Any]], timeout: float) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._slot():
+                    return await asyncio.wait_for(self._complete(prompt, config, timeout), timeout)
+            except Exception as e:
+                await self._retry_or_raise(e, attempt)
+                attempt += 1
+
+    async def _stream(self, prompt: str, config: Optional[Dict[str, Any]], timeout: float) -> AsyncIterator[str]:
+        # Only retried until the first chunk arrives; after that a failure ends the stream
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._slot():
+                    chunks = self._chunks(prompt, config, timeout).__aiter__()
+                    try:
+                        while True:
+                            try:
+                                # Same task as the backend's stream context (no wait_for task)
+                                async with asyncio.timeout(timeout):
+                                    chunk = await chunks.__anext__()
+                            except StopAsyncIteration:
+                                return
+                            started = True
+                            if chunk:
+                                yield chunk
+                    finally:
+                        close = getattr(chunks, "aclose", None)
+                        if close:
+                            await close()
+            except Exception as e:
+                if started:
+                    await self._retry_or_raise(e, self.max_retries)
+                await self._retry_or_raise(e, attempt)
+                attempt += 1
+
+    # --- Public API ---
+
+    async def generate_async(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Generates a full response without blocking the caller's event loop.
+
+        Raises:
+            LLMTimeoutError: If the last attempt timed out
+            LLMClientError: If the request failed for any other reason
+        """
+        return await run_async(self._generate(prompt, generation_config, timeout or self.timeout))
+
+    async def stream(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Yields the response text chunk by chunk as the model produces it."""
+        if _io.in_loop():
+            async for chunk in self._stream(prompt, generation_config, timeout or self.timeout):
+                yield chunk
+            return
+
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for chunk in self._stream(prompt, generation_config, timeout or self.timeout):
+                    caller.call_soon_threadsafe(queue.put_nowait, (chunk, None))
+            except Exception as e:
+                caller.call_soon_threadsafe(queue.put_nowait, (None, e))
+            else:
+                caller.call_soon_threadsafe(queue.put_nowait, (None, None))
+
+        future = _io.submit(pump())
+        try:
+            while True:
+                chunk, error = await queue.get()
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            future.cancel()
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> TextResponse:
+        """Blocking call with the `generate_content` interface of the Gemini SDK."""
+        return TextResponse(run_sync(self._generate(prompt, generation_config, self.timeout)))
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await run_async(self._close())
+
+    def close(self) -> None:
+        run_sync(self._close())
+
+
+class OllamaClient(AsyncLLMClient):
+    """Client for a local Ollama instance, over pooled keep-alive HTTP connections."""
+    backend = "ollama"
+    timeout_errors = (asyncio.TimeoutError, httpx.TimeoutException)
+
+    # Gemini generation_config keys -> Ollama options
+    _OPTIONS = {
+        "temperature": "temperature",
+        "top_p": "top_p",
+        "top_k": "top_k",
+        "max_output_tokens": "num_predict",
+        "stop_sequences": "stop",
+    }
+
+    def __init__(self, model: str = "llama3", base_url: str = "http://localhost:11434", **kwargs):
+        super().__init__(model, **kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.api_url = f"{self.base_url}/api/generate"
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return self._http
+
+    def _payload(self, prompt: str, config: Optional[Dict[str, Any]], stream: bool) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"model": self.model, "prompt": prompt, "stream": stream}
+        config = config or {}
+        if config.get("response_mime_type") == "application/json":
+            payload["format"] = "json"
+        options = {self._OPTIONS[k]: v for k, v in config.items() if k in self._OPTIONS}
+        if options:
+            payload["options"] = options
+        return payload
+
+    async def _complete(self, prompt, config, timeout) -> str:
+        response = await self._client().post("/api/generate", json=self._payload(prompt, config, False), timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("response", "")
+
+    async def _chunks(self, prompt, config, timeout) -> AsyncIterator[str]:
+        payload = self._payload(prompt, config, True)
+        async with self._client().stream("POST", "/api/generate", json=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise LLMClientError(f"{self.model_id}: {data['error']}")
+                yield data.get("response", "")
+                if data.get("done"):
+                    return
+
+    def _is_transient(self, exc) -> bool:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code == 429 or exc.response.status_code >= 500
+        return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+    async def _close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class GeminiClient(AsyncLLMClient):
+    """Gemini through google.generativeai's asyncio API (genai.configure must be called first)."""
+    backend = "gemini"
+
+    def __init__(self, model: str = "gemini-1.5-flash", **kwargs):
+        if not HAS_GENAI:
+            raise LLMClientError("google-generativeai is not installed")
+        super().__init__(model, **kwargs)
+        self._model = genai.GenerativeModel(model)
+
+    @property
+    def model_name(self) -> str:
+        return self._model.model_name
+
+    async def _complete(self, prompt, config, timeout) -> str:
+        response = await self._model.generate_content_async(
+            prompt, generation_config=config, request_options={"timeout": timeout})
+        return response.text
+
+    async def _chunks(self, prompt, config, timeout) -> AsyncIterator[str]:
+        response = await self._model.generate_content_async(
+            prompt, generation_config=config, stream=True, request_options={"timeout": timeout})
+        async for chunk in response:
+            yield chunk.text
+
+    def _is_transient(self, exc) -> bool:
+        return isinstance(exc, (
+            asyncio.TimeoutError,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.DeadlineExceeded,
+        ))
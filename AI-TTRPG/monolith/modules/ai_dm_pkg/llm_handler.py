@@ -5,7 +5,7 @@ Interfaces with Google's Gemini API.
 import logging
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 # Try to import google.generativeai
 try:
@@ -19,8 +19,51 @@ logger = logging.getLogger("monolith.ai_dm.llm")
 # Import the structured response schema and context builder
 from .schemas import NarrativeResponse
 from .context_builder import build_minimal_context
+from .narration_stream import MessageExtractor
+
+from .llm_service import ai_client, clean_json_response
+
+def _build_dm_prompt(
+    prompt_text: str,
+    char_context: Dict[str, Any],
+    loc_context: Dict[str, Any],
+    recent_log: Optional[list],
+    recent_changes: Optional[Dict[str, Any]],
+) -> str:
+    # Build minimal context snapshot (diff-based)
+    context_snapshot = build_minimal_context(char_context, loc_context, recent_log, recent_changes)
+    context_text = context_snapshot.to_prompt_text()
+
+    # Build the system instruction
+    system_instruction = _get_system_instruction()
+
+    # Assemble the full prompt with minimal context
+    return f"{system_instruction}\n\n{context_text}\n\nPlayer Input: {prompt_text}\n\nYour Task: Respond in valid JSON matching {{\"message\": \"your response here\"}}"
+
+
+def _parse_dm_message(text: str) -> str:
+    return NarrativeResponse(**json.loads(clean_json_response(text))).message
+
+
+def _dm_message(full_prompt: str, response_text: str, request_type: str) -> str:
+    # --- Metrics: Estimate Tokens ---
+    # Rough estimate: 1 token ~= 4 chars
+    prompt_tokens = len(full_prompt) // 4
+    response_tokens = len(response_text) // 4
+    total_tokens = prompt_tokens + response_tokens
+    
+    logger.info(f"LLM Request ({request_type}): Prompt={prompt_tokens}t, Response={response_tokens}t, Total={total_tokens}t")
+
+    # Expect the model to return a JSON string that matches NarrativeResponse
+    try:
+        return _parse_dm_message(response_text)
+    except Exception as parse_err:
+        logger.error(f"Failed to parse structured AI response: {parse_err}")
+        # Fallback to raw text if JSON parsing fails
+        if response_text:
+            return response_text
+        return "The DM remains silent (Empty response from AI)."
 
-from .llm_service import ai_client
 
 def generate_dm_response(
     prompt_text: str,
@@ -28,13 +71,19 @@ def generate_dm_response(
     loc_context: Dict[str, Any],
     recent_log: list = None,
     api_key: Optional[str] = None,
-    request_type: str = "narrative"
+    request_type: str = "narrative",
+    recent_changes: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True
 ) -> str:
     """Generate a narrative response from the AI DM using minimal context.
 
     This implementation enforces a JSON output that conforms to the
     ``NarrativeResponse`` Pydantic schema and uses diff-based minimal
-    context to drastically reduce token usage.
+    context to drastically reduce token usage. Identical prompts (same
+    input in the same context) are answered from the shared response cache
+    unless ``use_cache`` is False.
+
+    Blocks the calling thread; coroutines use ``generate_dm_response_async``.
     """
     # Note: api_key arg is legacy/optional now, as LLMService handles auth
     
@@ -42,47 +91,85 @@ def generate_dm_response(
         return "Error: AI Client not initialized. Check settings/env vars."
 
     try:
-        # Build minimal context snapshot (diff-based)
-        context_snapshot = build_minimal_context(char_context, loc_context, recent_log)
-        context_text = context_snapshot.to_prompt_text()
+        full_prompt = _build_dm_prompt(prompt_text, char_context, loc_context, recent_log, recent_changes)
+        # Use the unified client (Ollama or Gemini)
+        # We pass generation_config to hint JSON if supported
+        response_text = ai_client.generate(
+            full_prompt,
+            generation_config={"response_mime_type": "application/json"},
+            category=request_type,
+            validate=_parse_dm_message,
+            use_cache=use_cache,
+        )
+        return _dm_message(full_prompt, response_text, request_type)
+    except Exception as e:
+        logger.error(f"AI generation failed: {e}")
+        return f"The DM is having trouble thinking right now. (Error: {e})"
 
-        # Build the system instruction
-        system_instruction = _get_system_instruction()
 
-        # Assemble the full prompt with minimal context
-        full_prompt = f"{system_instruction}\n\n{context_text}\n\nPlayer Input: {prompt_text}\n\nYour Task: Respond in valid JSON matching {{\"message\": \"your response here\"}}"
+async def generate_dm_response_async(
+    prompt_text: str,
+    char_context: Dict[str, Any],
+    loc_context: Dict[str, Any],
+    recent_log: list = None,
+    request_type: str = "narrative",
+    recent_changes: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True
+) -> str:
+    """``generate_dm_response`` for coroutines; does not block the event loop."""
+    if not ai_client.model:
+        return "Error: AI Client not initialized. Check settings/env vars."
 
-        # --- Metrics: Estimate Prompt Tokens ---
-        # Rough estimate: 1 token ~= 4 chars
-        prompt_tokens = len(full_prompt) // 4
-        
-        # Use the unified client (Ollama or Gemini)
-        # We pass generation_config to hint JSON if supported
-        response = ai_client.model.generate_content(
-            full_prompt, 
-            generation_config={"response_mime_type": "application/json"}
+    try:
+        full_prompt = _build_dm_prompt(prompt_text, char_context, loc_context, recent_log, recent_changes)
+        response_text = await ai_client.agenerate(
+            full_prompt,
+            generation_config={"response_mime_type": "application/json"},
+            category=request_type,
+            validate=_parse_dm_message,
+            use_cache=use_cache,
         )
+        return _dm_message(full_prompt, response_text, request_type)
+    except Exception as e:
+        logger.error(f"AI generation failed: {e}")
+        return f"The DM is having trouble thinking right now. (Error: {e})"
 
-        # --- Metrics: Estimate Response Tokens ---
-        response_text = response.text if response.text else ""
-        response_tokens = len(response_text) // 4
-        total_tokens = prompt_tokens + response_tokens
-        
-        logger.info(f"LLM Request ({request_type}): Prompt={prompt_tokens}t, Response={response_tokens}t, Total={total_tokens}t")
-
-        # Expect the model to return a JSON string that matches NarrativeResponse
-        try:
-            from .llm_service import clean_json_response
-            raw_text = clean_json_response(response.text)
-            data = json.loads(raw_text)
-            validated = NarrativeResponse(**data)
-            return validated.message
-        except Exception as parse_err:
-            logger.error(f"Failed to parse structured AI response: {parse_err}")
-            # Fallback to raw text if JSON parsing fails
-            if response.text:
-                return response.text
-            return "The DM remains silent (Empty response from AI)."
+async def stream_dm_response(
+    prompt_text: str,
+    char_context: Dict[str, Any],
+    loc_context: Dict[str, Any],
+    on_text: Callable[[str], Awaitable[None]],
+    recent_log: list = None,
+    request_type: str = "narrative",
+    recent_changes: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True
+) -> str:
+    """Streaming ``generate_dm_response_async``.
+
+    ``on_text`` is awaited with each new piece of the narration as the model
+    writes it. The complete response then goes through the same structured
+    validation as the non-streaming call, and the validated message is
+    returned (it may differ from the streamed text if validation failed).
+    """
+    if not ai_client.model:
+        return "Error: AI Client not initialized. Check settings/env vars."
+
+    try:
+        full_prompt = _build_dm_prompt(prompt_text, char_context, loc_context, recent_log, recent_changes)
+        extractor = MessageExtractor()
+        parts = []
+        async for chunk in ai_client.astream(
+            full_prompt,
+            generation_config={"response_mime_type": "application/json"},
+            category=request_type,
+            validate=_parse_dm_message,
+            use_cache=use_cache,
+        ):
+            parts.append(chunk)
+            text = extractor.feed(chunk)
+            if text:
+                await on_text(text)
+        return _dm_message(full_prompt, "".join(parts), request_type)
     except Exception as e:
         logger.error(f"AI generation failed: {e}")
         return f"The DM is having trouble thinking right now. (Error: {e})"
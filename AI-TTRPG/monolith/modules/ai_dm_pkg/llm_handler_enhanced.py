@@ -3,93 +3,50 @@ Enhanced LLM Handler with Async Narrative Generation
 
 This module provides:
 - Async narrative generation (doesn't block UI)
-- Narrative caching and pre-loading
+- Pre-loading of narratives into the shared LLM response cache
 - Context window management for token optimization
 - Integration with existing Gemini API handler
 - Fallback to synchronous if no API key
 
 Design:
-- Wraps existing generate_dm_response() in async executor
-- Maintains narrative cache for common scenarios
+- Awaits generate_dm_response_async(), which runs on the asyncio LLM client
+  (pooled connections, timeouts, retries) instead of a thread pool
+- Caching is done by the persistent response cache (llm_cache), shared
+  with every other AI entry point
 - Pre-loads narratives for likely player actions
-- Thread-safe cache management
 """
 import logging
 import asyncio
 from typing import Dict, Any, Optional, List
-from concurrent.futures import ThreadPoolExecutor
-import threading
+
+from .llm_cache import get_llm_cache
+from .llm_client import speculative
+from .prefetch import get_prefetcher
 
 logger = logging.getLogger("monolith.ai_dm.llm_enhanced")
 
 # Import existing handler
 try:
-    from .llm_handler import generate_dm_response, HAS_GENAI
+    from .llm_handler import generate_dm_response_async, HAS_GENAI
+    from .llm_service import ai_client
 except ImportError:
     logger.warning("Could not import llm_handler, AI DM will be disabled")
     HAS_GENAI = False
-    def generate_dm_response(*args, **kwargs):
+    ai_client = None
+    async def generate_dm_response_async(*args, **kwargs):
         return "AI DM not available"
 
 
-class NarrativeCache:
-    """Thread-safe cache for pre-generated narratives"""
-    
-    def __init__(self, max_size: int = 50):
-        self.cache: Dict[str, str] = {}
-        self.max_size = max_size
-        self._lock = threading.Lock()
-        logger.info(f"Narrative cache initialized (max size: {max_size})")
-    
-    def get(self, key: str) -> Optional[str]:
-        """Get cached narrative"""
-        with self._lock:
-            narrative = self.cache.get(key)
-            if narrative:
-                logger.info(f"Cache HIT: {key}")
-            return narrative
-    
-    def set(self, key: str, narrative: str):
-        """Store narrative in cache"""
-        with self._lock:
-            # Simple FIFO eviction if full
-            if len(self.cache) >= self.max_size:
-                # Remove oldest (first inserted)
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
-                logger.debug(f"Cache evicted: {oldest_key}")
-            
-            self.cache[key] = narrative
-            logger.info(f"Cache SET: {key}")
-    
-    def clear(self):
-        """Clear all cached narratives"""
-        with self._lock:
-            self.cache.clear()
-            logger.info("Cache cleared")
-    
-    def get_stats(self) -> Dict[str, int]:
-        """Get cache statistics"""
-        with self._lock:
-            return {
-                "size": len(self.cache),
-                "max_size": self.max_size
-            }
-
-
 class AIContentManager:
     """Manages AI narrative generation with async execution and caching"""
     
-    def __init__(self, api_key: Optional[str] = None, max_cache_size: int = 50):
+    def __init__(self, api_key: Optional[str] = None):
         """Initialize AI DM manager
         
         Args:
             api_key: Google API key for Gemini (optional, can use env var)
-            max_cache_size: Maximum number of cached narratives
         """
         self.api_key = api_key
-        self.cache = NarrativeCache(max_cache_size)
-        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai_dm_")
         
         # Context management
         self.max_context_history = 5  # Keep last 5 interactions
@@ -97,21 +54,6 @@ class AIContentManager:
         
         logger.info("AIContentManager initialized")
     
-    def _generate_cache_key(self, action_type: str, context: Dict[str, Any]) -> str:
-        """Generate a cache key from action and context
-        
-        Args:
-            action_type: Type of action (e.g., "move", "ability")
-            context: Game context
-            
-        Returns:
-            Cache key string
-        """
-        # Simple key generation - could be more sophisticated
-        location = context.get("location_name", "unknown")
-        outcome = context.get("outcome", "")
-        return f"{action_type}:{location}:{outcome}"
-    
     async def generate_narrative_async(
         self,
         prompt_text: str,
@@ -128,37 +70,26 @@ class AIContentManager:
             char_context: Character state
             loc_context: Location context
             recent_log: Recent event log
-            action_type: Type of action for caching
-            use_cache: Whether to use cached narratives
+            action_type: Type of action (kept in the context history)
+            use_cache: Whether to use the shared response cache
             
         Returns:
             Generated narrative text
         """
-        # Check cache first
-        if use_cache:
-            cache_context = {
-                "location_name": loc_context.get("name"),
-                "outcome": prompt_text[:50]  # First 50 chars as outcome
-            }
-            cache_key = self._generate_cache_key(action_type, cache_context)
-            cached = self.cache.get(cache_key)
-            
-            if cached:
-                logger.info("Using cached narrative")
-                return cached
-        
-        # Generate in background thread
-        loop = asyncio.get_event_loop()
-        
         try:
-            narrative = await loop.run_in_executor(
-                self.executor,
-                self._synchronous_llm_call,
-                prompt_text,
-                char_context,
-                loc_context,
-                recent_log
+            # Use recent context history
+            context_log = recent_log or self._get_recent_context()
+
+            # Cache hits return without an API call
+            narrative = await generate_dm_response_async(
+                prompt_text=prompt_text,
+                char_context=char_context,
+                loc_context=loc_context,
+                recent_log=context_log,
+                request_type="narrative",
+                use_cache=use_cache
             )
+            logger.info(f"Generated narrative ({len(narrative)} chars)")
             
             # Update context history
             self._update_context_history({
@@ -167,47 +98,12 @@ class AIContentManager:
                 "action_type": action_type
             })
             
-            # Cache the result
-            if use_cache:
-                self.cache.set(cache_key, narrative)
-            
             return narrative
             
         except Exception as e:
             logger.exception(f"Async narrative generation failed: {e}")
             return f"The DM pauses momentarily... (Error: {str(e)})"
     
-    def _synchronous_llm_call(
-        self,
-        prompt_text: str,
-        char_context: Dict[str, Any],
-        loc_context: Dict[str, Any],
-        recent_log: Optional[List] = None
-    ) -> str:
-        """Synchronous LLM call (runs in thread pool)
-        
-        This wraps the existing generate_dm_response function.
-        """
-        try:
-            # Use recent context history
-            context_log = recent_log or self._get_recent_context()
-            
-            narrative = generate_dm_response(
-                prompt_text=prompt_text,
-                char_context=char_context,
-                loc_context=loc_context,
-                recent_log=context_log,
-                api_key=self.api_key,
-                request_type="narrative"
-            )
-            
-            logger.info(f"Generated narrative ({len(narrative)} chars)")
-            return narrative
-            
-        except Exception as e:
-            logger.exception(f"LLM call failed: {e}")
-            return f"The DM considers the situation... (Error: {str(e)})"
-    
     def _update_context_history(self, interaction: Dict[str, Any]):
         """Update rolling context window"""
         self.context_history.append(interaction)
@@ -238,39 +134,47 @@ class AIContentManager:
         """
         logger.info(f"Pre-generating {len(likely_actions)} narratives...")
         
-        tasks = []
-        for action in likely_actions:
-            task = self.generate_narrative_async(
-                prompt_text=action.get("prompt", ""),
-                char_context=char_context,
-                loc_context=loc_context,
-                action_type=action.get("action_type", "generic"),
-                use_cache=True  # Will cache results
-            )
-            tasks.append((action.get("action_type"), task))
+        # Run concurrently at speculative priority: the LLM client bounds how many
+        # requests are in flight and serves interactive requests first
+        with speculative():
+            narratives = await asyncio.gather(*(
+                self.generate_narrative_async(
+                    prompt_text=action.get("prompt", ""),
+                    char_context=char_context,
+                    loc_context=loc_context,
+                    action_type=action.get("action_type", "generic"),
+                    use_cache=True  # Will cache results
+                )
+                for action in likely_actions
+            ), return_exceptions=True)
         
         results = {}
-        for action_type, task in tasks:
-            try:
-                narrative = await task
+        for action, narrative in zip(likely_actions, narratives):
+            action_type = action.get("action_type")
+            if isinstance(narrative, Exception):
+                logger.error(f"Pre-generation failed for {action_type}: {narrative}")
+            else:
                 results[action_type] = narrative
-            except Exception as e:
-                logger.error(f"Pre-generation failed for {action_type}: {e}")
         
         logger.info(f"Pre-generated {len(results)} narratives")
         return results
     
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get statistics about the narrative cache"""
+        """Get statistics about the shared LLM response cache"""
+        cache = get_llm_cache()
+        prefetcher = get_prefetcher()
         return {
-            "cache": self.cache.get_stats(),
+            "cache": cache.stats() if cache else {"enabled": False},
+            "single_flight": ai_client.flights.stats() if ai_client is not None else {},
+            "prefetch": prefetcher.stats() if prefetcher else {"enabled": False},
             "context_history_size": len(self.context_history),
             "has_api": HAS_GENAI
         }
     
     def shutdown(self):
-        """Clean shutdown of executor"""
-        self.executor.shutdown(wait=True)
+        """Clean shutdown: close the LLM client's pooled connections"""
+        if ai_client is not None:
+            ai_client.close()
         logger.info("AIContentManager shut down")
 
 
@@ -1,9 +1,13 @@
 import os
 import json
+import asyncio
 import logging
-import hashlib
 import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .llm_cache import get_llm_cache, make_key
+from .llm_client import AsyncLLMClient, GeminiClient, OllamaClient
+from .single_flight import SingleFlight
 
 logger = logging.getLogger("monolith.ai_dm.llm")
 
@@ -16,79 +20,31 @@ def clean_json_response(text: str) -> str:
         text = text[:-3]
     return text
 
-class LLMCache:
-    """
-    Simple in-memory cache for LLM responses to reduce latency and costs.
-    """
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
 
-    def _generate_key(self, tags: List[str]) -> str:
-        """
-        Generates a deterministic cache key based on sorted tags.
-        """
-        # Sort tags to ensure ["forest", "dark"] == ["dark", "forest"]
-        sorted_tags = sorted([t.lower().strip() for t in tags])
-        key_str = "|".join(sorted_tags)
-        return hashlib.sha256(key_str.encode()).hexdigest()
-
-    def get(self, tags: List[str]) -> Optional[Dict[str, Any]]:
-        """Retrieves cached context if available."""
-        key = self._generate_key(tags)
-        result = self._cache.get(key)
-        if result:
-            logger.info(f"Cache HIT for tags: {tags}")
-        else:
-            logger.info(f"Cache MISS for tags: {tags}")
-        return result
-
-    def set(self, tags: List[str], data: Dict[str, Any]) -> None:
-        """Stores valid context in the cache."""
-        key = self._generate_key(tags)
-        self._cache[key] = data
-        logger.debug(f"Cached result for tags: {tags}")
+def _client_options() -> Dict[str, Any]:
+    """Timeout, retry and concurrency settings for the LLM clients (from env)."""
+    return {
+        "timeout": float(os.environ.get("LLM_TIMEOUT", 60)),
+        "max_retries": int(os.environ.get("LLM_MAX_RETRIES", 2)),
+        "max_concurrency": int(os.environ.get("LLM_MAX_CONCURRENCY", 4)),
+    }
 
 
-import requests
+def _local_client() -> OllamaClient:
+    # Default to llama3:latest, but allow override
+    return OllamaClient(
+        model=os.environ.get("LOCAL_LLM_MODEL", "llama3:latest"),
+        base_url=os.environ.get("LOCAL_LLM_URL", "http://localhost:11434"),
+        **_client_options(),
+    )
 
-class OllamaClient:
-    """Client for local Ollama instance."""
-    def __init__(self, model="llama3", base_url="http://localhost:11434"):
-        self.model = model
-        self.base_url = base_url
-        self.api_url = f"{base_url}/api/generate"
-        
-    def generate_content(self, prompt: str, generation_config: Optional[Dict] = None) -> Any:
-        """Mimics the Google GenAI generate_content interface."""
-        try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            if generation_config and generation_config.get("response_mime_type") == "application/json":
-                payload["format"] = "json"
-                
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            text = result.get("response", "")
-            
-            # Return an object with a .text attribute to match GenAI
-            class ResponseWrapper:
-                def __init__(self, t): self.text = t
-            return ResponseWrapper(text)
-            
-        except Exception as e:
-            logger.error(f"Ollama generation failed: {e}")
-            raise e
 
 class LLMService:
     def __init__(self):
         self.model = None
-        self.cache = LLMCache()
+        self.cache = get_llm_cache()
+        # Identical requests in flight at the same time share one generation
+        self.flights = SingleFlight()
         self._setup_client()
 
     def _setup_client(self):
@@ -101,31 +57,181 @@ class LLMService:
         if use_local or not api_key:
             logger.info("Using Local LLM (Ollama)...")
             try:
-                # Default to llama3:latest, but allow override
-                model_name = os.environ.get("LOCAL_LLM_MODEL", "llama3:latest")
-                self.model = OllamaClient(model=model_name)
-                logger.info(f"Local AI Client initialized with model: {model_name}")
+                self.model = _local_client()
+                logger.info(f"Local AI Client initialized with model: {self.model.model}")
             except Exception as e:
                 logger.error(f"Local AI Init failed: {e}")
         else:
             try:
                 genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                self.model = GeminiClient('gemini-1.5-flash', **_client_options())
                 logger.info("Gemini AI Client initialized.")
             except Exception as e:
                 logger.error(f"Gemini AI Init failed: {e}")
 
+    @staticmethod
+    def _model_id(model: Any) -> Optional[str]:
+        """Stable name of the model for cache keys, or None if it cannot be identified."""
+        return model.model_id if isinstance(model, AsyncLLMClient) else None
+
+    def _request_key(
+        self, prompt: str, generation_config: Optional[Dict[str, Any]], use_cache: bool
+    ) -> Optional[str]:
+        """Cache and single-flight key of a request, or None if its response must not be shared."""
+        if not self.model:
+            raise RuntimeError("AI Client not initialized")
+        model_id = self._model_id(self.model)
+        if not (use_cache and model_id):
+            return None
+        return make_key(prompt, model_id, generation_config)
+
+    def _cached(self, key: Optional[str], category: str) -> Optional[str]:
+        if not (key and self.cache):
+            return None
+        cached = self.cache.get(key, category)
+        if cached is not None:
+            logger.info(f"LLM cache HIT ({category})")
+        return cached
+
+    def _store(self, key, text, category, validate) -> None:
+        if not (key and self.cache and text):
+            return
+        try:
+            if validate:
+                validate(text)
+            self.cache.put(key, text, category, self._model_id(self.model))
+        except Exception as e:
+            logger.debug(f"Not caching invalid {category} response: {e}")
+
+    def _complete(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> str:
+        if generation_config:
+            response = self.model.generate_content(prompt, generation_config=generation_config)
+        else:
+            response = self.model.generate_content(prompt)
+        return response.text or ""
+
+    async def _acomplete(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> str:
+        if isinstance(self.model, AsyncLLMClient):
+            text = await self.model.generate_async(prompt, generation_config)
+        else:
+            kwargs = {"generation_config": generation_config} if generation_config else {}
+            text = (await asyncio.to_thread(self.model.generate_content, prompt, **kwargs)).text
+        return text or ""
+
+    def generate(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        category: str = "general",
+        validate: Optional[Callable[[str], Any]] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Generates text with the active model, through the shared response cache.
+        A request identical to one already in flight waits for that one instead
+        of being sent again.
+
+        Blocks the calling thread; coroutines use `agenerate` instead.
+
+        Args:
+            prompt: Full prompt text
+            generation_config: Passed to the model (part of the cache key)
+            category: Cache category, decides how long the response is kept
+            validate: Called with the response text; the response is only
+                cached if it returns without raising
+            use_cache: False for prompts whose answer must not be reused
+                (nor shared with a concurrent identical request)
+
+        Returns:
+            The response text ("" if the model returned nothing)
+        """
+        key = self._request_key(prompt, generation_config, use_cache)
+        cached = self._cached(key, category)
+        if cached is not None:
+            return cached
+        if not key:
+            return self._complete(prompt, generation_config)
+
+        def fetch() -> str:
+            text = self._complete(prompt, generation_config)
+            self._store(key, text, category, validate)
+            return text
+
+        return self.flights.run_sync(key, fetch)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        category: str = "general",
+        validate: Optional[Callable[[str], Any]] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        `generate` for coroutines: the request never blocks the running event loop.
+
+        Cancelling the caller detaches it from a shared request; the request
+        itself is only cancelled when every caller waiting for it was.
+        """
+        key = self._request_key(prompt, generation_config, use_cache)
+        cached = self._cached(key, category)
+        if cached is not None:
+            return cached
+        if not key:
+            return await self._acomplete(prompt, generation_config)
+        return await self.flights.run(key, lambda: self._fetch(key, prompt, generation_config, category, validate))
+
+    async def _fetch(self, key, prompt, generation_config, category, validate) -> str:
+        text = await self._acomplete(prompt, generation_config)
+        self._store(key, text, category, validate)
+        return text
+
+    async def astream(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        category: str = "general",
+        validate: Optional[Callable[[str], Any]] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Yields the response as it is generated.
+
+        A cached response is yielded as a single chunk, and so is the response
+        of an identical request already in flight (e.g. a prefetch), which this
+        call waits for instead of starting another. A streamed response is
+        cached once complete.
+        """
+        key = self._request_key(prompt, generation_config, use_cache)
+        cached = self._cached(key, category)
+        if cached is not None:
+            yield cached
+            return
+        if key and self.flights.in_flight(key):
+            yield await self.flights.run(key, lambda: self._fetch(key, prompt, generation_config, category, validate))
+            return
+
+        if not isinstance(self.model, AsyncLLMClient):
+            yield await self.agenerate(prompt, generation_config, category, validate, use_cache=False)
+            return
+
+        parts = []
+        async for chunk in self.model.stream(prompt, generation_config):
+            parts.append(chunk)
+            yield chunk
+        self._store(key, "".join(parts), category, validate)
+
+    def close(self) -> None:
+        """Close the pooled connections of the active client."""
+        if isinstance(self.model, AsyncLLMClient):
+            self.model.close()
+
     def generate_map_flavor(self, tags: List[str], lore_context: str = "") -> Dict[str, Any]:
         """
         Generates a batch of flavor text based on map tags.
         Returns a dictionary matching MapFlavorContext.
-        Checks cache first.
+        Served from the response cache when the same tags and lore were generated before.
         """
-        # 1. Check Cache
-        cached_result = self.cache.get(tags)
-        if cached_result:
-            return cached_result
-
         if not self.model:
             return self._get_fallback_flavor()
 
@@ -136,7 +242,11 @@ class LLMService:
             logger.error("Could not import MapFlavorContext")
             return self._get_fallback_flavor()
 
-        tag_str = ", ".join(tags)
+        def parse(text: str) -> Dict[str, Any]:
+            return MapFlavorContext(**json.loads(clean_json_response(text))).model_dump()
+
+        # Sort tags so ["forest", "dark"] and ["dark", "forest"] share a prompt (and cache entry)
+        tag_str = ", ".join(sorted(t.lower().strip() for t in tags))
         prompt = f"""
         You are a Fantasy RPG Content Generator.
         I need a JSON object containing atmospheric descriptions and combat flavor text for a map with these tags: [{tag_str}].
@@ -162,22 +272,14 @@ class LLMService:
         try:
             # Use generation_config to enforce JSON response if supported by the model version,
             # otherwise rely on the prompt and cleaning.
-            response = self.model.generate_content(
+            text = self.generate(
                 prompt,
-                generation_config={"response_mime_type": "application/json"}
+                generation_config={"response_mime_type": "application/json"},
+                category="map_flavor",
+                validate=parse,
             )
-            
-            clean_text = clean_json_response(response.text)
-            data = json.loads(clean_text)
-            
             # Validate with Pydantic
-            validated_context = MapFlavorContext(**data)
-            result_dict = validated_context.model_dump()
-            
-            # 2. Populate Cache
-            self.cache.set(tags, result_dict)
-            
-            return result_dict
+            return parse(text)
             
         except Exception as e:
             logger.warning(f"Flavor generation failed with primary model: {e}")
@@ -186,7 +288,7 @@ class LLMService:
             if not isinstance(self.model, OllamaClient):
                 logger.info("Attempting fallback to Local LLM (Ollama)...")
                 try:
-                    self.model = OllamaClient(model=os.environ.get("LOCAL_LLM_MODEL", "llama3:latest"))
+                    self.model = _local_client()
                     # Retry with new model
                     return self.generate_map_flavor(tags, lore_context)
                 except Exception as ollama_e:
@@ -206,36 +308,36 @@ class LLMService:
         {chr(10).join(clean_log)}
         """
         try:
-            return self.model.generate_content(prompt).text.strip()
+            return self.generate(prompt, category="combat").strip()
         except:
             return ""
 
     async def process_player_action(self, action_payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Processes a player action, potentially calling tools, and returning a narrative.
+
+        The model may ask for several tool calls at once; independent calls
+        run concurrently and all results are narrated in one follow-up call.
         """
         player_id = action_payload.get("player_id")
         action_type = action_payload.get("action_type")
         context = action_payload.get("context_data", {})
         
         # 1. Construct Prompt with Tool Definitions
-        from .tools import AI_TOOLS
-        
-        tools_desc = json.dumps({
-            name: {"description": t["description"], "schema": t["schema"].model_json_schema()}
-            for name, t in AI_TOOLS.items()
-        }, indent=2)
+        from .tools import AI_TOOLS, run_tool_calls, tool_manifest
         
         prompt = f"""
         You are the AI Dungeon Master. The player ({player_id}) has performed an action: {action_type}.
         Context: {json.dumps(context, indent=2)}
         
         Available Tools:
-        {tools_desc}
+        {tool_manifest()}
         
         Decide how to respond.
-        1. If the action requires a game mechanic (e.g., checking a skill, spawning a monster), call a tool.
-           Output a JSON object: {{"tool_call": "tool_name", "arguments": {{...}}}}
+        1. If the action requires game mechanics (e.g., checking a skill, spawning a monster), call tools.
+           Output a JSON object: {{"tool_calls": [{{"tool": "tool_name", "arguments": {{...}}}}, ...]}}
+           Calls run at the same time; give a call "depends_on": [indexes of earlier calls] if it must happen after them.
+           This only orders the calls: arguments cannot refer to earlier results, which you will see all together afterwards.
         2. If no tool is needed, provide a narrative response.
            Output a JSON object: {{"narrative": "Your story text here."}}
            
@@ -244,38 +346,40 @@ class LLMService:
         
         # 2. First LLM Call (Decide Action)
         try:
-            # Run blocking call in thread if needed, or just call directly
-            response_text = self.model.generate_content(prompt).text
+            # Not cached: the decision triggers tool calls with side effects
+            response_text = await self.agenerate(prompt, use_cache=False)
             response_text = clean_json_response(response_text)
             decision = json.loads(response_text)
             
-            # 3. Handle Tool Call
-            if "tool_call" in decision:
-                tool_name = decision["tool_call"]
-                args = decision.get("arguments", {})
+            # Single-call form: {"tool_call": name, "arguments": {...}}
+            calls = decision.get("tool_calls") or (
+                [{"tool": decision["tool_call"], "arguments": decision.get("arguments", {})}]
+                if "tool_call" in decision else [])
+            
+            # 3. Handle Tool Calls
+            if calls:
+                names = [call.get("tool") if isinstance(call, dict) else None for call in calls]
+                if not any(name in AI_TOOLS for name in names):
+                    return {"narrative": f"The DM tries to do something strange ({names[0]}), but fails."}
+                
+                logger.info(f"AI executing tools: {names}")
+                tool_results = await run_tool_calls(calls)
+                
+                # 4. Second LLM Call (Narrate all Results)
+                results_text = "\n".join(
+                    f"- {r['tool']}({json.dumps(r['arguments'])}): {r['result']}" for r in tool_results)
+                follow_up_prompt = f"""
+                These tools were executed.
+                Results:
+                {results_text}
                 
-                if tool_name in AI_TOOLS:
-                    logger.info(f"AI executing tool: {tool_name} with {args}")
-                    tool_func = AI_TOOLS[tool_name]["function"]
-                    try:
-                        # Execute Tool
-                        tool_result = tool_func(**args)
-                    except Exception as e:
-                        tool_result = f"Tool execution failed: {e}"
-                        
-                    # 4. Second LLM Call (Narrate Result)
-                    follow_up_prompt = f"""
-                    The tool '{tool_name}' was executed.
-                    Result: {tool_result}
-                    
-                    Provide a final narrative response describing what happens to the player.
-                    Output JSON: {{"narrative": "..."}}
-                    """
-                    final_resp = self.model.generate_content(follow_up_prompt).text
-                    final_data = json.loads(clean_json_response(final_resp))
-                    return final_data
-                else:
-                    return {"narrative": f"The DM tries to do something strange ({tool_name}), but fails."}
+                Provide a final narrative response describing what happens to the player.
+                Output JSON: {{"narrative": "..."}}
+                """
+                final_resp = await self.agenerate(follow_up_prompt, use_cache=False)
+                final_data = json.loads(clean_json_response(final_resp))
+                final_data["tool_results"] = tool_results
+                return final_data
             
             # 4. Handle Direct Narrative
             elif "narrative" in decision:
@@ -0,0 +1,79 @@
+"""
+Incremental narration for streamed DM responses.
+
+The DM answers in JSON ({"message": "..."}). While that response streams in,
+`MessageExtractor` decodes the "message" string out of the partial JSON so the
+narration can be shown as it is written. The complete response is still
+validated against NarrativeResponse once it has arrived.
+
+Event bus topics (published by ai_dm.stream_narrative_response):
+    NARRATION_CHUNK  {"request_id", "actor_id", "text"}  new text to append
+    NARRATION_DONE   {"request_id", "actor_id", "success", "message",
+                      "first_text_ms", "total_ms"}       final, validated message
+"""
+import json
+import re
+
+NARRATION_CHUNK = "ai_dm.narration_chunk"
+NARRATION_DONE = "ai_dm.narration_done"
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class MessageExtractor:
+    """Feeds on raw response chunks and returns the newly decoded message text."""
+
+    def __init__(self, key: str = "message"):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._head = ""  # raw text before the message value starts
+        self._pending = ""  # undecoded tail (an escape split across chunks)
+        self._state = "seek"  # seek -> value -> done, or plain
+
+    def feed(self, chunk: str) -> str:
+        """The message text added by `chunk` ("" if none yet)."""
+        if self._state == "seek":
+            self._head += chunk
+            start = self._head.lstrip()
+            if start and start[0] not in "{`":
+                # The model ignored the JSON format: its text is the narration
+                self._state = "plain"
+                return self._head
+            match = self._key.search(self._head)
+            if not match:
+                return ""
+            self._state = "value"
+            chunk, self._head = self._head[match.end():], ""
+        if self._state == "plain":
+            return chunk
+        if self._state == "done":
+            return ""
+        return self._decode(chunk)
+
+    def _decode(self, chunk: str) -> str:
+        text = self._pending + chunk
+        out = []
+        i = 0
+        while i < len(text):
+            c = text[i]
+            if c == '"':
+                self._state = "done"
+                self._pending = ""
+                return "".join(out)
+            if c != "\\":
+                out.append(c)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                break
+            if text[i + 1] != "u":
+                out.append(_ESCAPES.get(text[i + 1], text[i + 1]))
+                i += 2
+                continue
+            # \uXXXX, or two of them for a surrogate pair
+            size = 12 if text[i + 2:i + 3].lower() == "d" and text[i + 3:i + 4].lower() in "89ab" else 6
+            if i + size > len(text):
+                break
+            out.append(json.loads(f'"{text[i:i + size]}"'))
+            i += size
+        self._pending = text[i:]
+        return "".join(out)
@@ -0,0 +1,429 @@
+"""
+Speculative narrative prefetching.
+
+While the player reads the last narration, the AI DM is idle. The
+`PrefetchScheduler` uses that time to generate the DM's answer to the
+actions the player is most likely to take next:
+
+    recent  prompts this player actually sent to the AI DM, most frequent
+            first, answered again for the new game state (the default)
+    move    stepping onto a passable adjacent tile, or through an exit
+    npc     approaching a visible NPC (closest first)
+    shop    browsing a visible shop or merchant
+    combat  an exchange with each enemy of the current encounter
+
+The template kinds (move, npc, shop, combat) are opt-in: players rarely
+type those exact phrasings, and most of them are answered by the
+deterministic story router anyway. Any kind whose measured hit rate stays
+below `min_hit_rate` after `probe_size` generations is no longer generated.
+
+Speculations are built exactly like the real request (same context, same
+prompt), so their answers land in the shared response cache; a request is
+counted as a hit only when its text matches a speculation the way the cache
+key does (case-sensitive), and is then served from the cache or joins the
+generation still in flight.
+
+Speculative requests run at SPECULATIVE priority (see llm_client) and never
+delay an interactive one. A game state change makes queued and running
+speculations stale: they are cancelled and replanned once the game is idle
+again. Hits are counted per kind; kinds that hit more often are generated
+first, and `stats()` shows what each kind is worth.
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .keyword_handler import classify_intent
+from .llm_cache import get_llm_cache, normalize_prompt
+from .llm_client import speculative
+
+logger = logging.getLogger("monolith.ai_dm.prefetch")
+
+KINDS = ("recent", "move", "npc", "shop", "combat")
+DEFAULT_KINDS = ("recent",)
+HISTORY_SIZE = 32  # recent prompts remembered per actor
+
+# Events after which the last narration's context no longer holds
+STATE_TOPICS = (
+    "action.move", "action.dialogue", "action.buy", "action.sell", "action.equip", "action.unequip",
+    "combat.started", "combat.updated", "combat.ended",
+    "game.started", "game.loaded",
+    "story.narrative_advanced", "story.interaction_resolved", "story.player_action_resolved",
+)
+
+VIEW_RADIUS = 8
+_DIRECTIONS = (("north", 0, -1), ("south", 0, 1), ("east", 1, 0), ("west", -1, 0))
+_MERCHANT_TAGS = {"merchant", "shopkeeper", "vendor", "trader"}
+
+# actor_id -> (char_context, loc_context, tracked_id, recent_changes), as used for real requests
+ContextFn = Callable[[str], Tuple[Dict[str, Any], Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]]
+
+
+@dataclass
+class Speculation:
+    actor_id: str
+    kind: str
+    prompt: str
+    state: str = "queued"  # queued -> running -> done, or cancelled
+    task: Optional[asyncio.Task] = None
+
+
+def _cache_text(prompt: str) -> str:
+    # The player text as the response cache keys it: same normalization, same case
+    return normalize_prompt(prompt)
+
+
+def _name(entity: Dict[str, Any]) -> str:
+    name = entity.get("name_override") or entity.get("name") or entity.get("template_id") or "someone"
+    return name.replace("_", " ")
+
+
+def _tile_grid(map_data: Any) -> Tuple[List[List[int]], List[int]]:
+    # Same map formats as the combat pathfinding: {"tiles": [[...]], "impassable": [...]} or a bare grid
+    if isinstance(map_data, dict):
+        return map_data.get("tiles") or [], map_data.get("impassable", [1, 2, 3])
+    if isinstance(map_data, list):
+        return map_data, [1, 2, 3]
+    return [], []
+
+
+def _position(entity: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    coords = entity.get("coordinates")
+    if isinstance(coords, (list, tuple)) and len(coords) >= 2:
+        return coords[0], coords[1]
+    if entity.get("position_x") is not None and entity.get("position_y") is not None:
+        return entity["position_x"], entity["position_y"]
+    return None
+
+
+def predict_actions(
+    char_context: Dict[str, Any],
+    loc_context: Dict[str, Any],
+    combat: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Likely next player prompts as (kind, prompt), most likely first within each kind.
+
+    Args:
+        char_context: The acting character's context
+        loc_context: Context of the character's location
+        combat: State of the current encounter (LocalCombatManager.get_state_dict), if any
+    """
+    predictions: List[Tuple[str, str]] = []
+    here = _position(char_context)
+
+    tiles, impassable = _tile_grid(loc_context.get("generated_map_data"))
+    if tiles and here:
+        x, y = here
+        for direction, dx, dy in _DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= ny < len(tiles) and 0 <= nx < len(tiles[ny]) and tiles[ny][nx] not in impassable:
+                predictions.append(("move", f"I head {direction}."))
+    for direction in loc_context.get("exits") or {}:
+        predictions.append(("move", f"I take the {direction} exit."))
+
+    visible = []
+    for npc in loc_context.get("npcs") or []:
+        if npc.get("current_hp", 1) <= 0:
+            continue
+        there = _position(npc)
+        distance = abs(there[0] - here[0]) + abs(there[1] - here[1]) if here and there else VIEW_RADIUS
+        if distance <= VIEW_RADIUS:
+            visible.append((distance, npc))
+    visible.sort(key=lambda pair: pair[0])
+    for _, npc in visible:
+        predictions.append(("npc", f"I approach {_name(npc)}."))
+        if _MERCHANT_TAGS & set(npc.get("behavior_tags") or []):
+            predictions.append(("shop", f"I browse {_name(npc)}'s wares."))
+    for key, annotation in (loc_context.get("ai_annotations") or {}).items():
+        if isinstance(annotation, dict) and annotation.get("type") == "shop":
+            predictions.append(("shop", f"I step into the {key.replace('_', ' ')}."))
+
+    if combat and combat.get("is_active", True):
+        for participant in combat.get("participants") or []:
+            if participant.get("team") == "enemy" and participant.get("hp", 1) > 0:
+                predictions.append(("combat", f"I charge {_name(participant)}."))
+    return predictions
+
+
+def recent_requests(history: "OrderedDict[str, int]") -> List[Tuple[str, str]]:
+    """
+    Prompts from an actor's request history as ("recent", prompt), most often
+    sent first and, among equally frequent ones, most recently sent first.
+
+    Args:
+        history: prompt -> times sent, oldest first (see PrefetchScheduler.record_request)
+    """
+    ordered = sorted(reversed(list(history.items())), key=lambda item: -item[1])
+    return [("recent", prompt) for prompt, _ in ordered]
+
+
+def _needs_ai(prompt: str) -> bool:
+    # Prompts the story router answers without the AI are not worth generating
+    return not classify_intent(prompt).is_deterministic
+
+
+class PrefetchScheduler:
+    """Plans and runs speculative narrative generations while the game is idle."""
+
+    def __init__(
+        self,
+        generate: Optional[Callable[..., Any]] = None,
+        kinds: Tuple[str, ...] = DEFAULT_KINDS,
+        max_speculations: int = 8,
+        max_parallel: int = 1,
+        idle_delay: float = 1.5,
+        min_hit_rate: float = 0.1,
+        probe_size: int = 20,
+    ):
+        """
+        Args:
+            generate: Coroutine function called like llm_handler.generate_dm_response_async
+            kinds: Prediction kinds to generate
+            max_speculations: Speculations per plan
+            max_parallel: Speculations generated at once (keep below the
+                client's max_concurrency so interactive requests find a free slot)
+            idle_delay: Seconds without activity before planning
+            min_hit_rate: Hit rate a kind needs to keep being generated
+            probe_size: Generations of a kind before its hit rate is judged
+        """
+        if generate is None:
+            from .llm_handler import generate_dm_response_async as generate
+        self.generate = generate
+        self.kinds = tuple(kinds)
+        self.max_speculations = max_speculations
+        self.max_parallel = max_parallel
+        self.idle_delay = idle_delay
+        self.min_hit_rate = min_hit_rate
+        self.probe_size = probe_size
+
+        self._context: Optional[ContextFn] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._actor_id: Optional[str] = None
+        self._combat: Optional[Dict[str, Any]] = None
+        self._interactive = 0  # AI narrations in progress
+        self._planner: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._speculations: Dict[str, Speculation] = {}  # cache text -> current speculation
+        self._history: Dict[str, "OrderedDict[str, int]"] = {}  # actor_id -> prompt -> times sent
+        self._requests = 0
+        self._hits = 0
+        self._counts = {kind: {"generated": 0, "hits": 0, "stale": 0, "preempted": 0} for kind in KINDS}
+
+    # --- Wiring ---
+
+    def attach(self, bus, context: ContextFn) -> None:
+        """Subscribe to game state changes; `context` looks up an actor's narration context."""
+        self._context = context
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # taken from the first event
+        for topic in STATE_TOPICS:
+            bus.subscribe(topic, self._on_state_changed)
+
+    async def _on_state_changed(self, topic: str, payload: Any) -> None:
+        self._loop = asyncio.get_running_loop()
+        if topic in ("combat.started", "combat.updated"):
+            self._combat = payload if isinstance(payload, dict) and payload.get("is_active", True) else None
+        elif topic == "combat.ended":
+            self._combat = None
+        self._cancel("stale")
+        self._schedule()
+
+    def _call(self, fn: Callable[..., None], *args) -> None:
+        # Public entry points may be called from worker threads; the scheduler state lives on its loop
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            fn(*args)
+        else:
+            loop.call_soon_threadsafe(fn, *args)
+
+    # --- Real requests ---
+
+    def record_request(self, actor_id: str, prompt_text: str) -> bool:
+        """
+        Called when the AI DM is asked for a narration. Counts whether it was
+        speculated, remembers the prompt for the "recent" predictions and
+        stops the rest of the speculations: they would only compete with
+        this request, and its narration changes the context.
+
+        Returns:
+            True if the prompt was speculated (generated or still generating)
+        """
+        try:
+            self._loop = self._loop or asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        with self._lock:
+            self._requests += 1
+            self._interactive += 1
+            self._actor_id = actor_id
+            history = self._history.setdefault(actor_id, OrderedDict())
+            history[prompt_text] = history.pop(prompt_text, 0) + 1
+            if len(history) > HISTORY_SIZE:
+                history.popitem(last=False)
+            spec = self._speculations.get(_cache_text(prompt_text))
+            hit = spec is not None and spec.actor_id == actor_id and spec.state in ("running", "done")
+            if hit:
+                self._hits += 1
+                self._counts[spec.kind]["hits"] += 1
+        self._call(self._interrupt, spec if hit else None)
+        return hit
+
+    def narration_done(self, actor_id: str) -> None:
+        """Called when a narration was delivered: the player is reading, the DM is idle."""
+        with self._lock:
+            self._interactive = max(0, self._interactive - 1)
+            self._actor_id = actor_id
+        self._call(self._schedule)
+
+    # --- Planning ---
+
+    def _interrupt(self, keep: Optional[Speculation]) -> None:
+        # A running match is left alone: the request joins it
+        if self._planner and not self._planner.done():
+            self._planner.cancel()
+        self._cancel(None, keep)
+
+    def _schedule(self) -> None:
+        if self._planner and not self._planner.done():
+            self._planner.cancel()
+        self._planner = asyncio.get_running_loop().create_task(self._plan())
+
+    def _weight(self, kind: str) -> float:
+        counts = self._counts[kind]
+        return (counts["hits"] + 1) / (counts["generated"] + 2)
+
+    def _gated(self, kind: str) -> bool:
+        # A kind that has had its chance and is rarely asked for costs more than it saves
+        counts = self._counts[kind]
+        return counts["generated"] >= self.probe_size and counts["hits"] < self.min_hit_rate * counts["generated"]
+
+    async def _plan(self) -> None:
+        await asyncio.sleep(self.idle_delay)
+        with self._lock:
+            actor_id = self._actor_id if not self._interactive else None
+        if actor_id is None or self._context is None:
+            return
+        try:
+            char_context, loc_context, _, recent_changes = await asyncio.to_thread(self._context, actor_id)
+        except Exception as e:
+            logger.debug(f"No prefetch for {actor_id}: {e}")
+            return
+        if self._interactive:
+            return
+
+        with self._lock:
+            kinds = {kind for kind in self.kinds if not self._gated(kind)}
+            candidates = recent_requests(self._history.get(actor_id, OrderedDict()))
+        if kinds - {"recent"}:
+            candidates += predict_actions(char_context, loc_context, self._combat)
+        predictions = [(kind, prompt) for kind, prompt in candidates if kind in kinds and _needs_ai(prompt)]
+        # Stable sort: within a kind the predictions keep their likelihood order
+        predictions.sort(key=lambda prediction: -self._weight(prediction[0]))
+
+        self._cancel("stale")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_parallel)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._speculations = {}
+            for kind, prompt in predictions[:self.max_speculations]:
+                spec = Speculation(actor_id, kind, prompt)
+                if self._speculations.setdefault(_cache_text(prompt), spec) is spec:
+                    spec.task = loop.create_task(self._run(spec, char_context, loc_context, recent_changes))
+        if self._speculations:
+            logger.info(f"Prefetching {len(self._speculations)} narrations for {actor_id}")
+
+    async def _run(self, spec: Speculation, char_context, loc_context, recent_changes) -> None:
+        async with self._slots:
+            for attempt in range(2):
+                spec.state = "running"
+                try:
+                    with speculative():
+                        await self.generate(spec.prompt, char_context, loc_context, recent_changes=recent_changes)
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise  # stale
+                    # Preempted by an interactive request; the retry waits for a free slot
+                    with self._lock:
+                        self._counts[spec.kind]["preempted"] += 1
+                    continue
+                spec.state = "done"
+                with self._lock:
+                    self._counts[spec.kind]["generated"] += 1
+                return
+            spec.state = "cancelled"
+
+    def _cancel(self, reason: Optional[str], keep: Optional[Speculation] = None) -> None:
+        """Cancel queued and running speculations (except `keep`), counting them under `reason`."""
+        with self._lock:
+            pending = [s for s in self._speculations.values() if s is not keep and s.state in ("queued", "running")]
+            for spec in pending:
+                spec.state = "cancelled"
+                if reason:
+                    self._counts[spec.kind][reason] += 1
+        for spec in pending:
+            if spec.task:
+                spec.task.cancel()
+
+    # --- Introspection ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests, hits and per-kind counters (generated, hits, stale, preempted, hit_rate, gated)."""
+        with self._lock:
+            kinds = {
+                kind: {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / counts["generated"], 3) if counts["generated"] else 0.0,
+                    "gated": self._gated(kind),
+                }
+                for kind, counts in self._counts.items()
+            }
+            return {
+                "requests": self._requests,
+                "hits": self._hits,
+                "hit_rate": round(self._hits / self._requests, 3) if self._requests else 0.0,
+                "pending": sum(s.state in ("queued", "running") for s in self._speculations.values()),
+                "kinds": kinds,
+            }
+
+
+_prefetcher: Optional[PrefetchScheduler] = None
+
+
+def get_prefetcher() -> Optional[PrefetchScheduler]:
+    """
+    The process-wide prefetch scheduler, or None when prefetching is disabled.
+
+    Configured by environment:
+        MONOLITH_PREFETCH               "on" to enable (default off)
+        MONOLITH_PREFETCH_KINDS         comma-separated kinds to generate (default: recent)
+        MONOLITH_PREFETCH_MAX           speculations per plan (default 8)
+        MONOLITH_PREFETCH_MIN_HIT_RATE  hit rate a kind needs to stay on (default 0.1)
+    """
+    global _prefetcher
+    if os.environ.get("MONOLITH_PREFETCH", "off").lower() not in ("1", "on", "true"):
+        return None
+    if get_llm_cache() is None:
+        return None  # speculations are delivered through the response cache
+    if _prefetcher is None:
+        kinds = os.environ.get("MONOLITH_PREFETCH_KINDS")
+        _prefetcher = PrefetchScheduler(
+            kinds=tuple(k.strip() for k in kinds.split(",") if k.strip() in KINDS) if kinds else DEFAULT_KINDS,
+            max_speculations=int(os.environ.get("MONOLITH_PREFETCH_MAX", 8)),
+            min_hit_rate=float(os.environ.get("MONOLITH_PREFETCH_MIN_HIT_RATE", 0.1)),
+        )
+    return _prefetcher
@@ -18,3 +18,7 @@ class DialogueResponse(BaseModel):
     success: bool = Field(..., description="Indicates if the AI generated a valid response")
     dialogue: str = Field(..., description="The NPC's spoken line")
     next_action: Optional[str] = Field(None, description="Suggested next action for the player or NPC")
+
+class CannedDialogue(BaseModel):
+    """Schema for pre-generated NPC dialogue (batch content generation)."""
+    lines: List[str] = Field(..., min_length=3, max_length=8, description="Distinct lines the NPC can say")
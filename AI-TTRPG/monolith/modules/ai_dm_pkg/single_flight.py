@@ -0,0 +1,155 @@
+"""
+Single-flight deduplication of identical LLM requests.
+
+The response cache only helps once a response has arrived. Until then, every
+caller asking for the same prompt (several locations with the same tags
+generated at once, a retried narrative prompt) would send its own request.
+`SingleFlight` lets those callers attach to the one generation already in
+flight for their key and all receive its result (or its exception).
+
+Flights are shared by threads and coroutines on any event loop:
+
+    text = flights.run_sync(key, lambda: generate(prompt))          # blocking callers
+    text = await flights.run(key, lambda: generate_async(prompt))   # coroutines
+
+An async generation runs on the LLM I/O loop, with the priority of its most
+urgent waiter: an interactive caller joining a speculative generation makes
+it interactive. A cancelled waiter only leaves its flight; the generation
+itself is cancelled when its last waiter has gone.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+from .llm_client import RequestPriority, current_priority, submit
+
+logger = logging.getLogger("monolith.ai_dm.single_flight")
+
+T = TypeVar("T")
+
+
+class _Flight:
+    def __init__(self, future: "concurrent.futures.Future"):
+        self.future = future
+        self.waiters = 1
+        self.priority = RequestPriority(current_priority().level)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._started = 0
+        self._joined = 0
+        self._abandoned = 0
+
+    def _attach(self, key: str) -> Tuple[_Flight, bool]:
+        # (flight for key, True if the caller must start it); call with the lock held
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.waiters += 1
+            flight.priority.raise_to(current_priority().level)
+            self._joined += 1
+            return flight, False
+        flight = _Flight(concurrent.futures.Future())
+        self._flights[key] = flight
+        self._started += 1
+        return flight, True
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        """A waiter was cancelled; abandon the generation if nobody else waits for it."""
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters > 0:
+                return
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if flight.future.cancel():
+            with self._lock:
+                self._abandoned += 1
+            logger.debug(f"Abandoned generation {key[:12]}: every waiter was cancelled")
+
+    def run_sync(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Returns fn() for the first caller of a key; concurrent callers with the
+        same key block until that call finishes and get the same result.
+        """
+        with self._lock:
+            flight, leader = self._attach(key)
+            if leader:
+                # A blocking call cannot be interrupted: waiters may leave but not cancel it
+                flight.future.set_running_or_notify_cancel()
+        if not leader:
+            return flight.future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._finish(key, flight)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Awaits the generation in flight for key, starting `factory()` on the
+        LLM I/O loop if there is none.
+
+        Cancelling the caller only detaches it; the generation is cancelled
+        once all of its waiters have been cancelled.
+        """
+        with self._lock:
+            flight, leader = self._attach(key)
+        if leader:
+            task = submit(factory(), flight.priority)
+            task.add_done_callback(lambda done: self._finish(key, flight))
+            # Forward the outcome to the flight's future, and a cancelled flight to the task
+            task.add_done_callback(lambda done: _copy_outcome(done, flight.future))
+            flight.future.add_done_callback(lambda done: done.cancelled() and task.cancel())
+
+        try:
+            # shield: the shared future must survive the cancellation of any one waiter
+            return await asyncio.shield(asyncio.wrap_future(flight.future))
+        except asyncio.CancelledError:
+            if not flight.future.done():
+                self._leave(key, flight)
+            raise
+
+    def in_flight(self, key: str) -> bool:
+        """True while a generation for key is running."""
+        with self._lock:
+            return key in self._flights
+
+    def stats(self) -> Dict[str, Any]:
+        """Flight counters: started generations, callers that joined one, abandoned ones."""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "started": self._started,
+                "joined": self._joined,
+                "abandoned": self._abandoned,
+            }
+
+
+def _copy_outcome(source: "concurrent.futures.Future", target: "concurrent.futures.Future") -> None:
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+    except concurrent.futures.InvalidStateError:
+        pass  # the flight was abandoned meanwhile
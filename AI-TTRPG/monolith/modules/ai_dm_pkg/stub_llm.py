@@ -0,0 +1,284 @@
+"""
+Deterministic local stand-in for an Ollama server.
+
+Speaks the Ollama `/api/generate` protocol (one JSON response, or NDJSON
+chunks when `"stream": true`), so `OllamaClient` and everything above it can
+be exercised, benchmarked and load-tested without a Gemini key, a model or
+network access:
+
+    with StubLLMServer(latency=0.2, tokens_per_s=40) as server:
+        client = OllamaClient(model="stub", base_url=server.url)
+
+or standalone, in place of `ollama serve`:
+
+    python -m monolith.modules.ai_dm_pkg.stub_llm --port 11434 --latency 0.2
+
+Responses are chosen by matching the prompt against rules (a substring and
+a response template). The default rules answer the prompts the AI DM sends
+(narration, map flavor, tool decisions, director beats, NPC dialogue) with
+valid JSON. In a template, `{request}` is replaced with the request number
+and `{prompt_chars}` with the prompt length. Timing is simulated with a fixed
+time to first token plus a token rate, without randomness, so two runs
+produce the same responses in the same time.
+"""
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("monolith.ai_dm.stub_llm")
+
+# (prompt substring, response template); the first match wins
+DEFAULT_RULES: Tuple[Tuple[str, str], ...] = (
+    ('"environment_description"', json.dumps({
+        "environment_description": "Mist pools between crooked trees (stub #{request}).",
+        "visuals": ["Moss-covered stones", "A broken cart", "Crows on a branch"],
+        "sounds": ["Dripping water", "Distant howling", "Creaking boughs"],
+        "smells": ["Wet earth", "Woodsmoke"],
+        "combat_hits": ["The blow lands hard.", "Steel bites deep.", "A clean strike.",
+                        "The foe staggers.", "A crunching hit."],
+        "combat_misses": ["The swing goes wide.", "Steel meets air.", "A near miss.",
+                          "The foe ducks away.", "The attack glances off."],
+        "spell_casts": ["Runes flare.", "The air hums.", "Light coils around your hand."],
+        "enemy_intros": ["Something stirs in the brush.", "Eyes glint in the dark.", "A snarl rises."],
+    })),
+    ("Available Tools:", json.dumps({"tool_calls": [
+        {"tool": "perform_skill_check", "arguments": {"skill_name": "Perception", "difficulty": 12}},
+        {"tool": "spawn_entity", "arguments": {"entity_type": "rat", "x": 2, "y": 3}},
+    ]})),
+    ("tools were executed.", json.dumps({"narrative": "You scan the shadows and spot a loose stone (stub #{request})."})),
+    ("Campaign Director", json.dumps({
+        "title": "The Silent Bell",
+        "description": "The chapel bell has stopped ringing and the villagers are afraid.",
+        "objectives": ["Visit the chapel", "Find the bell ringer"],
+        "enemy_types": ["Bandit"],
+        "reward_summary": "40 Gold",
+        "new_narrative_tags": ["chapel"],
+    })),
+    ('"lines"', json.dumps({"lines": ["Well met, traveller.", "Mind the road at night.", "Coin first, questions later.",
+                                      "The mill's been quiet.", "Safe travels."]})),
+    ('"message"', json.dumps({
+        "success": True,
+        "message": "Rain drums on the slate roofs as you move on; the street smells of wet stone "
+                   "and woodsmoke, and somewhere a door bangs in the wind (stub #{request}).",
+    })),
+)
+DEFAULT_RESPONSE = "The stub model has nothing to add (request {request})."
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Pieces the stub streams and counts as tokens: words with their trailing whitespace."""
+    return _TOKEN.findall(text)
+
+
+class StubLLMServer:
+    """An in-process Ollama stand-in on a background thread."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        tokens_per_s: float = 0.0,
+        rules: Sequence[Tuple[str, str]] = (),
+        default_response: str = DEFAULT_RESPONSE,
+        model: str = "stub",
+    ):
+        """
+        Args:
+            host, port: Address to listen on (port 0 picks a free port)
+            latency: Seconds before the first token of every response
+            tokens_per_s: Generation rate after the first token; 0 is instant
+            rules: (prompt substring, response template) pairs checked before
+                the default rules
+            default_response: Template used when no rule matches
+            model: Model name reported in responses
+        """
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.rules: List[Tuple[str, str]] = list(rules) + list(DEFAULT_RULES)
+        self.default_response = default_response
+        self.model = model
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub LLM listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- Responses ---
+
+    def respond(self, prompt: str, request: int = 0) -> str:
+        """The response text for a prompt."""
+        template = next((t for needle, t in self.rules if needle in prompt), self.default_response)
+        # Not str.format: JSON templates are full of literal braces
+        return template.replace("{request}", str(request)).replace("{prompt_chars}", str(len(prompt)))
+
+    def _delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+    # --- Stats ---
+
+    def _begin(self, prompt: str, stream: bool) -> int:
+        with self._lock:
+            self._requests += 1
+            self._streamed += stream
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            self._prompt_chars.append(len(prompt))
+            return self._requests
+
+    def _end(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._requests = 0
+            self._streamed = 0
+            self._in_flight = 0
+            self._max_in_flight = 0
+            self._prompt_chars: List[int] = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests served, how many streamed, peak concurrency and prompt sizes (chars)."""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "streamed": self._streamed,
+                "max_in_flight": self._max_in_flight,
+                "prompt_chars": list(self._prompt_chars),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        stub = self.server.stub
+        if self.path == "/api/tags":
+            self._send(200, {"models": [{"name": stub.model, "model": stub.model}]})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = body["prompt"]
+        except (ValueError, KeyError) as e:
+            self._send(400, {"error": f"invalid request: {e}"})
+            return
+
+        stub = self.server.stub
+        stream = body.get("stream", True)  # Ollama streams unless told not to
+        request = stub._begin(prompt, stream)
+        started = time.perf_counter()
+        try:
+            tokens = tokenize(stub.respond(prompt, request))
+            final = {
+                "model": body.get("model", stub.model),
+                "done": True,
+                "prompt_eval_count": len(tokenize(prompt)),
+                "eval_count": len(tokens),
+            }
+            time.sleep(stub.latency)
+            if stream:
+                self._stream(stub, tokens, final, started)
+            else:
+                time.sleep(stub._delay(len(tokens)))
+                final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+                self._send(200, {**final, "response": "".join(tokens)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away (cancelled or timed out)
+        finally:
+            stub._end()
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, stub: StubLLMServer, tokens: List[str], final: Dict[str, Any], started: float) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            time.sleep(stub._delay(1))
+            self._chunk({"model": final["model"], "response": token, "done": False})
+        final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+        self._chunk({**final, "response": ""})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _chunk(self, line: Dict[str, Any]) -> None:
+        data = (json.dumps(line) + "\n").encode()
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a deterministic Ollama stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="Generation rate (0: instant)")
+    parser.add_argument("--responses", help='JSON file with [["prompt substring", "response template"], ...]')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    rules = ()
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            rules = [tuple(rule) for rule in json.load(f)]
+    server = StubLLMServer(args.host, args.port, args.latency, args.tokens_per_s, rules)
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
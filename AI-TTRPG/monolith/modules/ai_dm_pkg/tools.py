@@ -1,5 +1,9 @@
+import asyncio
+import inspect
+import json
+import threading
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple, Type
 
 # --- Tool Schemas ---
 
@@ -57,3 +61,92 @@ AI_TOOLS = {
         "description": "Use this to spawn new creatures or items on the map dynamically."
     }
 }
+
+# Bumped by register_tool; the manifest is rebuilt once per registry version
+_registry_version = 0
+_manifest_lock = threading.Lock()
+_manifest: Optional[Tuple[Any, str]] = None
+
+# Upper bound on tool calls executed for one model response
+MAX_TOOL_CALLS = 8
+
+
+def register_tool(name: str, schema: Type[BaseModel], function: Callable[..., Any], description: str) -> None:
+    """Adds (or replaces) a tool the AI DM may call. `function` may be sync or async."""
+    global _registry_version
+    AI_TOOLS[name] = {"schema": schema, "function": function, "description": description}
+    with _manifest_lock:
+        _registry_version += 1
+
+
+def tool_manifest() -> str:
+    """
+    The JSON description of AI_TOOLS (name -> description and argument schema)
+    for the AI DM prompt. Built once per registry version instead of calling
+    model_json_schema() on every tool for every action.
+    """
+    global _manifest
+    # Names are part of the key so direct edits to AI_TOOLS are picked up too
+    key = (_registry_version, tuple(AI_TOOLS))
+    with _manifest_lock:
+        if _manifest is None or _manifest[0] != key:
+            _manifest = (key, json.dumps({
+                name: {"description": t["description"], "schema": t["schema"].model_json_schema()}
+                for name, t in AI_TOOLS.items()
+            }, indent=2))
+        return _manifest[1]
+
+
+async def _call_tool(name: str, arguments: Dict[str, Any]) -> str:
+    tool = AI_TOOLS.get(name)
+    if tool is None:
+        return f"Unknown tool '{name}'."
+    try:
+        args = tool["schema"](**arguments).model_dump()
+        function = tool["function"]
+        if inspect.iscoroutinefunction(function):
+            result = await function(**args)
+        else:
+            # Sync tools may touch the databases; keep them off the event loop
+            result = await asyncio.to_thread(function, **args)
+        return str(result)
+    except Exception as e:
+        return f"Tool execution failed: {e}"
+
+
+async def run_tool_calls(calls: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Executes tool calls requested by the model, concurrently where possible.
+
+    Each call is {"tool": name, "arguments": {...}}, optionally with
+    "depends_on": [indexes of earlier calls]; a call starts once those have
+    finished, all others start at once. This only orders the calls: a call's
+    arguments are fixed by the model and never see earlier results. Failures
+    and malformed entries are reported as the call's result rather than raised.
+
+    Returns:
+        One {"tool", "arguments", "result"} dict per call, in request order
+    """
+    calls = calls[:MAX_TOOL_CALLS]
+    tasks: List[asyncio.Task] = []
+
+    async def run(call: Any, after: List[asyncio.Task]) -> str:
+        if after:
+            await asyncio.wait(after)
+        if not isinstance(call, dict):
+            return f"Malformed tool call: {call!r}."
+        return await _call_tool(call.get("tool", ""), call.get("arguments") or {})
+
+    for index, call in enumerate(calls):
+        depends_on = call.get("depends_on") if isinstance(call, dict) else None
+        if not isinstance(depends_on, list):
+            depends_on = []
+        # Only earlier calls can be dependencies, so there are no cycles
+        after = [tasks[i] for i in depends_on if isinstance(i, int) and 0 <= i < index]
+        tasks.append(asyncio.create_task(run(call, after)))
+    results = await asyncio.gather(*tasks)
+    return [
+        {"tool": call.get("tool"), "arguments": call.get("arguments") or {}, "result": result}
+        if isinstance(call, dict) else {"tool": None, "arguments": {}, "result": result}
+        for call, result in zip(calls, results)
+    ]
@@ -0,0 +1,223 @@
+"""
+Off-loop autosave writer for the JSON save system.
+
+Gameplay handlers run on the orchestrator's asyncio loop, so writing a save
+file inline stalls the AI DM and the event bus for the duration of the disk
+I/O. This service takes an immutable snapshot of the state (the serialized or
+dumped save envelope) on the caller's thread and hands the write to a worker thread.
+States that are already immutable (see state_history) are passed by
+reference and serialized on the worker instead.
+
+Responsibilities:
+- Coalesce bursts of save requests per slot into a single write (debounce)
+- Write atomically via save_manager (temp file + rename)
+- Expose flush() for explicit saves and shutdown()
+- Notify listeners (e.g. the SQLite state sync) with the written state
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from . import save_manager
+from .save_schemas import SaveFile, SaveGameData
+
+logger = logging.getLogger("monolith.autosave")
+
+
+@dataclass(frozen=True)
+class _PendingSave:
+    save_file: SaveFile
+    snapshot: Union[str, Dict[str, Any], None]  # None: serialize on the worker
+    first_requested: float
+    last_requested: float
+
+
+class AutosaveService:
+    """Debounced, coalescing save writer backed by a single worker thread.
+
+    Each slot holds at most one pending snapshot; a newer request replaces the
+    older one. The worker waits until no new request has arrived for
+    `debounce_seconds` (but never longer than `max_delay_seconds` after the
+    first pending request) and then writes the latest snapshot.
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float = 0.5,
+        max_delay_seconds: float = 5.0,
+        writer: Optional[Callable[[SaveFile, Any], Dict[str, Any]]] = None
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._writer = writer or save_manager.write_save_file
+        self._cond = threading.Condition()
+        self._pending: Dict[str, _PendingSave] = {}
+        self._last_results: Dict[str, Dict[str, Any]] = {}
+        self._writing = False
+        self._flush_requested = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[SaveGameData], None]] = []
+        self.stats = {"requests": 0, "writes": 0, "coalesced": 0}
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def request_save(
+        self,
+        data: SaveGameData,
+        slot_name: str = "CurrentSave",
+        active_character_id: Optional[str] = None,
+        active_character_name: Optional[str] = None,
+        frozen: bool = False
+    ) -> Dict[str, Any]:
+        """Snapshot the state and queue it for a background write.
+
+        Args:
+            data: Complete game state data
+            slot_name: Name of the save slot
+            active_character_id: ID of the currently active character
+            active_character_name: Name of the currently active character
+            frozen: `data` is never mutated in place, so serialization can
+                be deferred to the worker thread
+
+        Returns:
+            Result dictionary; `queued` is True when the write was deferred
+        """
+        try:
+            save_file = save_manager.build_save_file(
+                data, slot_name, active_character_id, active_character_name
+            )
+            snapshot = None if frozen else save_manager.snapshot_save_file(save_file)
+        except Exception as e:
+            logger.exception(f"Autosave snapshot failed: {e}")
+            return {"success": False, "error": str(e)}
+
+        with self._cond:
+            if self._stopped:
+                # Late requests after shutdown are written synchronously
+                return self._writer(save_file, snapshot)
+
+            now = time.monotonic()
+            previous = self._pending.get(slot_name)
+            first_requested = previous.first_requested if previous else now
+            self._pending[slot_name] = _PendingSave(save_file, snapshot, first_requested, now)
+            self.stats["requests"] += 1
+            if previous:
+                self.stats["coalesced"] += 1
+
+            self._ensure_worker()
+            self._cond.notify_all()
+
+        return {
+            "success": True,
+            "queued": True,
+            "path": str(save_manager._get_save_path(slot_name, save_manager.SAVE_FORMAT)),
+            "name": save_file.active_character_name or "Unknown",
+            "timestamp": save_file.save_time
+        }
+
+    def flush(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Write all pending snapshots now and wait for them to land on disk.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Mapping of slot name to the result of its most recent write
+        """
+        with self._cond:
+            if self._pending or self._writing:
+                self._flush_requested = True
+                self._cond.notify_all()
+                if not self._cond.wait_for(lambda: not self._pending and not self._writing, timeout):
+                    logger.warning("Autosave flush timed out with writes still pending")
+                self._flush_requested = False
+            return dict(self._last_results)
+
+    def shutdown(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Flush pending saves and stop the worker thread."""
+        results = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread:
+            thread.join(timeout)
+        logger.info(f"Autosave stopped: {self.stats}")
+        return results
+
+    def add_listener(self, callback: Callable[[SaveGameData], None]) -> None:
+        """Register a callback run on the worker thread after each successful write.
+
+        The callback receives the written SaveGameData itself, not a decoded
+        copy of the snapshot; it must treat it as read-only.
+        """
+        self._listeners.append(callback)
+
+    def last_result(self, slot_name: str) -> Optional[Dict[str, Any]]:
+        """Return the result of the most recent write for a slot, if any."""
+        with self._cond:
+            return self._last_results.get(slot_name)
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        # Caller holds self._cond
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+            self._thread.start()
+
+    def _next_deadline(self) -> float:
+        last = max(p.last_requested for p in self._pending.values())
+        first = min(p.first_requested for p in self._pending.values())
+        return min(last + self.debounce_seconds, first + self.max_delay_seconds)
+
+    def _notify_listeners(self, data: SaveGameData):
+        for callback in self._listeners:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.exception(f"Autosave listener failed: {e}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopped)
+                if self._stopped and not self._pending:
+                    return
+
+                # Debounce: keep absorbing requests until the burst goes quiet
+                while self._pending and not self._flush_requested and not self._stopped:
+                    remaining = self._next_deadline() - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch, self._pending = self._pending, {}
+                self._writing = True
+
+            results = {}
+            for slot_name, pending in batch.items():
+                try:
+                    snapshot = pending.snapshot
+                    if snapshot is None:
+                        snapshot = save_manager.snapshot_save_file(pending.save_file)
+                    results[slot_name] = self._writer(pending.save_file, snapshot)
+                except Exception as e:
+                    logger.exception(f"Autosave write failed for slot '{slot_name}': {e}")
+                    results[slot_name] = {"success": False, "error": str(e)}
+                    continue
+                if results[slot_name].get("success"):
+                    self._notify_listeners(pending.save_file.data)
+
+            with self._cond:
+                self._writing = False
+                self._last_results.update(results)
+                self.stats["writes"] += len(results)
+                self._cond.notify_all()
@@ -7,7 +7,7 @@ original HTTP API. It operates in-process by calling
 into its own internal `crud` and `services` functions
 with a local DB session.
 """
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple
 import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -17,6 +17,7 @@ from .character_pkg import crud as char_crud
 from .character_pkg import services as char_services
 from .character_pkg import database as char_db
 from .character_pkg import schemas as char_schemas
+from .character_pkg import context_cache as char_context_cache
 from .character_pkg.models import Character
 from .character_pkg import schemas
 from ..shared import with_db_session
@@ -32,6 +33,51 @@ def get_db():
     finally:
         db.close()
 
+def _character_uuid(char_id: str) -> str:
+    """Strips the "player_" prefix used by story_engine ids, if present."""
+    # Note: char_id in story_engine is "player_UUID"
+    # We must strip the "player_" prefix if present, or use as is if it's already a UUID
+    if isinstance(char_id, str) and char_id.startswith("player_"):
+        return char_id.split("_", 1)[1]
+    # Assume it is already a UUID or valid ID
+    return char_id
+
+# Fields combat writes straight to the database
+_COMBAT_FIELDS = ("current_hp", "temp_hp", "current_composure", "resource_pools", "status_effects", "injuries")
+
+# Called as listener(ids, fields) after every combat write (see add_combat_listener)
+_combat_listeners: List[Callable[[Tuple[str, ...], Dict[str, Any]], None]] = []
+
+
+def add_combat_listener(listener: Callable[[Tuple[str, ...], Dict[str, Any]], None]) -> None:
+    """Register a callback for combat results.
+
+    Combat updates the database directly. Listeners receive the ids the
+    character may be saved under (the caller's id and the database id) and
+    its combat fields as written; the orchestrator uses this to record the
+    result in the live game state, so the AI DM's per-turn diff sees damage,
+    healing and statuses. Listeners run on the thread that made the write.
+    """
+    if listener not in _combat_listeners:
+        _combat_listeners.append(listener)
+
+
+def remove_combat_listener(listener: Callable[[Tuple[str, ...], Dict[str, Any]], None]) -> None:
+    if listener in _combat_listeners:
+        _combat_listeners.remove(listener)
+
+
+def _publish_combat_result(char_id: str, db_char: Character) -> None:
+    if not _combat_listeners:
+        return
+    ids = tuple(dict.fromkeys((char_id, db_char.id)))
+    fields = {f: getattr(db_char, f) for f in _COMBAT_FIELDS}
+    for listener in list(_combat_listeners):
+        try:
+            listener(ids, fields)
+        except Exception:
+            logger.exception(f"Combat result listener failed for {char_id}")
+
 # --- Helper to get a character model ---
 def _get_character_db(db: char_db.SessionLocal, char_id: str) -> Character:
     """
@@ -52,14 +98,7 @@ def _get_character_db(db: char_db.SessionLocal, char_id: str) -> Character:
         ValueError: If `char_id` does not start with "player_".
         Exception: If the character is not found in the database.
     """
-    # Note: char_id in story_engine is "player_UUID"
-    # We must strip the "player_" prefix if present, or use as is if it's already a UUID
-    if isinstance(char_id, str) and char_id.startswith("player_"):
-        uuid_part = char_id.split("_", 1)[1]
-    else:
-        # Assume it is already a UUID or valid ID
-        uuid_part = char_id
-
+    uuid_part = _character_uuid(char_id)
     db_character = char_crud.get_character(db, char_id=uuid_part)
     if not db_character:
         raise Exception(f"Character {char_id} (UUID: {uuid_part}) not found in database")
@@ -81,8 +120,11 @@ def get_character_context(char_id: str, db: Session = None) -> Dict[str, Any]:
         Dict[str, Any]: A dictionary representation of the character's context.
     """
     try:
-        db_char = _get_character_db(db, char_id)
-        schema_char = char_services.get_character_context(db_char)
+        # Unchanged characters are served from the context cache without a query
+        schema_char = char_context_cache.get_cached(_character_uuid(char_id))
+        if schema_char is None:
+            db_char = _get_character_db(db, char_id)
+            schema_char = char_services.get_character_context(db_char)
         return schema_char.model_dump()
     except Exception as e:
         logger.exception(f"[character.get_character_context] Error: {e}")
@@ -272,6 +314,7 @@ def apply_damage_to_character(char_id: str, damage_amount: int, db: Session = No
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.apply_damage_to_character(db, db_char, damage_amount)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     # ... (rest of function unchanged) ...
@@ -296,6 +339,7 @@ def apply_status_to_character(char_id: str, status_id: str, db: Session = None)
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.apply_status_to_character(db, db_char, status_id)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -400,6 +444,7 @@ def remove_status_from_character(char_id: str, status_id: str, db: Session = Non
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.remove_status_from_character(db, db_char, status_id)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -437,6 +482,7 @@ def apply_composure_damage_to_character(char_id: str, damage_amount: int, db: Se
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.apply_composure_damage(db, db_char, damage_amount)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -459,6 +505,7 @@ def apply_composure_healing_to_character(char_id: str, amount: int, db: Session
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.apply_composure_healing(db, db_char, amount)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -482,6 +529,7 @@ def apply_resource_damage_to_character(char_id: str, resource_name: str, damage_
     try:
         db_char = _get_character_db(db, char_id)
         updated_char = char_crud.apply_resource_damage(db, db_char, resource_name, damage_amount)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -500,6 +548,7 @@ def apply_healing_to_character(char_id: str, amount: int, db: Session = None):
     """
     db_char = _get_character_db(db, char_id)
     char_crud.apply_healing(db, db_char, amount)
+    _publish_combat_result(char_id, db_char)
 
 @with_db_session(char_db.SessionLocal)
 def apply_temp_hp_to_character(char_id: str, amount: int, db: Session = None) -> Dict[str, Any]:
@@ -520,6 +569,7 @@ def apply_temp_hp_to_character(char_id: str, amount: int, db: Session = None) ->
         db_char = _get_character_db(db, char_id)
         # This now calls the real CRUD function
         updated_char = char_crud.apply_temp_hp(db, db_char, amount)
+        _publish_combat_result(char_id, db_char)
         schema_char = char_services.get_character_context(updated_char)
         return schema_char.model_dump()
     except Exception as e:
@@ -0,0 +1,118 @@
+"""Normalized status, injury and inventory tables
+
+Revision ID: 7c41e9b2a5d0
+Revises: d3875846ac96
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9b2a5d0'
+down_revision: Union[str, Sequence[str], None] = 'd3875846ac96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INVENTORY_SECTIONS = ("currency", "carried_gear", "items", "equipped_gear", "equipped_slots")
+
+
+def _item_entries(section):
+    if isinstance(section, list):
+        return [(i.get("template_id") or i.get("id") or i.get("item_id"), i.get("quantity", 1))
+                for i in section if isinstance(i, dict)]
+    if isinstance(section, dict):
+        return [(k, v.get("quantity", 1) if isinstance(v, dict) else v)
+                for k, v in section.items() if k not in _INVENTORY_SECTIONS]
+    return []
+
+
+def _inventory_entries(inventory):
+    # Items live at the top level, under 'carried_gear' or under 'items'; currency stays in the JSON
+    if not isinstance(inventory, dict):
+        return []
+    totals = {}
+    for section in (inventory.get("carried_gear"), inventory.get("items"), inventory):
+        for k, q in _item_entries(section):
+            if k and isinstance(q, (int, float)) and not isinstance(q, bool):
+                totals[k] = totals.get(k, 0) + int(q)
+    return list(totals.items())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('character_statuses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('character_id', sa.String(), nullable=False),
+    sa.Column('status_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['character_id'], ['characters.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_character_statuses_character_id'), 'character_statuses', ['character_id'], unique=False)
+    op.create_index('ix_character_statuses_status_owner', 'character_statuses', ['status_id', 'character_id'], unique=False)
+
+    op.create_table('character_injuries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('character_id', sa.String(), nullable=False),
+    sa.Column('body_location', sa.String(), nullable=True),
+    sa.Column('severity', sa.String(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['character_id'], ['characters.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_character_injuries_character_id'), 'character_injuries', ['character_id'], unique=False)
+    op.create_index(op.f('ix_character_injuries_severity'), 'character_injuries', ['severity'], unique=False)
+
+    op.create_table('character_inventory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('character_id', sa.String(), nullable=False),
+    sa.Column('item_id', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['character_id'], ['characters.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_character_inventory_character_id'), 'character_inventory', ['character_id'], unique=False)
+    op.create_index(op.f('ix_character_inventory_item_id'), 'character_inventory', ['item_id'], unique=False)
+
+    # --- Move existing JSON data into the new tables ---
+    characters = sa.table('characters',
+        sa.column('id', sa.String), sa.column('status_effects', sa.JSON),
+        sa.column('injuries', sa.JSON), sa.column('inventory', sa.JSON))
+    statuses, injuries, inventory = [], [], []
+    for row in op.get_bind().execute(sa.select(characters)):
+        for status_id in dict.fromkeys(row.status_effects or []):
+            if isinstance(status_id, str):
+                statuses.append({"character_id": row.id, "status_id": status_id})
+        for injury in row.injuries or []:
+            if isinstance(injury, dict):
+                details = {k: v for k, v in injury.items() if k not in ("location", "severity")}
+                injuries.append({"character_id": row.id, "body_location": injury.get("location"),
+                                 "severity": injury.get("severity"), "details": details or None})
+        for item_id, quantity in _inventory_entries(row.inventory):
+            inventory.append({"character_id": row.id, "item_id": item_id, "quantity": quantity})
+
+    metadata = sa.MetaData()
+    if statuses:
+        op.bulk_insert(sa.Table('character_statuses', metadata, autoload_with=op.get_bind()), statuses)
+    if injuries:
+        op.bulk_insert(sa.Table('character_injuries', metadata, autoload_with=op.get_bind()), injuries)
+    if inventory:
+        op.bulk_insert(sa.Table('character_inventory', metadata, autoload_with=op.get_bind()), inventory)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The JSON columns remain authoritative, so dropping the tables loses nothing
+    op.drop_index(op.f('ix_character_inventory_item_id'), table_name='character_inventory')
+    op.drop_index(op.f('ix_character_inventory_character_id'), table_name='character_inventory')
+    op.drop_table('character_inventory')
+    op.drop_index(op.f('ix_character_injuries_severity'), table_name='character_injuries')
+    op.drop_index(op.f('ix_character_injuries_character_id'), table_name='character_injuries')
+    op.drop_table('character_injuries')
+    op.drop_index('ix_character_statuses_status_owner', table_name='character_statuses')
+    op.drop_index(op.f('ix_character_statuses_character_id'), table_name='character_statuses')
+    op.drop_table('character_statuses')
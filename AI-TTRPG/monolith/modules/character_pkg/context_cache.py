@@ -0,0 +1,166 @@
+# AI-TTRPG/monolith/modules/character_pkg/context_cache.py
+"""
+Versioned cache for character contexts.
+
+Combat, AI DM prompts and UI refreshes rebuild the same character context
+many times per action: passive modifiers from equipment and talents, the
+TempDebuff status parsing and the CharacterContextResponse construction.
+
+Each character has an in-process row version. Any ORM write to a Character
+row bumps it (on flush and again on commit) and records which columns
+changed. A read at the current version returns the cached context without
+touching the database row; after a write, only the derived parts whose input
+columns changed are recomputed and the response is rebuilt from them.
+Writes that bypass the ORM must call `invalidate()` themselves.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger("monolith.character.context_cache")
+
+# Derived part -> Character columns it is computed from
+PART_INPUTS: Dict[str, Set[str]] = {
+    "equipment_modifiers": {"equipment"},
+    "talent_modifiers": {"talents"},
+    "temp_modifiers": {"status_effects"},
+}
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_changed: Dict[str, Set[str]] = {}   # Columns changed since the cached entry was built
+_entries: Dict[str, "_Entry"] = {}
+
+stats = {"hits": 0, "misses": 0, "partial": 0}
+
+
+@dataclass(frozen=True)
+class _Entry:
+    version: int
+    parts: Dict[str, Any]
+    context: Any  # schemas.CharacterContextResponse; treat as read-only
+
+
+def invalidate(char_ids: Iterable[str], columns: Optional[Iterable[str]] = None) -> None:
+    """Bump row versions; `columns=None` means everything may have changed."""
+    with _lock:
+        for char_id in char_ids:
+            _versions[char_id] = _versions.get(char_id, 0) + 1
+            if columns is None:
+                _entries.pop(char_id, None)
+                _changed.pop(char_id, None)
+            elif char_id in _entries:
+                _changed.setdefault(char_id, set()).update(columns)
+
+
+def clear() -> None:
+    """Drop every cached context (e.g. after talent/item rules were reloaded)."""
+    with _lock:
+        _entries.clear()
+        _changed.clear()
+
+
+def get_cached(char_id: str) -> Optional[Any]:
+    """Return the cached context if the character has not changed since it was built."""
+    with _lock:
+        entry = _entries.get(char_id)
+        if entry and entry.version == _versions.get(char_id, 0):
+            stats["hits"] += 1
+            return entry.context
+    return None
+
+
+def _is_clean_row(db_character: Any) -> bool:
+    try:
+        state = inspect(db_character)
+    except NoInspectionAvailable:
+        return False
+    return state.persistent and not state.modified
+
+
+def get_context(
+    db_character: models.Character,
+    compute_part: Callable[[str, models.Character], Any],
+    build: Callable[[models.Character, Dict[str, Any]], Any],
+) -> Any:
+    """Return the context for a loaded character, rebuilding only what changed.
+
+    Args:
+        db_character: Character row (must be persistent and unmodified to be cached)
+        compute_part: Computes one derived part (see PART_INPUTS) for a row
+        build: Builds the response from the row and all derived parts
+
+    Returns:
+        The (possibly cached) CharacterContextResponse
+    """
+    char_id = getattr(db_character, "id", None)
+    if char_id is None or not _is_clean_row(db_character):
+        # Pending in-memory edits are not reflected in the row version
+        parts = {name: compute_part(name, db_character) for name in PART_INPUTS}
+        return build(db_character, parts)
+
+    with _lock:
+        version = _versions.get(char_id, 0)
+        entry = _entries.get(char_id)
+        if entry and entry.version == version:
+            stats["hits"] += 1
+            return entry.context
+        changed = _changed.get(char_id) if entry else None
+
+    if changed is None:
+        stats["misses"] += 1
+        parts = {name: compute_part(name, db_character) for name in PART_INPUTS}
+    else:
+        stats["partial"] += 1
+        parts = dict(entry.parts)
+        for name, inputs in PART_INPUTS.items():
+            if inputs & changed:
+                parts[name] = compute_part(name, db_character)
+
+    context = build(db_character, parts)
+    with _lock:
+        # A write that landed while building leaves the entry stale; skip it
+        if _versions.get(char_id, 0) == version:
+            _entries[char_id] = _Entry(version, parts, context)
+            _changed.pop(char_id, None)
+    return context
+
+
+# --- Write tracking ---
+
+def _changed_columns(obj: models.Character) -> Set[str]:
+    return {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault("character_context_writes", {})
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, models.Character):
+            continue
+        # Inserts and deletes invalidate the whole entry (None)
+        columns = _changed_columns(obj) if obj in session.dirty else None
+        previous = pending.get(obj.id, set())
+        pending[obj.id] = None if columns is None or previous is None else previous | columns
+        # Bump now so reads through this session see the flushed row
+        invalidate([obj.id], columns)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_writes(session: Session) -> None:
+    # Bump again on commit so no reader can keep pre-commit data cached
+    for char_id, columns in session.info.pop("character_context_writes", {}).items():
+        invalidate([char_id], columns)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_writes(session: Session, previous_transaction) -> None:
+    for char_id in session.info.pop("character_context_writes", {}):
+        invalidate([char_id])
@@ -5,6 +5,9 @@ from typing import Dict, Any, List
 from sqlalchemy.orm.attributes import flag_modified
 import logging
 
+# Registers the flush hook that keeps the normalized status/injury/inventory tables in step
+from .. import state_tables  # noqa: F401
+
 logger = logging.getLogger("monolith.character.crud")
 
 def get_character(db: Session, char_id: str) -> models.Character | None:
@@ -85,13 +88,12 @@ db: Session, character: models.Character, status_id: str) -> models.Character:
     Returns:
         models.Character: The updated character instance.
     """
-    status_effects = character.status_effects or []
+    status_effects = list(character.status_effects or [])
 
     if status_id not in status_effects:
         status_effects.append(status_id)
         logger.info(f"Applying status '{status_id}' to {character.name}")
     character.status_effects = status_effects
-    flag_modified(character, "status_effects")
     db.commit()
     db.refresh(character)
     return character
@@ -109,13 +111,12 @@ db: Session, character: models.Character, status_id: str) -> models.Character:
     Returns:
         models.Character: The updated character instance.
     """
-    status_effects = character.status_effects or []
+    status_effects = list(character.status_effects or [])
 
     if status_id in status_effects:
         status_effects.remove(status_id)
         logger.info(f"Removing status '{status_id}' from {character.name}")
         character.status_effects = status_effects
-        flag_modified(character, "status_effects")
         db.commit()
         db.refresh(character)
     return character
@@ -171,7 +172,7 @@ def add_item_to_inventory(
         models.Character: The updated character instance.
     """
     # --- MODIFICATION: Update the correct column ---
-    inventory = character.inventory or {}
+    inventory = dict(character.inventory or {})
 
     # Assuming inventory is a dict {item_id: {name: "...", "quantity": X}}
     # Based on apiTypes.ts, it seems to be: { item_id: { name: "...", quantity: X } }
@@ -195,7 +196,6 @@ def add_item_to_inventory(
     inventory[item_id] = current_quantity + quantity
 
     character.inventory = inventory
-    flag_modified(character, "inventory")
     # --- END MODIFICATION ---
     db.commit()
     db.refresh(character)
@@ -217,7 +217,7 @@ def remove_item_from_inventory(
         models.Character: The updated character instance.
     """
     # --- MODIFICATION: Update the correct column ---
-    inventory = character.inventory or {}
+    inventory = dict(character.inventory or {})
 
     current_quantity = inventory.get(item_id, 0)
     new_quantity = current_quantity - quantity
@@ -229,12 +229,36 @@ def remove_item_from_inventory(
             del inventory[item_id] # Remove item if quantity is 0 or less
 
     character.inventory = inventory
-    flag_modified(character, "inventory")
     # --- END MODIFICATION ---
     db.commit()
     db.refresh(character)
     return character
 
+def get_characters_with_status(db: Session, status_id: str) -> List[models.Character]:
+    """
+    Returns all characters that currently have the given status effect.
+
+    Uses the indexed character_statuses table instead of scanning JSON.
+    """
+    return (
+        db.query(models.Character)
+        .join(models.CharacterStatus, models.CharacterStatus.character_id == models.Character.id)
+        .filter(models.CharacterStatus.status_id == status_id)
+        .all()
+    )
+
+def get_characters_holding_item(db: Session, item_id: str) -> List[models.Character]:
+    """
+    Returns all characters with at least one of the given item template in their inventory.
+    """
+    return (
+        db.query(models.Character)
+        .join(models.CharacterInventoryEntry, models.CharacterInventoryEntry.character_id == models.Character.id)
+        .filter(models.CharacterInventoryEntry.item_id == item_id)
+        .distinct()
+        .all()
+    )
+
 def list_characters(
     db: Session, skip: int = 0, limit: int = 100
 ) -> List[models.Character]:
@@ -361,7 +385,7 @@ def unequip_item(db: Session, character: models.Character, slot: str) -> models.
     Returns:
         models.Character: The updated character instance.
     """
-    inventory = character.inventory or {}
+    inventory = dict(character.inventory or {})
     equipment = character.equipment or {}
 
     item_id = equipment.get(slot)
@@ -375,7 +399,6 @@ def unequip_item(db: Session, character: models.Character, slot: str) -> models.
 
     character.inventory = inventory
     character.equipment = equipment
-    flag_modified(character, "inventory")
     flag_modified(character, "equipment")
 
     db.commit()
@@ -398,7 +421,7 @@ def equip_item(db: Session, character: models.Character, item_id: str, slot: str
     Returns:
         models.Character: The updated character instance.
     """
-    inventory = character.inventory or {}
+    inventory = dict(character.inventory or {})
     equipment = character.equipment or {}
 
     if inventory.get(item_id, 0) <= 0:
@@ -416,7 +439,6 @@ def equip_item(db: Session, character: models.Character, item_id: str, slot: str
 
     character.inventory = inventory
     character.equipment = equipment
-    flag_modified(character, "inventory")
     flag_modified(character, "equipment")
 
     db.commit()
@@ -1,5 +1,5 @@
 # AI-TTRPG/monolith/modules/character_pkg/models.py
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, Index
 from .database import Base
 
 class Character(Base):
@@ -45,3 +45,35 @@ class Character(Base):
     # --- ADD THIS COLUMN ---
     previous_state = Column(JSON, default={}) # For AI Context Diffing
     # --- END ADD ---
+
+
+# --- Normalized, indexed views of the hot JSON columns ---
+# The JSON columns above stay the document the game reads and saves; these rows
+# are kept in step by monolith.modules.state_tables and make status/injury/item
+# lookups indexed queries instead of full-table JSON scans.
+
+class CharacterStatus(Base):
+    """One active status effect on a character."""
+    __tablename__ = "character_statuses"
+    id = Column(Integer, primary_key=True)
+    character_id = Column(String, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    status_id = Column(String, nullable=False)
+
+    __table_args__ = (Index("ix_character_statuses_status_owner", "status_id", "character_id"),)
+
+class CharacterInjury(Base):
+    """One injury on a character (body location + severity)."""
+    __tablename__ = "character_injuries"
+    id = Column(Integer, primary_key=True)
+    character_id = Column(String, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    body_location = Column(String, nullable=True)
+    severity = Column(String, nullable=True, index=True)
+    details = Column(JSON, nullable=True) # Any other keys of the injury record
+
+class CharacterInventoryEntry(Base):
+    """One stack of an item template in a character's inventory."""
+    __tablename__ = "character_inventory"
+    id = Column(Integer, primary_key=True)
+    character_id = Column(String, ForeignKey("characters.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_id = Column(String, nullable=False, index=True)
+    quantity = Column(Integer, default=1)
@@ -4,7 +4,7 @@ from typing import List, Dict, Any, Optional
 from copy import deepcopy
 import uuid
 import logging
-from . import models, schemas
+from . import models, schemas, context_cache
 from ..rules_pkg.data_loader import get_item_template
 from ..rules_pkg.models_inventory import PassiveModifier
 from ..rules_pkg.talent_logic import get_talent_modifiers
@@ -85,16 +85,73 @@ def toggle_technique_state(db: Session, character_id: str, technique_id: str, ac
         logger.warning(f"Failed to toggle technique '{technique_id}' (Active={active}) for {character.name}")
         return None
 
+def _compute_context_part(part: str, db_character: models.Character) -> List[PassiveModifier]:
+    """Computes one derived part of the character context (see context_cache.PART_INPUTS)."""
+    if part == "equipment_modifiers":
+        return get_passive_modifiers(db_character)
+    if part == "talent_modifiers":
+        return get_talent_modifiers(db_character.talents or [])
+    if part == "temp_modifiers":
+        return _parse_temp_modifiers(db_character.status_effects or [])
+    raise ValueError(f"Unknown character context part: {part}")
+
+def _parse_temp_modifiers(status_effects: List[str]) -> List[PassiveModifier]:
+    """Parses TempDebuff_STATNAME_AMOUNT_DURATION statuses into stat modifiers."""
+    modifiers = []
+    for status_id in status_effects:
+        if status_id.startswith("TempDebuff_"):
+            try:
+                # Expected format: TempDebuff_STATNAME_AMOUNT_DURATION (e.g., TempDebuff_Might_-2_1)
+                # Note: amount is typically negative for debuffs
+                parts = status_id.split("_")
+                if len(parts) == 4:
+                    _, stat_name, amount_str, _ = parts
+                    modifiers.append(PassiveModifier(
+                        effect_type="STAT_MODIFIER",
+                        target=stat_name,
+                        value=int(amount_str),
+                        source_id=status_id
+                    ))
+            except Exception as e:
+                logger.warning(f"Failed to parse dynamic stat status {status_id}: {e}")
+    return modifiers
+
+def _combine_modifiers(base: Dict[str, Any], parts: Dict[str, List[PassiveModifier]]) -> (Dict[str, Any], int):
+    """Applies cached modifier parts to the base stats. Returns (final stats, total DR)."""
+    final_stats = deepcopy(base) if base else {}
+    total_dr = 0
+    for mod in parts["equipment_modifiers"] + parts["talent_modifiers"]:
+        if mod.effect_type == "STAT_MODIFIER" and mod.target in final_stats:
+            final_stats[mod.target] += mod.value
+        elif mod.effect_type == "DR_MODIFIER":
+            total_dr += mod.value
+    # --- IMPLEMENT: DYNAMIC STAT OVERRIDE LOGIC ---
+    for mod in parts["temp_modifiers"]:
+        if mod.target in final_stats:
+            final_stats[mod.target] += mod.value
+    # --- END IMPLEMENTATION ---
+    return final_stats, total_dr
+
 def get_character_context(
     db_character: models.Character,
 ) -> schemas.CharacterContextResponse:
     """
     Maps the SQLAlchemy model (with JSON fields) to the Pydantic
     response model. THIS FUNCTION IS REUSED.
+
+    Served from the versioned context cache: unchanged characters return the
+    cached (read-only) response, and after a write only the modifier parts
+    whose inputs changed are recomputed.
     """
     if not db_character:
         return None
+    return context_cache.get_context(db_character, _compute_context_part, _build_character_context)
 
+def _build_character_context(
+    db_character: models.Character,
+    modifier_parts: Dict[str, List[PassiveModifier]],
+) -> schemas.CharacterContextResponse:
+    """Builds the response model from the row and its derived modifier parts."""
     def_skills = {}
     def_pools = {}
     def_talents = []
@@ -106,27 +163,8 @@ def get_character_context(
     def_unlocks = []
     def_techniques = []
 
-    # Apply passive modifiers from talents and equipment
-    final_stats, total_dr = apply_passive_modifiers(db_character)
-
-    # --- IMPLEMENT: DYNAMIC STAT OVERRIDE LOGIC ---
-    current_statuses = db_character.status_effects or []
-    for status_id in current_statuses:
-        if status_id.startswith("TempDebuff_"):
-            try:
-                # Expected format: TempDebuff_STATNAME_AMOUNT_DURATION (e.g., TempDebuff_Might_-2_1)
-                # Note: amount is typically negative for debuffs
-                parts = status_id.split("_")
-                if len(parts) == 4:
-                    _, stat_name, amount_str, _ = parts
-                    amount = int(amount_str)
-
-                    if stat_name in final_stats:
-                        final_stats[stat_name] += amount
-                        logger.info(f"Applying temporary modifier: {stat_name} adjusted by {amount}")
-            except Exception as e:
-                logger.warning(f"Failed to parse dynamic stat status {status_id}: {e}")
-    # --- END IMPLEMENTATION ---
+    # Apply passive modifiers from talents, equipment and temporary statuses
+    final_stats, total_dr = _combine_modifiers(db_character.stats, modifier_parts)
 
     return schemas.CharacterContextResponse(
         id=getattr(db_character, "id", None),
@@ -1054,6 +1092,26 @@ def update_character_context(
         return None
 
 
+def build_state_baseline(char: Any) -> Dict[str, Any]:
+    """
+    Builds the dict of tracked fields used as the AI context diff baseline.
+
+    Works on a Character row or a CharacterSave; we only cache what
+    _calculate_state_diff in the AI DM context builder tracks.
+    """
+    return {
+        "current_hp": char.current_hp,
+        "max_hp": char.max_hp,
+        "current_composure": char.current_composure,
+        "max_composure": char.max_composure,
+        "inventory": [item['template_id'] for item in (char.inventory or {}).get('items', [])] if isinstance(char.inventory, dict) else [],
+        # Simplified inventory tracking (just template IDs)
+        "status_effects": char.status_effects or [],
+        "resource_pools": char.resource_pools or {},
+        "location_id": char.current_location_id
+    }
+
+
 def snapshot_character_state(db: Session, character_id: str) -> bool:
     """
     Updates the character's 'previous_state' field with the current values.
@@ -1065,21 +1123,7 @@ def snapshot_character_state(db: Session, character_id: str) -> bool:
         return False
         
     try:
-        # Construct the state dictionary to cache
-        # We only cache what we track in _calculate_state_diff
-        state_snapshot = {
-            "current_hp": char.current_hp,
-            "max_hp": char.max_hp,
-            "current_composure": char.current_composure,
-            "max_composure": char.max_composure,
-            "inventory": [item['template_id'] for item in (char.inventory or {}).get('items', [])] if isinstance(char.inventory, dict) else [],
-            # Simplified inventory tracking (just template IDs)
-            "status_effects": char.status_effects or [],
-            "resource_pools": char.resource_pools or {},
-            "location_id": char.current_location_id
-        }
-        
-        char.previous_state = state_snapshot
+        char.previous_state = build_state_baseline(char)
         
         # Force SQLAlchemy to detect change in JSON field
         from sqlalchemy.orm.attributes import flag_modified
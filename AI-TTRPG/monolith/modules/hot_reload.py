@@ -0,0 +1,261 @@
+"""
+Hot reload of the static game data (rules and map generation config).
+
+A background thread polls the mtimes of the rules and map data files. When
+a file changes (and has stayed unchanged for one more poll, so half-written
+saves from an editor are skipped):
+
+- Rules: only the changed files are re-read and only the indexes derived
+  from them are rebuilt (`ruleset.rebuild_ruleset`). The new RuleSet is
+  built and validated off to the side; if it has any load or validation
+  errors it is rejected and the running version stays in place. Otherwise
+  it is swapped in atomically and the views that hold references
+  (RuleSetContainer, the character context cache) are re-pointed at it;
+  the data_loader globals resolve from `get_ruleset()` on every access.
+- Mod packs (see rules_pkg/mods.py): their files are watched too, and the
+  overlay re-merges only the documents fed by a changed file.
+- Map config: both files are parsed before the config is swapped.
+
+The RuleSet and map config a reload replaces are never modified, so an
+action that started on them (see `ruleset.pin_ruleset` and
+`map_pkg.data_loader.pin_data`) finishes on the version it started with.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .rules_pkg import mods as rules_mods
+from .rules_pkg import ruleset as rules_ruleset
+from .rules_pkg.ruleset import RULE_FILES, RuleSet
+from .map_pkg import data_loader as map_loader
+
+logger = logging.getLogger("monolith.hot_reload")
+
+DEFAULT_INTERVAL = 2.0
+
+Signature = Dict[str, Tuple[int, int]]  # file name -> (mtime_ns, size)
+
+
+def _signature(directory: Path, filenames) -> Signature:
+    sig = {}
+    for name in filenames:
+        try:
+            st = os.stat(directory / name)
+        except OSError:
+            sig[name] = (-1, -1)
+        else:
+            sig[name] = (st.st_mtime_ns, st.st_size)
+    return sig
+
+
+def _changed(old: Signature, new: Signature):
+    return {name for name in new if old.get(name) != new[name]}
+
+
+def publish_ruleset(rules: RuleSet) -> Optional[RuleSet]:
+    """Make `rules` the live RuleSet and re-point every view onto it.
+
+    Returns:
+        The RuleSet that was replaced
+    """
+    from .rules_pkg.data_loader_enhanced import RuleSetContainer
+    from .character_pkg import context_cache
+
+    previous = rules_ruleset.swap_ruleset(rules)
+    container = RuleSetContainer._instance
+    if container is not None and RuleSetContainer._initialized:
+        container._bind(rules)
+    # Cached contexts hold stats/talents derived from the old rules
+    context_cache.clear()
+    return previous
+
+
+class HotReloader:
+    """Polls the data directories and applies changes without a restart."""
+
+    def __init__(
+        self,
+        rules_dir: Optional[Path] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        # Must be the directory the live RuleSet was loaded from
+        self.rules_dir = Path(rules_dir or rules_ruleset.DATA_DIR)
+        self.interval = interval
+        self._rule_files = [filename for filename, _, _ in RULE_FILES.values()]
+        overlay = rules_mods.active_overlay()
+        if overlay is not None and overlay.base_dir.resolve() == self.rules_dir.resolve():
+            # Absolute paths; `self.rules_dir / path` leaves them as they are
+            base_files = {str(self.rules_dir / name) for name in self._rule_files}
+            self._rule_files += [str(p) for p in overlay.watched_files() if str(p) not in base_files]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Signatures of what is loaded, and of the last poll (for settling)
+        self._loaded_rules = _signature(self.rules_dir, self._rule_files)
+        self._loaded_map = _signature(self.map_dir, map_loader.DATA_FILES)
+        self._seen_rules = dict(self._loaded_rules)
+        self._seen_map = dict(self._loaded_map)
+        # Signatures that failed to load; not retried until the files change again
+        self._rejected_rules: Optional[Signature] = None
+        self._rejected_map: Optional[Signature] = None
+        self.stats = {"polls": 0, "rules_reloads": 0, "map_reloads": 0, "rejected": 0}
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def map_dir(self) -> Path:
+        return Path(map_loader.DATA_DIR)
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Check once for settled changes and reload them.
+
+        Returns:
+            The reload result, or None if nothing (settled) changed
+        """
+        with self._lock:
+            self.stats["polls"] += 1
+            rules_sig = _signature(self.rules_dir, self._rule_files)
+            map_sig = _signature(self.map_dir, map_loader.DATA_FILES)
+            # Only act on files that looked the same on the previous poll
+            rules_changed = _changed(self._loaded_rules, rules_sig) - _changed(self._seen_rules, rules_sig)
+            map_changed = _changed(self._loaded_map, map_sig) - _changed(self._seen_map, map_sig)
+            self._seen_rules, self._seen_map = rules_sig, map_sig
+            if rules_sig == self._rejected_rules:
+                rules_changed = set()
+            if map_sig == self._rejected_map:
+                map_changed = set()
+            if not rules_changed and not map_changed:
+                return None
+            return self._apply(rules_changed, map_changed, rules_sig, map_sig)
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Reload whatever changed on disk right now (no settling).
+
+        Args:
+            force: Also rebuild every rule index if file contents differ from
+                the live RuleSet even though no mtime changed
+
+        Returns:
+            Result dictionary with success status and what was reloaded
+        """
+        with self._lock:
+            rules_sig = _signature(self.rules_dir, self._rule_files)
+            map_sig = _signature(self.map_dir, map_loader.DATA_FILES)
+            rules_changed = _changed(self._loaded_rules, rules_sig)
+            map_changed = _changed(self._loaded_map, map_sig)
+            if force:
+                if rules_mods.active_overlay() is not None:
+                    # The overlay compares content hashes itself
+                    rules_changed = rules_changed or set(self._rule_files)
+                elif not rules_changed and rules_ruleset.hash_sources(self.rules_dir) != rules_ruleset.get_ruleset().source_hash:
+                    rules_changed = set(self._rule_files)
+                map_changed = set(map_loader.DATA_FILES)
+            self._seen_rules, self._seen_map = rules_sig, map_sig
+            return self._apply(rules_changed, map_changed, rules_sig, map_sig)
+
+    def start(self) -> None:
+        """Start the polling thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hot-reload", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.rules_dir} and {self.map_dir} every {self.interval}s")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Hot reload poll failed")
+
+    def _apply(self, rules_changed, map_changed, rules_sig: Signature, map_sig: Signature) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"success": True, "rules": None, "map": None}
+
+        if rules_changed:
+            result["rules"] = self._reload_rules(sorted(rules_changed))
+            if result["rules"]["success"]:
+                self._loaded_rules = rules_sig
+            else:
+                self._rejected_rules = rules_sig
+                result["success"] = False
+
+        if map_changed:
+            try:
+                map_loader.load_data()
+                self._loaded_map = map_sig
+                self.stats["map_reloads"] += 1
+                result["map"] = {"success": True, "files": sorted(map_changed)}
+            except Exception as e:
+                logger.error(f"Map data reload rejected: {e}")
+                self._rejected_map = map_sig
+                self.stats["rejected"] += 1
+                result["map"] = {"success": False, "files": sorted(map_changed), "error": str(e)}
+                result["success"] = False
+
+        self.last_result = result
+        return result
+
+    def _reload_rules(self, changed_files) -> Dict[str, Any]:
+        started = time.perf_counter()
+        current = rules_ruleset.get_ruleset()
+        if current.data_dir.resolve() != self.rules_dir.resolve():
+            return {"success": False, "files": changed_files,
+                    "error": f"live rules come from {current.data_dir}, not {self.rules_dir}"}
+        overlay = rules_mods.active_overlay()
+        try:
+            if overlay is not None:
+                rules, rebuilt = overlay.build(strict=True)
+            else:
+                rules, rebuilt = rules_ruleset.rebuild_ruleset(current, changed_files)
+            if rules.validation_errors:
+                raise ValueError(f"validation failed: {dict(rules.validation_errors)}")
+        except Exception as e:
+            logger.error(f"Rules reload rejected ({', '.join(changed_files)}): {e}")
+            self.stats["rejected"] += 1
+            return {"success": False, "files": changed_files, "error": str(e)}
+
+        publish_ruleset(rules)
+        self.stats["rules_reloads"] += 1
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Rules reloaded from {', '.join(changed_files)} in {elapsed_ms}ms (rebuilt: {sorted(rebuilt)})")
+
+        # Keep the next cold start warm; not fatal if the directory is read-only
+        # (the mod overlay writes its own)
+        if overlay is None and rules.data_dir == rules_ruleset.DATA_DIR:
+            try:
+                from .rules_pkg.rules_snapshot import write_snapshot
+                write_snapshot(rules)
+            except Exception as e:
+                logger.warning(f"Could not write rules snapshot after reload: {e}")
+
+        return {"success": True, "files": changed_files, "rebuilt": sorted(rebuilt),
+                "source_hash": rules.source_hash, "elapsed_ms": elapsed_ms}
+
+
+# Global singleton instance
+_reloader_instance: Optional[HotReloader] = None
+
+
+def get_hot_reloader() -> HotReloader:
+    """Return the process-wide reloader watching the packaged data directories."""
+    global _reloader_instance
+    if _reloader_instance is None:
+        _reloader_instance = HotReloader()
+    return _reloader_instance
@@ -1,97 +1,315 @@
+"""
+Lore retrieval for AI prompts.
+
+The `.txt` files in AI-TTRPG/lore are split once into passages (a section
+heading plus roughly a paragraph or two) and indexed in a process-wide
+inverted index. `get_lore_context` scores passages against the caller's tags
+and query text with BM25 and returns the best ones that fit the caller's
+token budget, instead of pasting whole files into the prompt.
+
+Each passage is indexed on two fields: its text, and its tags (the file
+name, its section heading and the topic keywords of its file, weighted
+higher). The index is shared by every LoreManager and only re-reads the
+files that changed on disk.
+"""
+import logging
+import math
 import os
-from typing import List, Dict, Optional
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-class LoreManager:
-    def __init__(self, lore_dir: str = "AI-TTRPG/lore"):
-        # Resolve absolute path relative to the project root if needed, 
-        # but for now assume the path is correct relative to CWD or absolute.
-        # Ideally, we should make this robust.
-        if not os.path.isabs(lore_dir):
-            # Assuming running from project root
-            self.lore_dir = os.path.abspath(lore_dir)
+logger = logging.getLogger("monolith.lore")
+
+DEFAULT_LORE_DIR = Path(__file__).resolve().parents[2] / "lore"
+DEFAULT_TOKEN_BUDGET = 1200
+DEFAULT_TOP_K = 6
+FALLBACK_FILE = "foundations.txt"
+
+# Topic words that refer to a file without naming it (tags like "forest")
+TOPIC_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "Canopy_Clans.txt": ("forest", "jungle", "tree"),
+    "Coastal_Theocracy.txt": ("coast", "ocean", "water"),
+    "Iron_Caldera.txt": ("volcano", "mountain", "iron"),
+    "Economy.txt": ("trade", "money", "shop", "economy"),
+}
+
+_PASSAGE_TOKENS = 180  # target passage size
+_TAG_WEIGHT = 3.0  # a tag hit counts as this many text hits
+_K1 = 1.2
+_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their them "
+    "they this to was were which with".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (same 4-characters-per-token estimate as the LLM handler)."""
+    return max(1, len(text) // 4)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word terms, without stopwords and with plurals folded."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+@dataclass(frozen=True)
+class Passage:
+    """One retrievable chunk of a lore file."""
+    filename: str
+    position: int  # order within the file
+    heading: str
+    text: str
+
+    @property
+    def title(self) -> str:
+        return f"{self.filename}: {self.heading}" if self.heading else self.filename
+
+    def render(self) -> str:
+        return f"--- {self.title} ---\n{self.text}"
+
+
+def _is_heading(paragraph: str) -> bool:
+    return "\n" not in paragraph and len(paragraph) <= 100 and not paragraph.rstrip().endswith((".", "!", "?", ":", ","))
+
+
+def _split_long(paragraph: str) -> List[str]:
+    """Split a paragraph that is larger than a passage at sentence boundaries."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        if current and estimate_tokens(current) + estimate_tokens(sentence) > _PASSAGE_TOKENS:
+            pieces.append(current)
+            current = sentence
         else:
-            self.lore_dir = lore_dir
-            
-        self.lore_cache: Dict[str, str] = {}
-        self._load_lore()
-
-    def _load_lore(self):
-        if not os.path.exists(self.lore_dir):
-            print(f"Lore directory not found: {self.lore_dir}")
-            return
-
-        for filename in os.listdir(self.lore_dir):
-            if filename.endswith(".txt"):
-                filepath = os.path.join(self.lore_dir, filename)
-                try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        self.lore_cache[filename] = f.read()
-                except Exception as e:
-                    print(f"Error loading lore file {filename}: {e}")
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(filename: str, text: str) -> List[Passage]:
+    """Split a lore file into passages of about `_PASSAGE_TOKENS` tokens."""
+    passages: List[Passage] = []
+    heading = ""
+    buffer: List[str] = []
+
+    def flush():
+        if buffer:
+            body = "\n\n".join(buffer)
+            passages.append(Passage(filename, len(passages), heading, body))
+            buffer.clear()
+
+    for raw in re.split(r"\n\s*\n", text):
+        paragraph = raw.strip()
+        if not paragraph or set(paragraph) <= set("-=_*"):
+            continue
+        if _is_heading(paragraph):
+            flush()
+            heading = paragraph.strip("- ").strip()
+            continue
+        for piece in _split_long(paragraph):
+            if buffer and estimate_tokens("\n\n".join(buffer)) + estimate_tokens(piece) > _PASSAGE_TOKENS:
+                flush()
+            buffer.append(piece)
+    flush()
+    if not passages and text.strip():
+        # A file too short to have a body paragraph
+        passages.append(Passage(filename, 0, "", text.strip()))
+    return passages
+
+
+def _file_tags(filename: str) -> List[str]:
+    stem = os.path.splitext(filename)[0]
+    return tokenize(stem.replace("_", " ")) + [t for k in TOPIC_KEYWORDS.get(filename, ()) for t in tokenize(k)]
+
 
-    def get_lore_context(self, tags: List[str] = None) -> str:
+class LoreIndex:
+    """BM25 inverted index over the passages of a lore directory."""
+
+    def __init__(self, lore_dir: Path):
+        self.lore_dir = Path(lore_dir)
+        self.texts: Dict[str, str] = {}  # file name -> full text
+        self.passages: List[Passage] = []
+        self._files: Dict[str, Tuple[Tuple[int, int], List[Passage]]] = {}  # name -> (signature, passages)
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}  # term -> [(passage id, weighted tf)]
+        self._lengths: List[float] = []
+        self._avg_length = 1.0
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        try:
+            entries = list(os.scandir(self.lore_dir))
+        except FileNotFoundError:
+            return signatures
+        for entry in entries:
+            if entry.name.endswith(".txt") and entry.is_file():
+                st = entry.stat()
+                signatures[entry.name] = (st.st_mtime_ns, st.st_size)
+        return signatures
+
+    def refresh(self) -> bool:
+        """Re-read changed files and rebuild the index if anything changed.
+
+        Returns:
+            True if the index was rebuilt
         """
-        Retrieves relevant lore context based on tags.
+        with self._lock:
+            signatures = self._scan()
+            if self.builds and signatures == {name: sig for name, (sig, _) in self._files.items()}:
+                return False
+
+            files = {}
+            texts = {}
+            for name in sorted(signatures):
+                cached = self._files.get(name)
+                if cached and cached[0] == signatures[name]:
+                    files[name] = cached
+                    if name in self.texts:
+                        texts[name] = self.texts[name]
+                    continue
+                try:
+                    with open(self.lore_dir / name, "r", encoding="utf-8") as f:
+                        texts[name] = f.read()
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.error(f"Error loading lore file {name}: {e}")
+                    # Keep its signature so it is only retried once it changes
+                    files[name] = (signatures[name], [])
+                    continue
+                files[name] = (signatures[name], chunk_text(name, texts[name]))
+            self._build(files, texts)
+            return True
+
+    def _build(self, files, texts) -> None:
+        passages = [p for name in sorted(files) for p in files[name][1]]
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        lengths = []
+        for pid, passage in enumerate(passages):
+            text_terms = tokenize(passage.text)
+            tag_terms = _file_tags(passage.filename) + tokenize(passage.heading)
+            weighted = Counter(text_terms)
+            for term in tag_terms:
+                weighted[term] += _TAG_WEIGHT
+            for term, tf in weighted.items():
+                postings.setdefault(term, []).append((pid, tf))
+            lengths.append(len(text_terms) + _TAG_WEIGHT * len(tag_terms))
+
+        # Swap everything at once so concurrent searches see one version
+        self._files, self.texts, self.passages = files, texts, passages
+        self._postings, self._lengths = postings, lengths
+        self._avg_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        self.builds += 1
+        logger.info(f"Lore index built: {len(passages)} passages from {len(files)} files")
+
+    def search(self, query_terms: List[str], top_k: int = DEFAULT_TOP_K) -> List[Tuple[float, Passage]]:
+        """Best passages for the query terms, highest score first."""
+        postings, lengths, passages = self._postings, self._lengths, self.passages
+        n = len(passages)
+        scores: Dict[int, float] = {}
+        for term in set(query_terms):
+            hits = postings.get(term)
+            if not hits:
+                continue
+            idf = math.log(1 + (n - len(hits) + 0.5) / (len(hits) + 0.5))
+            for pid, tf in hits:
+                norm = _K1 * (1 - _B + _B * lengths[pid] / self._avg_length)
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(score, passages[pid]) for pid, score in best]
+
+    def file_passages(self, filename: str) -> List[Passage]:
+        cached = self._files.get(filename)
+        return list(cached[1]) if cached else []
+
+
+def select_passages(candidates: List[Passage], token_budget: int) -> List[Passage]:
+    """The candidates (in order) that fit in the budget; oversized ones are skipped."""
+    chosen, used = [], 0
+    for passage in candidates:
+        cost = estimate_tokens(passage.render())
+        if used + cost <= token_budget:
+            chosen.append(passage)
+            used += cost
+    return chosen
+
+
+def render_passages(passages: List[Passage]) -> str:
+    """Passages in reading order, with one header per file section."""
+    parts, title = [], None
+    for passage in sorted(passages, key=lambda p: (p.filename, p.position)):
+        parts.append(passage.text if passage.title == title else passage.render())
+        title = passage.title
+    return "\n\n".join(parts)
+
+
+# Process-wide indexes, one per lore directory
+_indexes: Dict[Path, LoreIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lore_index(lore_dir: Optional[str] = None) -> LoreIndex:
+    """Return the shared, up-to-date index for `lore_dir` (default AI-TTRPG/lore)."""
+    path = Path(os.path.abspath(lore_dir)) if lore_dir else DEFAULT_LORE_DIR
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = LoreIndex(path)
+    index.refresh()
+    return index
+
+
+class LoreManager:
+    """Lore lookups for prompts; a view onto the shared lore index."""
+
+    def __init__(self, lore_dir: Optional[str] = None):
+        self.index = get_lore_index(lore_dir)
+        self.lore_dir = str(self.index.lore_dir)
+        if not self.index.lore_dir.exists():
+            logger.warning(f"Lore directory not found: {self.lore_dir}")
+
+    @property
+    def lore_cache(self) -> Dict[str, str]:
+        """File name -> full text of every loaded lore file."""
+        return self.index.texts
+
+    def get_lore_context(
+        self,
+        tags: Optional[List[str]] = None,
+        query: str = "",
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        top_k: int = DEFAULT_TOP_K,
+    ) -> str:
         """
-        if not self.lore_cache:
-            return ""
-
-        context = []
-        
-        # If no tags provided, default to foundations if available
-        if not tags:
-             if "foundations.txt" in self.lore_cache:
-                 return self.lore_cache["foundations.txt"]
-             # If no foundations, return a generic message or empty
-             return ""
-
-        # Normalize tags
-        normalized_tags = [t.lower() for t in tags]
-
-        # Simple mapping strategy
-        # 1. Check filenames against tags
-        # 2. Specific mappings (e.g. "forest" -> "Canopy_Clans.txt")
-        
-        # Mapping helper
-        # TODO: Move this to a config or make it dynamic
-        keyword_map = {
-            "forest": ["Canopy_Clans.txt"],
-            "jungle": ["Canopy_Clans.txt"],
-            "tree": ["Canopy_Clans.txt"],
-            "coast": ["Coastal_Theocracy.txt"],
-            "ocean": ["Coastal_Theocracy.txt"],
-            "water": ["Coastal_Theocracy.txt"],
-            "volcano": ["Iron_Caldera.txt"],
-            "mountain": ["Iron_Caldera.txt"],
-            "iron": ["Iron_Caldera.txt"],
-            "trade": ["Economy.txt"],
-            "money": ["Economy.txt"],
-            "shop": ["Economy.txt"],
-            "economy": ["Economy.txt"]
-        }
-
-        relevant_files = set()
-
-        for tag in normalized_tags:
-            # Direct filename match
-            for filename in self.lore_cache.keys():
-                if tag in filename.lower():
-                    relevant_files.add(filename)
-            
-            # Keyword map match
-            if tag in keyword_map:
-                for mapped_file in keyword_map[tag]:
-                    if mapped_file in self.lore_cache:
-                        relevant_files.add(mapped_file)
-
-        # If we found specific files, load them
-        if relevant_files:
-            for filename in relevant_files:
-                context.append(f"--- {filename} ---\n{self.lore_cache[filename]}")
-        else:
-            # Fallback: if tags were provided but no match found, 
-            # maybe return foundations as a safe bet?
-            if "foundations.txt" in self.lore_cache:
-                context.append(self.lore_cache["foundations.txt"])
+        Retrieves the lore passages most relevant to the tags and query text.
+
+        Args:
+            tags: Map/narrative tags (e.g. ["forest", "creepy"])
+            query: Free text to match as well (e.g. the player's action)
+            token_budget: Maximum size of the returned context, in estimated tokens
+            top_k: Maximum number of passages
 
-        return "\n\n".join(context)
+        Returns:
+            The selected passages, or the start of foundations.txt if nothing matches
+        """
+        self.index.refresh()
+        terms = [t for tag in tags or [] for t in tokenize(tag)] + tokenize(query)
+        ranked = [passage for _, passage in self.index.search(terms, top_k)] if terms else []
+        chosen = select_passages(ranked, token_budget)
+        if not chosen:
+            chosen = select_passages(self.index.file_passages(FALLBACK_FILE), token_budget)
+        return render_passages(chosen)
@@ -2,7 +2,7 @@ import random
 import numpy as np
 from typing import List, Dict, Optional, Any
 from . import models
-from .data_loader import GENERATION_ALGORITHMS, TILE_DEFINITIONS
+from . import data_loader
 
 # --- Import AI Service ---
 try:
@@ -15,12 +15,14 @@ try:
 except ImportError:
     LoreManager = None
 
+MAP_LORE_TOKEN_BUDGET = 600  # flavor text only needs a few passages
+
 # --- Algorithm Selection ---
 def select_algorithm(tags: List[str]) -> Optional[Dict[str, Any]]:
     """Finds a generation algorithm matching the input tags."""
     tag_set = set(t.lower() for t in tags)
     possible_matches = []
-    for algo in GENERATION_ALGORITHMS:
+    for algo in data_loader.GENERATION_ALGORITHMS:
         required_tags = set(t.lower() for t in algo.get("required_tags", []))
         if required_tags.issubset(tag_set):
             possible_matches.append(algo)
@@ -355,7 +357,7 @@ def run_generation(algorithm: Dict[str, Any], seed: str, width_override: Optiona
         if LoreManager:
             try:
                 lore_mgr = LoreManager()
-                lore_context = lore_mgr.get_lore_context(map_tags)
+                lore_context = lore_mgr.get_lore_context(map_tags, token_budget=MAP_LORE_TOKEN_BUDGET)
             except Exception as e:
                 print(f"Failed to load lore context: {e}")
 
@@ -1,31 +1,66 @@
 # AI-TTRPG/monolith/modules/map_pkg/data_loader.py
 import json
 import os
-from typing import Dict, List, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
-# Global variables
-TILE_DEFINITIONS: Dict[str, Any] = {}
-GENERATION_ALGORITHMS: List[Dict[str, Any]] = []
+# Global views (resolved by __getattr__; read them as data_loader.X, not by import)
+TILE_DEFINITIONS: Dict[str, Any]
+GENERATION_ALGORITHMS: List[Dict[str, Any]]
+
+MapConfig = Tuple[Dict[str, Any], List[Dict[str, Any]]]  # (tile definitions, generation algorithms)
+
+# Replaced wholesale on reload; `pin_data()` keeps a context on the version it started with
+_config: MapConfig = ({}, [])
+_pinned: ContextVar[Optional[MapConfig]] = ContextVar("pinned_map_config", default=None)
+_VIEWS = {"TILE_DEFINITIONS": 0, "GENERATION_ALGORITHMS": 1}
+
+
+def __getattr__(name: str) -> Any:
+    index = _VIEWS.get(name)
+    if index is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return get_config()[index]
+
+
+def get_config() -> MapConfig:
+    """The pinned map config inside `pin_data()`, otherwise the live one."""
+    pinned = _pinned.get()
+    return pinned if pinned is not None else _config
+
+
+@contextmanager
+def pin_data() -> Iterator[MapConfig]:
+    """Keep the map globals on the current version for the rest of this context.
+
+    The map counterpart of `ruleset.pin_ruleset`: a reload mid-action does not
+    change the tiles or algorithms the action sees.
+    """
+    token = _pinned.set(get_config())
+    try:
+        yield _pinned.get()
+    finally:
+        _pinned.reset(token)
+
+# __file__ is .../monolith/modules/map_pkg/data_loader.py
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DATA_FILES = ('tile_definitions.json', 'generation_algorithms.json')
 
 def load_data():
     """
     Loads map generation configuration from JSON files.
 
     Reads `tile_definitions.json` and `generation_algorithms.json` from the package's
-    `data` directory and populates the global configuration variables.
+    `data` directory. Both files are parsed before the configuration is
+    swapped to the new objects in one assignment, so readers never see a
+    half-loaded state and a bad file leaves the previous data in place.
 
     Raises:
         FileNotFoundError: If a required data file is missing.
         json.JSONDecodeError: If a data file contains invalid JSON.
     """
-    global TILE_DEFINITIONS, GENERATION_ALGORITHMS
-
-    # --- THIS PATH IS NOW CORRECT ---
-    # __file__ is .../monolith/modules/map_pkg/data_loader.py
-    # BASE_DIR is .../monolith/modules/map_pkg/
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    DATA_DIR = os.path.join(BASE_DIR, 'data')
-    # --- END CORRECTION ---
+    global _config
 
     print("--- Map Generator: Loading Data ---")
 
@@ -33,16 +68,12 @@ def load_data():
         # Load Tile Definitions
         tile_file = os.path.join(DATA_DIR, 'tile_definitions.json')
         with open(tile_file, 'r') as f:
-            TILE_DEFINITIONS.clear()
-            TILE_DEFINITIONS.update(json.load(f))
-        print(f"Loaded {len(TILE_DEFINITIONS)} tile definitions.")
+            tile_definitions = json.load(f)
 
         # Load Generation Algorithms
         algo_file = os.path.join(DATA_DIR, 'generation_algorithms.json')
         with open(algo_file, 'r') as f:
-            GENERATION_ALGORITHMS.clear()
-            GENERATION_ALGORITHMS.extend(json.load(f).get("algorithms", []))
-        print(f"Loaded {len(GENERATION_ALGORITHMS)} generation algorithms.")
+            generation_algorithms = json.load(f).get("algorithms", [])
 
     except FileNotFoundError as e:
         print(f"FATAL ERROR: Data file not found: {e.filename}")
@@ -51,6 +82,9 @@ def load_data():
         print(f"FATAL ERROR: Failed to decode JSON from {e.doc}")
         raise
 
+    _config = (tile_definitions, generation_algorithms)
+    print(f"Loaded {len(tile_definitions)} tile definitions.")
+    print(f"Loaded {len(generation_algorithms)} generation algorithms.")
     print("--- Map Generator: Data Loaded ---")
 
 # Automatically load data on import
@@ -1,6 +1,7 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional
 from .rules_pkg import data_loader, core, models, talent_logic
+from .rules_pkg.ruleset import get_ruleset
 
 logger = logging.getLogger("monolith.rules")
 
@@ -74,51 +75,23 @@ def calculate_creation_preview(request_data: Dict[str, Any]) -> Dict[str, Any]:
     return {"calculated_stats": stats, "calculated_skills": [], "eligible_talents": [{"name": "Basic Strike"}, {"name": "Defensive Stance"}]}
 
 def get_all_stats() -> List[str]:
-    if not data_loader.STATS_LIST:
-        logger.warning("Stats list empty, attempting to reload data...")
-        data_loader.load_data()
-    return data_loader.STATS_LIST
+    return list(get_ruleset().stats_list)
 
 def get_all_skills() -> List[str]:
-    if not data_loader.SKILL_MAP:
-        data_loader.load_data()
-    return list(data_loader.SKILL_MAP.keys())
+    return list(get_ruleset().skills.keys())
 
 def get_all_talents_data() -> Dict[str, Any]:
     """Returns structured talent data."""
-    if not data_loader.TALENT_DATA:
-        data_loader.load_data()
-    return data_loader.TALENT_DATA
+    return get_ruleset().talent_data
 
-def get_talent_details(talent_name: str) -> Dict[str, Any]:
-    """Returns details for a specific talent by name, searching recursively."""
-    all_talents = get_all_talents_data()
-    
-    def search_list(t_list: List[Any]) -> Optional[Dict[str, Any]]:
-        for t in t_list:
-            if not isinstance(t, dict): continue
-            
-            # Check current item
-            name = t.get("name") or t.get("talent_name")
-            if name == talent_name:
-                return t
-            
-            # Check nested 'talents' list (common in skill mastery)
-            if "talents" in t and isinstance(t["talents"], list):
-                found = search_list(t["talents"])
-                if found: return found
-        return None
-
-    for category, content in all_talents.items():
-        if isinstance(content, list):
-            found = search_list(content)
-            if found: return found
-        elif isinstance(content, dict):
-            for sub_list in content.values():
-                if isinstance(sub_list, list):
-                    found = search_list(sub_list)
-                    if found: return found
+def get_talent_details(talent_name: str) -> Mapping[str, Any]:
+    """Returns details for a specific talent by name (including nested skill mastery talents).
 
+    The result is a read-only view shared by every caller.
+    """
+    talent = get_ruleset().get_talent(talent_name)
+    if talent:
+        return talent
     return {"name": talent_name, "effect": "Details not found.", "modifiers": []}
 
 def get_ability_school(school_name: str) -> Dict[str, Any]:
@@ -127,15 +100,17 @@ def get_ability_school(school_name: str) -> Dict[str, Any]:
         return {}
     return data_loader.ABILITY_DATA.get(school_name, {})
 
-def get_ability_data(ability_name: str) -> Dict[str, Any]:
-    if not data_loader.ABILITY_DATA:
-        return {}
-    for school, data in data_loader.ABILITY_DATA.items():
-        for branch in data.get("branches", []):
-            for tier in branch.get("tiers", []):
-                if tier.get("name") == ability_name:
-                    return tier
-    return {}
+def get_ability_data(ability_name: str) -> Mapping[str, Any]:
+    """Returns a read-only view of an ability tier by name, or {}."""
+    return get_ruleset().get_ability(ability_name) or {}
+
+def search_talents(query: str, limit: int = 10) -> List[str]:
+    """Talent names for a search box: prefix matches first, then close matches."""
+    return get_ruleset().talent_names.search(query, limit)
+
+def search_abilities(query: str, limit: int = 10) -> List[str]:
+    """Ability names for a search box: prefix matches first, then close matches."""
+    return get_ruleset().ability_names.search(query, limit)
 
 def resolve_stat(context: dict, default: str, tags: list, check_type: str) -> str:
     return core.resolve_governing_stat(default, context, data_loader.TALENT_DATA, tags, check_type)
@@ -147,54 +122,67 @@ def get_data(data_key: str) -> Any:
     """Public accessor for raw data."""
     return _get_data(data_key)
 
+# Data key -> RuleSet attribute (served from memory; nothing is re-read from disk)
+_DATA_KEYS = {
+    "kingdom_features_data": "kingdom_features",
+    "ability_data": "ability_data",
+    "stats_and_skills": "stats_and_skills",
+    "talents": "talent_data",
+    "talent_data": "talent_data",
+    "stats_list": "stats_list",
+    "all_skills": "skills",
+    "status_effects": "status_effects",
+    "injury_effects": "injury_effects",
+    "item_templates": "item_templates",
+    "loot_tables": "loot_tables",
+    "npc_templates": "npc_templates",
+    "melee_weapons": "melee_weapons",
+    "ranged_weapons": "ranged_weapons",
+    "armor": "armor",
+    "skill_mappings": "equipment_category_to_skill_map",
+    "generation_rules": "generation_rules",
+}
+
 def _get_data(data_key: str) -> Any:
-    mapping = {
-        "kingdom_features_data": "kingdom_features.json",
-        "ability_data": "abilities.json",
-        "stats_and_skills": "stats_and_skills.json",
-        "talents": "talents.json",
-        "status_effects": "status_effects.json",
-        "item_templates": "item_templates.json",
-        "loot_tables": "loot_tables.json",
-        "npc_templates": "npc_templates.json",
-        "melee_weapons": "melee_weapons.json",
-        "ranged_weapons": "ranged_weapons.json",
-        "armor": "armor.json",
-        "skill_mappings": "skill_mappings.json",
-    }
-    filename = mapping.get(data_key)
-    if not filename:
+    attr = _DATA_KEYS.get(data_key)
+    if not attr:
         logger.warning(f"_get_data unknown key {data_key}")
         return {}
-    return data_loader.load_json_data(filename)
+    value = getattr(get_ruleset(), attr)
+    return list(value) if attr == "stats_list" else value
 
 def get_injury_effects(location: str, severity: str) -> Dict:
     # Wrapper for safety as combat_handler depends on it
-    injury_data = _get_data("injury_effects")
-    if not injury_data: return {}
-
-    loc_data = injury_data.get(location, {})
-    sub_loc = loc_data.get("Torso", {}) # Defaulting sub-location
-
     # Severity string to int mapping
     sev_int = "1"
     if severity.lower() == "minor": sev_int = "1"
     elif severity.lower() == "major": sev_int = "3"
 
-    return sub_loc.get(sev_int, {})
+    # Defaulting sub-location
+    return get_ruleset().get_injury(location, "Torso", sev_int) or {}
 
 def find_eligible_talents_api(payload: Dict) -> List[Dict]:
-    stats = payload.get("stats", {})
-    skills = payload.get("skills", {})
-    talents = talent_logic.find_eligible_talents(
-        stats_in=stats,
-        skills_in=skills,
-        talent_data=_get_data("talent_data"),
-        stats_list=_get_data("stats_list"),
-        all_skills_map=_get_data("all_skills")
+    """Talents the payload's stats and skills qualify for, from the threshold index (core.find_eligible_talents)."""
+    rules = get_ruleset()
+    talents = core.find_eligible_talents(
+        stats_in=payload.get("stats", {}),
+        skills_in=payload.get("skills", {}),
+        talent_data=rules.talent_data,
+        stats_list=list(rules.stats_list),
+        all_skills_map=rules.skills
     )
     return [t.model_dump() for t in talents]
 
+def find_talent_changes_api(payload: Dict) -> Dict[str, List[Dict]]:
+    """Talents unlocked/lost by a stat or skill change (payload: stats, skills, stat_delta, skill_delta)."""
+    delta = core.find_talent_changes(
+        stats_in=payload.get("stats", {}),
+        skills_in=payload.get("skills", {}),
+        stat_delta=payload.get("stat_delta"),
+        skill_delta=payload.get("skill_delta")
+    )
+    return {"unlocked": [t.model_dump() for t in delta.unlocked], "lost": [t.model_dump() for t in delta.lost]}
+
 def register(orchestrator) -> None:
     logger.info("[rules] module registered (self-contained logic)")
 
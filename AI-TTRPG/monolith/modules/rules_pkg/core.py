@@ -8,6 +8,8 @@ from typing import Dict, List, Optional, Any
 from . import models
 from .models import RollResult, TalentInfo, FeatureStatsResponse
 from . import data_loader # Import data_loader to access TECHNIQUES
+from .ruleset import get_ruleset
+from .talent_index import TalentDelta, TalentIndex
 
 logger = logging.getLogger("rules.core")
 
@@ -647,6 +649,14 @@ def get_injury_effects(
     )
 
 
+def _talent_index_for(talent_data: Dict[str, Any], all_skills_map: Dict[str, Any]) -> TalentIndex:
+    """The shared RuleSet's prebuilt index, or a throwaway one for other data."""
+    rules = get_ruleset()
+    if talent_data is rules.talent_data and all_skills_map is rules.skills:
+        return rules.talent_index
+    return TalentIndex.build(talent_data, all_skills_map)
+
+
 def find_eligible_talents(
     stats_in: Dict[str, int],
     skills_in: Dict[str, int],  # {skill_name: rank}
@@ -657,7 +667,8 @@ def find_eligible_talents(
     """
     Identifies all talents a character qualifies for based on their stats and skills.
 
-    Checks against Single Stat Mastery, Dual Stat Focus, and Single Skill Mastery prerequisites.
+    Checks against Single Stat Mastery, Dual Stat Focus, and Single Skill Mastery prerequisites
+    using the threshold index (one bisect per stat, stat pair and skill).
 
     Args:
         stats_in (Dict[str, int]): Character's stat scores.
@@ -667,10 +678,8 @@ def find_eligible_talents(
         all_skills_map (Dict[str, Dict[str, str]]): Master mapping of all skills.
 
     Returns:
-        List[TalentInfo]: A list of talents the character is eligible for.
+        List[TalentInfo]: A list of talents the character is eligible for (shared, frozen objects).
     """
-    unlocked_talents = []
-
     if not talent_data or not stats_list or not all_skills_map:
         logger.warning(
             "Missing required data (talents, stats list, or skills map) for talent lookup."
@@ -678,85 +687,28 @@ def find_eligible_talents(
         return []
 
     stats_complete = {stat: stats_in.get(stat, 0) for stat in stats_list}
-    skills_complete = skills_in  # Assumes skills_in is {skill_name: rank}
-
-    # --- 1. Check Single Stat Mastery ---
-    for talent_group in talent_data.get("single_stat_mastery", []):
-        stat_name = talent_group.get("stat")
-        if not stat_name:
-            continue
-        current_stat_score = stats_complete.get(stat_name, 0)
-        # Check 'score' field (ensure talents.json uses 'score')
-        required_score = talent_group.get("score")
-        if required_score is not None and current_stat_score >= required_score:
-            unlocked_talents.append(
-                TalentInfo(
-                    name=talent_group.get("talent_name", "Unknown Talent"),
-                    source=f"Stat: {stat_name} {required_score}",
-                    effect=talent_group.get("effect", ""),
-                        modifiers=[models.PassiveModifier(**m) for m in talent_group.get("modifiers", [])]
-                )
-            )
+    return _talent_index_for(talent_data, all_skills_map).eligible(stats_complete, skills_in)
+
+
+def find_talent_changes(
+    stats_in: Dict[str, int],
+    skills_in: Dict[str, int],
+    stat_delta: Optional[Dict[str, int]] = None,
+    skill_delta: Optional[Dict[str, int]] = None,
+) -> TalentDelta:
+    """
+    Returns only the talents unlocked or lost when stats/skills change by the given amounts.
+
+    Args:
+        stats_in (Dict[str, int]): Stat scores before the change.
+        skills_in (Dict[str, int]): Skill ranks before the change.
+        stat_delta (Dict[str, int]): Change per stat (e.g. {"Might": 1}).
+        skill_delta (Dict[str, int]): Change per skill rank.
 
-    # --- 2. Check Dual Stat Synergy ---
-    for talent in talent_data.get("dual_stat_focus", []):
-        req_score = talent.get("score", 99)  # Check 'score' field
-        stats_pair = talent.get("stats", [])  # FIXED: Changed 'paired_stats' to 'stats' to match JSON
-        if len(stats_pair) == 2:
-            stat1, stat2 = stats_pair
-            if (
-                stats_complete.get(stat1, 0) >= req_score
-                and stats_complete.get(stat2, 0) >= req_score
-            ):
-                unlocked_talents.append(
-                    TalentInfo(
-                        name=talent.get(
-                            "talent_name", "Unknown Talent"
-                        ),  # Check 'talent_name' field
-                        source=f"Dual Stat: {stat1} & {stat2} {req_score}",
-                        effect=talent.get("effect", ""),
-                            modifiers=[models.PassiveModifier(**m) for m in talent.get("modifiers", [])]
-                    )
-                )
-
-    # --- 3. Check Skill Mastery ---
-    for category_key, category_list in talent_data.get(
-        "single_skill_mastery", {}
-    ).items():
-        if isinstance(category_list, list):
-            for skill_group in category_list:
-                skill_name = skill_group.get("skill")
-                if (
-                    skill_name and skill_name in all_skills_map
-                ):  # Check against provided map
-                    current_skill_rank = skills_complete.get(skill_name, 0)
-                    for talent in skill_group.get("talents", []):
-                        # Check both 'tier' and 'prerequisite_mt' keys for flexibility
-                        tier_name = talent.get("tier", talent.get("prerequisite_mt"))
-                        req_rank = 99
-                        if tier_name and tier_name.startswith("MT"):
-                            try:
-                                req_rank = int(tier_name.replace("MT", ""))
-                            except ValueError:
-                                pass
-
-                        if current_skill_rank >= req_rank:
-                            unlocked_talents.append(
-                                TalentInfo(
-                                    name=talent.get(
-                                        "talent_name", "Unknown Talent"
-                                    ),  # Check 'talent_name' field
-                                    source=f"Skill: {skill_name} ({tier_name})",
-                                    effect=talent.get("effect", ""),
-                                    modifiers=[models.PassiveModifier(**m) for m in talent.get("modifiers", [])]
-                                )
-                            )
-                elif skill_name:
-                    logger.warning(
-                        f"Skill '{skill_name}' from talent data not found in master skill map."
-                    )
-
-    return unlocked_talents
+    Returns:
+        TalentDelta: `unlocked` and `lost` talents, in talents.json order.
+    """
+    return get_ruleset().talent_index.delta(stats_in, skills_in, stat_delta, skill_delta)
 
 
 def _check_modifier_conditions(mod: models.PassiveModifier, context: Optional[Dict[str, Any]]) -> bool:
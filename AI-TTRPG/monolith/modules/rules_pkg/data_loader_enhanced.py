@@ -1,23 +1,21 @@
 """
-Enhanced Rules Data Loader with Strict Validation and Singleton Pattern
+Enhanced Rules Data Loader with Singleton Pattern
 
 This module provides:
-- RuleSetContainer singleton for immut able, validated game rules
-- Pydantic-based validation with detailed error reporting
+- RuleSetContainer singleton exposing the game rules as attributes
 - Thread-safe initialization
-- Support for modding with clear error messages
+- Load errors reported with file, type and position
+
+The data itself is the shared RuleSet from ruleset.py; the container only
+holds references to it, so attaching never re-reads the rules files.
 """
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-from pydantic import ValidationError
 import threading
 
-from .models import (
-    AbilitySchool, TalentInfo, BackgroundChoice,
-    StatusEffectResponse
-)
+from .ruleset import DATA_DIR, RuleSet, get_ruleset
+from .data_loader import legacy_view
 
 logger = logging.getLogger("monolith.rules.data_loader_enhanced")
 
@@ -26,7 +24,7 @@ class RuleSetContainer:
     """Thread-safe singleton container for immutable game rules.
     
     All game rules are loaded once at startup and cached for fast access.
-    Uses Pydantic validation to ensure data integrity.
+    Attributes reference the shared RuleSet; treat them as read-only.
     """
     
     _instance: Optional['RuleSetContainer'] = None
@@ -72,6 +70,7 @@ class RuleSetContainer:
         self.loot_tables: Dict[str, Any] = {}
         
         # Metadata
+        self.ruleset: Optional[RuleSet] = None
         self.data_directory: Path = self._get_data_directory()
         self.load_errors: List[Dict[str, str]] = []
         
@@ -95,173 +94,39 @@ class RuleSetContainer:
     
     def _get_data_directory(self) -> Path:
         """Get the data directory path."""
-        # Assumes this file is in modules/rules_pkg/
-        return Path(__file__).parent / "data"
-    
-    def _load_json_file(self, filename: str, required: bool = True) -> Any:
-        """Load and parse a JSON file with error handling.
-        
-        Args:
-            filename: Name of JSON file to load
-            required: Whether file is required (logs error vs raises exception)
-            
-        Returns:
-            Parsed JSON data or empty dict if not found
-        """
-        filepath = self.data_directory / filename
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"Loaded: {filename}")
-                return data
-                
-        except FileNotFoundError:
-            error_msg = f"File not found: {filename} at {filepath}"
-            if required:
-                logger.error(error_msg)
-                self.load_errors.append({
-                    "file": filename,
-                    "error_type": "FileNotFoundError",
-                    "message": error_msg
-                })
-            else:
-                logger.warning(f"Optional file not found: {filename}")
-            return {} if isinstance(data, dict) else []
-            
-        except json.JSONDecodeError as e:
-            error_msg = f"Invalid JSON in {filename}: {e}"
-            logger.error(error_msg)
-            self.load_errors.append({
-                "file": filename,
-                "error_type": "JSONDecodeError",
-                "message": error_msg,
-                "line": e.lineno,
-                "column": e.colno
-            })
-            return {} if "dict" in str(type({})) else []
-            
-        except Exception as e:
-            error_msg = f"Unexpected error loading {filename}: {e}"
-            logger.error(error_msg)
-            self.load_errors.append({
-                "file": filename,
-                "error_type": type(e).__name__,
-                "message": str(e)
-            })
-            return {}
-    
-    def _build_ability_lookup(self) -> Dict[str, Any]:
-        """Build flat lookup map from nested ability data.
-        
-        Returns:
-            Dictionary mapping ability names to ability data
-        """
-        lookup = {}
-        
-        for school_name, school_data in self.abilities.items():
-            if not isinstance(school_data, dict):
-                continue
-            
-            for branch in school_data.get("branches", []):
-                if not isinstance(branch, dict):
-                    continue
-                
-                for tier in branch.get("tiers", []):
-                    if not isinstance(tier, dict):
-                        continue
-                    
-                    ability_name = tier.get("name")
-                    if ability_name:
-                        # Add school context
-                        tier["_school_name"] = school_name
-                        tier["_school_resource"] = school_data.get("resource")
-                        tier["_school_stat"] = school_data.get("associated_stat")
-                        tier["_branch_name"] = branch.get("branch")
-                        lookup[ability_name] = tier
-        
-        logger.info(f"Built {len(lookup)} ability lookups")
-        return lookup
-    
-    def _build_talent_lookup(self) -> Dict[str, Any]:
-        """Build flat lookup map from talent data.
-        
-        Returns:
-            Dictionary mapping talent names to talent data
-        """
-        lookup = {}
-        
-        # Talents can be in various structures
-        for category, talents_data in self.talents.items():
-            if isinstance(talents_data, list):
-                for talent in talents_data:
-                    if isinstance(talent, dict):
-                        name = talent.get("talent_name") or talent.get("name")
-                        if name:
-                            talent["_category"] = category
-                            lookup[name] = talent
-            elif isinstance(talents_data, dict):
-                for talent_name, talent_data in talents_data.items():
-                    if isinstance(talent_data, dict):
-                        talent_data["_category"] = category
-                        lookup[talent_name] = talent_data
-        
-        logger.info(f"Built {len(lookup)} talent lookups")
-        return lookup
-    
-    def _process_kingdom_features(self) -> Dict[str, Any]:
-        """Process kingdom features into flat map for stat lookups."""
-        feature_map = {}
-        
-        for category_data in self.kingdom_features.values():
-            if not isinstance(category_data, dict):
-                continue
-            
-            for kingdom_list in category_data.values():
-                if isinstance(kingdom_list, list):
-                    for feature in kingdom_list:
-                        if not isinstance(feature, dict):
-                            continue
-                        
-                        feature_name = feature.get("name")
-                        if feature_name:
-                            feature_map[feature_name] = feature
-        
-        logger.info(f"Processed {len(feature_map)} kingdom features")
-        return feature_map
-    
-    def _process_skills(self) -> tuple:
-        """Process stats and skills from JSON.
-        
-        Returns:
-            Tuple of (stats_list, skill_categories, skill_map)
-        """
-        stats_data = self._load_json_file("stats_and_skills.json")
-        
-        stats_list = stats_data.get("stats", [])
-        skill_categories = stats_data.get("skill_categories", {})
-        
-        # Build flat skill map
-        skill_map = {}
-        for category, skills_dict in skill_categories.items():
-            if isinstance(skills_dict, dict):
-                for skill_name, governing_stat in skills_dict.items():
-                    if governing_stat not in stats_list:
-                        logger.warning(
-                            f"Skill '{skill_name}' has invalid governing stat '{governing_stat}'"
-                        )
-                        continue
-                    
-                    skill_map[skill_name] = {
-                        "category": category,
-                        "governing_stat": governing_stat
-                    }
-        
-        logger.info(f"Processed {len(stats_list)} stats and {len(skill_map)} skills")
-        return stats_list, skill_categories, skill_map
+        return DATA_DIR
+    
+    def _bind(self, rules: RuleSet):
+        """Point every attribute at the shared RuleSet (no copies)."""
+        self.ruleset = rules
+        self.stats_list = list(rules.stats_list)
+        self.skill_categories = rules.skill_categories
+        self.skill_map = rules.skills
+        self.abilities = rules.ability_data
+        self.ability_lookup = rules.abilities
+        self.talents = rules.talent_data
+        self.talent_lookup = rules.talents
+        self.melee_weapons = rules.melee_weapons
+        self.ranged_weapons = rules.ranged_weapons
+        self.armor = rules.armor
+        self.status_effects = rules.status_effects
+        self.injury_effects = rules.injury_effects
+        self.kingdom_features = rules.kingdom_features
+        self.feature_stats_map = rules.features
+        self.origin_choices = rules.origin_choices
+        self.childhood_choices = rules.childhood_choices
+        self.coming_of_age_choices = rules.coming_of_age_choices
+        self.training_choices = rules.training_choices
+        self.devotion_choices = rules.devotion_choices
+        self.npc_templates = rules.npc_templates
+        self.item_templates = rules.item_templates
+        self.generation_rules = rules.generation_rules
+        self.loot_tables = rules.loot_tables
+        self.data_directory = rules.data_dir
+        self.load_errors = list(rules.load_errors)
     
     def load_all(self) -> Dict[str, Any]:
-        """Load and validate all game rules data.
+        """Attach to the shared RuleSet (loading it if nothing has yet).
         
         Returns:
             Summary dictionary of loaded data
@@ -274,105 +139,29 @@ class RuleSetContainer:
                 logger.warning("Already initialized, skipping reload")
                 return self.get_summary()
             
-            logger.info("=" * 60)
-            logger.info("LOADING GAME RULES DATA")
-            logger.info("=" * 60)
-            
-            # Clear any previous errors
-            self.load_errors = []
-            
             try:
-                # 1. Load core stats and skills
-                self.stats_list, self.skill_categories, self.skill_map = self._process_skills()
-                
-                if not self.stats_list:
-                    raise ValueError("Critical: No stats loaded from stats_and_skills.json")
-                
-                # 2. Load abilities
-                self.abilities = self._load_json_file("abilities.json")
-                self.ability_lookup = self._build_ability_lookup()
-                
-                # 3. Load talents
-                self.talents = self._load_json_file("talents.json")
-                self.talent_lookup = self._build_talent_lookup()
-                
-                # 4. Load kingdom features
-                self.kingdom_features = self._load_json_file("kingdom_features.json")
-                self.feature_stats_map = self._process_kingdom_features()
-                
-                # 5. Load combat data
-                self.melee_weapons = self._load_json_file("melee_weapons.json")
-                self.ranged_weapons = self._load_json_file("ranged_weapons.json")
-                self.armor = self._load_json_file("armor.json")
-                self.injury_effects = self._load_json_file("injury_effects.json")
-                self.status_effects = self._load_json_file("status_effects.json")
-                
-                # 6. Load character creation data
-                self.origin_choices = self._load_json_file("origin_choices.json")
-                self.childhood_choices = self._load_json_file("childhood_choices.json")
-                self.coming_of_age_choices = self._load_json_file("coming_of_age_choices.json")
-                self.training_choices = self._load_json_file("training_choices.json")
-                self.devotion_choices = self._load_json_file("devotion_choices.json")
-                
-                # 7. Load world generation data
-                self.npc_templates = self._load_json_file("npc_templates.json")
-                self.item_templates = self._load_json_file("item_templates.json")
-                self.generation_rules = self._load_json_file("generation_rules.json")
-                self.loot_tables = self._load_json_file("loot_tables.json", required=False)
-                
-                RuleSetContainer._initialized = True
-                
-                # Log summary
-                summary = self.get_summary()
-                logger.info("=" * 60)
-                logger.info("RULES DATA LOADED SUCCESSFULLY")
-                logger.info("=" * 60)
-                for key, value in summary.items():
-                    if isinstance(value, int):
-                        logger.info(f"  {key}: {value}")
-                
-                if self.load_errors:
-                    logger.warning(f"Loaded with {len(self.load_errors)} errors:")
-                    for error in self.load_errors:
-                        logger.warning(f"  - {error['file']}: {error['message']}")
-                
-                return summary
-                
+                self._bind(get_ruleset())
             except Exception as e:
                 logger.exception("Fatal error during rules data loading")
                 raise ValueError(f"Failed to load game rules: {e}") from e
+            
+            RuleSetContainer._initialized = True
+            summary = self.get_summary()
+            logger.info(f"Rules container attached: {summary}")
+            return summary
     
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of loaded data counts."""
-        return {
-            "stats": len(self.stats_list),
-            "skills": len(self.skill_map),
-            "abilities": len(self.ability_lookup),
-            "talents": len(self.talent_lookup),
-            "kingdom_features": len(self.feature_stats_map),
-            "melee_weapons": len(self.melee_weapons),
-            "ranged_weapons": len(self.ranged_weapons),
-            "armor": len(self.armor),
-            "status_effects": len(self.status_effects),
-            "injury_effects": len(self.injury_effects),
-            "npc_templates": len(self.npc_templates),
-            "item_templates": len(self.item_templates),
-            "origin_choices": len(self.origin_choices),
-            "childhood_choices": len(self.childhood_choices),
-            "coming_of_age_choices": len(self.coming_of_age_choices),
-            "training_choices": len(self.training_choices),
-            "devotion_choices": len(self.devotion_choices),
-            "load_errors": len(self.load_errors)
-        }
+        return self.ruleset.summary() if self.ruleset else {}
     
     # Convenience accessors
     def get_ability(self, ability_name: str) -> Optional[Dict[str, Any]]:
-        """Get ability data by name."""
-        return self.ability_lookup.get(ability_name)
+        """Get ability data by name (read-only, case-insensitive)."""
+        return self.ruleset.get_ability(ability_name) if self.ruleset else None
     
     def get_talent(self, talent_name: str) -> Optional[Dict[str, Any]]:
-        """Get talent data by name."""
-        return self.talent_lookup.get(talent_name)
+        """Get talent data by name (read-only, case-insensitive)."""
+        return self.ruleset.get_talent(talent_name) if self.ruleset else None
     
     def get_skill_info(self, skill_name: str) -> Optional[Dict[str, Any]]:
         """Get skill information."""
@@ -428,28 +217,4 @@ def load_data() -> Dict[str, Any]:
     
     Returns the same data structure as the old loader.
     """
-    rules = get_rules()
-    
-    return {
-        "stats_list": rules.stats_list,
-        "skill_categories": rules.skill_categories,
-        "all_skills": rules.skill_map,
-        "ability_data": rules.abilities,
-        "ability_map": rules.ability_lookup,
-        "talent_data": rules.talents,
-        "feature_stats_map": rules.feature_stats_map,
-        "kingdom_features_data": rules.kingdom_features,
-        "melee_weapons": rules.melee_weapons,
-        "ranged_weapons": rules.ranged_weapons,
-        "armor": rules.armor,
-        "injury_effects": rules.injury_effects,
-        "status_effects": rules.status_effects,
-        "origin_choices": rules.origin_choices,
-        "childhood_choices": rules.childhood_choices,
-        "coming_of_age_choices": rules.coming_of_age_choices,
-        "training_choices": rules.training_choices,
-        "devotion_choices": rules.devotion_choices,
-        "npc_templates": rules.npc_templates,
-        "item_templates": rules.item_templates,
-        "generation_rules": rules.generation_rules,
-    }
+    return legacy_view(get_rules().ruleset)
@@ -174,6 +174,9 @@ class ModifierSource(BaseModel):
 
 
 class TalentInfo(BaseModel):
+    # Shared between callers (see talent_index), so never mutated in place
+    model_config = {"frozen": True}
+
     name: str
     source: str
     effect: str
@@ -0,0 +1,534 @@
+"""
+Mod pack overlays over the base rules data.
+
+A mod pack is a directory holding any of the rules files (same names and
+layout as `rules_pkg/data`, e.g. `abilities.json` with just the new schools,
+branches or tiers) and an optional `mod.json` manifest:
+
+    {"name": "Arcane Expansion", "priority": 10}
+
+Packs are applied lowest priority first (ties keep the configured order), and
+each one is merged over the result per entry:
+
+- abilities.json: per tier, by (school, branch, tier name)
+- talents.json: per talent, by (category[, group, skill], talent name)
+- other object files (items, status effects, ...): per top-level key
+- list files (origin/training/... choices): per entry "name"
+
+An entry defined by more than one pack is a conflict: the highest priority
+pack wins and the conflict is reported (`RuleSet.mod_conflicts`).
+
+Every input file is hashed. The merged RuleSet is cached as a compiled
+snapshot keyed by the hash of all inputs, so an unchanged setup starts
+without parsing anything. In-process, parsed pack files are cached by their
+hash and a merged document is only rebuilt when a file feeding it changed,
+so editing one pack re-merges only what that pack touches.
+
+Packs are configured with MONOLITH_MODS (directories separated by os.pathsep)
+or `configure_mods`.
+
+CLI (for mod authors):
+
+    python -m monolith.modules.rules_pkg.mods report DIR [DIR ...]
+"""
+import argparse
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .ruleset import (
+    DATA_DIR, RULE_FILES, RuleSet, _read_json, load_ruleset, rebuild_ruleset, replace_documents,
+)
+
+logger = logging.getLogger("monolith.rules.mods")
+
+MANIFEST = "mod.json"
+
+Location = Tuple[str, ...]
+EntryKey = Tuple[Location, str]
+# A document split into its entries and the attributes of the containers
+# (schools, branches, skill groups) that hold them
+Split = Tuple[Dict[EntryKey, Any], Dict[Location, Dict[str, Any]]]
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _file_hashes(directory: Path, filenames) -> Dict[str, str]:
+    """{file name: content hash} for the files that exist."""
+    hashes = {}
+    for name in filenames:
+        try:
+            hashes[name] = _hash_bytes((directory / name).read_bytes())
+        except FileNotFoundError:
+            continue
+    return hashes
+
+
+# -----------------------------------------------------------------------------
+# Splitting documents into entries and joining them back
+# -----------------------------------------------------------------------------
+
+def _split_abilities(doc: Dict[str, Any]) -> Split:
+    entries: Dict[EntryKey, Any] = {}
+    containers: Dict[Location, Dict[str, Any]] = {}
+    for school, school_data in doc.items():
+        if not isinstance(school_data, dict):
+            continue
+        containers[(school,)] = {k: v for k, v in school_data.items() if k != "branches"}
+        for branch in school_data.get("branches", []):
+            if not isinstance(branch, dict):
+                continue
+            location = (school, branch.get("branch", ""))
+            containers[location] = {k: v for k, v in branch.items() if k != "tiers"}
+            for tier in branch.get("tiers", []):
+                if isinstance(tier, dict) and tier.get("name"):
+                    entries[(location, tier["name"])] = tier
+    return entries, containers
+
+
+def _join_abilities(entries: Dict[EntryKey, Any], containers: Dict[Location, Dict[str, Any]]) -> Dict[str, Any]:
+    doc: Dict[str, Any] = {}
+    branches: Dict[Location, Dict[str, Any]] = {}
+    for location, attrs in containers.items():
+        if len(location) == 1:
+            doc[location[0]] = {**attrs, "branches": []}
+    for location, attrs in containers.items():
+        if len(location) == 2:
+            branches[location] = {**attrs, "tiers": []}
+            doc[location[0]]["branches"].append(branches[location])
+    for (location, _), tier in entries.items():
+        branches[location]["tiers"].append(tier)
+    return doc
+
+
+def _talent_name(talent: Dict[str, Any]) -> Optional[str]:
+    return talent.get("talent_name") or talent.get("name")
+
+
+def _split_talents(doc: Dict[str, Any]) -> Split:
+    entries: Dict[EntryKey, Any] = {}
+    containers: Dict[Location, Dict[str, Any]] = {}
+    for category, content in doc.items():
+        if isinstance(content, list):
+            # {"single_stat_mastery": [talent, ...]}
+            containers[(category,)] = {}
+            for talent in content:
+                if isinstance(talent, dict) and _talent_name(talent):
+                    entries[((category,), _talent_name(talent))] = talent
+        elif isinstance(content, dict):
+            # {"single_skill_mastery": {"Melee": [{"skill": ..., "talents": [...]}, ...]}}
+            containers[(category,)] = {}
+            for group_category, groups in content.items():
+                containers[(category, group_category)] = {}
+                for group in groups if isinstance(groups, list) else []:
+                    if not isinstance(group, dict):
+                        continue
+                    location = (category, group_category, group.get("skill", ""))
+                    containers[location] = {k: v for k, v in group.items() if k != "talents"}
+                    for talent in group.get("talents", []):
+                        if isinstance(talent, dict) and _talent_name(talent):
+                            entries[(location, _talent_name(talent))] = talent
+    return entries, containers
+
+
+def _join_talents(entries: Dict[EntryKey, Any], containers: Dict[Location, Dict[str, Any]]) -> Dict[str, Any]:
+    grouped = {location[0] for location in containers if len(location) > 1}
+    doc: Dict[str, Any] = {}
+    groups: Dict[Location, Dict[str, Any]] = {}
+    for location, attrs in containers.items():
+        if len(location) == 1:
+            doc[location[0]] = {} if location[0] in grouped else []
+        elif len(location) == 2:
+            doc[location[0]][location[1]] = []
+        else:
+            groups[location] = {**attrs, "talents": []}
+            doc[location[0]][location[1]].append(groups[location])
+    for (location, _), talent in entries.items():
+        if len(location) == 1:
+            doc[location[0]].append(talent)
+        else:
+            groups[location]["talents"].append(talent)
+    return doc
+
+
+def _split_mapping(doc: Dict[str, Any]) -> Split:
+    return {((), key): value for key, value in doc.items()}, {}
+
+
+def _join_mapping(entries: Dict[EntryKey, Any], containers: Dict[Location, Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: value for (_, key), value in entries.items()}
+
+
+def _split_list(doc: List[Any]) -> Split:
+    entries = {}
+    for position, entry in enumerate(doc):
+        name = entry.get("name") or entry.get("id") if isinstance(entry, dict) else None
+        entries[((), name or f"#{position}")] = entry
+    return entries, {}
+
+
+def _join_list(entries: Dict[EntryKey, Any], containers: Dict[Location, Dict[str, Any]]) -> List[Any]:
+    return list(entries.values())
+
+
+_SHAPES: Dict[str, Tuple[Callable[[Any], Split], Callable[..., Any]]] = {
+    "ability_data": (_split_abilities, _join_abilities),
+    "talent_data": (_split_talents, _join_talents),
+}
+
+
+def _shape(attr: str):
+    if attr in _SHAPES:
+        return _SHAPES[attr]
+    _, _, empty = RULE_FILES[attr]
+    return (_split_list, _join_list) if isinstance(empty, list) else (_split_mapping, _join_mapping)
+
+
+def _entry_label(key: EntryKey) -> str:
+    location, name = key
+    return "/".join((*location, name))
+
+
+# -----------------------------------------------------------------------------
+# Packs
+# -----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ModPack:
+    """One mod directory as found on disk."""
+    name: str
+    path: Path
+    priority: int
+    order: int  # position in the configured list (tie-break)
+    hashes: Dict[str, str]  # rules file name -> content hash (only files the pack has)
+
+
+def scan_packs(mod_dirs: Sequence[Path], errors: Optional[List[Dict[str, Any]]] = None) -> List[ModPack]:
+    """Read the manifests of `mod_dirs`, sorted lowest priority first."""
+    errors = errors if errors is not None else []
+    filenames = [filename for filename, _, _ in RULE_FILES.values()]
+    packs = []
+    for order, directory in enumerate(Path(d) for d in mod_dirs):
+        if not directory.is_dir():
+            logger.error(f"Mod pack directory not found: {directory}")
+            errors.append({"file": str(directory), "error_type": "FileNotFoundError",
+                           "message": f"Mod pack directory not found: {directory}"})
+            continue
+        manifest = _read_json(directory, MANIFEST, False, {}, errors)
+        hashes = _file_hashes(directory, filenames)
+        hashes.pop(MANIFEST, None)
+        packs.append(ModPack(
+            name=str(manifest.get("name") or directory.name),
+            path=directory,
+            priority=int(manifest.get("priority", 0)),
+            order=order,
+            hashes=hashes,
+        ))
+    return sorted(packs, key=lambda p: (p.priority, p.order))
+
+
+def combined_hash(base_hashes: Dict[str, str], packs: Sequence[ModPack]) -> str:
+    """Hash of every input of a merged RuleSet (base files and pack files, in order)."""
+    digest = hashlib.blake2b(digest_size=20)
+    for filename in sorted(base_hashes):
+        digest.update(f"{filename}={base_hashes[filename]};".encode("utf-8"))
+    for pack in packs:
+        digest.update(b"\0" + pack.name.encode("utf-8") + b"\0")
+        for filename in sorted(pack.hashes):
+            digest.update(f"{filename}={pack.hashes[filename]};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _doc_keys(base_hashes: Dict[str, str], packs: Sequence[ModPack], only: Optional[str] = None) -> Any:
+    """The inputs a merged document is built from: its base file and pack files, in order."""
+    def key(filename: str) -> Tuple:
+        return (base_hashes.get(filename),) + tuple(
+            (pack.name, pack.hashes[filename]) for pack in packs if filename in pack.hashes)
+    if only is not None:
+        return key(RULE_FILES[only][0])
+    return {attr: key(filename) for attr, (filename, _, _) in RULE_FILES.items()}
+
+
+# -----------------------------------------------------------------------------
+# Overlay
+# -----------------------------------------------------------------------------
+
+class ModOverlay:
+    """Builds (and incrementally rebuilds) the base rules merged with mod packs."""
+
+    def __init__(
+        self,
+        mod_dirs: Sequence[Path],
+        base_dir: Optional[Path] = None,
+        snapshot_dir: Optional[Path] = None,
+        snapshots: bool = True,
+    ):
+        """
+        Args:
+            mod_dirs: Mod pack directories (priority ties keep this order)
+            base_dir: Base rules JSON directory (defaults to rules_pkg/data)
+            snapshot_dir: Where compiled snapshots are cached
+            snapshots: Read and write compiled snapshots
+        """
+        from . import rules_snapshot
+
+        self.mod_dirs = [Path(d) for d in mod_dirs]
+        self.base_dir = Path(base_dir) if base_dir else DATA_DIR
+        self.snapshot_dir = snapshot_dir
+        self.snapshots = snapshots and rules_snapshot.SNAPSHOTS_ENABLED
+        self._lock = threading.RLock()
+        self._base: Optional[RuleSet] = None
+        self._base_hashes: Dict[str, str] = {}
+        self._rules: Optional[RuleSet] = None
+        # Per document: the inputs it was merged from, and its conflicts
+        self._doc_keys: Dict[str, Tuple] = {}
+        self._doc_conflicts: Dict[str, List[Dict[str, Any]]] = {}
+        # (pack path, file name) -> (content hash, split or None if unreadable)
+        self._pack_splits: Dict[Tuple[Path, str], Tuple[str, Optional[Split]]] = {}
+        self._pack_errors: Dict[Tuple[Path, str], Dict[str, Any]] = {}
+        # (file name, content hash) -> split of the base document
+        self._base_splits: Dict[Tuple[str, str], Split] = {}
+        self.last_rebuilt: Set[str] = set()
+
+    def watched_files(self) -> List[Path]:
+        """Every file whose change affects the merged rules (base and packs)."""
+        filenames = [filename for filename, _, _ in RULE_FILES.values()]
+        files = [self.base_dir / name for name in filenames]
+        for directory in self.mod_dirs:
+            files.extend(directory / name for name in [MANIFEST, *filenames])
+        return files
+
+    def load(self, strict: bool = False) -> RuleSet:
+        return self.build(strict)[0]
+
+    def build(self, strict: bool = False) -> Tuple[RuleSet, Set[str]]:
+        """Return the merged RuleSet for the files currently on disk.
+
+        Args:
+            strict: Raise instead of skipping unreadable pack files (hot reload)
+
+        Returns:
+            (merged RuleSet, attributes rebuilt since the previous build)
+
+        Raises:
+            ValueError: In strict mode, if a pack or base file cannot be loaded
+        """
+        from . import rules_snapshot
+
+        with self._lock:
+            errors: List[Dict[str, Any]] = []
+            packs = scan_packs(self.mod_dirs, errors)
+            base_hashes = _file_hashes(self.base_dir, [filename for filename, _, _ in RULE_FILES.values()])
+            source_hash = combined_hash(base_hashes, packs)
+
+            if self._rules is not None and self._rules.source_hash == source_hash:
+                self.last_rebuilt = set()
+                return self._rules, set()
+
+            if self._rules is None and self.snapshots:
+                cached = rules_snapshot.read_snapshot(source_hash, self.base_dir, self.snapshot_dir)
+                if cached is not None:
+                    logger.info(f"Rules with {len(packs)} mod pack(s) loaded from snapshot {source_hash[:12]}")
+                    self._adopt(cached, base_hashes, packs)
+                    self.last_rebuilt = set(RULE_FILES)
+                    return cached, set(RULE_FILES)
+
+            base = self._load_base(base_hashes)
+            previous = self._rules or base
+            doc_keys = self._doc_keys if self._rules else _doc_keys(base_hashes, [])
+            doc_conflicts = dict(self._doc_conflicts)
+
+            new_docs = {}
+            new_keys = {}
+            for attr, (filename, _, _) in RULE_FILES.items():
+                key = _doc_keys(base_hashes, packs, attr)
+                if key == doc_keys.get(attr):
+                    continue
+                new_keys[attr] = key
+                if any(filename in pack.hashes for pack in packs):
+                    new_docs[attr], doc_conflicts[attr] = self._merge(attr, base, packs)
+                else:
+                    new_docs[attr], doc_conflicts[attr] = getattr(base, attr), []
+
+            errors.extend(self._pack_errors[(pack.path, filename)] for pack in packs for filename in pack.hashes
+                          if (pack.path, filename) in self._pack_errors)
+            if strict and errors:
+                raise ValueError("; ".join(f"{e['file']}: {e['message']}" for e in errors))
+
+            conflicts = tuple(c for attr in RULE_FILES for c in doc_conflicts.get(attr, ()))
+            rules, rebuilt = replace_documents(previous, new_docs, source_hash=source_hash,
+                                               load_errors=base.load_errors + tuple(errors))
+            rules = dataclasses.replace(rules, mod_packs=tuple(p.name for p in packs), mod_conflicts=conflicts)
+            self._rules = rules
+            self._doc_keys = {**doc_keys, **new_keys}
+            self._doc_conflicts = doc_conflicts
+            self.last_rebuilt = rebuilt
+
+            for conflict in conflicts:
+                logger.warning(f"Mod conflict in {conflict['file']}: {conflict['entry']} defined by "
+                               f"{', '.join(conflict['packs'])}; using {conflict['winner']}")
+            logger.info(f"Rules merged with mod packs {list(rules.mod_packs)} (rebuilt: {sorted(rebuilt)})")
+
+            if self.snapshots and not rules.load_errors:
+                try:
+                    rules_snapshot.write_snapshot(rules, self.snapshot_dir)
+                except Exception as e:
+                    logger.warning(f"Could not write merged rules snapshot: {e}")
+            return rules, rebuilt
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _load_base(self, base_hashes: Dict[str, str]) -> RuleSet:
+        from .rules_snapshot import load_compiled
+
+        if self._base is None:
+            self._base = load_compiled(self.base_dir, self.snapshot_dir) if self.snapshots else load_ruleset(self.base_dir)
+        elif base_hashes != self._base_hashes:
+            changed = {name for name in set(base_hashes) | set(self._base_hashes)
+                       if base_hashes.get(name) != self._base_hashes.get(name)}
+            self._base, _ = rebuild_ruleset(self._base, changed)
+        self._base_hashes = base_hashes
+        return self._base
+
+    def _adopt(self, rules: RuleSet, base_hashes: Dict[str, str], packs: Sequence[ModPack]) -> None:
+        """Take over a snapshot's merged documents as the starting point for later builds."""
+        self._rules = rules
+        self._doc_keys = _doc_keys(base_hashes, packs)
+        self._doc_conflicts = {}
+        for conflict in rules.mod_conflicts:
+            attr = next(a for a, (filename, _, _) in RULE_FILES.items() if filename == conflict["file"])
+            self._doc_conflicts.setdefault(attr, []).append(conflict)
+
+    def _base_split(self, attr: str, base: RuleSet) -> Split:
+        filename = RULE_FILES[attr][0]
+        key = (filename, self._base_hashes.get(filename, ""))
+        if key not in self._base_splits:
+            self._base_splits = {k: v for k, v in self._base_splits.items() if k[0] != filename}
+            self._base_splits[key] = _shape(attr)[0](getattr(base, attr))
+        return self._base_splits[key]
+
+    def _pack_split(self, attr: str, pack: ModPack) -> Optional[Split]:
+        filename, _, empty = RULE_FILES[attr]
+        cache_key = (pack.path, filename)
+        cached = self._pack_splits.get(cache_key)
+        if cached is not None and cached[0] == pack.hashes[filename]:
+            return cached[1]
+
+        errors: List[Dict[str, Any]] = []
+        doc = _read_json(pack.path, filename, True, type(empty)(), errors)
+        split = None
+        self._pack_errors.pop(cache_key, None)
+        if errors:
+            error = dict(errors[0], file=f"{pack.name}/{filename}")
+            logger.error(f"Mod pack '{pack.name}': skipping {filename}: {error['message']}")
+            self._pack_errors[cache_key] = error
+        else:
+            split = _shape(attr)[0](doc)
+        self._pack_splits[cache_key] = (pack.hashes[filename], split)
+        return split
+
+    def _merge(self, attr: str, base: RuleSet, packs: Sequence[ModPack]) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Merge one document: base entries overlaid by each pack in priority order."""
+        filename = RULE_FILES[attr][0]
+        base_entries, base_containers = self._base_split(attr, base)
+        entries = dict(base_entries)
+        containers = {location: dict(attrs) for location, attrs in base_containers.items()}
+        owners: Dict[EntryKey, List[str]] = {}
+
+        for pack in packs:
+            if filename not in pack.hashes:
+                continue
+            split = self._pack_split(attr, pack)
+            if split is None:
+                continue
+            pack_entries, pack_containers = split
+            for location, attrs in pack_containers.items():
+                containers.setdefault(location, {}).update(attrs)
+            for key, entry in pack_entries.items():
+                owners.setdefault(key, []).append(pack.name)
+                entries[key] = entry
+
+        conflicts = [
+            {"file": filename, "entry": _entry_label(key), "packs": names, "winner": names[-1]}
+            for key, names in owners.items() if len(names) > 1
+        ]
+        return _shape(attr)[1](entries, containers), conflicts
+
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+
+def _env_mod_dirs() -> List[Path]:
+    value = os.environ.get("MONOLITH_MODS", "")
+    return [Path(d) for d in value.split(os.pathsep) if d.strip()]
+
+
+_overlay: Optional[ModOverlay] = None
+_configured: Optional[List[Path]] = None
+
+
+def configure_mods(mod_dirs: Optional[Sequence[Path]]) -> None:
+    """Set the mod pack directories (None: use MONOLITH_MODS). Applies on the next load."""
+    global _overlay, _configured
+    _configured = None if mod_dirs is None else [Path(d) for d in mod_dirs]
+    _overlay = None
+
+
+def active_overlay() -> Optional[ModOverlay]:
+    """The overlay for the configured packs over the packaged rules, or None without mods."""
+    global _overlay
+    mod_dirs = _env_mod_dirs() if _configured is None else _configured
+    if not mod_dirs:
+        return None
+    if _overlay is None:
+        _overlay = ModOverlay(mod_dirs, DATA_DIR)
+    return _overlay
+
+
+def load_with_mods(data_dir: Optional[Path] = None) -> RuleSet:
+    """Load the rules in `data_dir` with the configured mod packs applied."""
+    from .rules_snapshot import load_compiled
+
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    overlay = active_overlay()
+    if overlay is None or overlay.base_dir != data_dir:
+        return load_compiled(data_dir)
+    return overlay.load()
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge mod packs over the rules data and report conflicts.")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("mod_dirs", nargs="+", type=Path, help="mod pack directories, lowest priority first")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="base rules JSON directory")
+    args = parser.parse_args(argv)
+
+    rules = ModOverlay(args.mod_dirs, args.data_dir, snapshots=False).load()
+
+    print(f"Packs (lowest priority first): {', '.join(rules.mod_packs) or 'none'}")
+    for error in rules.load_errors:
+        print(f"error: {error['file']}: {error['message']}", file=sys.stderr)
+    for conflict in rules.mod_conflicts:
+        print(f"conflict: {conflict['file']}: {conflict['entry']} ({' < '.join(conflict['packs'])})")
+    print(json.dumps(rules.summary()))
+    return 1 if rules.load_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Name lookup for rules entries (talents, abilities).
+
+Built once with the RuleSet. Every entry is reachable under each of its
+names (e.g. both `talent_name` and `name`), exactly or case-insensitively,
+in O(1). UI search boxes use `prefix` (bisect over the sorted folded names)
+and `search` (prefix matches first, then fuzzy matches ranked by trigram
+overlap and edit similarity) instead of scanning the raw JSON.
+
+Lookups return read-only views of the shared entry dicts; nothing is copied.
+"""
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+_FUZZY_CANDIDATES = 50  # best trigram matches scored with SequenceMatcher
+_SUBSTRING_SCORE = 0.9
+
+
+def _fold(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Exact, case-insensitive, prefix and fuzzy lookup over named entries."""
+
+    def __init__(self, entries: Iterable[Tuple[Iterable[str], Dict[str, Any]]]):
+        """
+        Args:
+            entries: (names, entry) pairs; the first entry to claim a name keeps it
+        """
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._folded: Dict[str, str] = {}  # folded name -> name
+        for names, entry in entries:
+            for name in names:
+                if not name or name in self._entries:
+                    continue
+                self._entries[name] = entry
+                self._folded.setdefault(_fold(name), name)
+        self._sorted: List[str] = sorted(self._folded)
+        self._grams: Dict[str, List[str]] = {}
+        for folded in self._sorted:
+            for gram in _trigrams(folded):
+                self._grams.setdefault(gram, []).append(folded)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """The indexed name for `name` (exact match, else case-insensitive)."""
+        if name in self._entries:
+            return name
+        return self._folded.get(_fold(name)) if isinstance(name, str) else None
+
+    def get(self, name: str) -> Optional[Mapping[str, Any]]:
+        """Read-only view of the entry named `name`, or None."""
+        key = self.resolve(name)
+        return MappingProxyType(self._entries[key]) if key is not None else None
+
+    def prefix(self, text: str, limit: int = 20) -> List[str]:
+        """Names starting with `text` (case-insensitive), alphabetically."""
+        folded = _fold(text)
+        start = bisect_left(self._sorted, folded)
+        matches = []
+        for key in self._sorted[start:]:
+            if not key.startswith(folded) or len(matches) >= limit:
+                break
+            matches.append(self._folded[key])
+        return matches
+
+    def fuzzy(self, text: str, limit: int = 10, cutoff: float = 0.6) -> List[str]:
+        """Names similar to `text` (typos, partial words), best first."""
+        folded = _fold(text)
+        if not folded:
+            return []
+        overlap: Dict[str, int] = {}
+        for gram in _trigrams(folded):
+            for key in self._grams.get(gram, ()):
+                overlap[key] = overlap.get(key, 0) + 1
+        candidates = sorted(overlap, key=lambda k: (-overlap[k], k))[:_FUZZY_CANDIDATES]
+        scored = []
+        for key in candidates:
+            if folded in key:
+                # Part of a longer name ("strike" -> "Power Strike")
+                ratio = _SUBSTRING_SCORE
+            else:
+                matcher = SequenceMatcher(None, folded, key)
+                # Cheap upper bounds first; ratio() is the expensive part
+                if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                    continue
+                ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((ratio, key))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [self._folded[key] for _, key in scored[:limit]]
+
+    def search(self, text: str, limit: int = 10) -> List[str]:
+        """Prefix matches first, then fuzzy matches, without duplicates."""
+        if not _fold(text):
+            return []
+        results = self.prefix(text, limit)
+        if len(results) < limit:
+            seen = set(results)
+            results.extend(n for n in self.fuzzy(text, limit) if n not in seen)
+        return results[:limit]
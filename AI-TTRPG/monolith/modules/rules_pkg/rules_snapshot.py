@@ -0,0 +1,256 @@
+"""
+Compiled rules snapshot for fast cold starts.
+
+Building a RuleSet means parsing every rules JSON file, running the
+validators and building the lookup indexes. The result only changes when
+the files change, so it is compiled once into a binary artifact keyed by the
+content hash of the source files (`ruleset.hash_sources`):
+
+    MAGIC | version (uint16) | header length (uint32) | header JSON | pickle payload
+
+The header records the source hash, a fingerprint of the code that builds
+the indexes (so changing an index builder invalidates old artifacts) and a
+summary; the payload holds the
+documents and indexes with their shared references intact (an index entry
+is the same object as its entry in the raw document, as after a JSON load).
+
+At startup `load_compiled` hashes the sources, loads the matching artifact
+and falls back to a JSON rebuild (writing a fresh artifact) when there is
+none or it is stale or unreadable. Artifacts are only ever written by this
+module; treat the snapshot directory like build output, not user input.
+
+CLI (for deployments):
+
+    python -m monolith.modules.rules_pkg.rules_snapshot build [--data-dir D] [--out-dir O]
+    python -m monolith.modules.rules_pkg.rules_snapshot check [--data-dir D] [--out-dir O]
+"""
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import time
+from dataclasses import fields
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ruleset import DATA_DIR, RuleSet, hash_sources, load_ruleset
+
+logger = logging.getLogger("monolith.rules.rules_snapshot")
+
+MAGIC = b"SHRS"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".rules"
+_PREAMBLE = struct.Struct("<4sHI")
+_KEEP_SNAPSHOTS = 4  # older artifacts in the directory are pruned on write
+
+SNAPSHOT_DIR = Path(os.environ.get("MONOLITH_RULES_SNAPSHOT_DIR", Path(__file__).parent / ".compiled"))
+SNAPSHOTS_ENABLED = os.environ.get("MONOLITH_RULES_SNAPSHOT", "on").lower() not in ("0", "off", "false")
+
+
+@functools.lru_cache(maxsize=1)
+def builder_fingerprint() -> str:
+    """Hash of the modules whose code shapes a RuleSet."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(str(FORMAT_VERSION).encode("ascii"))
+    for module in ("ruleset.py", "talent_index.py", "name_index.py", "mods.py", "models.py", "models_inventory.py",
+                   "data_validator.py", "rules_snapshot.py"):
+        digest.update((Path(__file__).parent / module).read_bytes())
+    return digest.hexdigest()
+
+
+def snapshot_path(source_hash: str, out_dir: Optional[Path] = None) -> Path:
+    """Where the artifact for a given source hash lives."""
+    return Path(out_dir or SNAPSHOT_DIR) / f"rules-{source_hash[:24]}{FILE_EXTENSION}"
+
+
+# -----------------------------------------------------------------------------
+# Encoding
+# -----------------------------------------------------------------------------
+
+def _payload(rules: RuleSet) -> Dict[str, Any]:
+    # MappingProxyType does not pickle; store the underlying dicts and re-wrap on load
+    payload: Dict[str, Any] = {"_proxied": []}
+    for f in fields(RuleSet):
+        if f.name == "data_dir":
+            continue
+        value = getattr(rules, f.name)
+        if isinstance(value, MappingProxyType):
+            payload["_proxied"].append(f.name)
+            value = dict(value)
+        payload[f.name] = value
+    return payload
+
+
+def encode_snapshot(rules: RuleSet) -> bytes:
+    """Serialize a RuleSet into artifact bytes."""
+    header = {
+        "source_hash": rules.source_hash,
+        "builder": builder_fingerprint(),
+        "created": time.time(),
+        "python": list(sys.version_info[:2]),
+        "summary": rules.summary(),
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    body = pickle.dumps(_payload(rules), protocol=pickle.HIGHEST_PROTOCOL)
+    return b"".join([_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes, body])
+
+
+def read_header(blob: bytes) -> Tuple[Dict[str, Any], int]:
+    """Parse the artifact header.
+
+    Returns:
+        (header dict, byte offset where the payload begins)
+
+    Raises:
+        ValueError: If the blob is not a supported artifact
+    """
+    if len(blob) < _PREAMBLE.size:
+        raise ValueError("Rules snapshot is truncated")
+    magic, version, header_len = _PREAMBLE.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a rules snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported rules snapshot version {version}")
+    start = _PREAMBLE.size
+    header = json.loads(blob[start:start + header_len].decode("utf-8"))
+    return header, start + header_len
+
+
+def decode_snapshot(blob: bytes, data_dir: Optional[Path] = None, expected_hash: Optional[str] = None) -> RuleSet:
+    """Rebuild a RuleSet from artifact bytes.
+
+    Raises:
+        ValueError: If the artifact is invalid or was built from other sources
+    """
+    header, start = read_header(blob)
+    if expected_hash and header.get("source_hash") != expected_hash:
+        raise ValueError("Rules snapshot is stale")
+    if header.get("builder") != builder_fingerprint():
+        raise ValueError("Rules snapshot was built by different code")
+    payload = pickle.loads(blob[start:])
+
+    proxied = set(payload.pop("_proxied"))
+    values = {name: MappingProxyType(value) if name in proxied else value for name, value in payload.items()}
+    return RuleSet(data_dir=Path(data_dir) if data_dir else DATA_DIR, **values)
+
+
+# -----------------------------------------------------------------------------
+# Files
+# -----------------------------------------------------------------------------
+
+def _atomic_write_bytes(filepath: Path, blob: bytes) -> None:
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{filepath.name}.", suffix=".tmp", dir=filepath.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filepath)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+
+def _prune(out_dir: Path, keep: Path) -> None:
+    snapshots = sorted(out_dir.glob(f"rules-*{FILE_EXTENSION}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in [p for p in snapshots if p != keep][_KEEP_SNAPSHOTS - 1:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def write_snapshot(rules: RuleSet, out_dir: Optional[Path] = None) -> Path:
+    """Write the artifact for `rules` and prune old ones. Returns its path."""
+    path = snapshot_path(rules.source_hash, out_dir)
+    _atomic_write_bytes(path, encode_snapshot(rules))
+    _prune(path.parent, path)
+    return path
+
+
+def read_snapshot(source_hash: str, data_dir: Optional[Path] = None, out_dir: Optional[Path] = None) -> Optional[RuleSet]:
+    """Load the artifact for `source_hash`, or None if missing or unusable."""
+    path = snapshot_path(source_hash, out_dir)
+    try:
+        blob = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not read rules snapshot {path}: {e}")
+        return None
+    try:
+        return decode_snapshot(blob, data_dir, expected_hash=source_hash)
+    except Exception as e:
+        logger.warning(f"Ignoring unusable rules snapshot {path}: {e}")
+        return None
+
+
+def load_compiled(data_dir: Optional[Path] = None, out_dir: Optional[Path] = None) -> RuleSet:
+    """Load the RuleSet for `data_dir`, from its snapshot when it is current.
+
+    A missing, stale or unreadable snapshot is rebuilt from the JSON files;
+    failing to write the new one (e.g. a read-only install) only logs.
+    """
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    if not SNAPSHOTS_ENABLED:
+        return load_ruleset(data_dir)
+
+    source_hash = hash_sources(data_dir)
+    rules = read_snapshot(source_hash, data_dir, out_dir)
+    if rules is not None:
+        logger.info(f"Rules loaded from snapshot {source_hash[:12]}")
+        return rules
+
+    rules = load_ruleset(data_dir)
+    if rules.load_errors:
+        # Never cache a partial load; the next start should retry the files
+        return rules
+    try:
+        path = write_snapshot(rules, out_dir)
+        logger.info(f"Compiled rules snapshot {path.name}")
+    except Exception as e:
+        logger.warning(f"Could not write rules snapshot: {e}")
+    return rules
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or check the compiled rules snapshot.")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="rules JSON directory")
+    parser.add_argument("--out-dir", type=Path, default=None, help=f"snapshot directory (default {SNAPSHOT_DIR})")
+    args = parser.parse_args(argv)
+
+    source_hash = hash_sources(args.data_dir)
+    path = snapshot_path(source_hash, args.out_dir)
+
+    if args.command == "check":
+        current = read_snapshot(source_hash, args.data_dir, args.out_dir) is not None
+        print(f"{path}: {'up to date' if current else 'missing or stale'}")
+        return 0 if current else 1
+
+    rules = load_ruleset(args.data_dir)
+    if rules.load_errors:
+        for error in rules.load_errors:
+            print(f"error: {error['file']}: {error['message']}", file=sys.stderr)
+        return 1
+    for dataset, messages in rules.validation_errors.items():
+        print(f"warning: {dataset}: {len(messages)} validation issue(s)", file=sys.stderr)
+    path = write_snapshot(rules, args.out_dir)
+    print(f"Wrote {path} ({path.stat().st_size} bytes): {rules.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
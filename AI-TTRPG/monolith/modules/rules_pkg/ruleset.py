@@ -0,0 +1,507 @@
+"""
+The single, immutable set of game rules.
+
+Every rules JSON file is read exactly once, the lookup indexes are built from
+it, and the result is frozen into a RuleSet that is handed out by reference.
+`data_loader` (module-level globals) and `data_loader_enhanced`
+(RuleSetContainer) are views onto the same object, so nothing reads the
+rules files again after startup.
+
+The raw documents (e.g. `talent_data`, `ability_data`) are the parsed JSON
+and must be treated as read-only; the indexes are read-only mappings.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .name_index import NameIndex
+from .talent_index import TalentIndex
+
+logger = logging.getLogger("monolith.rules.ruleset")
+
+DATA_DIR = Path(__file__).parent / "data"
+
+# attribute -> (file name, required, empty value)
+RULE_FILES: Dict[str, Tuple[str, bool, Any]] = {
+    "stats_and_skills": ("stats_and_skills.json", True, {}),
+    "ability_data": ("abilities.json", True, {}),
+    "talent_data": ("talents.json", True, {}),
+    "kingdom_features": ("kingdom_features.json", True, {}),
+    "melee_weapons": ("melee_weapons.json", True, {}),
+    "ranged_weapons": ("ranged_weapons.json", True, {}),
+    "armor": ("armor.json", True, {}),
+    "equipment_category_to_skill_map": ("skill_mappings.json", True, {}),
+    "injury_effects": ("injury_effects.json", True, {}),
+    "status_effects": ("status_effects.json", True, {}),
+    "origin_choices": ("origin_choices.json", True, []),
+    "childhood_choices": ("childhood_choices.json", True, []),
+    "coming_of_age_choices": ("coming_of_age_choices.json", True, []),
+    "training_choices": ("training_choices.json", True, []),
+    "devotion_choices": ("devotion_choices.json", True, []),
+    "npc_templates": ("npc_templates.json", True, {}),
+    "item_templates": ("item_templates.json", True, {}),
+    "generation_rules": ("generation_rules.json", True, {}),
+    "loot_tables": ("loot_tables.json", False, {}),
+}
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """All rules documents plus prebuilt lookup indexes."""
+    # Raw documents (parsed JSON)
+    stats_and_skills: Dict[str, Any]
+    ability_data: Dict[str, Any]
+    talent_data: Dict[str, Any]
+    kingdom_features: Dict[str, Any]
+    melee_weapons: Dict[str, Any]
+    ranged_weapons: Dict[str, Any]
+    armor: Dict[str, Any]
+    equipment_category_to_skill_map: Dict[str, Any]
+    injury_effects: Dict[str, Any]
+    status_effects: Dict[str, Any]
+    origin_choices: List[Dict[str, Any]]
+    childhood_choices: List[Dict[str, Any]]
+    coming_of_age_choices: List[Dict[str, Any]]
+    training_choices: List[Dict[str, Any]]
+    devotion_choices: List[Dict[str, Any]]
+    npc_templates: Dict[str, Any]
+    item_templates: Dict[str, Any]
+    generation_rules: Dict[str, Any]
+    loot_tables: Dict[str, Any]
+
+    # Derived from stats_and_skills
+    stats_list: Tuple[str, ...]
+    skill_categories: Dict[str, Any]
+    techniques: Dict[str, Any]
+
+    # Indexes (name -> definition)
+    skills: Mapping[str, Dict[str, Any]]
+    abilities: Mapping[str, Dict[str, Any]]
+    talents: Mapping[str, Dict[str, Any]]
+    features: Mapping[str, Dict[str, Any]]
+    items: Mapping[str, Dict[str, Any]]
+    statuses: Mapping[str, Dict[str, Any]]
+    weapons: Mapping[str, Dict[str, Any]]
+    armors: Mapping[str, Dict[str, Any]]
+    injuries: Mapping[Tuple[str, str, str], Dict[str, Any]]  # (location, sub_location, severity)
+    talent_index: TalentIndex  # eligibility thresholds
+    talent_names: NameIndex  # exact/case-insensitive/prefix/fuzzy name lookup
+    ability_names: NameIndex
+
+    data_dir: Path = DATA_DIR
+    load_errors: Tuple[Dict[str, Any], ...] = field(default=())
+    validation_errors: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    source_hash: str = ""  # content hash of the rules files (and mod packs) this was built from
+    mod_packs: Tuple[str, ...] = ()  # applied mod packs, lowest priority first
+    mod_conflicts: Tuple[Dict[str, Any], ...] = ()  # entries defined by more than one pack
+
+    def get_ability(self, name: str) -> Optional[Mapping[str, Any]]:
+        """Read-only view of an ability tier, by exact or case-insensitive name."""
+        return self.ability_names.get(name)
+
+    def get_talent(self, name: str) -> Optional[Mapping[str, Any]]:
+        """Read-only view of a talent, by any of its names (case-insensitive)."""
+        return self.talent_names.get(name)
+
+    def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        return self.items.get(item_id)
+
+    def get_status(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.statuses.get(name)
+
+    def get_injury(self, location: str, sub_location: str, severity: str) -> Optional[Dict[str, Any]]:
+        return self.injuries.get((location, sub_location, str(severity)))
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of loaded definitions (for startup logs and health checks)."""
+        return {
+            "stats": len(self.stats_list),
+            "skills": len(self.skills),
+            "abilities": len(self.abilities),
+            "talents": len(self.talents),
+            "kingdom_features": len(self.features),
+            "melee_weapons": len(self.melee_weapons),
+            "ranged_weapons": len(self.ranged_weapons),
+            "armor": len(self.armor),
+            "status_effects": len(self.statuses),
+            "injury_effects": len(self.injury_effects),
+            "npc_templates": len(self.npc_templates),
+            "item_templates": len(self.items),
+            "origin_choices": len(self.origin_choices),
+            "childhood_choices": len(self.childhood_choices),
+            "coming_of_age_choices": len(self.coming_of_age_choices),
+            "training_choices": len(self.training_choices),
+            "devotion_choices": len(self.devotion_choices),
+            "load_errors": len(self.load_errors),
+            "validation_errors": sum(len(v) for v in self.validation_errors.values()),
+        }
+
+
+# -----------------------------------------------------------------------------
+# Loading
+# -----------------------------------------------------------------------------
+
+def hash_sources(data_dir: Optional[Path] = None) -> str:
+    """Content hash of every rules file in `data_dir` (missing files count too)."""
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    digest = hashlib.blake2b(digest_size=20)
+    for filename, _, _ in sorted(RULE_FILES.values()):
+        digest.update(filename.encode("utf-8") + b"\0")
+        try:
+            digest.update((data_dir / filename).read_bytes())
+        except FileNotFoundError:
+            digest.update(b"<missing>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_json(data_dir: Path, filename: str, required: bool, empty: Any, errors: List[Dict[str, Any]]) -> Any:
+    filepath = data_dir / filename
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        if required:
+            logger.error(f"Rules file not found: {filepath}")
+            errors.append({"file": filename, "error_type": "FileNotFoundError", "message": f"File not found: {filepath}"})
+        return empty
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in {filename}: {e}")
+        errors.append({"file": filename, "error_type": "JSONDecodeError", "message": str(e),
+                       "line": e.lineno, "column": e.colno})
+        return empty
+    if not isinstance(data, type(empty)):
+        logger.error(f"{filename} should hold a {type(empty).__name__}, got {type(data).__name__}")
+        errors.append({"file": filename, "error_type": "TypeError", "message": f"Expected {type(empty).__name__}"})
+        return empty
+    return data
+
+
+def _index_skills(stats_list: List[str], skill_categories: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    skills = {}
+    for category, skills_dict in skill_categories.items():
+        if not isinstance(skills_dict, dict):
+            logger.warning(f"Expected dict for skills in category '{category}', got {type(skills_dict)}")
+            continue
+        for skill_name, governing_stat in skills_dict.items():
+            if governing_stat not in stats_list:
+                logger.warning(f"Skill '{skill_name}' has invalid governing stat '{governing_stat}'")
+                continue
+            # "stat" is the legacy data_loader key, "governing_stat" the RuleSetContainer one
+            skills[skill_name] = {"category": category, "stat": governing_stat, "governing_stat": governing_stat}
+    return skills
+
+
+def _index_abilities(ability_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    abilities = {}
+    for school_name, school_data in ability_data.items():
+        if not isinstance(school_data, dict):
+            continue
+        for branch in school_data.get("branches", []):
+            if not isinstance(branch, dict):
+                continue
+            for tier in branch.get("tiers", []):
+                if not isinstance(tier, dict) or not tier.get("name"):
+                    continue
+                # School context for resource/stat lookups, on a copy: the raw document stays as loaded
+                abilities[tier["name"]] = {
+                    **tier,
+                    "_school_name": school_name,
+                    "_school_resource": school_data.get("resource"),
+                    "_school_stat": school_data.get("associated_stat"),
+                    "_branch_name": branch.get("branch"),
+                }
+    return abilities
+
+
+def _talent_aliases(talent: Dict[str, Any]) -> Tuple[str, ...]:
+    # Talents are named by "talent_name", "name" or both
+    return tuple(n for n in (talent.get("talent_name"), talent.get("name")) if n)
+
+
+def _index_talents(talent_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    talents: Dict[str, Dict[str, Any]] = {}
+
+    def walk(entries: Any, category: str) -> None:
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            # Indexed as a copy carrying its category: the raw document stays as loaded
+            indexed = None
+            for name in _talent_aliases(entry):
+                if name not in talents:
+                    if indexed is None:
+                        indexed = {**entry, "_category": category}
+                    talents[name] = indexed
+            # Skill mastery groups nest their talents
+            if isinstance(entry.get("talents"), list):
+                walk(entry["talents"], category)
+
+    for category, content in talent_data.items():
+        if isinstance(content, list):
+            walk(content, category)
+        elif isinstance(content, dict):
+            for sub_list in content.values():
+                if isinstance(sub_list, list):
+                    walk(sub_list, category)
+    return talents
+
+
+def _index_talent_names(talents: Mapping[str, Dict[str, Any]]) -> NameIndex:
+    return NameIndex((_talent_aliases(t), t) for t in talents.values())
+
+
+def _index_ability_names(abilities: Mapping[str, Dict[str, Any]]) -> NameIndex:
+    return NameIndex(((name,), tier) for name, tier in abilities.items())
+
+
+def _index_features(kingdom_features: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    features = {}
+    for category_data in kingdom_features.values():
+        if not isinstance(category_data, dict):
+            continue
+        for kingdom_list in category_data.values():
+            if not isinstance(kingdom_list, list):
+                continue
+            for feature in kingdom_list:
+                if isinstance(feature, dict) and feature.get("name"):
+                    features[feature["name"]] = feature
+    return features
+
+
+def _index_injuries(injury_effects: Dict[str, Any]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    injuries = {}
+    for location, sub_locations in injury_effects.items():
+        if not isinstance(sub_locations, dict):
+            continue
+        for sub_location, severities in sub_locations.items():
+            if not isinstance(severities, dict):
+                continue
+            for severity, effect in severities.items():
+                injuries[(location, sub_location, str(severity))] = effect
+    return injuries
+
+
+def _validate(docs: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    from .data_validator import validate_all_rules_data
+
+    _, errors = validate_all_rules_data({
+        "ability_data": docs["ability_data"],
+        "talent_data": docs["talent_data"],
+        "kingdom_features_data": docs["kingdom_features"],
+        "origin_choices": docs["origin_choices"],
+    })
+    for dataset, messages in errors.items():
+        logger.warning(f"Rules validation: {len(messages)} issue(s) in {dataset}, first: {messages[0]}")
+    return {dataset: tuple(messages) for dataset, messages in errors.items()}
+
+
+# Derived attribute -> (raw documents it is built from, builder). Builders run
+# in this order and see the attributes built before them, so an index built
+# on top of another one (e.g. talent_names on talents) reuses it.
+_DERIVED: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {
+    "stats_list": (("stats_and_skills",), lambda d: tuple(d["stats_and_skills"].get("stats", []))),
+    "skill_categories": (("stats_and_skills",), lambda d: d["stats_and_skills"].get("skill_categories", {})),
+    "techniques": (("stats_and_skills",), lambda d: d["stats_and_skills"].get("techniques", {})),
+    "skills": (("stats_and_skills",), lambda d: MappingProxyType(_index_skills(
+        d["stats_and_skills"].get("stats", []), d["stats_and_skills"].get("skill_categories", {})))),
+    "abilities": (("ability_data",), lambda d: MappingProxyType(_index_abilities(d["ability_data"]))),
+    "talents": (("talent_data",), lambda d: MappingProxyType(_index_talents(d["talent_data"]))),
+    "features": (("kingdom_features",), lambda d: MappingProxyType(_index_features(d["kingdom_features"]))),
+    "items": (("item_templates",), lambda d: MappingProxyType(d["item_templates"])),
+    "statuses": (("status_effects",), lambda d: MappingProxyType(d["status_effects"])),
+    "weapons": (("melee_weapons", "ranged_weapons"),
+                lambda d: MappingProxyType({**d["melee_weapons"], **d["ranged_weapons"]})),
+    "armors": (("armor",), lambda d: MappingProxyType(d["armor"])),
+    "injuries": (("injury_effects",), lambda d: MappingProxyType(_index_injuries(d["injury_effects"]))),
+    "talent_index": (("talent_data", "stats_and_skills"), lambda d: TalentIndex.build(d["talent_data"], d["skills"])),
+    "talent_names": (("talent_data",), lambda d: _index_talent_names(d["talents"])),
+    "ability_names": (("ability_data",), lambda d: _index_ability_names(d["abilities"])),
+}
+
+
+def _build_derived(docs: Dict[str, Any], attrs: Iterable[str]) -> Dict[str, Any]:
+    """Build the derived attributes `attrs`; `docs` also holds any derived ones kept as they are."""
+    wanted = set(attrs)
+    env = dict(docs)
+    built = {}
+    for attr, (_, build) in _DERIVED.items():
+        if attr in wanted:
+            built[attr] = env[attr] = build(env)
+    return built
+
+
+def _read_docs(data_dir: Path, attrs: Iterable[str], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    docs = {}
+    for attr in attrs:
+        filename, required, empty = RULE_FILES[attr]
+        docs[attr] = _read_json(data_dir, filename, required, type(empty)(), errors)
+    if "stats_and_skills" in docs and not docs["stats_and_skills"].get("stats"):
+        raise ValueError("Critical: No stats loaded from stats_and_skills.json")
+    return docs
+
+
+def load_ruleset(data_dir: Optional[Path] = None) -> RuleSet:
+    """Read and validate every rules file once and build a RuleSet.
+
+    This always parses the JSON; startup goes through `get_ruleset`, which
+    reuses a compiled snapshot when one matches (see rules_snapshot.py).
+
+    Args:
+        data_dir: Directory holding the rules JSON (defaults to rules_pkg/data)
+
+    Returns:
+        The loaded RuleSet; missing/invalid files are recorded in `load_errors`
+
+    Raises:
+        ValueError: If no stats could be loaded
+    """
+    data_dir = Path(data_dir) if data_dir else DATA_DIR
+    source_hash = hash_sources(data_dir)
+    errors: List[Dict[str, Any]] = []
+    docs = _read_docs(data_dir, RULE_FILES, errors)
+
+    rules = RuleSet(
+        **docs,
+        **_build_derived(docs, _DERIVED),
+        data_dir=data_dir,
+        load_errors=tuple(errors),
+        validation_errors=MappingProxyType(_validate(docs)),
+        source_hash=source_hash,
+    )
+    logger.info(f"Rules loaded from {data_dir}: {rules.summary()}")
+    for error in errors:
+        logger.warning(f"  - {error['file']}: {error['message']}")
+    return rules
+
+
+def rebuild_ruleset(previous: RuleSet, changed_files: Iterable[str]) -> Tuple[RuleSet, Set[str]]:
+    """Build a new RuleSet that re-reads only `changed_files`.
+
+    Documents from unchanged files and every index that does not depend on a
+    changed file are shared with `previous`, which is left untouched.
+
+    Args:
+        previous: The RuleSet to start from
+        changed_files: File names (e.g. "talents.json") that changed on disk
+
+    Returns:
+        (new RuleSet, names of the attributes that were rebuilt)
+
+    Raises:
+        ValueError: If a changed file is missing or invalid, or no stats load
+    """
+    changed = set(changed_files)
+    doc_attrs = [attr for attr, (filename, _, _) in RULE_FILES.items() if filename in changed]
+    errors: List[Dict[str, Any]] = []
+    new_docs = _read_docs(previous.data_dir, doc_attrs, errors)
+    if errors:
+        raise ValueError("; ".join(f"{e['file']}: {e['message']}" for e in errors))
+
+    return replace_documents(
+        previous,
+        new_docs,
+        source_hash=hash_sources(previous.data_dir),
+        load_errors=tuple(e for e in previous.load_errors if e["file"] not in changed),
+    )
+
+
+def replace_documents(
+    previous: RuleSet,
+    new_docs: Dict[str, Any],
+    source_hash: str,
+    load_errors: Optional[Tuple[Dict[str, Any], ...]] = None,
+) -> Tuple[RuleSet, Set[str]]:
+    """Build a new RuleSet from `previous` with some raw documents replaced.
+
+    Only the indexes derived from a replaced document are rebuilt; everything
+    else is shared with `previous`, which is left untouched.
+
+    Args:
+        previous: The RuleSet to start from
+        new_docs: {document attribute (e.g. "talent_data"): new parsed JSON}
+        source_hash: Hash identifying the inputs of the new RuleSet
+        load_errors: Load errors of the new RuleSet (default: keep previous)
+
+    Returns:
+        (new RuleSet, names of the attributes that were rebuilt)
+    """
+    docs = {attr: getattr(previous, attr) for attr in (*RULE_FILES, *_DERIVED)}
+    docs.update(new_docs)
+    derived = _build_derived(docs, [attr for attr, (sources, _) in _DERIVED.items()
+                                    if any(source in new_docs for source in sources)])
+
+    rules = dataclasses.replace(
+        previous,
+        **new_docs,
+        **derived,
+        load_errors=previous.load_errors if load_errors is None else tuple(load_errors),
+        validation_errors=MappingProxyType(_validate(docs)),
+        source_hash=source_hash,
+    )
+    return rules, set(new_docs) | set(derived)
+
+
+# -----------------------------------------------------------------------------
+# Shared instance
+# -----------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_ruleset: Optional[RuleSet] = None
+# Version pinned for the current action (see pin_ruleset)
+_pinned: ContextVar[Optional[RuleSet]] = ContextVar("pinned_ruleset", default=None)
+
+
+def get_ruleset() -> RuleSet:
+    """Return the process-wide RuleSet, loading it on first use.
+
+    The first load goes through the compiled snapshot, which is rebuilt
+    transparently whenever the rules files have changed, and applies the
+    configured mod packs (see mods.py). Inside
+    `pin_ruleset()` the pinned version is returned even if a hot reload has
+    swapped in a newer one.
+    """
+    global _ruleset
+    pinned = _pinned.get()
+    if pinned is not None:
+        return pinned
+    if _ruleset is None:
+        with _lock:
+            if _ruleset is None:
+                from .mods import load_with_mods
+                _ruleset = load_with_mods(DATA_DIR)
+    return _ruleset
+
+
+def is_loaded() -> bool:
+    return _ruleset is not None
+
+
+def swap_ruleset(rules: RuleSet) -> Optional[RuleSet]:
+    """Atomically make `rules` the process-wide RuleSet; returns the previous one."""
+    global _ruleset
+    with _lock:
+        previous, _ruleset = _ruleset, rules
+    return previous
+
+
+@contextmanager
+def pin_ruleset() -> Iterator[RuleSet]:
+    """Keep `get_ruleset()` on the current version for the rest of this context.
+
+    Used around a single action so a hot reload mid-action cannot mix rules
+    versions; tasks started inside the context inherit the pin.
+    """
+    token = _pinned.set(get_ruleset())
+    try:
+        yield _pinned.get()
+    finally:
+        _pinned.reset(token)
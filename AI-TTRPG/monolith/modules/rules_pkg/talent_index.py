@@ -0,0 +1,242 @@
+"""
+Threshold index for talent eligibility.
+
+Every talent prerequisite is a single threshold on one key: a stat score
+(single stat mastery), the lower of two stat scores (dual stat focus) or a
+skill rank (skill mastery, "MT<n>" tiers). The index keeps, per key, the
+talents sorted by that threshold, so the talents unlocked at a value are a
+prefix found with one bisect, and the talents gained or lost when a value
+moves are the slice between its old and new positions.
+
+The `TalentInfo` objects are built once per RuleSet (frozen, shared by every
+caller) instead of on every eligibility check. Results keep the order of
+talents.json so they match the old linear scan.
+"""
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .models import TalentInfo
+from .models_inventory import PassiveModifier
+
+logger = logging.getLogger("monolith.rules.talent_index")
+
+_UNREACHABLE = 99  # threshold for prerequisites that cannot be parsed
+
+StatPair = Tuple[str, str]
+_Entry = Tuple[int, TalentInfo]  # (position in talents.json, talent)
+
+
+def _passive_modifiers(talent: Dict[str, Any], talent_name: str) -> List[PassiveModifier]:
+    """Convert talents.json modifiers to PassiveModifiers, skipping non-numeric ones."""
+    modifiers = []
+    for mod in talent.get("modifiers", []):
+        if not isinstance(mod, dict):
+            continue
+        if "effect_type" in mod:
+            modifiers.append(PassiveModifier(**mod))
+        elif "type" in mod and isinstance(mod.get("bonus"), (int, float)):
+            # Same mapping as talent_logic.get_talent_modifiers
+            if mod["type"] in ("contested_check", "skill_check", "stat_check"):
+                effect_type = "STAT_MODIFIER"
+            else:
+                effect_type = mod["type"].upper() + "_MODIFIER"
+            modifiers.append(PassiveModifier(
+                effect_type=effect_type,
+                target=mod.get("stat") or mod.get("skill") or "general",
+                value=mod["bonus"],
+                source_id=talent_name,
+            ))
+    return modifiers
+
+
+def _talent_info(talent: Dict[str, Any], source: str) -> TalentInfo:
+    name = talent.get("talent_name") or talent.get("name") or "Unknown Talent"
+    return TalentInfo(name=name, source=source, effect=talent.get("effect", ""),
+                      modifiers=_passive_modifiers(talent, name))
+
+
+def _rank(value: Any) -> int:
+    # Skills arrive as {name: rank} or {name: {"rank": rank}}
+    if isinstance(value, dict):
+        return value.get("rank", 0) or 0
+    return value or 0
+
+
+def _tier_rank(tier_name: Optional[str]) -> int:
+    if tier_name and tier_name.startswith("MT"):
+        try:
+            return int(tier_name[2:])
+        except ValueError:
+            pass
+    return _UNREACHABLE
+
+
+@dataclass(frozen=True)
+class _Ladder:
+    """Talents on one key, sorted by required value."""
+    thresholds: Tuple[int, ...]
+    entries: Tuple[_Entry, ...]
+
+    @classmethod
+    def build(cls, pairs: List[Tuple[int, _Entry]]) -> "_Ladder":
+        pairs.sort(key=lambda p: (p[0], p[1][0]))
+        return cls(tuple(p[0] for p in pairs), tuple(p[1] for p in pairs))
+
+    def unlocked(self, value: int) -> Tuple[_Entry, ...]:
+        return self.entries[:bisect_right(self.thresholds, value)]
+
+    def between(self, low: int, high: int) -> Tuple[_Entry, ...]:
+        """Entries unlocked at `high` but not at `low` (low <= high)."""
+        return self.entries[bisect_right(self.thresholds, low):bisect_right(self.thresholds, high)]
+
+
+@dataclass(frozen=True)
+class TalentDelta:
+    """Talents gained and lost by a stat/skill change."""
+    unlocked: Tuple[TalentInfo, ...] = ()
+    lost: Tuple[TalentInfo, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.unlocked or self.lost)
+
+
+def _ordered(entries: Iterable[_Entry]) -> List[TalentInfo]:
+    return [talent for _, talent in sorted(entries, key=lambda e: e[0])]
+
+
+@dataclass(frozen=True)
+class TalentIndex:
+    """Per-stat, per-stat-pair and per-skill talent ladders."""
+    stats: Mapping[str, _Ladder]
+    pairs: Mapping[StatPair, _Ladder]
+    pairs_by_stat: Mapping[str, Tuple[StatPair, ...]]
+    skills: Mapping[str, _Ladder]
+    size: int
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle (compiled rules snapshots)
+        return (_restore_index, (dict(self.stats), dict(self.pairs), dict(self.pairs_by_stat), dict(self.skills), self.size))
+
+    @classmethod
+    def build(cls, talent_data: Dict[str, Any], skill_names: Iterable[str]) -> "TalentIndex":
+        """Index a talents.json document.
+
+        Args:
+            talent_data: The loaded talents document
+            skill_names: Known skills; skill groups for other skills are skipped
+        """
+        known_skills = set(skill_names)
+        stats: Dict[str, List] = {}
+        pairs: Dict[StatPair, List] = {}
+        skills: Dict[str, List] = {}
+        ordinal = 0
+
+        for talent in talent_data.get("single_stat_mastery", []):
+            stat, score = talent.get("stat"), talent.get("score")
+            if not stat or score is None:
+                continue
+            info = _talent_info(talent, f"Stat: {stat} {score}")
+            stats.setdefault(stat, []).append((score, (ordinal, info)))
+            ordinal += 1
+
+        for talent in talent_data.get("dual_stat_focus", []):
+            pair = talent.get("stats", [])
+            if len(pair) != 2:
+                continue
+            score = talent.get("score", _UNREACHABLE)
+            info = _talent_info(talent, f"Dual Stat: {pair[0]} & {pair[1]} {score}")
+            pairs.setdefault(tuple(pair), []).append((score, (ordinal, info)))
+            ordinal += 1
+
+        for category_list in talent_data.get("single_skill_mastery", {}).values():
+            if not isinstance(category_list, list):
+                continue
+            for skill_group in category_list:
+                skill = skill_group.get("skill")
+                if not skill:
+                    continue
+                if skill not in known_skills:
+                    logger.warning(f"Skill '{skill}' from talent data not found in master skill map.")
+                    continue
+                for talent in skill_group.get("talents", []):
+                    tier_name = talent.get("tier", talent.get("prerequisite_mt"))
+                    info = _talent_info(talent, f"Skill: {skill} ({tier_name})")
+                    skills.setdefault(skill, []).append((_tier_rank(tier_name), (ordinal, info)))
+                    ordinal += 1
+
+        pairs_by_stat: Dict[str, List[StatPair]] = {}
+        for pair in pairs:
+            for stat in pair:
+                pairs_by_stat.setdefault(stat, []).append(pair)
+
+        return cls(
+            stats=MappingProxyType({k: _Ladder.build(v) for k, v in stats.items()}),
+            pairs=MappingProxyType({k: _Ladder.build(v) for k, v in pairs.items()}),
+            pairs_by_stat=MappingProxyType({k: tuple(v) for k, v in pairs_by_stat.items()}),
+            skills=MappingProxyType({k: _Ladder.build(v) for k, v in skills.items()}),
+            size=ordinal,
+        )
+
+    def eligible(self, stats: Mapping[str, int], skills: Mapping[str, Any]) -> List[TalentInfo]:
+        """All talents unlocked by these stat scores and skill ranks."""
+        entries: List[_Entry] = []
+        for stat, ladder in self.stats.items():
+            entries.extend(ladder.unlocked(stats.get(stat, 0)))
+        for (a, b), ladder in self.pairs.items():
+            entries.extend(ladder.unlocked(min(stats.get(a, 0), stats.get(b, 0))))
+        for skill, ladder in self.skills.items():
+            entries.extend(ladder.unlocked(_rank(skills.get(skill))))
+        return _ordered(entries)
+
+    def delta(
+        self,
+        stats: Mapping[str, int],
+        skills: Mapping[str, Any],
+        stat_delta: Optional[Mapping[str, int]] = None,
+        skill_delta: Optional[Mapping[str, int]] = None,
+    ) -> TalentDelta:
+        """Talents gained and lost when `stats`/`skills` change by the given amounts.
+
+        Only the ladders of the changed keys are touched.
+
+        Args:
+            stats: Stat scores before the change
+            skills: Skill ranks before the change
+            stat_delta: {stat: change in score}
+            skill_delta: {skill: change in rank}
+        """
+        stat_delta = {k: v for k, v in (stat_delta or {}).items() if v}
+        skill_delta = {k: v for k, v in (skill_delta or {}).items() if v}
+        gained: List[_Entry] = []
+        lost: List[_Entry] = []
+
+        def move(ladder: Optional[_Ladder], old: int, new: int) -> None:
+            if ladder is None or old == new:
+                return
+            if new > old:
+                gained.extend(ladder.between(old, new))
+            else:
+                lost.extend(ladder.between(new, old))
+
+        def stat_after(stat: str) -> int:
+            return stats.get(stat, 0) + stat_delta.get(stat, 0)
+
+        touched_pairs = set()
+        for stat, change in stat_delta.items():
+            move(self.stats.get(stat), stats.get(stat, 0), stat_after(stat))
+            touched_pairs.update(self.pairs_by_stat.get(stat, ()))
+        for a, b in touched_pairs:
+            move(self.pairs[(a, b)], min(stats.get(a, 0), stats.get(b, 0)), min(stat_after(a), stat_after(b)))
+        for skill, change in skill_delta.items():
+            old = _rank(skills.get(skill))
+            move(self.skills.get(skill), old, old + change)
+
+        return TalentDelta(unlocked=tuple(_ordered(gained)), lost=tuple(_ordered(lost)))
+
+
+def _restore_index(stats, pairs, pairs_by_stat, skills, size) -> TalentIndex:
+    return TalentIndex(MappingProxyType(stats), MappingProxyType(pairs), MappingProxyType(pairs_by_stat),
+                       MappingProxyType(skills), size)
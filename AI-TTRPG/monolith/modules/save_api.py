@@ -3,9 +3,6 @@ Public-facing API for the Save/Load system.
 The Kivy client imports and calls these synchronous functions.
 """
 import logging
-import glob
-import os
-import json
 from typing import List, Dict, Any
 # Import from this module's own internal package
 from . import save_manager
@@ -45,22 +42,21 @@ def load_game(slot_name: str) -> Dict[str, Any]:
 
 def list_save_games() -> List[Dict[str, str]]:
     """
-    Scans the 'saves' directory and returns info for each save file.
-    :return: A list of dictionaries, e.g., [{"name": "my_save_1", "time": "...", "char": "Tester"}]
+    Lists save slots from the save manager's metadata index.
+    :return: A list of dictionaries, e.g., [{"name": "my_save_1", "time": "...", "char": "Tester", "summary": {...}}]
     """
     save_files_info = []
     try:
-        for filepath in glob.glob(os.path.join(save_manager.SAVE_DIR, "*.json")):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    save_files_info.append({
-                        "name": data.get("save_name", os.path.basename(filepath)),
-                        "time": data.get("save_time", "Unknown"),
-                        "char": data.get("active_character_name", "Unknown")
-                    })
-            except Exception as e:
-                logger.warning(f"Could not read save file {filepath}: {e}")
+        for save in save_manager.scan_saves():
+            if "error" in save:
+                logger.warning(f"Could not read save file {save['path']}: {save['error']}")
+                continue
+            save_files_info.append({
+                "name": save["name"],
+                "time": save["timestamp"],
+                "char": save["active_character"],
+                "summary": save.get("summary")
+            })
 
         # Sort by time, newest first
         save_files_info.sort(key=lambda x: x.get("time", ""), reverse=True)
@@ -0,0 +1,365 @@
+"""
+Compact binary save container with lazily decoded sections.
+
+JSON saves store every location's tile map as nested lists and must be fully
+parsed and validated before anything can be shown. This container keeps a
+small JSON header (metadata + section index) followed by independently
+zlib-compressed sections:
+
+    MAGIC | version (uint16) | header length (uint32) | header JSON | sections...
+
+Sections:
+- "characters": list of CharacterSave dicts
+- "world": factions, regions, npcs, items, traps
+- "story": campaigns, campaign_states, quests, flags
+- "locations": location dicts with their maps stripped out
+- "map:<location_id>": tile grid packed as a little-endian uint8/uint16 array
+
+On load, characters and the current location are decoded eagerly; every
+other location is decoded on first access through a LazyList.
+"""
+import hashlib
+import json
+import logging
+import struct
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .save_schemas import (
+    SaveFile, SaveGameData, CharacterSave, LocationSave, FactionSave, RegionSave,
+    NpcInstanceSave, ItemInstanceSave, TrapInstanceSave, CampaignSave,
+    CampaignStateSave, ActiveQuestSave, StoryFlagSave
+)
+
+logger = logging.getLogger("monolith.save_container")
+
+MAGIC = b"SHSV"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".sav"
+_PREAMBLE = struct.Struct("<4sHI")
+_COMPRESSION_LEVEL = 6
+
+_WORLD_FIELDS = {
+    "factions": FactionSave,
+    "regions": RegionSave,
+    "npcs": NpcInstanceSave,
+    "items": ItemInstanceSave,
+    "traps": TrapInstanceSave,
+}
+_STORY_FIELDS = {
+    "campaigns": CampaignSave,
+    "campaign_states": CampaignStateSave,
+    "quests": ActiveQuestSave,
+    "flags": StoryFlagSave,
+}
+
+
+class _Unloaded:
+    """Placeholder for a LazyList entry that has not been decoded yet."""
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"<unloaded {self.key!r}>"
+
+
+class LazyList(list):
+    """A list whose entries are decoded on first access.
+
+    Unloaded slots hold an `_Unloaded(key)` placeholder; reading a slot calls
+    `loader(key)` once and stores the result in place. All read paths go
+    through `_resolve`, and copies/pickles produce a plain, fully loaded list.
+    """
+
+    def __init__(self, keys: List[Any], loader: Callable[[Any], Any], loaded: Optional[Dict[Any, Any]] = None):
+        loaded = loaded or {}
+        super().__init__(loaded[k] if k in loaded else _Unloaded(k) for k in keys)
+        self._loader = loader
+
+    def _resolve(self, index: int) -> Any:
+        item = list.__getitem__(self, index)
+        if isinstance(item, _Unloaded):
+            item = self._loader(item.key)
+            list.__setitem__(self, index, item)
+        return item
+
+    def materialize(self) -> "LazyList":
+        """Decode every remaining entry."""
+        for i in range(len(self)):
+            self._resolve(i)
+        return self
+
+    @property
+    def loaded_count(self) -> int:
+        return sum(1 for item in list.__iter__(self) if not isinstance(item, _Unloaded))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(i) for i in range(len(self))[index]]
+        return self._resolve(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._resolve(i)
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield self._resolve(i)
+
+    def __contains__(self, value) -> bool:
+        return any(item == value for item in self)
+
+    def __eq__(self, other) -> bool:
+        return list.__eq__(self.materialize(), other)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return list.__repr__(self.materialize())
+
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+    def index(self, value, *args):
+        return list.index(self.materialize(), value, *args)
+
+    def count(self, value) -> int:
+        return list.count(self.materialize(), value)
+
+    def remove(self, value) -> None:
+        list.remove(self.materialize(), value)
+
+    def pop(self, index: int = -1):
+        item = self._resolve(index)
+        list.pop(self, index)
+        return item
+
+    def sort(self, *args, **kwargs) -> None:
+        list.sort(self.materialize(), *args, **kwargs)
+
+    def copy(self) -> list:
+        return list(self)
+
+    def peek(self, index: int) -> Any:
+        """Return a decoded entry, or the loader key of an undecoded one."""
+        item = list.__getitem__(self, index)
+        return item.key if isinstance(item, _Unloaded) else item
+
+    def iter_detached(self) -> Iterator[Any]:
+        """Yield every entry decoded without storing the newly decoded ones.
+
+        For one-off passes over the whole list (e.g. mirroring it to SQLite)
+        that should not leave every entry resident in memory.
+        """
+        for item in list.__iter__(self):
+            yield self._loader(item.key) if isinstance(item, _Unloaded) else item
+
+    def replaced(self, index: int, value: Any) -> "LazyList":
+        """Copy with one entry replaced; every other slot, decoded or not, is shared."""
+        new = LazyList([], self._loader)
+        list.extend(new, list.__iter__(self))
+        list.__setitem__(new, index, value)
+        return new
+
+
+# -----------------------------------------------------------------------------
+# Map packing
+# -----------------------------------------------------------------------------
+
+def _pack_map(grid: Any) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    """Pack a rectangular List[List[int]] into raw array bytes.
+
+    Returns None when the map is not a rectangular non-negative int grid that
+    fits in uint16; such maps are stored as JSON in the locations section.
+    """
+    if not isinstance(grid, list) or not grid or not isinstance(grid[0], list):
+        return None
+    try:
+        arr = np.asarray(grid)
+    except (ValueError, TypeError):
+        return None
+    if arr.ndim != 2 or arr.dtype.kind not in "iu" or arr.size == 0:
+        return None
+    low, high = int(arr.min()), int(arr.max())
+    if low < 0 or high > 0xFFFF:
+        return None
+    dtype = "<u1" if high <= 0xFF else "<u2"
+    height, width = arr.shape
+    return arr.astype(dtype).tobytes(), {"dtype": dtype, "width": width, "height": height}
+
+
+def _unpack_map(raw: bytes, info: Dict[str, Any]) -> List[List[int]]:
+    arr = np.frombuffer(raw, dtype=info["dtype"]).reshape(info["height"], info["width"])
+    return arr.tolist()
+
+
+# -----------------------------------------------------------------------------
+# Encoding
+# -----------------------------------------------------------------------------
+
+def _compress_json(obj: Any) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"), _COMPRESSION_LEVEL)
+
+
+def _current_location_id(save_dict: Dict[str, Any]) -> Optional[int]:
+    characters = save_dict["data"].get("characters") or []
+    active_id = save_dict.get("active_character_id")
+    active = next((c for c in characters if c.get("id") == active_id), characters[0] if characters else None)
+    return active.get("current_location_id") if active else None
+
+
+def encode_save(save_dict: Dict[str, Any]) -> bytes:
+    """Encode a SaveFile dump (`SaveFile.model_dump(mode="json")`) into container bytes.
+
+    Args:
+        save_dict: JSON-compatible dump of a SaveFile
+
+    Returns:
+        The complete container as bytes
+    """
+    data = save_dict["data"]
+    sections: Dict[str, bytes] = {
+        "characters": _compress_json(data.get("characters", [])),
+        "world": _compress_json({k: data.get(k, []) for k in _WORLD_FIELDS}),
+        "story": _compress_json({k: data.get(k, []) for k in _STORY_FIELDS}),
+    }
+
+    maps: Dict[str, Dict[str, Any]] = {}
+    locations = []
+    for loc in data.get("locations", []):
+        packed = _pack_map(loc.get("generated_map_data"))
+        if packed is not None:
+            raw, info = packed
+            section_name = f"map:{loc['id']}"
+            sections[section_name] = zlib.compress(raw, _COMPRESSION_LEVEL)
+            info["section"] = section_name
+            info["hash"] = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            maps[str(loc["id"])] = info
+            loc = {k: v for k, v in loc.items() if k != "generated_map_data"}
+        locations.append(loc)
+    sections["locations"] = _compress_json(locations)
+
+    index = {}
+    offset = 0
+    for name, blob in sections.items():
+        index[name] = {"offset": offset, "length": len(blob)}
+        offset += len(blob)
+
+    header = {
+        "save_name": save_dict["save_name"],
+        "save_time": save_dict["save_time"],
+        "active_character_id": save_dict.get("active_character_id"),
+        "active_character_name": save_dict.get("active_character_name"),
+        "current_location_id": _current_location_id(save_dict),
+        "summary": save_dict.get("summary"),
+        "location_ids": [loc["id"] for loc in locations],
+        "sections": index,
+        "maps": maps,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return b"".join([_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes, *sections.values()])
+
+
+# -----------------------------------------------------------------------------
+# Decoding
+# -----------------------------------------------------------------------------
+
+def is_container(blob: bytes) -> bool:
+    """Check whether the given bytes start with the container magic."""
+    return blob[:len(MAGIC)] == MAGIC
+
+
+def read_header(blob: bytes) -> Tuple[Dict[str, Any], int]:
+    """Parse the container header.
+
+    Returns:
+        (header dict, byte offset where section data begins)
+
+    Raises:
+        ValueError: If the blob is not a supported container
+    """
+    if len(blob) < _PREAMBLE.size:
+        raise ValueError("Save container is truncated")
+    magic, version, header_len = _PREAMBLE.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a binary save container")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported save container version {version}")
+    start = _PREAMBLE.size
+    header = json.loads(blob[start:start + header_len].decode("utf-8"))
+    return header, start + header_len
+
+
+def read_header_from_file(filepath) -> Dict[str, Any]:
+    """Read only the header of a container file, without touching its sections."""
+    with open(filepath, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError("Save container is truncated")
+        _, _, header_len = _PREAMBLE.unpack(preamble)
+        header, _ = read_header(preamble + f.read(header_len))
+    return header
+
+
+class _SectionReader:
+    """Decompresses individual sections of a container on demand."""
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+        self.header, self.data_start = read_header(blob)
+
+    def raw(self, name: str) -> bytes:
+        entry = self.header["sections"][name]
+        start = self.data_start + entry["offset"]
+        return zlib.decompress(self.blob[start:start + entry["length"]])
+
+    def json(self, name: str) -> Any:
+        return json.loads(self.raw(name))
+
+
+def decode_save(blob: bytes) -> SaveFile:
+    """Decode container bytes into a SaveFile.
+
+    Characters, world and story sections are validated immediately; locations
+    other than the active character's current location are decoded lazily.
+    """
+    reader = _SectionReader(blob)
+    header = reader.header
+
+    characters = [CharacterSave.model_validate(c) for c in reader.json("characters")]
+    world = reader.json("world")
+    story = reader.json("story")
+
+    location_meta = {loc["id"]: loc for loc in reader.json("locations")}
+    maps = header.get("maps", {})
+
+    def load_location(loc_id: int) -> LocationSave:
+        loc = dict(location_meta[loc_id])
+        info = maps.get(str(loc_id))
+        if info:
+            loc["generated_map_data"] = _unpack_map(reader.raw(info["section"]), info)
+        return LocationSave.model_validate(loc)
+
+    current_id = header.get("current_location_id")
+    eager = {current_id: load_location(current_id)} if current_id in location_meta else {}
+    locations = LazyList(header.get("location_ids", list(location_meta)), load_location, eager)
+
+    data = SaveGameData.model_construct(
+        characters=characters,
+        locations=locations,
+        **{k: [model.model_validate(v) for v in world.get(k, [])] for k, model in _WORLD_FIELDS.items()},
+        **{k: [model.model_validate(v) for v in story.get(k, [])] for k, model in _STORY_FIELDS.items()},
+    )
+    return SaveFile(
+        save_name=header["save_name"],
+        save_time=header["save_time"],
+        active_character_id=header.get("active_character_id"),
+        active_character_name=header.get("active_character_name"),
+        summary=header.get("summary"),
+        data=data
+    )
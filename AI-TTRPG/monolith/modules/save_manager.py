@@ -5,20 +5,24 @@ This module handles all game state persistence using JSON files and Pydantic val
 Replaces the previous SQLAlchemy/database-based approach with direct file I/O.
 
 Responsibilities:
-- Save GameSaveState to JSON files
-- Load and validate JSON save files
-- Scan save directory for available saves
+- Save GameSaveState to JSON files or the binary save container
+- Load and validate JSON and binary save files
+- Scan save directory for available saves (via a cached metadata index)
 - Load character JSON files from external sources
 """
 import logging
 import os
 import json
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 from pydantic import ValidationError
 
 from .save_schemas import SaveFile, SaveGameData, CharacterSave
+from . import save_container
+from .state_history import get_in
 
 logger = logging.getLogger("monolith.save_manager")
 
@@ -28,29 +32,242 @@ CHARACTER_DIR = Path("./characters")
 SAVE_DIR.mkdir(exist_ok=True)
 CHARACTER_DIR.mkdir(exist_ok=True)
 
+# Format for new saves: "json" (pretty-printed) or "binary" (see save_container)
+SAVE_FORMAT = os.environ.get("MONOLITH_SAVE_FORMAT", "json")
+_EXTENSIONS = {"json": ".json", "binary": save_container.FILE_EXTENSION}
 
-def _get_save_path(slot_name: str) -> Path:
+
+def _get_save_path(slot_name: str, save_format: str = "json") -> Path:
     """Generate a clean file path for the save slot.
     
     Args:
         slot_name: Name of the save slot
+        save_format: "json" or "binary"
         
     Returns:
         Path object for the save file
     """
     # Sanitize filename
     filename = "".join(c for c in slot_name if c.isalnum() or c in ('_', '-', ' '))
-    filename = f"{filename}.json"
+    filename = f"{filename}{_EXTENSIONS[save_format]}"
     return SAVE_DIR / filename
 
 
-def save_game(
+def _find_save_path(slot_name: str) -> Path:
+    """Locate the existing file for a slot, preferring the newest format on disk."""
+    candidates = [p for p in (_get_save_path(slot_name, fmt) for fmt in _EXTENSIONS) if p.exists()]
+    if not candidates:
+        return _get_save_path(slot_name)
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+def _field(obj: Any, key: str, default: Any = None) -> Any:
+    # Summaries are built from live models on save and from raw dicts on rescan
+    return obj.get(key, default) if isinstance(obj, dict) else getattr(obj, key, default)
+
+
+def build_save_summary(data: Any, active_character_id: Optional[str] = None) -> Dict[str, Any]:
+    """Build the thumbnail-sized summary shown on the load screen.
+    
+    Args:
+        data: SaveGameData model or its plain dict form
+        active_character_id: ID of the active character, if known
+        
+    Returns:
+        Dictionary with the party (name + level) and the active location
+    """
+    characters = _field(data, "characters") or []
+    active = next((c for c in characters if _field(c, "id") == active_character_id), characters[0] if characters else None)
+    location = None
+    if active:
+        location_id = _field(active, "current_location_id")
+        # Looked up by id: lazily loaded locations other than this one stay undecoded
+        loc = get_in(_field(data, "locations") or [], (location_id,))
+        location = {"id": location_id, "name": _field(loc, "name") if loc is not None else None}
+    return {
+        "party": [{"name": _field(c, "name"), "level": _field(c, "level", 1)} for c in characters],
+        "location": location
+    }
+
+
+def read_save_metadata(filepath: Path) -> Dict[str, Any]:
+    """Read slot metadata (name, time, active character, summary) from a save file.
+    
+    Binary saves only need their header read; JSON saves are fully parsed.
+    Used to (re)build index entries, not on the normal scan path.
+    
+    Args:
+        filepath: Path to a JSON or binary save file
+        
+    Returns:
+        Dictionary with save_name, save_time, active character and summary
+    """
+    if filepath.suffix == save_container.FILE_EXTENSION:
+        data = save_container.read_header_from_file(filepath)
+    else:
+        data = json.loads(filepath.read_text(encoding='utf-8'))
+    summary = data.get("summary")
+    if summary is None and isinstance(data.get("data"), dict):
+        summary = build_save_summary(data["data"], data.get("active_character_id"))
+    return {
+        "save_name": data.get("save_name", filepath.stem),
+        "save_time": data.get("save_time", "Unknown"),
+        "active_character_id": data.get("active_character_id"),
+        "active_character_name": data.get("active_character_name", "Unknown"),
+        "summary": summary
+    }
+
+
+def _read_character_metadata(filepath: Path) -> Dict[str, Any]:
+    data = json.loads(filepath.read_text(encoding='utf-8'))
+    return {
+        "name": data.get("name", filepath.stem),
+        "id": data.get("id", "unknown"),
+        "level": data.get("level", 1),
+        "kingdom": data.get("kingdom", "Unknown")
+    }
+
+
+def _atomic_write_text(filepath: Path, text: Union[str, bytes]) -> None:
+    """Write text to a file atomically (temp file in the same directory + rename).
+
+    A crash mid-write leaves the previous file intact instead of a truncated save.
+
+    Args:
+        filepath: Final destination of the file
+        text: Content to write (bytes are written as-is)
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{filepath.name}.", suffix=".tmp", dir=filepath.parent)
+    try:
+        if isinstance(text, bytes):
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8")
+        with f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filepath)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+
+# -----------------------------------------------------------------------------
+# Slot metadata index
+#
+# One small JSON index per directory maps each file name to the metadata the
+# load screen needs, validated by the file's mtime and size. Scans only stat
+# the directory and read the index; a file is opened only when its entry is
+# missing or stale (e.g. saves written by an older build or copied in by hand).
+# -----------------------------------------------------------------------------
+
+INDEX_FILENAME = "_index.meta"
+INDEX_VERSION = 1
+_index_lock = threading.Lock()
+
+
+def _load_index(directory: Path) -> Dict[str, Any]:
+    try:
+        index = json.loads((directory / INDEX_FILENAME).read_text(encoding='utf-8'))
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "entries": {}}
+
+
+def _index_entry(filepath: Path, meta: Dict[str, Any]) -> Dict[str, Any]:
+    stat = filepath.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "meta": meta}
+
+
+def _index_record(filepath: Path, meta: Dict[str, Any]) -> None:
+    """Store metadata for a file that was just written."""
+    try:
+        with _index_lock:
+            index = _load_index(filepath.parent)
+            index["entries"][filepath.name] = _index_entry(filepath, meta)
+            _atomic_write_text(filepath.parent / INDEX_FILENAME, json.dumps(index))
+    except Exception as e:
+        # The index is a cache; the next scan rebuilds the entry
+        logger.warning(f"Could not update metadata index for {filepath}: {e}")
+
+
+def _index_forget(filepaths: List[Path]) -> None:
+    """Drop index entries for deleted files."""
+    if not filepaths:
+        return
+    try:
+        with _index_lock:
+            index = _load_index(filepaths[0].parent)
+            for filepath in filepaths:
+                index["entries"].pop(filepath.name, None)
+            _atomic_write_text(filepaths[0].parent / INDEX_FILENAME, json.dumps(index))
+    except Exception as e:
+        logger.warning(f"Could not update metadata index: {e}")
+
+
+def _index_scan(directory: Path, suffixes: List[str], read_metadata) -> List[Dict[str, Any]]:
+    """List files in a directory with their cached metadata.
+    
+    Args:
+        directory: Directory to scan
+        suffixes: File extensions to include
+        read_metadata: Fallback reader for files with missing/stale entries
+        
+    Returns:
+        List of {"path", "meta"} or {"path", "error"} dictionaries
+    """
+    results = []
+    with _index_lock:
+        index = _load_index(directory)
+        entries = index["entries"]
+        changed = False
+        seen = set()
+        
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                if name.startswith(".") or name == INDEX_FILENAME or not dir_entry.is_file():
+                    continue
+                if not any(name.endswith(suffix) for suffix in suffixes):
+                    continue
+                seen.add(name)
+                filepath = Path(dir_entry.path)
+                stat = dir_entry.stat()
+                cached = entries.get(name)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    results.append({"path": filepath, "meta": cached["meta"]})
+                    continue
+                try:
+                    meta = read_metadata(filepath)
+                    entries[name] = _index_entry(filepath, meta)
+                    changed = True
+                    results.append({"path": filepath, "meta": meta})
+                except Exception as e:
+                    results.append({"path": filepath, "error": str(e)})
+        
+        for name in set(entries) - seen:
+            del entries[name]
+            changed = True
+        
+        if changed:
+            try:
+                _atomic_write_text(directory / INDEX_FILENAME, json.dumps(index))
+            except OSError as e:
+                logger.warning(f"Could not write metadata index for {directory}: {e}")
+    return results
+
+
+def build_save_file(
     data: SaveGameData,
     slot_name: str = "CurrentSave",
     active_character_id: Optional[str] = None,
     active_character_name: Optional[str] = None
-) -> Dict[str, Any]:
-    """Save game state to JSON file.
+) -> SaveFile:
+    """Wrap game state in a SaveFile envelope with metadata.
     
     Args:
         data: Complete game state data (Pydantic model)
@@ -59,38 +276,85 @@ def save_game(
         active_character_name: Name of the currently active character
         
     Returns:
-        Result dictionary with success status and metadata
+        SaveFile ready to be serialized
     """
-    try:
-        logger.info(f"Starting save game to slot: {slot_name}")
-        
-        # Auto-detect active character if not provided
-        if not active_character_id and data.characters:
-            active_character_id = data.characters[0].id
-            active_character_name = data.characters[0].name
-            logger.info(f"Auto-detected active character: {active_character_name}")
-        
-        # Create save file structure
-        save_file = SaveFile(
-            save_name=slot_name,
-            save_time=datetime.now().isoformat(),
-            active_character_id=active_character_id,
-            active_character_name=active_character_name,
-            data=data
-        )
+    # Auto-detect active character if not provided
+    if not active_character_id and data.characters:
+        active_character_id = data.characters[0].id
+        active_character_name = data.characters[0].name
+        logger.info(f"Auto-detected active character: {active_character_name}")
+    
+    return SaveFile(
+        save_name=slot_name,
+        save_time=datetime.now().isoformat(),
+        active_character_id=active_character_id,
+        active_character_name=active_character_name,
+        summary=build_save_summary(data, active_character_id),
+        data=data
+    )
+
+
+def snapshot_save_file(save_file: SaveFile, save_format: Optional[str] = None) -> Union[str, Dict[str, Any]]:
+    """Detach a SaveFile from the live state so it can be written later.
+    
+    JSON saves are serialized straight to text; binary saves are dumped to
+    plain dicts and packed by write_save_file.
+    
+    Args:
+        save_file: The save envelope to snapshot
+        save_format: "json" or "binary" (defaults to SAVE_FORMAT)
         
-        # Serialize to JSON
-        filepath = _get_save_path(slot_name)
-        json_data = save_file.model_dump_json(indent=2)
+    Returns:
+        JSON text or a JSON-compatible dict
+    """
+    if (save_format or SAVE_FORMAT) == "binary":
+        return save_file.model_dump(mode="json")
+    return save_file.model_dump_json(indent=2)
+
+
+def write_save_file(save_file: SaveFile, snapshot: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
+    """Atomically write a SaveFile to its slot.
+    
+    Args:
+        save_file: The save envelope to write
+        snapshot: Output of snapshot_save_file for `save_file` (taken here if omitted)
         
-        # Write to file
-        filepath.write_text(json_data, encoding='utf-8')
+    Returns:
+        Result dictionary with success status and metadata
+    """
+    try:
+        if snapshot is None:
+            snapshot = snapshot_save_file(save_file)
+        
+        if isinstance(snapshot, dict):
+            save_format, payload = "binary", save_container.encode_save(snapshot)
+        else:
+            save_format, payload = "json", snapshot
+        filepath = _get_save_path(save_file.save_name, save_format)
+        
+        _atomic_write_text(filepath, payload)
+        _index_record(filepath, {
+            "save_name": save_file.save_name,
+            "save_time": save_file.save_time,
+            "active_character_id": save_file.active_character_id,
+            "active_character_name": save_file.active_character_name,
+            "summary": save_file.summary
+        })
+        
+        # Drop the slot's file in the other format so loads are unambiguous
+        stale_paths = []
+        for other_format in _EXTENSIONS:
+            stale = _get_save_path(save_file.save_name, other_format)
+            if other_format != save_format and stale.exists():
+                stale.unlink()
+                stale_paths.append(stale)
+        _index_forget(stale_paths)
         
         logger.info(f"Save complete: {filepath}")
         return {
             "success": True,
             "path": str(filepath),
-            "name": active_character_name or "Unknown",
+            "name": save_file.active_character_name or "Unknown",
             "timestamp": save_file.save_time
         }
         
@@ -102,6 +366,36 @@ def save_game(
         }
 
 
+def save_game(
+    data: SaveGameData,
+    slot_name: str = "CurrentSave",
+    active_character_id: Optional[str] = None,
+    active_character_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Save game state to JSON file.
+    
+    Args:
+        data: Complete game state data (Pydantic model)
+        slot_name: Name of the save slot
+        active_character_id: ID of the currently active character
+        active_character_name: Name of the currently active character
+        
+    Returns:
+        Result dictionary with success status and metadata
+    """
+    try:
+        logger.info(f"Starting save game to slot: {slot_name}")
+        save_file = build_save_file(data, slot_name, active_character_id, active_character_name)
+    except Exception as e:
+        logger.exception(f"Save game failed: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    
+    return write_save_file(save_file)
+
+
 def load_game(slot_name: str) -> Dict[str, Any]:
     """Load game state from JSON file with Pydantic validation.
     
@@ -111,7 +405,7 @@ def load_game(slot_name: str) -> Dict[str, Any]:
     Returns:
         Result dictionary with SaveFile data or error
     """
-    filepath = _get_save_path(slot_name)
+    filepath = _find_save_path(slot_name)
     
     try:
         logger.info(f"Loading game from: {filepath}")
@@ -119,11 +413,14 @@ def load_game(slot_name: str) -> Dict[str, Any]:
         if not filepath.exists():
             raise FileNotFoundError(f"Save file not found: {filepath}")
         
-        # Read and parse JSON
-        json_content = filepath.read_text(encoding='utf-8')
+        content = filepath.read_bytes()
         
-        # Validate with Pydantic
-        save_file = SaveFile.model_validate_json(json_content)
+        if save_container.is_container(content):
+            # Binary container: remaining locations decode on first access
+            save_file = save_container.decode_save(content)
+        else:
+            # Validate with Pydantic
+            save_file = SaveFile.model_validate_json(content)
         
         logger.info(f"Load complete: {save_file.save_name}")
         return {
@@ -163,28 +460,29 @@ def scan_saves() -> List[Dict[str, Any]]:
     saves = []
     
     try:
-        for save_file in SAVE_DIR.glob("*.json"):
-            try:
-                # Read minimal metadata without full validation
-                json_content = save_file.read_text(encoding='utf-8')
-                data = json.loads(json_content)
-                
-                saves.append({
-                    "name": data.get("save_name", save_file.stem),
-                    "path": str(save_file),
-                    "timestamp": data.get("save_time", "Unknown"),
-                    "active_character": data.get("active_character_name", "Unknown")
-                })
-            except Exception as e:
-                logger.warning(f"Could not read save metadata from {save_file}: {e}")
+        # Metadata comes from the index; files are only opened for stale entries
+        for entry in _index_scan(SAVE_DIR, list(_EXTENSIONS.values()), read_save_metadata):
+            save_file = entry["path"]
+            if "error" in entry:
+                logger.warning(f"Could not read save metadata from {save_file}: {entry['error']}")
                 # Include corrupted files in list but mark them
                 saves.append({
                     "name": save_file.stem,
                     "path": str(save_file),
                     "timestamp": "Unknown",
                     "active_character": "Corrupted",
-                    "error": str(e)
+                    "error": entry["error"]
                 })
+                continue
+            
+            data = entry["meta"]
+            saves.append({
+                "name": data.get("save_name", save_file.stem),
+                "path": str(save_file),
+                "timestamp": data.get("save_time", "Unknown"),
+                "active_character": data.get("active_character_name", "Unknown"),
+                "summary": data.get("summary")
+            })
         
         logger.info(f"Found {len(saves)} save files")
         return saves
@@ -274,7 +572,13 @@ def save_character_to_json(character: CharacterSave, filename: Optional[str] = N
         
         # Serialize and write
         json_data = character.model_dump_json(indent=2)
-        filepath.write_text(json_data, encoding='utf-8')
+        _atomic_write_text(filepath, json_data)
+        _index_record(filepath, {
+            "name": character.name,
+            "id": character.id,
+            "level": character.level,
+            "kingdom": character.kingdom or "Unknown"
+        })
         
         logger.info(f"Character saved: {character.name}")
         return {
@@ -300,26 +604,18 @@ def scan_characters() -> List[Dict[str, Any]]:
     characters = []
     
     try:
-        for char_file in CHARACTER_DIR.glob("*.json"):
-            try:
-                # Read minimal metadata
-                json_content = char_file.read_text(encoding='utf-8')
-                data = json.loads(json_content)
-                
-                characters.append({
-                    "name": data.get("name", char_file.stem),
-                    "path": str(char_file),
-                    "id": data.get("id", "unknown"),
-                    "level": data.get("level", 1),
-                    "kingdom": data.get("kingdom", "Unknown")
-                })
-            except Exception as e:
-                logger.warning(f"Could not read character from {char_file}: {e}")
+        for entry in _index_scan(CHARACTER_DIR, [".json"], _read_character_metadata):
+            char_file = entry["path"]
+            if "error" in entry:
+                logger.warning(f"Could not read character from {char_file}: {entry['error']}")
                 characters.append({
                     "name": char_file.stem,
                     "path": str(char_file),
-                    "error": str(e)
+                    "error": entry["error"]
                 })
+                continue
+            
+            characters.append({"path": str(char_file), **entry["meta"]})
         
         logger.info(f"Found {len(characters)} character files")
         return characters
@@ -339,16 +635,18 @@ def delete_save(slot_name: str) -> Dict[str, Any]:
         Result dictionary with success status
     """
     try:
-        filepath = _get_save_path(slot_name)
+        filepaths = [p for p in (_get_save_path(slot_name, fmt) for fmt in _EXTENSIONS) if p.exists()]
         
-        if not filepath.exists():
+        if not filepaths:
             return {
                 "success": False,
                 "error": f"Save file '{slot_name}' not found"
             }
         
-        filepath.unlink()
-        logger.info(f"Deleted save: {filepath}")
+        for filepath in filepaths:
+            filepath.unlink()
+            logger.info(f"Deleted save: {filepath}")
+        _index_forget(filepaths)
         
         return {
             "success": True,
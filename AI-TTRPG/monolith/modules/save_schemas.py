@@ -3,7 +3,7 @@ Pydantic schemas used *only* for serializing and deserializing
 the database state for save games. These schemas must match the
 table columns in ..._pkg/models.py exactly.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 from typing import List, Dict, Any, Optional
 
 # --- Character Schema ---
@@ -183,9 +183,18 @@ class SaveGameData(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_serializer("locations", mode="wrap")
+    def _serialize_locations(self, locations, handler):
+        # Binary saves hold locations in a lazily decoded list subclass;
+        # iterate it so every entry is loaded before pydantic serializes it.
+        if type(locations) is not list:
+            locations = list(locations)
+        return handler(locations)
+
 class SaveFile(BaseModel):
     save_name: str
     save_time: str
     active_character_id: Optional[str] = None
     active_character_name: Optional[str] = None
+    summary: Optional[Dict[str, Any]] = None # Party levels + location for the load screen
     data: SaveGameData
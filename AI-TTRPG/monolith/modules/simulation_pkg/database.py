@@ -1,10 +1,11 @@
 # AI-TTRPG/monolith/modules/simulation_pkg/database.py
 import os
 from pathlib import Path
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from ... import storage
+
 # Use an absolute path for the SQLite DB file so behavior is consistent.
 # Path(__file__).resolve() is this file: .../monolith/modules/simulation_pkg/database.py
 # .parents[0] = simulation_pkg
@@ -19,8 +20,8 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-# The connect_args is recommended for SQLite with FastAPI to allow multithreading.
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Engine, pragmas and pooling are shared through the monolith storage layer.
+engine = storage.get_engine("simulation", DB_PATH)
 
 # This SessionLocal is what our API endpoints will use
 # to get a connection to the database.
@@ -0,0 +1,304 @@
+"""
+Copy-on-write game state and a bounded undo/rewind history.
+
+GameStateManager used to hold one SaveGameData that handlers edited in
+place, so the only earlier version of the game was whatever had last been
+written to disk. States are now treated as immutable values:
+
+- `assoc_in` / `update_in` / `dissoc_in` return a new state that copies only
+  the models, lists and dicts on the path to the change. Everything else
+  (tile maps, other characters, NPC lists) is shared with the old state.
+- Keeping a snapshot is therefore just keeping a reference. `StateHistory`
+  holds a ring of recent snapshots for undo/rewind plus named marks (e.g.
+  "last narrated for this actor") for per-turn diffs.
+- `diff_states` skips every subtree two states share by identity, so its
+  cost follows the size of the change rather than the size of the world.
+
+Paths are tuples of keys: attribute names on models, keys on dicts, and ids
+on lists (`("characters", "player_1", "inventory", "currency")`). States
+recorded here must never be mutated in place; build the next one with the
+helpers instead.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from .save_container import LazyList
+from .save_schemas import SaveGameData
+
+logger = logging.getLogger("monolith.state_history")
+
+DEFAULT_CAPACITY = 64
+
+Path = Sequence[Any]
+_MISSING = object()
+
+
+# -----------------------------------------------------------------------------
+# Path copying
+# -----------------------------------------------------------------------------
+
+def _item_id(item: Any) -> Any:
+    if isinstance(item, BaseModel):
+        return getattr(item, "id", None)
+    if isinstance(item, dict):
+        return item.get("id")
+    return item
+
+
+def _raw_item(seq: list, index: int) -> Any:
+    # Never decodes lazily loaded entries
+    return seq.peek(index) if isinstance(seq, LazyList) else list.__getitem__(seq, index)
+
+
+def _index_of(seq: list, key: Any) -> int:
+    for index in range(len(seq)):
+        if _item_id(_raw_item(seq, index)) == key:
+            return index
+    raise KeyError(key)
+
+
+def _replace_item(seq: list, index: int, value: Any) -> list:
+    if isinstance(seq, LazyList):
+        return seq.replaced(index, value)
+    new = list(seq)
+    new[index] = value
+    return new
+
+
+def get_in(node: Any, path: Path, default: Any = None) -> Any:
+    """Read the value at `path`, or `default` if any step is missing."""
+    for key in path:
+        if isinstance(node, BaseModel):
+            node = getattr(node, key, _MISSING)
+        elif isinstance(node, list):
+            try:
+                node = node[_index_of(node, key)]
+            except KeyError:
+                return default
+        elif isinstance(node, dict):
+            node = node.get(key, _MISSING)
+        else:
+            return default
+        if node is _MISSING:
+            return default
+    return node
+
+
+def assoc_in(node: Any, path: Path, value: Any) -> Any:
+    """Return a copy of `node` with `value` at `path`, sharing all untouched subtrees.
+
+    Missing dict levels are created; list entries must already exist.
+    """
+    if not path:
+        return value
+    key, rest = path[0], path[1:]
+
+    if isinstance(node, list):
+        index = _index_of(node, key)
+        child = node[index]
+        new_child = assoc_in(child, rest, value)
+        return node if new_child is child else _replace_item(node, index, new_child)
+
+    if isinstance(node, BaseModel):
+        child = getattr(node, key)
+        new_child = assoc_in(child, rest, value)
+        return node if new_child is child else node.model_copy(update={key: new_child})
+
+    node = node or {}
+    child = node.get(key)
+    new_child = assoc_in(child, rest, value)
+    if key in node and new_child is child:
+        return node
+    return {**node, key: new_child}
+
+
+def update_in(node: Any, path: Path, fn: Callable[[Any], Any]) -> Any:
+    """Return a copy of `node` with the value at `path` replaced by `fn(value)`."""
+    return assoc_in(node, path, fn(get_in(node, path)))
+
+
+def dissoc_in(node: Any, path: Path) -> Any:
+    """Return a copy of `node` without the dict key at `path` (no-op if absent)."""
+    *parent, key = path
+    container = get_in(node, parent)
+    if not isinstance(container, dict) or key not in container:
+        return node
+    return assoc_in(node, parent, {k: v for k, v in container.items() if k != key})
+
+
+# -----------------------------------------------------------------------------
+# Structural diff
+# -----------------------------------------------------------------------------
+
+def _is_keyed(seq: list) -> bool:
+    if isinstance(seq, LazyList):
+        return True
+    return bool(seq) and all(isinstance(item, (BaseModel, dict)) and _item_id(item) is not None for item in seq)
+
+
+def _diff(old: Any, new: Any, path: Tuple[Any, ...], out: Dict[Tuple[Any, ...], Tuple[Any, Any]]) -> None:
+    if old is new:
+        return
+    if isinstance(old, BaseModel) and type(old) is type(new):
+        for name in type(old).model_fields:
+            _diff(getattr(old, name), getattr(new, name), path + (name,), out)
+    elif isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            _diff(old.get(key), new.get(key), path + (key,), out)
+    elif isinstance(old, list) and isinstance(new, list) and (_is_keyed(old) or _is_keyed(new)):
+        old_index = {_item_id(_raw_item(old, i)): i for i in range(len(old))}
+        new_index = {_item_id(_raw_item(new, i)): i for i in range(len(new))}
+        for key in old_index.keys() | new_index.keys():
+            i, j = old_index.get(key), new_index.get(key)
+            if i is not None and j is not None and list.__getitem__(old, i) is list.__getitem__(new, j):
+                continue
+            _diff(old[i] if i is not None else None, new[j] if j is not None else None, path + (key,), out)
+    elif old != new:
+        out[path] = (old, new)
+
+
+def diff_states(old: Any, new: Any) -> Dict[Tuple[Any, ...], Tuple[Any, Any]]:
+    """Map each changed leaf path to its `(old, new)` value.
+
+    Added or removed list entries and dict keys appear with None on the
+    missing side.
+    """
+    changes: Dict[Tuple[Any, ...], Tuple[Any, Any]] = {}
+    _diff(old, new, (), changes)
+    return changes
+
+
+# -----------------------------------------------------------------------------
+# History ring
+# -----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    seq: int
+    label: str
+    state: SaveGameData
+    active_player_index: int
+    created: float
+
+
+class StateHistory:
+    """Bounded ring of recent immutable states with undo/redo and named marks.
+
+    Snapshots are references to shared structures, so recording one is O(1)
+    whatever the size of the world.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._ring: Deque[StateSnapshot] = deque(maxlen=capacity)
+        self._redo: List[StateSnapshot] = []
+        self._marks: Dict[str, StateSnapshot] = {}
+        self._seq = 0
+
+    @property
+    def head(self) -> Optional[StateSnapshot]:
+        with self._lock:
+            return self._ring[-1] if self._ring else None
+
+    def snapshots(self) -> List[StateSnapshot]:
+        """Recorded snapshots, oldest first."""
+        with self._lock:
+            return list(self._ring)
+
+    def reset(self, state: Optional[SaveGameData], label: str = "load", active_player_index: int = 0) -> Optional[StateSnapshot]:
+        """Forget all history (e.g. on load) and start again from `state`."""
+        with self._lock:
+            self._ring.clear()
+            self._redo.clear()
+            self._marks.clear()
+        return self.record(state, label, active_player_index) if state is not None else None
+
+    def record(self, state: SaveGameData, label: str = "", active_player_index: int = 0) -> StateSnapshot:
+        """Push `state` as the newest snapshot; recording the current head again is a no-op."""
+        with self._lock:
+            head = self._ring[-1] if self._ring else None
+            if head and head.state is state and head.active_player_index == active_player_index:
+                return head
+            self._seq += 1
+            snapshot = StateSnapshot(self._seq, label, state, active_player_index, time.time())
+            self._ring.append(snapshot)
+            self._redo.clear()
+            return snapshot
+
+    def rewind(self, steps: int = 1) -> Optional[StateSnapshot]:
+        """Step back `steps` snapshots (keeping at least one) and return the new head.
+
+        Rewound snapshots can be restored with `redo` until something new is recorded.
+        """
+        with self._lock:
+            steps = min(steps, len(self._ring) - 1)
+            if steps <= 0:
+                return None
+            for _ in range(steps):
+                self._redo.append(self._ring.pop())
+            return self._ring[-1]
+
+    def rewind_to(self, seq: int) -> Optional[StateSnapshot]:
+        """Rewind to the snapshot with sequence number `seq`, if it is still in the ring."""
+        with self._lock:
+            steps = next((len(self._ring) - 1 - i for i, snap in enumerate(self._ring) if snap.seq == seq), None)
+        if steps is None:
+            return None
+        return self.rewind(steps) if steps else self.head
+
+    def redo(self) -> Optional[StateSnapshot]:
+        """Re-apply the most recently rewound snapshot."""
+        with self._lock:
+            if not self._redo:
+                return None
+            self._ring.append(self._redo.pop())
+            return self._ring[-1]
+
+    def mark(self, name: str) -> Optional[StateSnapshot]:
+        """Remember the current head under `name` (kept even after it leaves the ring)."""
+        with self._lock:
+            if not self._ring:
+                return None
+            self._marks[name] = self._ring[-1]
+            return self._marks[name]
+
+    def marked(self, name: str) -> Optional[StateSnapshot]:
+        with self._lock:
+            return self._marks.get(name)
+
+    def diff_since(self, name: str) -> Dict[Tuple[Any, ...], Tuple[Any, Any]]:
+        """Changes from the snapshot marked `name` to the current head."""
+        mark, head = self.marked(name), self.head
+        if not mark or not head:
+            return {}
+        return diff_states(mark.state, head.state)
+
+    def character_since(self, char_id: str, name: str) -> Optional[Tuple[Any, Any]]:
+        """Return `(character at mark, character now)`, or None if either is unknown."""
+        mark, head = self.marked(name), self.head
+        if not mark or not head:
+            return None
+        before = get_in(mark.state, ("characters", char_id))
+        after = get_in(head.state, ("characters", char_id))
+        if before is None or after is None:
+            return None
+        return before, after
+
+
+# Global singleton instance
+_history_instance: Optional[StateHistory] = None
+
+
+def get_state_history() -> StateHistory:
+    """Return the process-wide history used by the live GameStateManager."""
+    global _history_instance
+    if _history_instance is None:
+        _history_instance = StateHistory()
+    return _history_instance
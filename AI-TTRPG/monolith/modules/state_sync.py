@@ -0,0 +1,297 @@
+"""
+Dirty-tracked bulk sync from the in-memory game state to the SQLite databases.
+
+The AI DM and the rules modules read characters, regions and locations from
+SQLite, while the authoritative game state lives in SaveGameData. Copying the
+whole state row by row on every load (one query + setattr per entity,
+including full map blobs) scales with world size even when nothing changed.
+
+StateSynchronizer keeps a per-entity fingerprint of what was last written:
+scalar columns are stored as-is and JSON columns (maps, stats, inventory...)
+as a content hash. A sync fingerprints the current state, diffs it against
+the last known fingerprints, and issues one bulk upsert per group of rows
+that share the same set of changed columns. Untouched rows and columns are
+never written.
+
+The state is passed in its JSON-mode dump form (`model_dump(mode="json")`).
+`changed_rows` builds that form for just the entities (and columns) that
+differ between two immutable states, and `state_rows` dumps a whole state
+without leaving lazily loaded locations decoded.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .character_pkg import database as char_db
+from .character_pkg import models as char_models
+from .character_pkg import context_cache as char_context_cache
+from .world_pkg import database as world_db
+from .world_pkg import models as world_models
+from .world_pkg import snapshots as world_snapshots
+from . import state_tables
+from .save_container import LazyList
+from .save_schemas import CharacterSave, SaveGameData
+from .state_history import diff_states, get_in
+
+logger = logging.getLogger("monolith.state_sync")
+
+# SQLite limits bound parameters per statement; keep IN (...) lists well below it
+_SELECT_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class _TableSpec:
+    key: str                  # SaveGameData field holding the entities
+    model: Any                # SQLAlchemy model
+    database: str             # Which session factory to use
+    columns: Tuple[str, ...]  # Columns mirrored from the save state (excluding "id")
+
+
+TABLE_SPECS: Tuple[_TableSpec, ...] = (
+    _TableSpec(
+        "characters", char_models.Character, "characters",
+        tuple(f for f in CharacterSave.model_fields if f != "id" and f in char_models.Character.__table__.c)
+    ),
+    _TableSpec(
+        "regions", world_models.Region, "world",
+        ("name", "current_weather", "environmental_effects", "faction_influence")
+    ),
+    _TableSpec(
+        "locations", world_models.Location, "world",
+        ("name", "region_id", "tags", "exits", "description", "generated_map_data",
+         "map_seed", "spawn_points", "ai_annotations")
+    ),
+)
+
+
+SYNCED_KEYS = tuple(spec.key for spec in TABLE_SPECS)
+
+
+def content_hash(value: Any) -> str:
+    """Stable content hash for a JSON-compatible value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _fingerprint(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        column: content_hash(value) if isinstance(value, (dict, list)) else value
+        for column, value in row.items()
+    }
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def state_rows(state: SaveGameData, chunk_size: int = 32) -> Iterable[Dict[str, List[Dict[str, Any]]]]:
+    """Dump every synced entity of a state, in chunks of at most `chunk_size` rows.
+
+    Lazily loaded locations are decoded one at a time and not kept, so a full
+    sync does not leave the whole world resident in memory.
+    """
+    for key in SYNCED_KEYS:
+        entities = getattr(state, key, None) or []
+        if isinstance(entities, LazyList):
+            entities = entities.iter_detached()
+        chunk: List[Dict[str, Any]] = []
+        for entity in entities:
+            chunk.append(entity.model_dump(mode="json"))
+            if len(chunk) >= chunk_size:
+                yield {key: chunk}
+                chunk = []
+        if chunk:
+            yield {key: chunk}
+
+
+def changed_rows(old: SaveGameData, new: SaveGameData) -> Dict[str, List[Dict[str, Any]]]:
+    """Dump only the entities, and within them the columns, that differ between two states.
+
+    Relies on copy-on-write states (see state_history): unchanged entities
+    are shared by identity and never visited or decoded.
+    """
+    dirty: Dict[str, Dict[Any, Optional[set]]] = {}
+    for path in diff_states(old, new):
+        if len(path) < 2 or path[0] not in SYNCED_KEYS:
+            continue
+        entities = dirty.setdefault(path[0], {})
+        if len(path) == 2:
+            entities[path[1]] = None  # added entity: every column
+        elif entities.get(path[1], set()) is not None:
+            entities.setdefault(path[1], set()).add(path[2])
+
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    for key, entities in dirty.items():
+        for entity_id, columns in entities.items():
+            entity = get_in(new, (key, entity_id))
+            if entity is None:
+                continue  # removed from the state; rows are not deleted
+            include = None if columns is None else columns | {"id"}
+            rows.setdefault(key, []).append(entity.model_dump(mode="json", include=include))
+    return rows
+
+
+class StateSynchronizer:
+    """Mirrors SaveGameData entities into SQLite, writing only what changed.
+
+    Fingerprints are remembered per (table, id) after each committed sync.
+    With `verify=True` (used on load/new game, when other modules may have
+    written to the database in the meantime) the fingerprints are re-read
+    from the database with one SELECT per table instead of trusted.
+    """
+
+    def __init__(self, session_factories: Optional[Dict[str, Callable[[], Session]]] = None):
+        self._session_factories = session_factories or {
+            "characters": char_db.SessionLocal,
+            "world": world_db.SessionLocal,
+        }
+        self._synced: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def forget(self, tables: Optional[Iterable[str]] = None) -> None:
+        """Drop remembered fingerprints so the next sync re-reads the database."""
+        with self._lock:
+            for key in list(tables or self._synced):
+                self._synced.pop(key, None)
+
+    def sync(
+        self,
+        data: Dict[str, Any],
+        tables: Optional[Iterable[str]] = None,
+        verify: bool = False,
+        raise_errors: bool = False
+    ) -> Dict[str, Dict[str, int]]:
+        """Write changed entities from a state dump to the databases.
+
+        Args:
+            data: SaveGameData dumped with `model_dump(mode="json")`
+            tables: Subset of SaveGameData fields to sync (default: all specs)
+            verify: Compare against the database instead of remembered fingerprints
+            raise_errors: Re-raise a failed database write (after rolling it
+                back) instead of only logging it
+
+        Returns:
+            Per-table counts of inserted/updated/unchanged rows
+        """
+        wanted = set(tables) if tables is not None else {spec.key for spec in TABLE_SPECS}
+        specs_by_db: Dict[str, List[_TableSpec]] = defaultdict(list)
+        for spec in TABLE_SPECS:
+            if spec.key in wanted and spec.key in data:
+                specs_by_db[spec.database].append(spec)
+
+        stats: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for database, specs in specs_by_db.items():
+                db = self._session_factories[database]()
+                try:
+                    committed, written = {}, {}
+                    for spec in specs:
+                        stats[spec.key], committed[spec.key], written[spec.key] = self._sync_table(
+                            db, spec, data.get(spec.key) or [], verify
+                        )
+                    db.commit()
+                    for key, fingerprints in committed.items():
+                        synced = self._synced.setdefault(key, {})
+                        for entity_id, fingerprint in fingerprints.items():
+                            # Rows may carry only some columns; keep the others' fingerprints
+                            synced[entity_id] = {**synced.get(entity_id, {}), **fingerprint}
+                    self._invalidate_caches(written)
+                except Exception as e:
+                    logger.exception(f"State sync to '{database}' database failed: {e}")
+                    db.rollback()
+                    for spec in specs:
+                        self._synced.pop(spec.key, None)
+                    if raise_errors:
+                        raise
+                finally:
+                    db.close()
+
+        logger.info(f"State sync complete: {stats}")
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _invalidate_caches(self, written: Dict[str, Dict[Tuple[str, ...], List[Any]]]):
+        # Core upserts bypass the ORM write hooks of the read caches
+        for columns, ids in written.get("characters", {}).items():
+            char_context_cache.invalidate(ids, columns)
+        if written.get("regions") or written.get("locations"):
+            world_snapshots.bump_world_epoch()
+
+    def _sync_table(
+        self, db: Session, spec: _TableSpec, entities: List[Dict[str, Any]], verify: bool
+    ) -> Tuple[Dict[str, int], Dict[Any, Dict[str, Any]], Dict[Tuple[str, ...], List[Any]]]:
+        rows = {
+            entity["id"]: {column: entity[column] for column in spec.columns if column in entity}
+            for entity in entities
+        }
+        fingerprints = {entity_id: _fingerprint(row) for entity_id, row in rows.items()}
+
+        known = {} if verify else dict(self._synced.get(spec.key, {}))
+        unknown_ids = [entity_id for entity_id in rows if entity_id not in known]
+        if unknown_ids:
+            known.update(self._fetch_fingerprints(db, spec, unknown_ids))
+
+        # Group rows by the exact set of columns that changed
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        inserted = 0
+        for entity_id, fingerprint in fingerprints.items():
+            previous = known.get(entity_id)
+            if previous is None:
+                changed = tuple(sorted(fingerprint))
+                inserted += 1
+            else:
+                changed = tuple(sorted(c for c, v in fingerprint.items() if previous.get(c) != v))
+                if not changed:
+                    continue
+            row = rows[entity_id]
+            groups[changed].append({"id": entity_id, **{c: row[c] for c in changed}})
+
+        table = spec.model.__table__
+        for columns, batch in groups.items():
+            stmt = sqlite_insert(table)
+            if columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.id],
+                    set_={c: stmt.excluded[c] for c in columns}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.id])
+            db.execute(stmt, batch)
+            # Core upserts bypass the ORM hooks that keep the normalized state tables in step
+            for projection in state_tables.projections_for(spec.model, columns):
+                for row in batch:
+                    state_tables.sync_owner(db.connection(), projection, row["id"], row[projection.column])
+
+        written = sum(len(batch) for batch in groups.values())
+        stats = {"inserted": inserted, "updated": written - inserted, "unchanged": len(rows) - written}
+        changed_fingerprints = {
+            row["id"]: fingerprints[row["id"]] for batch in groups.values() for row in batch
+        }
+        if verify or unknown_ids:
+            # Everything compared this round now matches the database
+            changed_fingerprints = {**{i: known[i] for i in rows if i in known}, **changed_fingerprints}
+        written_ids = {columns: [row["id"] for row in batch] for columns, batch in groups.items()}
+        return stats, changed_fingerprints, written_ids
+
+    def _fetch_fingerprints(self, db: Session, spec: _TableSpec, ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        table = spec.model.__table__
+        columns = [table.c[c] for c in spec.columns]
+        fetched = {}
+        for chunk in _chunks(ids, _SELECT_CHUNK):
+            result = db.execute(select(table.c.id, *columns).where(table.c.id.in_(chunk)))
+            for row in result:
+                mapping = row._mapping
+                fetched[mapping["id"]] = _fingerprint({c: mapping[c] for c in spec.columns})
+        return fetched
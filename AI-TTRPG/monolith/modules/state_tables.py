@@ -0,0 +1,247 @@
+"""
+Keeps the normalized status/injury/inventory tables in step with the JSON columns.
+
+Character and NpcInstance keep status_effects, injuries and inventory as JSON
+documents (that is what the rules, combat and save code read). Those columns
+cannot be indexed, so every "which NPCs here are poisoned?" question meant
+loading and scanning every row.
+
+Each Projection below maps one JSON column to a child table. After every ORM
+flush that changes a projected column, the old value from the attribute
+history is diffed against the new one and only the differing child rows are
+deleted/inserted in the same transaction, without reading the child table.
+Bulk Core writes (state_sync) call `sync_owner`, which diffs against the
+rows in the table. Query helpers live in the packages' crud modules.
+"""
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import JSON, String, Table, cast, delete, event, insert, inspect, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .character_pkg import models as char_models
+from .world_pkg import models as world_models
+
+logger = logging.getLogger("monolith.state_tables")
+
+# Child tables found missing (database not migrated yet); skipped until restart
+_missing_tables = set()
+
+Row = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Projection:
+    owner: Any                            # Mapped owner class
+    column: str                           # JSON column on the owner
+    table: Table                          # Child table
+    owner_fk: str                         # Child column referencing the owner id
+    fields: Tuple[str, ...]               # Child columns filled from the JSON value
+    to_rows: Callable[[Any], List[Row]]   # JSON value -> rows (tuples in `fields` order)
+
+
+def _status_rows(value: Any) -> List[Row]:
+    return [(status,) for status in dict.fromkeys(value or []) if isinstance(status, str)]
+
+
+def _injury_rows(value: Any) -> List[Row]:
+    rows = []
+    for injury in value or []:
+        if not isinstance(injury, dict):
+            continue
+        details = {k: v for k, v in injury.items() if k not in ("location", "severity")}
+        rows.append((injury.get("location"), injury.get("severity"), details or None))
+    return rows
+
+
+# Inventory keys that hold money or sub-documents rather than an item count
+_INVENTORY_SECTIONS = ("currency", "carried_gear", "items", "equipped_gear", "equipped_slots")
+
+
+def _item_entries(value: Any) -> List[Tuple[Any, Any]]:
+    if isinstance(value, list):
+        return [
+            (item.get("template_id") or item.get("id") or item.get("item_id"), item.get("quantity", 1))
+            for item in value if isinstance(item, dict)
+        ]
+    if isinstance(value, dict):
+        return [
+            (item_id, qty.get("quantity", 1) if isinstance(qty, dict) else qty)
+            for item_id, qty in value.items() if item_id not in _INVENTORY_SECTIONS
+        ]
+    return []
+
+
+def _inventory_rows(value: Any) -> List[Row]:
+    """Item rows of an inventory document.
+
+    Items may sit at the top level (`{item_id: qty}` or `{item_id: {"quantity": qty}}`),
+    under `carried_gear` (a map or a list of item dicts) or under `items`.
+    Currency and the equipment sections are not items and are left in the JSON.
+    """
+    if not isinstance(value, dict):
+        return []
+    totals: Dict[Any, int] = {}
+    for section in (value.get("carried_gear"), value.get("items"), value):
+        for item_id, qty in _item_entries(section):
+            if item_id and isinstance(qty, (int, float)) and not isinstance(qty, bool):
+                totals[item_id] = totals.get(item_id, 0) + int(qty)
+    return list(totals.items())
+
+
+PROJECTIONS: Tuple[Projection, ...] = (
+    Projection(char_models.Character, "status_effects", char_models.CharacterStatus.__table__,
+               "character_id", ("status_id",), _status_rows),
+    Projection(char_models.Character, "injuries", char_models.CharacterInjury.__table__,
+               "character_id", ("body_location", "severity", "details"), _injury_rows),
+    Projection(char_models.Character, "inventory", char_models.CharacterInventoryEntry.__table__,
+               "character_id", ("item_id", "quantity"), _inventory_rows),
+    Projection(world_models.NpcInstance, "status_effects", world_models.NpcStatus.__table__,
+               "npc_id", ("status_id",), _status_rows),
+    Projection(world_models.NpcInstance, "injuries", world_models.NpcInjury.__table__,
+               "npc_id", ("body_location", "severity", "details"), _injury_rows),
+)
+
+
+def _row_key(row: Row) -> Row:
+    # JSON payloads are compared by content
+    return tuple(json.dumps(v, sort_keys=True) if isinstance(v, (dict, list)) else v for v in row)
+
+
+def sync_owner(connection: Connection, projection: Projection, owner_id: Any, value: Any) -> Dict[str, int]:
+    """Bring one owner's child rows in line with its JSON value.
+
+    Args:
+        connection: Connection inside the writing transaction
+        projection: Which JSON column / child table to sync
+        owner_id: Primary key of the owner row
+        value: Current JSON value (None deletes all child rows)
+
+    Returns:
+        Counts of inserted and deleted child rows
+    """
+    table = projection.table
+    owner_col = table.c[projection.owner_fk]
+    fields = [table.c[f] for f in projection.fields]
+    if table.name in _missing_tables:
+        return {"inserted": 0, "deleted": 0}
+
+    existing: Dict[Row, List[int]] = {}
+    try:
+        rows = connection.execute(select(table.c.id, *fields).where(owner_col == owner_id)).all()
+    except OperationalError as e:
+        logger.warning(f"State table '{table.name}' unavailable ({e.orig}); run the Alembic migrations")
+        _missing_tables.add(table.name)
+        return {"inserted": 0, "deleted": 0}
+    for row in rows:
+        existing.setdefault(_row_key(tuple(row[1:])), []).append(row[0])
+
+    wanted = projection.to_rows(value)
+    wanted_counts = Counter(_row_key(r) for r in wanted)
+
+    stale_ids = []
+    for key, ids in existing.items():
+        surplus = len(ids) - wanted_counts.get(key, 0)
+        if surplus > 0:
+            stale_ids.extend(ids[:surplus])
+
+    missing = []
+    have = {key: len(ids) for key, ids in existing.items()}
+    for row in wanted:
+        key = _row_key(row)
+        if have.get(key, 0) > 0:
+            have[key] -= 1
+        else:
+            missing.append({projection.owner_fk: owner_id, **dict(zip(projection.fields, row))})
+
+    if stale_ids:
+        connection.execute(delete(table).where(table.c.id.in_(stale_ids)))
+    if missing:
+        connection.execute(insert(table), missing)
+    return {"inserted": len(missing), "deleted": len(stale_ids)}
+
+
+def _matches(column: Any, value: Any) -> Any:
+    if value is None:
+        # JSON columns store None as a JSON 'null' unless the whole column is NULL
+        return or_(column.is_(None), cast(column, String) == "null") if isinstance(column.type, JSON) \
+            else column.is_(None)
+    return column == value
+
+
+def apply_delta(connection: Connection, projection: Projection, owner_id: Any, old: Any, new: Any) -> Dict[str, int]:
+    """Apply the change between two JSON values to the owner's child rows.
+
+    Unlike `sync_owner` this does not read the child table: rows in `old` but
+    not in `new` are deleted one by one and rows only in `new` are inserted.
+    `old` must be what was last written for the owner.
+
+    Returns:
+        Counts of inserted and deleted child rows
+    """
+    table = projection.table
+    if table.name in _missing_tables:
+        return {"inserted": 0, "deleted": 0}
+    rows: Dict[Row, Row] = {}
+    counts = []
+    for value in (old, new):
+        keyed = [(_row_key(r), r) for r in projection.to_rows(value)]
+        rows.update(keyed)
+        counts.append(Counter(key for key, _ in keyed))
+    old_counts, new_counts = counts
+
+    owner_col = table.c[projection.owner_fk]
+    deleted = inserted = 0
+    try:
+        for key, count in (old_counts - new_counts).items():
+            match = [_matches(table.c[f], v) for f, v in zip(projection.fields, rows[key])]
+            ids = select(table.c.id).where(owner_col == owner_id, *match).limit(count).scalar_subquery()
+            deleted += connection.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+        missing = [
+            {projection.owner_fk: owner_id, **dict(zip(projection.fields, rows[key]))}
+            for key, count in (new_counts - old_counts).items() for _ in range(count)
+        ]
+        if missing:
+            connection.execute(insert(table), missing)
+            inserted = len(missing)
+    except OperationalError as e:
+        logger.warning(f"State table '{table.name}' unavailable ({e.orig}); run the Alembic migrations")
+        _missing_tables.add(table.name)
+    return {"inserted": inserted, "deleted": deleted}
+
+
+def projections_for(owner: Any, columns: Optional[Any] = None) -> List[Projection]:
+    """Projections of an owner class, optionally only those fed by the given columns."""
+    return [p for p in PROJECTIONS if p.owner is owner and (columns is None or p.column in columns)]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_flushed_owners(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        projections = projections_for(type(obj))
+        if not projections:
+            continue
+        connection = session.connection(bind_arguments={"mapper": inspect(type(obj))})
+        state = inspect(obj)
+        for projection in projections:
+            if obj in session.deleted:
+                sync_owner(connection, projection, obj.id, None)
+                continue
+            value = getattr(obj, projection.column)
+            if obj in session.new:
+                apply_delta(connection, projection, obj.id, None, value)
+                continue
+            history = state.attrs[projection.column].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            if history.deleted and old is not value:
+                apply_delta(connection, projection, obj.id, old, value)
+            else:
+                # Mutated in place (flag_modified) or never loaded: no previous value, diff against the table
+                sync_owner(connection, projection, obj.id, value)
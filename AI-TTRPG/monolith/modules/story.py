@@ -5,7 +5,7 @@ Provides synchronous API functions for the Kivy client and registers async event
 """
 import logging
 import asyncio
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from ..event_bus import get_event_bus
 
 # Internal package imports
@@ -22,6 +22,7 @@ from .story_pkg import crud as se_crud
 from .story_pkg import models as se_models
 from .story_pkg import director # Import the director
 from . import ai_dm
+from .ai_dm_pkg.narration_stream import NARRATION_DONE
 # from ..simulation import run_simulation_turn # This relative import is failing in tests
 # We can import it from the module if we are running from monolith root
 from . import simulation # It is in the same directory 'modules'
@@ -266,61 +267,6 @@ def rest_at_camp(rest_request: camp_schemas.CampRestRequest, db: Session = None)
         logger.exception(f"Failed to rest at camp: {e}")
         raise
 
-def handle_narrative_prompt(actor_id: str, prompt_text: str) -> Dict[str, Any]:
-    """Generate a narrative response using intent classification and deterministic routing.
-    
-    This function implements the AI gatekeeper pattern:
-    1. Classify intent using lightweight keyword matching
-    2. Route deterministic actions to coded logic
-    3. Only call expensive AI for truly narrative/creative requests
-    """
-    logger.info(f"[story.sync] Narrative prompt from {actor_id}: {prompt_text}")
-    try:
-        # Import here to avoid circular dependency
-        from .ai_dm_pkg.keyword_handler import classify_intent
-        
-        # Step 1: Intent Classification (Deterministic Filter)
-        action_intent = classify_intent(prompt_text)
-        logger.debug(f"[story.sync] Intent classified as: {action_intent.intent_type}, deterministic={action_intent.is_deterministic}")
-        
-        # Step 2: Deterministic Routing for known actions
-        if action_intent.is_deterministic:
-            intent_type = action_intent.intent_type
-            
-            if intent_type == "combat_action":
-                # Player typed something like "I attack the goblin"
-                # In production, this would parse the target and route to combat handler
-                return {"success": True, "message": "[Deterministic Combat Action] Use the combat system to attack."}
-            
-            elif intent_type == "shop_interaction":
-                # Player typed "buy potion" or similar
-                return {"success": True, "message": "[Deterministic Shop Action] Use the shop interface to trade."}
-            
-            elif intent_type == "inspect_item":
-                # Player typed "examine door" or similar
-                return {"success": True, "message": "[Deterministic Inspect] Use the inspect command to examine objects."}
-            
-            elif intent_type == "dialogue_action":
-                # Player typed "talk to guard" or similar
-                return {"success": True, "message": "[Deterministic Dialogue] Use the dialogue system to speak with NPCs."}
-            
-            # If we reach here with a deterministic flag but no handler, log warning
-            logger.warning(f"[story.sync] Deterministic intent '{intent_type}' has no handler, falling back to AI")
-        
-        # Step 3: AI Gatekeeper (Legacy check for backward compatibility)
-        orchestrator = get_orchestrator()
-        if not orchestrator.should_ai_be_called(action_intent.action_tags):
-            return {"success": True, "message": "[Simple Query] No AI needed for this request."}
-        
-        # Step 4: Call expensive AI-DM only for narrative/creative requests
-        logger.info(f"[story.sync] Invoking AI-DM for narrative request")
-        response = ai_dm.get_narrative_response(actor_id, prompt_text)
-        return response
-        
-    except Exception as e:
-        logger.exception(f"Call to AI DM module failed: {e}")
-        return {"success": False, "message": "The world feels unresponsive..."}
-
 # ---------------------------------------------------------------------------
 # Async event bus registration (internal use)
 # ---------------------------------------------------------------------------
@@ -461,6 +407,61 @@ def rest_at_camp(rest_request: camp_schemas.CampRestRequest, db: Session = None)
         logger.exception(f"Failed to rest at camp: {e}")
         raise
 
+def _route_narrative_prompt(actor_id: str, prompt_text: str) -> Optional[Dict[str, Any]]:
+    """The response for prompts that do not need the AI DM, or None if they do.
+
+    1. Classify intent using lightweight keyword matching
+    2. Route deterministic actions to coded logic
+    3. Only leave truly narrative/creative requests for the AI
+
+    Deterministic responses carry the parsed intent (type, target, target_id,
+    quantity) under "intent".
+    """
+    # Import here to avoid circular dependency
+    from .ai_dm_pkg.keyword_handler import classify_intent
+    
+    # Step 1: Intent Classification (Deterministic Filter)
+    action_intent = classify_intent(prompt_text)
+    logger.debug(f"[story.sync] Intent classified as: {action_intent.intent_type}, deterministic={action_intent.is_deterministic}")
+    
+    # Step 2: Deterministic Routing for known actions
+    if action_intent.is_deterministic:
+        intent_type = action_intent.intent_type
+        target = action_intent.payload.get("target")
+        routed = None
+        
+        if intent_type == "combat_action":
+            # Player typed something like "I attack the goblin"
+            routed = {"success": True, "message": f"[Deterministic Combat Action] Use the combat system to attack {target or 'an enemy'}."}
+        
+        elif intent_type == "shop_interaction":
+            # Player typed "buy potion" or similar
+            routed = {"success": True, "message": f"[Deterministic Shop Action] Use the shop interface to trade{f' for {target}' if target else ''}."}
+        
+        elif intent_type == "inspect_item":
+            # Player typed "examine door" or similar
+            routed = {"success": True, "message": f"[Deterministic Inspect] Use the inspect command to examine {target or 'objects'}."}
+        
+        elif intent_type == "dialogue_action":
+            # Player typed "talk to guard" or similar
+            routed = {"success": True, "message": f"[Deterministic Dialogue] Use the dialogue system to speak with {target or 'NPCs'}."}
+        
+        elif intent_type in ("look_around", "self_status"):
+            # Player typed "look around" or "check self": answered from the game state
+            routed = ai_dm.get_keyword_response(actor_id, prompt_text)
+        
+        if routed is not None:
+            return {**routed, "intent": {"type": intent_type, **action_intent.payload}}
+        
+        # If we reach here with a deterministic flag but no handler, log warning
+        logger.warning(f"[story.sync] Deterministic intent '{intent_type}' has no handler, falling back to AI")
+    
+    # Step 3: AI Gatekeeper (Legacy check for backward compatibility)
+    orchestrator = get_orchestrator()
+    if not orchestrator.should_ai_be_called(action_intent.action_tags):
+        return {"success": True, "message": "[Simple Query] No AI needed for this request."}
+    return None
+
 def handle_narrative_prompt(actor_id: str, prompt_text: str) -> Dict[str, Any]:
     """Generate a narrative response using intent classification and deterministic routing.
     
@@ -468,44 +469,14 @@ def handle_narrative_prompt(actor_id: str, prompt_text: str) -> Dict[str, Any]:
     1. Classify intent using lightweight keyword matching
     2. Route deterministic actions to coded logic
     3. Only call expensive AI for truly narrative/creative requests
+
+    Blocks the calling thread; coroutines use ahandle_narrative_prompt.
     """
     logger.info(f"[story.sync] Narrative prompt from {actor_id}: {prompt_text}")
     try:
-        # Import here to avoid circular dependency
-        from .ai_dm_pkg.keyword_handler import classify_intent
-        
-        # Step 1: Intent Classification (Deterministic Filter)
-        action_intent = classify_intent(prompt_text)
-        logger.debug(f"[story.sync] Intent classified as: {action_intent.intent_type}, deterministic={action_intent.is_deterministic}")
-        
-        # Step 2: Deterministic Routing for known actions
-        if action_intent.is_deterministic:
-            intent_type = action_intent.intent_type
-            
-            if intent_type == "combat_action":
-                # Player typed something like "I attack the goblin"
-                # In production, this would parse the target and route to combat handler
-                return {"success": True, "message": "[Deterministic Combat Action] Use the combat system to attack."}
-            
-            elif intent_type == "shop_interaction":
-                # Player typed "buy potion" or similar
-                return {"success": True, "message": "[Deterministic Shop Action] Use the shop interface to trade."}
-            
-            elif intent_type == "inspect_item":
-                # Player typed "examine door" or similar
-                return {"success": True, "message": "[Deterministic Inspect] Use the inspect command to examine objects."}
-            
-            elif intent_type == "dialogue_action":
-                # Player typed "talk to guard" or similar
-                return {"success": True, "message": "[Deterministic Dialogue] Use the dialogue system to speak with NPCs."}
-            
-            # If we reach here with a deterministic flag but no handler, log warning
-            logger.warning(f"[story.sync] Deterministic intent '{intent_type}' has no handler, falling back to AI")
-        
-        # Step 3: AI Gatekeeper (Legacy check for backward compatibility)
-        orchestrator = get_orchestrator()
-        if not orchestrator.should_ai_be_called(action_intent.action_tags):
-            return {"success": True, "message": "[Simple Query] No AI needed for this request."}
+        routed = _route_narrative_prompt(actor_id, prompt_text)
+        if routed is not None:
+            return routed
         
         # Step 4: Call expensive AI-DM only for narrative/creative requests
         logger.info(f"[story.sync] Invoking AI-DM for narrative request")
@@ -516,6 +487,40 @@ def handle_narrative_prompt(actor_id: str, prompt_text: str) -> Dict[str, Any]:
         logger.exception(f"Call to AI DM module failed: {e}")
         return {"success": False, "message": "The world feels unresponsive..."}
 
+async def ahandle_narrative_prompt(actor_id: str, prompt_text: str) -> Dict[str, Any]:
+    """handle_narrative_prompt for coroutines: routing runs in a worker thread and the AI DM is awaited."""
+    logger.info(f"[story] Narrative prompt from {actor_id}: {prompt_text}")
+    try:
+        routed = await asyncio.to_thread(_route_narrative_prompt, actor_id, prompt_text)
+        if routed is not None:
+            return routed
+        logger.info(f"[story] Invoking AI-DM for narrative request")
+        return await ai_dm.aget_narrative_response(actor_id, prompt_text)
+    except Exception as e:
+        logger.exception(f"Call to AI DM module failed: {e}")
+        return {"success": False, "message": "The world feels unresponsive..."}
+
+async def stream_narrative_prompt(actor_id: str, prompt_text: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """Streaming handle_narrative_prompt: the response arrives as event bus events.
+
+    AI narration is published piece by piece (ai_dm.narration_chunk) as it is
+    generated; every prompt, including deterministically routed ones, ends
+    with one ai_dm.narration_done event carrying the final message.
+    """
+    logger.info(f"[story] Streamed narrative prompt from {actor_id}: {prompt_text}")
+    try:
+        # Routing may answer from the database (look around, check self); keep it off the loop
+        routed = await asyncio.to_thread(_route_narrative_prompt, actor_id, prompt_text)
+    except Exception as e:
+        logger.exception(f"Call to AI DM module failed: {e}")
+        routed = {"success": False, "message": "The world feels unresponsive..."}
+    if routed is None:
+        return await ai_dm.stream_narrative_response(actor_id, prompt_text, request_id)
+
+    result = {"request_id": request_id, "actor_id": actor_id, "first_text_ms": None, "total_ms": 0.0, **routed}
+    await get_event_bus().publish(NARRATION_DONE, result)
+    return result
+
 # ---------------------------------------------------------------------------
 # Async event bus registration (internal use)
 # ---------------------------------------------------------------------------
@@ -608,6 +613,21 @@ async def _on_command_advance_narrative(topic: str, payload: Dict[str, Any]) ->
 
     await bus.publish("story.narrative_advanced", {"node_id": node_id, "timestamp": "now"})
 
+async def _on_command_narrative_prompt(topic: str, payload: Dict[str, Any]) -> None:
+    bus = get_event_bus()
+    logger.info(f"[story] (async) narrative_prompt command: {payload}")
+    actor_id = payload.get("actor_id")
+    prompt_text = payload.get("prompt_text")
+    if actor_id is None or not prompt_text:
+        await bus.publish("story.narrative_prompt_failed", {"error": "missing actor_id/prompt_text", "payload": payload})
+        return
+    if payload.get("stream"):
+        # Chunks and the final message arrive as ai_dm.narration_* events
+        await stream_narrative_prompt(actor_id, prompt_text, payload.get("request_id"))
+        return
+    result = await ahandle_narrative_prompt(actor_id, prompt_text)
+    await bus.publish("story.narrative_response", {"request_id": payload.get("request_id"), "actor_id": actor_id, **result})
+
 def register(orchestrator) -> None:
     bus = get_event_bus()
     loop = asyncio.get_event_loop()
@@ -615,4 +635,5 @@ def register(orchestrator) -> None:
     loop.create_task(bus.subscribe("command.story.interact", _on_command_interact))
     loop.create_task(bus.subscribe("command.story.advance_narrative", _on_command_advance_narrative))
     loop.create_task(bus.subscribe("command.story.player_action", _on_command_player_action))
+    loop.create_task(bus.subscribe("command.story.narrative_prompt", _on_command_narrative_prompt))
     logger.info("[story] module registered (sync API and async bus)")
\ No newline at end of file
@@ -9,6 +9,7 @@ from ..rules_pkg import core as rules_core
 from ..story_pkg import database as story_db
 from ..world_pkg import database as world_db
 from ..world_pkg import models as world_models
+from ..world_pkg import snapshots as world_snapshots
 # --- END MODIFIED/ADDED IMPORTS ---
 import random
 import re
@@ -40,18 +41,23 @@ def _get_map_dimensions_and_data(location_id: int) -> Tuple[int, int, List[List[
     """
     db = None
     try:
-        db = world_db.SessionLocal()
-        location = db.query(world_models.Location).filter(world_models.Location.id == location_id).first()
-        
-        if not location:
-            raise RuntimeError(f"Location {location_id} not found in database")
+        # Pathfinding asks for the map every step; reuse the cached location snapshot when current
+        cached = world_snapshots.get_cached(location_id)
+        if cached is not None:
+            map_data_json = cached.get("generated_map_data")
+        else:
+            db = world_db.SessionLocal()
+            location = db.query(world_models.Location).filter(world_models.Location.id == location_id).first()
+            
+            if not location:
+                raise RuntimeError(f"Location {location_id} not found in database")
+            map_data_json = location.generated_map_data
         
-        if not location.generated_map_data:
+        if not map_data_json:
             raise RuntimeError(f"Location {location_id} has no generated map data")
         
         # Parse the generated map data
         # Expected format: {"tiles": [[...]], "width": N, "height": M, ...}
-        map_data_json = location.generated_map_data
         
         if isinstance(map_data_json, dict):
             # Extract tile grid
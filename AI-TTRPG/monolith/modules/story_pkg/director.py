@@ -3,7 +3,7 @@ import logging
 from sqlalchemy.orm import Session
 from . import models
 from . import schemas
-from ..ai_dm_pkg.llm_service import ai_client
+from ..ai_dm_pkg.llm_service import ai_client, clean_json_response
 from ..simulation import get_world_context
 
 try:
@@ -13,6 +13,8 @@ except ImportError:
 
 logger = logging.getLogger("monolith.story.director")
 
+DIRECTOR_LORE_TOKEN_BUDGET = 1500
+
 class CampaignDirector:
     def __init__(self, db: Session, campaign_id: int):
         self.db = db
@@ -65,7 +67,8 @@ class CampaignDirector:
         if LoreManager:
             try:
                 lore_mgr = LoreManager()
-                lore_context = lore_mgr.get_lore_context(narrative_tags)
+                lore_context = lore_mgr.get_lore_context(
+                    narrative_tags, query=world_context, token_budget=DIRECTOR_LORE_TOKEN_BUDGET)
             except Exception as e:
                 logger.error(f"Failed to load lore context: {e}")
 
@@ -104,34 +107,26 @@ class CampaignDirector:
             "new_narrative_tags": ["peaceful"]
         }
 
+        required_fields = ["title", "description", "objectives"]
+
+        def parse(text: str) -> dict:
+            # Clean and parse
+            data = json.loads(clean_json_response(text))
+            # Basic validation
+            if not all(k in data for k in required_fields):
+                raise ValueError(f"AI returned invalid quest structure: {list(data.keys())}")
+            return data
+
         if ai_client and ai_client.model:
             try:
-                # Use the 'generate_content' method of the underlying model if exposed,
-                # or better, check if LLMService has a generic generate method.
-                # It has `generate_map_flavor` which uses `self.model.generate_content`.
-                # We can access `ai_client.model` directly since it's an attribute of LLMService.
-
-                response = ai_client.model.generate_content(
+                # Same world state, tags and act -> same beat, served from the response cache
+                text = ai_client.generate(
                     prompt,
-                    generation_config={"response_mime_type": "application/json"}
+                    generation_config={"response_mime_type": "application/json"},
+                    category="director",
+                    validate=parse,
                 )
-
-                # Clean and parse
-                text = response.text.strip()
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.endswith("```"):
-                    text = text[:-3]
-
-                data = json.loads(text)
-
-                # Basic validation
-                required_fields = ["title", "description", "objectives"]
-                if all(k in data for k in required_fields):
-                    return data
-                else:
-                    logger.warning(f"AI returned invalid quest structure: {data.keys()}")
-                    return fallback_quest
+                return parse(text)
 
             except Exception as e:
                 logger.error(f"AI Director failed: {e}")
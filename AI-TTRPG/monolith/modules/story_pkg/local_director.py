@@ -2,10 +2,20 @@ import logging
 import json
 from typing import List, Dict, Any, Optional
 from ..save_schemas import SaveGameData, QuestSave
-from ..ai_dm_pkg.llm_service import ai_client
+from ..ai_dm_pkg.llm_service import ai_client, clean_json_response
 
 logger = logging.getLogger("monolith.story.director.local")
 
+# Used when the AI fails or is offline
+FALLBACK_QUEST = {
+    "title": "A Local Trouble",
+    "description": "Villagers are complaining about disturbances nearby.",
+    "objectives": ["Investigate the area", "Report back"],
+    "enemy_types": ["Bandit"],
+    "reward_summary": "50 Gold",
+    "new_narrative_tags": ["minor_disturbance"]
+}
+
 class LocalCampaignDirector:
     """
     A local version of the Campaign Director that operates on SaveGameData.
@@ -25,16 +35,13 @@ class LocalCampaignDirector:
         active_quests = [q for q in state.quests if q.status == "active"]
         return len(active_quests) == 0
 
-    def generate_next_beat(self, state: SaveGameData) -> Dict[str, Any]:
-        """
-        Calls AI to generate the next quest/beat based on simulation state.
-        """
+    def _beat_prompt(self, state: SaveGameData) -> str:
         # Gather context
         narrative_tags = [] # state.narrative_tags if exists
         current_act = 1 # state.current_act if exists
         
         # Build prompt
-        prompt = f"""
+        return f"""
         Act as a Campaign Director for a TTRPG.
         
         Current Act: {current_act}
@@ -47,38 +54,53 @@ class LocalCampaignDirector:
         - reward_summary
         - new_narrative_tags (list of strings)
         """
-        
+
+    @staticmethod
+    def _parse_beat(text: str) -> Dict[str, Any]:
+        return json.loads(clean_json_response(text))
+
+    def generate_next_beat(self, state: SaveGameData) -> Dict[str, Any]:
+        """
+        Calls AI to generate the next quest/beat based on simulation state.
+        """
+        prompt = self._beat_prompt(state)
         logger.info("Director generating next beat...")
-        
-        # Fallback
-        fallback_quest = {
-            "title": "A Local Trouble",
-            "description": "Villagers are complaining about disturbances nearby.",
-            "objectives": ["Investigate the area", "Report back"],
-            "enemy_types": ["Bandit"],
-            "reward_summary": "50 Gold",
-            "new_narrative_tags": ["minor_disturbance"]
-        }
 
         if ai_client and ai_client.model:
             try:
-                response = ai_client.model.generate_content(
+                text = ai_client.generate(
                     prompt,
-                    generation_config={"response_mime_type": "application/json"}
+                    generation_config={"response_mime_type": "application/json"},
+                    category="director",
+                    validate=self._parse_beat,
                 )
-                
-                text = response.text.strip()
-                # Basic cleanup if markdown is included
-                if text.startswith("```json"):
-                    text = text[7:]
-                if text.endswith("```"):
-                    text = text[:-3]
-                    
-                data = json.loads(text)
-                return data
+                return self._parse_beat(text)
                 
             except Exception as e:
                 logger.error(f"AI Director failed: {e}")
-                return fallback_quest
+                return dict(FALLBACK_QUEST)
         
-        return fallback_quest
+        return dict(FALLBACK_QUEST)
+
+    async def generate_next_beat_async(self, state: SaveGameData) -> Dict[str, Any]:
+        """
+        `generate_next_beat` for coroutines; does not block the event loop.
+        """
+        prompt = self._beat_prompt(state)
+        logger.info("Director generating next beat...")
+
+        if ai_client and ai_client.model:
+            try:
+                text = await ai_client.agenerate(
+                    prompt,
+                    generation_config={"response_mime_type": "application/json"},
+                    category="director",
+                    validate=self._parse_beat,
+                )
+                return self._parse_beat(text)
+
+            except Exception as e:
+                logger.error(f"AI Director failed: {e}")
+                return dict(FALLBACK_QUEST)
+
+        return dict(FALLBACK_QUEST)
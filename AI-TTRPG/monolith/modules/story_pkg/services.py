@@ -220,13 +220,7 @@ def remove_injury_from_target(target_id: str, severity: str) -> Dict:
 def get_ability_data(ability_name: str) -> Dict:
     """Gets the data for a single ability from the rules engine."""
     logger.debug(f"Calling internal rules_api.get_ability_data for {ability_name}")
-    all_abilities = rules_api.get_all_abilities()
-    for school, school_data in all_abilities.items():
-        for branch in school_data.get("branches", []):
-            for tier in branch.get("tiers", []):
-                if tier.get("name") == ability_name:
-                    return tier
-    return {}
+    return rules_api.get_ability_data(ability_name)
 
 # --- NEW HELPER FUNCTIONS ---
 def apply_status_to_target(target_id: str, status_id: str) -> Dict:
@@ -17,6 +17,7 @@ from sqlalchemy.orm import Session
 from .world_pkg import crud as we_crud
 from .world_pkg import database as we_db
 from .world_pkg import schemas as we_schemas
+from .world_pkg import snapshots as we_snapshots
 
 # Import story to access director or active quests
 from . import story
@@ -41,48 +42,55 @@ def get_world_location_context(location_id: int, db: Session = None) -> Dict[str
         Dict[str, Any]: The location context dictionary.
     """
     try:
-        # Check if map needs generation
-        loc = we_crud.get_location(db, location_id)
-        if loc and not loc.generated_map_data:
-             # It needs generation. Let's check for injections.
-             # We need to get active quests.
-             tags = loc.tags or ["generic"]
-
-             # --- Determine Injections from Quests ---
-             injection_req = story.get_active_quest_requirements(location_id)
-             if injection_req:
-                 logger.info(f"Injecting into map {location_id}: {injection_req}")
-
-             # Manually trigger generation via map_api
-             from . import map as map_api
-
-             # generate map
-             map_data = map_api.generate_map(tags, injections=injection_req)
-
-             # save it using crud
-             update_schema = we_schemas.LocationMapUpdate(
-                generated_map_data=map_data.get("map_data"),
-                map_seed=map_data.get("seed_used"),
-                spawn_points=map_data.get("spawn_points")
-             )
-             we_crud.update_location_map(db, location_id, update_schema)
-
-             # Now `get_location_context` will find the map and return it.
-
-        ctx = we_crud.get_location_context(db, location_id)
-        if not ctx:
-            raise Exception(f"Location {location_id} not found")
+        # A current snapshot with a map means no generation is needed
+        ctx = we_snapshots.get_cached(location_id)
+        if ctx is None or not ctx.get("generated_map_data"):
+            ctx = _build_location_context(location_id, db)
         if isinstance(ctx.get("generated_map_data"), str):
             try:
                 ctx["generated_map_data"] = json.loads(ctx["generated_map_data"])
             except Exception:
                 ctx["generated_map_data"] = None
         return ctx
-    # ... (rest of function unchanged) ...
     except Exception as e:
         logger.exception(f"[world.get_world_location_context] Error: {e}")
         raise
 
+def _build_location_context(location_id: int, db: Session) -> Dict[str, Any]:
+    """Generates the map if needed (with quest injections), then loads the location context."""
+    # Check if map needs generation
+    loc = we_crud.get_location(db, location_id)
+    if loc and not loc.generated_map_data:
+         # It needs generation. Let's check for injections.
+         # We need to get active quests.
+         tags = loc.tags or ["generic"]
+
+         # --- Determine Injections from Quests ---
+         injection_req = story.get_active_quest_requirements(location_id)
+         if injection_req:
+             logger.info(f"Injecting into map {location_id}: {injection_req}")
+
+         # Manually trigger generation via map_api
+         from . import map as map_api
+
+         # generate map
+         map_data = map_api.generate_map(tags, injections=injection_req)
+
+         # save it using crud
+         update_schema = we_schemas.LocationMapUpdate(
+            generated_map_data=map_data.get("map_data"),
+            map_seed=map_data.get("seed_used"),
+            spawn_points=map_data.get("spawn_points")
+         )
+         we_crud.update_location_map(db, location_id, update_schema)
+
+         # Now `get_location_context` will find the map and return it.
+
+    ctx = we_crud.get_location_context(db, location_id)
+    if not ctx:
+        raise Exception(f"Location {location_id} not found")
+    return ctx
+
 @with_db_session(we_db.SessionLocal)
 def spawn_trap_in_world(trap_request: Any, db: Session = None) -> Dict[str, Any]:
     """
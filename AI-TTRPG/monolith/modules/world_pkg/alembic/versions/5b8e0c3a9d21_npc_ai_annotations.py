@@ -0,0 +1,25 @@
+"""npc_ai_annotations
+
+Revision ID: 5b8e0c3a9d21
+Revises: 9e02b6c4d1f7
+Create Date: 2026-10-18 16:42:11.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e0c3a9d21'
+down_revision = '9e02b6c4d1f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('npc_instances', sa.Column('ai_annotations', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('npc_instances') as batch_op:
+        batch_op.drop_column('ai_annotations')
@@ -0,0 +1,76 @@
+"""npc_state_tables_and_location_indexes
+
+Revision ID: 9e02b6c4d1f7
+Revises: 2f36b11650e3
+Create Date: 2026-10-18 10:14:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e02b6c4d1f7'
+down_revision = '2f36b11650e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_npc_instances_location_id'), 'npc_instances', ['location_id'], unique=False)
+    op.create_index(op.f('ix_item_instances_location_id'), 'item_instances', ['location_id'], unique=False)
+    op.create_index(op.f('ix_item_instances_npc_id'), 'item_instances', ['npc_id'], unique=False)
+
+    op.create_table('npc_statuses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('npc_id', sa.Integer(), nullable=False),
+    sa.Column('status_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['npc_id'], ['npc_instances.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_npc_statuses_npc_id'), 'npc_statuses', ['npc_id'], unique=False)
+    op.create_index('ix_npc_statuses_status_owner', 'npc_statuses', ['status_id', 'npc_id'], unique=False)
+
+    op.create_table('npc_injuries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('npc_id', sa.Integer(), nullable=False),
+    sa.Column('body_location', sa.String(), nullable=True),
+    sa.Column('severity', sa.String(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['npc_id'], ['npc_instances.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_npc_injuries_npc_id'), 'npc_injuries', ['npc_id'], unique=False)
+    op.create_index(op.f('ix_npc_injuries_severity'), 'npc_injuries', ['severity'], unique=False)
+
+    # --- Move existing JSON data into the new tables ---
+    npcs = sa.table('npc_instances',
+        sa.column('id', sa.Integer), sa.column('status_effects', sa.JSON), sa.column('injuries', sa.JSON))
+    statuses, injuries = [], []
+    for row in op.get_bind().execute(sa.select(npcs)):
+        for status_id in dict.fromkeys(row.status_effects or []):
+            if isinstance(status_id, str):
+                statuses.append({"npc_id": row.id, "status_id": status_id})
+        for injury in row.injuries or []:
+            if isinstance(injury, dict):
+                details = {k: v for k, v in injury.items() if k not in ("location", "severity")}
+                injuries.append({"npc_id": row.id, "body_location": injury.get("location"),
+                                 "severity": injury.get("severity"), "details": details or None})
+
+    metadata = sa.MetaData()
+    if statuses:
+        op.bulk_insert(sa.Table('npc_statuses', metadata, autoload_with=op.get_bind()), statuses)
+    if injuries:
+        op.bulk_insert(sa.Table('npc_injuries', metadata, autoload_with=op.get_bind()), injuries)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_npc_injuries_severity'), table_name='npc_injuries')
+    op.drop_index(op.f('ix_npc_injuries_npc_id'), table_name='npc_injuries')
+    op.drop_table('npc_injuries')
+    op.drop_index('ix_npc_statuses_status_owner', table_name='npc_statuses')
+    op.drop_index(op.f('ix_npc_statuses_npc_id'), table_name='npc_statuses')
+    op.drop_table('npc_statuses')
+    op.drop_index(op.f('ix_item_instances_npc_id'), table_name='item_instances')
+    op.drop_index(op.f('ix_item_instances_location_id'), table_name='item_instances')
+    op.drop_index(op.f('ix_npc_instances_location_id'), table_name='npc_instances')
@@ -1,7 +1,7 @@
 # AI-TTRPG/monolith/modules/world_pkg/crud.py
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
-from . import models, schemas
+from . import models, schemas, snapshots
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 import logging
@@ -9,6 +9,8 @@ import logging
 # --- MONOLITH IMPORT ---
 # Import our new, self-contained map module
 from .. import map as map_api
+# Registers the flush hook that keeps the normalized NPC status/injury tables in step
+from .. import state_tables  # noqa: F401
 # --- END IMPORT ---
 
 logger = logging.getLogger("monolith.world.crud")
@@ -259,16 +261,30 @@ def update_npc(db: Session, npc_id: int, updates: schemas.NpcUpdate) -> Optional
         db.refresh(db_npc)
     return db_npc
 
+def get_npcs_with_status(db: Session, status_id: str, location_id: Optional[int] = None) -> List[models.NpcInstance]:
+    """
+    Returns NPCs that currently have the given status, optionally only in one location.
+
+    Both filters are indexed lookups (npc_statuses.status_id, npc_instances.location_id).
+    """
+    query = (
+        db.query(models.NpcInstance)
+        .join(models.NpcStatus, models.NpcStatus.npc_id == models.NpcInstance.id)
+        .filter(models.NpcStatus.status_id == status_id)
+    )
+    if location_id is not None:
+        query = query.filter(models.NpcInstance.location_id == location_id)
+    return query.all()
+
 def apply_status_to_npc(db: Session, npc_id: int, status_id: str) -> Optional[models.NpcInstance]:
     """Adds a status effect ID to the NPC's status_effects list."""
     db_npc = get_npc(db, npc_id)
     if db_npc:
-        status_effects = db_npc.status_effects or []
+        status_effects = list(db_npc.status_effects or [])
         if status_id not in status_effects:
             status_effects.append(status_id)
             logger.info(f"Applying status '{status_id}' to NPC {npc_id}")
         db_npc.status_effects = status_effects
-        flag_modified(db_npc, "status_effects")
         db.commit()
         db.refresh(db_npc)
     return db_npc
@@ -277,12 +293,11 @@ def remove_status_from_npc(db: Session, npc_id: int, status_id: str) -> Optional
     """Removes a status effect ID from the NPC's status_effects list."""
     db_npc = get_npc(db, npc_id)
     if db_npc:
-        status_effects = db_npc.status_effects or []
+        status_effects = list(db_npc.status_effects or [])
         if status_id in status_effects:
             status_effects.remove(status_id)
             logger.info(f"Removing status '{status_id}' from NPC {npc_id}")
         db_npc.status_effects = status_effects
-        flag_modified(db_npc, "status_effects")
         db.commit()
         db.refresh(db_npc)
     return db_npc
@@ -294,10 +309,9 @@ def apply_injury_to_npc(db: Session, npc_id: int, injury: dict) -> Optional[mode
     """
     db_npc = get_npc(db, npc_id)
     if db_npc:
-        injuries = db_npc.injuries or []
+        injuries = list(db_npc.injuries or [])
         injuries.append(injury)
         db_npc.injuries = injuries
-        flag_modified(db_npc, "injuries")
         db.commit()
         db.refresh(db_npc)
         logger.info(f"Applied injury to NPC {npc_id}")
@@ -310,7 +324,7 @@ def remove_injury_from_npc(db: Session, npc_id: int, severity: str) -> Optional[
     """
     db_npc = get_npc(db, npc_id)
     if db_npc:
-        injuries = db_npc.injuries or []
+        injuries = list(db_npc.injuries or [])
         injury_to_remove = None
         for inj in injuries:
             if inj.get("severity") == severity:
@@ -320,7 +334,6 @@ def remove_injury_from_npc(db: Session, npc_id: int, severity: str) -> Optional[
         if injury_to_remove:
             injuries.remove(injury_to_remove)
             db_npc.injuries = injuries
-            flag_modified(db_npc, "injuries")
             db.commit()
             db.refresh(db_npc)
             logger.info(f"Removed '{severity}' injury from NPC {npc_id}")
@@ -397,12 +410,21 @@ def delete_item(db: Session, item_id: int) -> bool:
 def get_location_context(db: Session, location_id: int):
     """
     Retrieves the full context for a given location, including region,
-    NPCs, and items.
+    NPCs, items and traps.
+
+    The context is built from one eager-loaded location snapshot, serialized
+    once and cached until a write to the location bumps its version
+    (see snapshots.py). Callers get a shallow copy; treat nested data as read-only.
 
     *** REFACTORED: This function now handles on-demand map generation. ***
     """
+    cached = snapshots.get_cached(location_id)
+    if cached is not None:
+        return cached
+
     logger.info(f"Getting full context for location_id: {location_id}")
-    location = db.query(models.Location).filter(models.Location.id == location_id).first()
+    version = snapshots.cache_key(location_id)
+    location = snapshots.load_location(db, location_id)
     if not location:
         logger.error(f"Location not found for id: {location_id}")
         raise HTTPException(status_code=404, detail="Location not found")
@@ -452,39 +474,15 @@ def get_location_context(db: Session, location_id: int):
         except Exception as e:
             logger.exception(f"Failed to generate map for location {location_id}: {e}")
             # Do not raise an error; we can still return the context without a map
+        # The map commit expired the eager-loaded rows; load the snapshot again
+        version = snapshots.cache_key(location_id)
+        location = snapshots.load_location(db, location_id)
     # --- END NEW LOGIC ---
 
-    npcs = db.query(models.NpcInstance).filter(models.NpcInstance.location_id == location_id).all()
-    items = db.query(models.ItemInstance).filter(models.ItemInstance.location_id == location_id).all()
-
-    # Get Region name
-    region = db.query(models.Region).filter(models.Region.id == location.region_id).first()
-
     # --- START OF NEW FIX ---
-    if not region:
+    if not location.region:
         logger.error(f"Data integrity error: Location {location_id} has region_id {location.region_id} but no matching region was found.")
         raise HTTPException(status_code=500, detail=f"Data integrity error: Region {location.region_id} not found for location {location_id}.")
 
     # Return a DICTIONARY (to match the old API response)
-    return {
-        "id": location.id, # <-- ADDED (was missing from your old code, but implied by schema)
-        "name": location.name,
-        "region_name": region.name,
-        "description": getattr(location, 'description', None),
-        "generated_map_data": location.generated_map_data,
-        "map_seed": location.map_seed,
-        "ai_annotations": location.ai_annotations,
-        "spawn_points": location.spawn_points, # <-- ADDED
-        # Use the Pydantic schemas to convert ORM objects
-        "npcs": [schemas.NpcInstance.from_orm(npc).model_dump() for npc in npcs],
-        "items": [schemas.ItemInstance.from_orm(item).model_dump() for item in items],
-        # Add traps and other fields if they exist in your schema/model
-        "trap_instances": [schemas.TrapInstance.from_orm(trap).model_dump() for trap in location.trap_instances],
-        "tags": location.tags,
-        "exits": location.exits,
-        "region": schemas.Region.from_orm(region).model_dump(),
-        # Use the current schema model names
-        "npcs": [schemas.NpcInstance.from_orm(npc) for npc in npcs],
-        "items": [schemas.ItemInstance.from_orm(item) for item in items],
-
-    }
+    return snapshots.store(location_id, version, snapshots.serialize_location(location))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import Float
 
@@ -121,12 +121,13 @@ class NpcInstance(Base):
     # --- END ADD ---
 
     # This links the NPC to the Location it is currently in
-    location_id = Column(Integer, ForeignKey("locations.id"))
+    location_id = Column(Integer, ForeignKey("locations.id"), index=True)
     behavior_tags = Column(JSON, default=[]) # Store tags like ["aggressive"]
 
 
     # --- ADD THIS LINE ---
     coordinates = Column(JSON, nullable=True) # e.g., [10, 5]
+    ai_annotations = Column(JSON, nullable=True) # Pre-generated content, e.g. {"canned_dialogue": [...]}
 
     location = relationship("Location", back_populates="npc_instances")
     # This links the NPC to the Items it is carrying (its inventory)
@@ -144,9 +145,9 @@ class ItemInstance(Base):
     quantity = Column(Integer, default=1)
 
     # An item can be on the ground (location_id is set)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True, index=True)
     # OR it can be in an NPC's inventory (npc_id is set)
-    npc_id = Column(Integer, ForeignKey("npc_instances.id"), nullable=True)
+    npc_id = Column(Integer, ForeignKey("npc_instances.id"), nullable=True, index=True)
 
 
     # --- ADD THIS LINE ---
@@ -155,6 +156,29 @@ class ItemInstance(Base):
     location = relationship("Location", back_populates="item_instances")
     npc = relationship("NpcInstance", back_populates="item_instances")
 
+# --- Normalized, indexed views of the NPC JSON columns ---
+# status_effects/injuries stay the document the game reads; these rows are
+# kept in step by monolith.modules.state_tables. NPC inventories are already
+# rows (ItemInstance.npc_id).
+
+class NpcStatus(Base):
+    """One active status effect on an NPC instance."""
+    __tablename__ = "npc_statuses"
+    id = Column(Integer, primary_key=True)
+    npc_id = Column(Integer, ForeignKey("npc_instances.id", ondelete="CASCADE"), nullable=False, index=True)
+    status_id = Column(String, nullable=False)
+
+    __table_args__ = (Index("ix_npc_statuses_status_owner", "status_id", "npc_id"),)
+
+class NpcInjury(Base):
+    """One injury on an NPC instance."""
+    __tablename__ = "npc_injuries"
+    id = Column(Integer, primary_key=True)
+    npc_id = Column(Integer, ForeignKey("npc_instances.id", ondelete="CASCADE"), nullable=False, index=True)
+    body_location = Column(String, nullable=True)
+    severity = Column(String, nullable=True, index=True)
+    details = Column(JSON, nullable=True)
+
 # --- NEW MODEL: Global Game/World State ---
 class GameState(Base):
     """
@@ -115,6 +115,7 @@ class NpcInstance(NpcInstanceBase):
     # from the database relationship
     item_instances: List[ItemInstance] = []
     behavior_tags: List[str] = [] # Add this
+    ai_annotations: Optional[Dict[str, Any]] = None
     class Config:
         from_attributes = True
 
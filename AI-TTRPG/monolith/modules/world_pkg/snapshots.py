@@ -0,0 +1,178 @@
+# AI-TTRPG/monolith/modules/world_pkg/snapshots.py
+"""
+Versioned location snapshots.
+
+The AI DM, the client scene build and combat map lookups all ask for the
+same location context many times per action. Building it means loading the
+location, its region, NPCs (with their carried items), ground items and
+traps, then serializing each row through the Pydantic schemas.
+
+This module loads all of that with eager loading (no lazy loads while
+serializing), serializes it once, and caches the result against a
+per-location version counter. Any ORM write touching a location or
+something placed in it bumps that location's counter (on flush and again on
+commit); region writes bump a world-wide epoch. Writes that bypass the ORM (bulk Core statements) must
+call `bump_location_versions` / `bump_world_epoch` themselves.
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from . import models, schemas
+
+logger = logging.getLogger("monolith.world.snapshots")
+
+_lock = threading.Lock()
+_versions: Dict[int, int] = {}
+_world_epoch = 0
+_cache: Dict[int, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+stats = {"hits": 0, "misses": 0}
+
+# Models whose rows belong to a location through a location_id column
+_PLACED_MODELS = (models.NpcInstance, models.ItemInstance, models.TrapInstance)
+
+
+# --- Versions ---
+
+def cache_key(location_id: int) -> Tuple[int, int]:
+    """Current (world epoch, location version) for a location."""
+    with _lock:
+        return _world_epoch, _versions.get(location_id, 0)
+
+
+def bump_location_versions(location_ids: Iterable[int]) -> None:
+    """Invalidate cached snapshots for the given locations."""
+    with _lock:
+        for location_id in location_ids:
+            if location_id is None:
+                continue
+            _versions[location_id] = _versions.get(location_id, 0) + 1
+            _cache.pop(location_id, None)
+
+
+def bump_world_epoch() -> None:
+    """Invalidate every cached snapshot (e.g. after a region changed)."""
+    global _world_epoch
+    with _lock:
+        _world_epoch += 1
+        _cache.clear()
+
+
+# --- Cache ---
+
+def get_cached(location_id: int) -> Optional[Dict[str, Any]]:
+    """Return a copy of the cached snapshot if it is still current."""
+    with _lock:
+        entry = _cache.get(location_id)
+        if entry and entry[0] == (_world_epoch, _versions.get(location_id, 0)):
+            stats["hits"] += 1
+            return dict(entry[1])
+        stats["misses"] += 1
+        return None
+
+
+def store(location_id: int, key: Tuple[int, int], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache a snapshot built at `key`; dropped if a write happened meanwhile."""
+    with _lock:
+        if key == (_world_epoch, _versions.get(location_id, 0)):
+            _cache[location_id] = (key, snapshot)
+    return dict(snapshot)
+
+
+# --- Loading & serialization ---
+
+def load_location(db: Session, location_id: int) -> Optional[models.Location]:
+    """Load a location with its region, NPCs (and their items), items and traps.
+
+    The region is joined; the collections are fetched with one IN query each.
+    Joining the collections as well would repeat the map blob once per
+    NPC x item x trap row.
+    """
+    return (
+        db.query(models.Location)
+        .options(
+            joinedload(models.Location.region),
+            selectinload(models.Location.npc_instances).selectinload(models.NpcInstance.item_instances),
+            selectinload(models.Location.item_instances),
+            selectinload(models.Location.trap_instances),
+        )
+        .filter(models.Location.id == location_id)
+        .first()
+    )
+
+
+def serialize_location(location: models.Location) -> Dict[str, Any]:
+    """Build the location context dict from an eagerly loaded location."""
+    region = location.region
+    return {
+        "id": location.id,
+        "name": location.name,
+        "region_name": region.name,
+        "description": getattr(location, 'description', None),
+        "generated_map_data": location.generated_map_data,
+        "map_seed": location.map_seed,
+        "ai_annotations": location.ai_annotations,
+        "spawn_points": location.spawn_points,
+        "npcs": [schemas.NpcInstance.model_validate(npc).model_dump() for npc in location.npc_instances],
+        "items": [schemas.ItemInstance.model_validate(item).model_dump() for item in location.item_instances],
+        "trap_instances": [schemas.TrapInstance.model_validate(trap).model_dump() for trap in location.trap_instances],
+        "tags": location.tags,
+        "exits": location.exits,
+        "region": schemas.Region.model_validate(region).model_dump(),
+    }
+
+
+# --- Write tracking ---
+
+def _touched_locations(obj: Any) -> Set[int]:
+    if isinstance(obj, models.Location):
+        return {obj.id}
+    if isinstance(obj, _PLACED_MODELS):
+        touched = {obj.location_id}
+        # A row moved between locations invalidates the old one too
+        history = inspect(obj).attrs.location_id.history
+        touched.update(history.deleted or ())
+        return touched
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writes(session: Session, flush_context) -> None:
+    # Bump now so reads through this session see the flushed rows, and again
+    # on commit so no reader can have cached pre-commit data in between
+    touched = set()
+    epoch = False
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models.Region):
+            epoch = True
+        else:
+            touched.update(_touched_locations(obj))
+    if epoch:
+        session.info["world_snapshot_epoch"] = True
+        bump_world_epoch()
+    if touched:
+        session.info.setdefault("world_snapshot_locations", set()).update(touched)
+        bump_location_versions(touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_writes(session: Session) -> None:
+    touched = session.info.pop("world_snapshot_locations", None)
+    if session.info.pop("world_snapshot_epoch", False):
+        bump_world_epoch()
+    if touched:
+        bump_location_versions(touched)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_writes(session: Session, previous_transaction) -> None:
+    # Snapshots may have been built from the rolled-back flushed rows
+    touched = session.info.pop("world_snapshot_locations", None)
+    if session.info.pop("world_snapshot_epoch", False):
+        bump_world_epoch()
+    if touched:
+        bump_location_versions(touched)
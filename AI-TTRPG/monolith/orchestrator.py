@@ -10,6 +10,7 @@ Responsibilities:
 """
 import logging
 import asyncio
+import threading
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -17,9 +18,16 @@ from pathlib import Path
 from .event_bus import get_event_bus
 from .modules.save_schemas import SaveGameData, CharacterSave, LocationSave
 from .modules import save_manager
+from .modules.autosave import AutosaveService
+from .modules.state_sync import StateSynchronizer, changed_rows, state_rows
+from .modules.state_history import StateHistory, StateSnapshot, get_state_history, assoc_in, get_in, update_in
+from . import storage
+from .modules.rules_pkg.ruleset import pin_ruleset
+from .modules.map_pkg import data_loader as map_loader
 from .modules.character_pkg import models as char_models
 from .modules.character_pkg import database as char_db
 from .modules.character_pkg import crud as char_crud
+from .modules import character as character_api
 
 logger = logging.getLogger("monolith.orchestrator")
 
@@ -30,13 +38,20 @@ _orchestrator_instance = None
 class GameStateManager:
     """Manages the live game state and hotseat player rotation.
     
-    This is the single source of truth for the current game state.
+    This is the single source of truth for the current game state. States are
+    immutable values (see state_history): changes go through `update_state` /
+    `apply_state_change`, and every applied state is kept in a bounded history
+    for undo and per-turn diffs. Changes are serialized by a lock, so
+    `update_state` calls from worker threads never drop each other's updates.
     """
     
-    def __init__(self):
+    def __init__(self, history: Optional[StateHistory] = None):
         self.current_state: Optional[SaveGameData] = None
         self.active_player_index: int = 0
         self.save_slot_name: str = "CurrentSave"
+        self.autosaver = AutosaveService()
+        self.history = history or get_state_history()
+        self._lock = threading.RLock()
         logger.info("GameStateManager initialized")
     
     def load_state(self, save_data: SaveGameData, slot_name: str = "CurrentSave"):
@@ -49,6 +64,7 @@ class GameStateManager:
         self.current_state = save_data
         self.save_slot_name = slot_name
         self.active_player_index = 0
+        self.history.reset(save_data, label=f"load:{slot_name}")
         logger.info(f"Game state loaded: {len(save_data.characters)} characters")
     
     def get_current_state(self) -> Optional[SaveGameData]:
@@ -85,30 +101,113 @@ class GameStateManager:
         
         return next_player
     
-    def apply_state_change(self, new_state: SaveGameData, auto_save: bool = True):
+    def apply_state_change(self, new_state: SaveGameData, auto_save: bool = True, label: str = ""):
         """Update the current state and optionally save to disk.
         
         Args:
-            new_state: Updated game state
+            new_state: Updated game state (must not be mutated afterwards)
             auto_save: Whether to automatically save to disk
+            label: Short description recorded in the history
         """
-        self.current_state = new_state
+        with self._lock:
+            self.current_state = new_state
+            self.history.record(new_state, label, self.active_player_index)
         
         if auto_save:
-            self.save_current_game()
+            self.request_autosave()
     
-    def save_current_game(self) -> Dict[str, Any]:
-        """Save the current game state to disk."""
+    def update_state(self, path, fn, auto_save: bool = True, label: str = "") -> SaveGameData:
+        """Apply `fn` to the value at `path`, copying only the nodes on that path.
+        
+        Args:
+            path: Keys from the SaveGameData root, e.g. ("characters", char_id, "inventory")
+            fn: Receives the current value and returns its replacement
+            auto_save: Whether to automatically save to disk
+            label: Short description recorded in the history
+            
+        Returns:
+            The new current state
+        """
+        with self._lock:
+            self.apply_state_change(update_in(self.current_state, path, fn), auto_save, label)
+            return self.current_state
+    
+    def record_combat_result(self, ids, fields: Dict[str, Any]) -> bool:
+        """Record fields combat wrote to a character's database row in the live state.
+        
+        Args:
+            ids: Ids the character may be saved under; the first one present is used
+            fields: Combat fields as written (only those that differ are recorded)
+            
+        Returns:
+            True if the character is part of the current state
+        """
+        with self._lock:
+            state = self.current_state
+            if state is None:
+                return False
+            for save_id in ids:
+                saved = get_in(state, ("characters", save_id))
+                if saved is None:
+                    continue
+                update = {f: v for f, v in fields.items() if getattr(saved, f) != v}
+                if update:
+                    self.update_state(("characters", save_id), lambda c: c.model_copy(update=update),
+                                      auto_save=False, label=f"combat:{save_id}")
+                return True
+        return False
+    
+    def undo(self, steps: int = 1, auto_save: bool = True) -> Optional[StateSnapshot]:
+        """Rewind to an earlier snapshot in the history.
+        
+        Returns:
+            The restored snapshot, or None if there is nothing to undo
+        """
+        snapshot = self.history.rewind(steps)
+        if snapshot:
+            self._restore(snapshot, auto_save)
+        return snapshot
+    
+    def redo(self, auto_save: bool = True) -> Optional[StateSnapshot]:
+        """Re-apply the most recently undone snapshot."""
+        snapshot = self.history.redo()
+        if snapshot:
+            self._restore(snapshot, auto_save)
+        return snapshot
+    
+    def _restore(self, snapshot: StateSnapshot, auto_save: bool):
+        with self._lock:
+            self.current_state = snapshot.state
+            self.active_player_index = snapshot.active_player_index
+        logger.info(f"Restored state #{snapshot.seq} ({snapshot.label or 'unlabelled'})")
+        if auto_save:
+            self.request_autosave()
+    
+    def request_autosave(self) -> Dict[str, Any]:
+        """Snapshot the current state and queue it for a background write.
+        
+        Returns immediately; disk I/O happens on the autosave worker thread.
+        """
         if not self.current_state:
             return {"success": False, "error": "No game state loaded"}
         
         active_player = self.get_active_player()
-        return save_manager.save_game(
+        return self.autosaver.request_save(
             data=self.current_state,
             slot_name=self.save_slot_name,
             active_character_id=active_player.id if active_player else None,
-            active_character_name=active_player.name if active_player else None
+            active_character_name=active_player.name if active_player else None,
+            frozen=True
         )
+    
+    def save_current_game(self) -> Dict[str, Any]:
+        """Save the current game state to disk and wait for the write."""
+        result = self.request_autosave()
+        if not result["success"] or not result.get("queued"):
+            return result
+        
+        self.autosaver.flush()
+        return self.autosaver.last_result(self.save_slot_name) or result
 
 
 class Orchestrator:
@@ -123,6 +222,13 @@ class Orchestrator:
         self._lock = asyncio.Lock()
         self._initialized = False
         
+        self.state_sync = StateSynchronizer()
+        self._synced_state: Optional[SaveGameData] = None  # Last state mirrored into SQLite
+        self._sync_lock = threading.Lock()
+        self.state_manager.autosaver.add_listener(self._on_autosave_written)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        character_api.add_combat_listener(self._on_combat_result)
+        
         logger.info("Orchestrator: Initializing Local Combat Manager...")
         from .modules.combat_pkg.local_combat_manager import LocalCombatManager
         self.combat_manager = LocalCombatManager(self.event_bus)
@@ -149,6 +255,7 @@ class Orchestrator:
         if self._initialized:
             logger.warning("Engine already initialized")
             return
+        self._loop = asyncio.get_running_loop()
         
         logger.info("Initializing game engine...")
         
@@ -173,106 +280,76 @@ class Orchestrator:
         # Save current game if loaded
         if self.state_manager.current_state:
             self.state_manager.save_current_game()
+        self.state_manager.autosaver.shutdown()
     
     # -------------------------------------------------------------------------
     # Helper Methods
     # -------------------------------------------------------------------------
 
-    def _sync_characters_to_db(self, characters: List[CharacterSave]):
-        """Syncs loaded characters to the SQLite database for AI access."""
-        logger.info(f"Syncing {len(characters)} characters to DB...")
-        db = char_db.SessionLocal()
+    def _sync_state_to_db(self, state: SaveGameData) -> bool:
+        """Mirror a freshly loaded or created state into SQLite for AI access.
+
+        Blocking; run it off the event loop. Lazily loaded locations are
+        decoded one at a time and dropped again, so the state stays lazy.
+        Later syncs only write what changed since this state; if this one
+        fails, the next autosave runs it again.
+
+        Returns:
+            True if every row was written
+        """
         try:
-            for char_data in characters:
-                # Check if exists
-                db_char = char_crud.get_character(db, char_data.id)
-                
-                # Prepare data dict
-                char_dict = char_data.model_dump()
-                
-                if not db_char:
-                    logger.info(f"Creating DB record for {char_data.name}")
-                    db_char = char_models.Character(**char_dict)
-                    db.add(db_char)
-                else:
-                    # Update existing
-                    for key, value in char_dict.items():
-                        if hasattr(db_char, key):
-                            setattr(db_char, key, value)
-            
-            db.commit()
-            logger.info("Character sync complete.")
+            for rows in state_rows(state):
+                self.state_sync.sync(rows, verify=True, raise_errors=True)
         except Exception as e:
-            logger.exception(f"Failed to sync characters to DB: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            logger.warning(f"Full state sync failed, retrying on the next autosave: {e}")
+            with self._sync_lock:
+                self._synced_state = None
+            return False
+        with self._sync_lock:
+            self._synced_state = state
+        return True
 
-    def _sync_world_to_db(self, state: SaveGameData):
+    def _on_combat_result(self, ids, fields: Dict[str, Any]):
+        """Record a combat write in the live state (character API listener).
+
+        Combat may write from a worker thread; the result is then recorded on
+        the event loop's thread, in order with the loop's own state changes.
         """
-        Ensures that Regions and Locations loaded from JSON are present in the SQLite database.
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if not on_loop:
+                loop.call_soon_threadsafe(self.state_manager.record_combat_result, ids, fields)
+                return
+        self.state_manager.record_combat_result(ids, fields)
+
+    def _on_autosave_written(self, state: SaveGameData):
+        """Mirror what changed since the last sync into SQLite (runs on the autosave thread).
+
+        Only entities and columns that differ from the last synced state are
+        written, so rows other modules changed in the database are left alone
+        unless the game state changed them too. The synced state only advances
+        when the write succeeded; after a failure the next autosave falls back
+        to a full verified sync.
         """
-        from .modules.world_pkg import database as world_db
-        from .modules.world_pkg import crud as world_crud
-        
-        db = world_db.SessionLocal()
-        try:
-            # 1. Sync Regions
-            for region in state.regions:
-                existing = world_crud.get_region(db, region.id)
-                if not existing:
-                    from .modules.world_pkg import models as world_models
-                    db_region = world_models.Region(
-                        id=region.id,
-                        name=region.name,
-                        current_weather=region.current_weather,
-                        environmental_effects=region.environmental_effects,
-                        faction_influence=region.faction_influence
-                    )
-                    db.add(db_region)
-                else:
-                    existing.name = region.name
-                    existing.current_weather = region.current_weather
-                    existing.environmental_effects = region.environmental_effects
-                    existing.faction_influence = region.faction_influence
-            
-            # 2. Sync Locations
-            for loc in state.locations:
-                existing_loc = world_crud.get_location(db, loc.id)
-                if not existing_loc:
-                    from .modules.world_pkg import models as world_models
-                    db_loc = world_models.Location(
-                        id=loc.id,
-                        name=loc.name,
-                        region_id=loc.region_id,
-                        tags=loc.tags,
-                        exits=loc.exits,
-                        description=loc.description,
-                        generated_map_data=loc.generated_map_data,
-                        map_seed=loc.map_seed,
-                        spawn_points=loc.spawn_points,
-                        ai_annotations=loc.ai_annotations
-                    )
-                    db.add(db_loc)
-                else:
-                    existing_loc.name = loc.name
-                    existing_loc.region_id = loc.region_id
-                    existing_loc.tags = loc.tags
-                    existing_loc.exits = loc.exits
-                    existing_loc.description = loc.description
-                    existing_loc.generated_map_data = loc.generated_map_data
-                    existing_loc.map_seed = loc.map_seed
-                    existing_loc.spawn_points = loc.spawn_points
-                    existing_loc.ai_annotations = loc.ai_annotations
-            
-            db.commit()
-            logger.info(f"Synced {len(state.regions)} regions and {len(state.locations)} locations to SQLite DB.")
-            
-        except Exception as e:
-            logger.error(f"Failed to sync world to DB: {e}")
-            db.rollback()
-        finally:
-            db.close()
+        with self._sync_lock:
+            previous = self._synced_state
+        if previous is None:
+            self._sync_state_to_db(state)
+        elif previous is not state:
+            try:
+                rows = changed_rows(previous, state)
+                if rows:
+                    self.state_sync.sync(rows, raise_errors=True)
+            except Exception as e:
+                logger.warning(f"State sync failed, running a full sync on the next autosave: {e}")
+                state = None
+            with self._sync_lock:
+                if self._synced_state is previous:  # not replaced by a load meanwhile
+                    self._synced_state = state
 
     # -------------------------------------------------------------------------
     # Game Creation & Loading
@@ -299,10 +376,11 @@ class Orchestrator:
             # Select a random algorithm for the starting area
             algo = map_core.select_algorithm(["forest", "starter"])
             if not algo:
-                algo = map_core.GENERATION_ALGORITHMS[0]
+                algo = map_core.data_loader.GENERATION_ALGORITHMS[0]
                 
-            # Generate the map
-            map_response = map_core.run_generation(
+            # Generate the map (in a worker thread: the AI flavor request blocks)
+            map_response = await asyncio.to_thread(
+                map_core.run_generation,
                 algorithm=algo,
                 seed="start_seed_12345",
                 width_override=40,
@@ -353,11 +431,10 @@ class Orchestrator:
             self.state_manager.load_state(game_state)
             
             # Sync to DB for AI
-            self._sync_characters_to_db(characters)
-            self._sync_world_to_db(game_state)
+            await asyncio.to_thread(self._sync_state_to_db, game_state)
             
-            # Initial save
-            save_result = self.state_manager.save_current_game()
+            # Initial save (written in the background)
+            save_result = self.state_manager.request_autosave()
             
             if save_result["success"]:
                 await self.event_bus.publish("game.started", {
@@ -401,9 +478,8 @@ class Orchestrator:
             save_file = result["save_file"]
             self.state_manager.load_state(save_file.data, slot_name)
             
-            # Sync to DB for AI
-            self._sync_characters_to_db(save_file.data.characters)
-            self._sync_world_to_db(save_file.data)
+            # Sync to DB for AI (off the loop; lazy locations stay undecoded)
+            await asyncio.to_thread(self._sync_state_to_db, save_file.data)
             
             await self.event_bus.publish("game.loaded", {
                 "slot_name": slot_name,
@@ -446,62 +522,71 @@ class Orchestrator:
         """
         async with self._lock:
             try:
-                logger.info(f"Processing action: {action_type} from {player_id}")
-                
-                # Verify it's the active player's turn (UNLESS in combat)
-                # Combat actions are handled by the CombatManager which has its own turn logic
-                is_combat_action = action_type in ["ATTACK", "FLEE"] or (action_type == "END_TURN" and self.combat_manager and self.combat_manager.state.is_active)
-                
-                if not is_combat_action:
-                    active_id = self.state_manager.get_active_player_id()
-                    if player_id != active_id:
-                        return {
-                            "success": False,
-                            "error": f"Not {player_id}'s turn (active player: {active_id})"
-                        }
-                
-                current_state = self.state_manager.get_current_state()
-                
-                # Dispatch based on action type
-                if action_type == "MOVE":
-                    result = await self._handle_movement(current_state, player_id, action_data)
-                elif action_type == "ABILITY":
-                    result = await self._handle_ability(current_state, player_id, action_data)
-                elif action_type == "DIALOGUE":
-                    result = await self._handle_dialogue(current_state, player_id, action_data)
-                elif action_type == "END_TURN":
-                    result = await self._handle_end_turn(current_state, player_id, action_data)
-                elif action_type == "EQUIP":
-                    result = await self._handle_equip(current_state, player_id, action_data)
-                elif action_type == "UNEQUIP":
-                    result = await self._handle_unequip(current_state, player_id, action_data)
-                elif action_type == "BUY":
-                    result = await self._handle_buy(current_state, player_id, action_data)
-                elif action_type == "SELL":
-                    result = await self._handle_sell(current_state, player_id, action_data)
-                elif action_type in ["ATTACK", "FLEE"]:
-                    # Route directly to combat manager
-                    result = self.combat_manager.handle_action(player_id, action_type, action_data)
-                elif action_type == "END_TURN":
-                    # Check if we are in combat
-                    if self.combat_manager.state.is_active:
-                        result = self.combat_manager.handle_action(player_id, action_type, action_data)
-                    else:
-                        result = await self._handle_end_turn(current_state, player_id, action_data)
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Unknown action type: {action_type}"
-                    }
-                
-                return result
-                
+                # One storage scope per action: DB calls share sessions and commit once.
+                # The rules and map config are pinned so a hot reload mid-action cannot mix versions.
+                # The scope sits inside the try so a failing action rolls back its writes.
+                with storage.session_scope(), pin_ruleset(), map_loader.pin_data():
+                    logger.info(f"Processing action: {action_type} from {player_id}")
+                    result = await self._dispatch_action(player_id, action_type, action_data)
+                    if isinstance(result, dict) and result.get("success") is False:
+                        storage.rollback_scope()
+                    return result
             except Exception as e:
                 logger.exception(f"Action handling failed: {e}")
                 return {
                     "success": False,
                     "error": str(e)
                 }
+
+    async def _dispatch_action(self, player_id: str, action_type: str, action_data: dict) -> Dict[str, Any]:
+        """Route one action to its handler; runs inside handle_player_action's storage scope."""
+        # Verify it's the active player's turn (UNLESS in combat)
+        # Combat actions are handled by the CombatManager which has its own turn logic
+        is_combat_action = action_type in ["ATTACK", "FLEE"] or (action_type == "END_TURN" and self.combat_manager and self.combat_manager.state.is_active)
+
+        if not is_combat_action:
+            active_id = self.state_manager.get_active_player_id()
+            if player_id != active_id:
+                return {
+                    "success": False,
+                    "error": f"Not {player_id}'s turn (active player: {active_id})"
+                }
+
+        current_state = self.state_manager.get_current_state()
+
+        # Dispatch based on action type
+        if action_type == "MOVE":
+            result = await self._handle_movement(current_state, player_id, action_data)
+        elif action_type == "ABILITY":
+            result = await self._handle_ability(current_state, player_id, action_data)
+        elif action_type == "DIALOGUE":
+            result = await self._handle_dialogue(current_state, player_id, action_data)
+        elif action_type == "END_TURN":
+            result = await self._handle_end_turn(current_state, player_id, action_data)
+        elif action_type == "EQUIP":
+            result = await self._handle_equip(current_state, player_id, action_data)
+        elif action_type == "UNEQUIP":
+            result = await self._handle_unequip(current_state, player_id, action_data)
+        elif action_type == "BUY":
+            result = await self._handle_buy(current_state, player_id, action_data)
+        elif action_type == "SELL":
+            result = await self._handle_sell(current_state, player_id, action_data)
+        elif action_type in ["ATTACK", "FLEE"]:
+            # Route directly to combat manager
+            result = self.combat_manager.handle_action(player_id, action_type, action_data)
+        elif action_type == "END_TURN":
+            # Check if we are in combat
+            if self.combat_manager.state.is_active:
+                result = self.combat_manager.handle_action(player_id, action_type, action_data)
+            else:
+                result = await self._handle_end_turn(current_state, player_id, action_data)
+        else:
+            return {
+                "success": False,
+                "error": f"Unknown action type: {action_type}"
+            }
+
+        return result
     
     # -------------------------------------------------------------------------
     # Action Handlers (Stubs for now - to be implemented with game logic)
@@ -646,28 +731,29 @@ class Orchestrator:
         # 3. If slot occupied, move old item to inventory
         
         # Implementation (simplified for now)
-        if not character.equipment:
-            character.equipment = {}
-        if not character.inventory:
-            character.inventory = {}
+        # State is immutable: work on copies of the two dicts being changed
+        equipment = dict(character.equipment or {})
+        inventory = dict(character.inventory or {})
             
         # Check if slot occupied
-        old_item = character.equipment.get(slot)
+        old_item = equipment.get(slot)
         if old_item:
             # Move old item to inventory
-            character.inventory[old_item] = character.inventory.get(old_item, 0) + 1
+            inventory[old_item] = inventory.get(old_item, 0) + 1
             
         # Equip new item
-        character.equipment[slot] = item_id
+        equipment[slot] = item_id
         
         # Remove from inventory
-        character.inventory[item_id] -= 1
-        if character.inventory[item_id] <= 0:
-            del character.inventory[item_id]
+        inventory[item_id] -= 1
+        if inventory[item_id] <= 0:
+            del inventory[item_id]
             
         # Save state
-        # Save state
-        self.state_manager.save_current_game()
+        character = character.model_copy(update={"equipment": equipment, "inventory": inventory})
+        self.state_manager.apply_state_change(
+            assoc_in(current_state, ("characters", player_id), character), label=f"equip:{player_id}"
+        )
         await self.event_bus.publish("notification.auto_save", {})
         
         await self.event_bus.publish("action.equip", {
@@ -707,15 +793,15 @@ class Orchestrator:
         # 1. Remove from equipment
         # 2. Add to inventory
         
-        del character.equipment[slot]
-        
-        if not character.inventory:
-            character.inventory = {}
-            
-        character.inventory[item_id] = character.inventory.get(item_id, 0) + 1
+        equipment = {k: v for k, v in character.equipment.items() if k != slot}
+        inventory = dict(character.inventory or {})
+        inventory[item_id] = inventory.get(item_id, 0) + 1
         
         # Save state
-        self.state_manager.save_current_game()
+        character = character.model_copy(update={"equipment": equipment, "inventory": inventory})
+        self.state_manager.apply_state_change(
+            assoc_in(current_state, ("characters", player_id), character), label=f"unequip:{player_id}"
+        )
         
         await self.event_bus.publish("action.unequip", {
             "player_id": player_id,
@@ -764,15 +850,14 @@ class Orchestrator:
         cost = shop_item["price"] * quantity
         
         # Check funds
-        # Ensure inventory exists
-        if not character.inventory: character.inventory = {}
-        current_gold = character.inventory.get("currency", 0)
+        inventory = dict(character.inventory or {})
+        current_gold = inventory.get("currency", 0)
         
         if current_gold < cost:
             return {"success": False, "error": "Not enough gold"}
             
         # Transaction
-        character.inventory["currency"] = current_gold - cost
+        inventory["currency"] = current_gold - cost
         shop_item["quantity"] -= quantity
         
         # Add item
@@ -782,205 +867,14 @@ class Orchestrator:
         # ShopScreen expects `char_context.inventory['carried_gear']`.
         # So we should respect that structure.
         
-        if "carried_gear" not in character.inventory:
-            character.inventory["carried_gear"] = {}
-            
-        character.inventory["carried_gear"][item_id] = character.inventory["carried_gear"].get(item_id, 0) + quantity
-        
-        self.state_manager.save_current_game()
-        
-        await self.event_bus.publish("action.buy", {
-            "player_id": player_id,
-            "shop_id": shop_id,
-            "item_id": item_id,
-            "quantity": quantity,
-            "cost": cost
-        })
-        
-        return {
-            "success": True,
-            "message": f"Bought {quantity}x {item_id}",
-            "character": character
-        }
-
-    async def _handle_sell(
-        self,
-        current_state: SaveGameData,
-        player_id: str,
-        data: dict
-    ) -> Dict[str, Any]:
-        """Handle selling an item."""
-        shop_id = data.get("shop_id")
-        item_id = data.get("item_id")
-        quantity = data.get("quantity", 1)
+        carried = dict(inventory.get("carried_gear") or {})
+        carried[item_id] = carried.get(item_id, 0) + quantity
+        inventory["carried_gear"] = carried
         
-        logger.info(f"Sell: {player_id} selling {quantity}x {item_id} to {shop_id}")
-        
-        # Find character
-        character = next((c for c in current_state.characters if c.id == player_id), None)
-        if not character:
-            return {"success": False, "error": "Character not found"}
-            
-        # Get Shop Data
-        from .modules.story_pkg.shop_handler import get_shop_inventory
-        try:
-            shop = get_shop_inventory(shop_id)
-        except ValueError:
-            return {"success": False, "error": "Shop not found"}
-            
-        # Check player inventory
-        if not character.inventory: character.inventory = {}
-        
-        # Check carried gear
-        carried = character.inventory.get("carried_gear", {})
-        if item_id not in carried or carried[item_id] < quantity:
-            return {"success": False, "error": "Item not in inventory"}
-            
-        # Calculate value (simplified: 50% of buy price)
-        # We need item data to know price.
-        # For now, let's assume we can get it from shop if they sell it, or rule engine.
-        # Fallback: 10 gold per item if unknown.
-        
-        shop_item = shop["inventory"].get(item_id)
-        base_price = shop_item["price"] if shop_item else 20
-        sell_price = int(base_price * 0.5)
-        total_value = sell_price * quantity
-        
-        # Transaction
-        carried[item_id] -= quantity
-        if carried[item_id] <= 0:
-            del carried[item_id]
-            
-        current_gold = character.inventory.get("currency", 0)
-        character.inventory["currency"] = current_gold + total_value
-        
-        # Shop gets item? (Optional, maybe shop has infinite space or we add it)
-        # For now, items just vanish into the economy.
-        
-        self.state_manager.save_current_game()
-        
-        await self.event_bus.publish("action.sell", {
-            "player_id": player_id,
-            "shop_id": shop_id,
-            "item_id": item_id,
-            "quantity": quantity,
-            "value": total_value
-        })
-        
-        return {
-            "success": True,
-            "message": f"Sold {quantity}x {item_id} for {total_value} gold",
-            "character": character
-        }
-
-    # -------------------------------------------------------------------------
-    # Time & Simulation
-    # -------------------------------------------------------------------------
-
-    async def advance_time(self, hours: int = 8) -> Dict[str, Any]:
-        """
-        Advances game time, triggering world simulation and story checks.
-        """
-        logger.info(f"Advancing time by {hours} hours...")
-        
-        state = self.state_manager.current_state
-        if not state:
-            return {"success": False, "error": "No active game state"}
-            
-        events = []
-        
-        # 1. Run World Simulation
-        if self.world_sim:
-            sim_events = self.world_sim.process_turn(state)
-            events.extend(sim_events)
-            
-        # 2. Run Story Director
-        if self.campaign_director:
-            # Check pacing
-            if self.campaign_director.check_pacing(state):
-                beat = self.campaign_director.generate_next_beat(state)
-                if beat:
-                    # Add new quest to state
-                    from .modules.save_schemas import QuestSave
-                    new_quest = QuestSave(
-                        id=f"quest_{len(state.quests) + 1}",
-                        title=beat.get("title", "Unknown Quest"),
-                        description=beat.get("description", ""),
-                        status="active",
-                        objectives=[{"text": obj, "completed": False} for obj in beat.get("objectives", [])],
-                        rewards={"xp": 100, "gold": 50} # Simplified
-                    )
-                    state.quests.append(new_quest)
-                    events.append(f"New Quest: {new_quest.title}")
-                    
-        # Save changes
-        self.state_manager.save_current_game()
-        
-        return {
-            "success": True,
-            "hours_passed": hours,
-            "events": events
-        }
-
-    async def _handle_buy(
-        self,
-        current_state: SaveGameData,
-        player_id: str,
-        data: dict
-    ) -> Dict[str, Any]:
-        """Handle buying an item."""
-        shop_id = data.get("shop_id")
-        item_id = data.get("item_id")
-        quantity = data.get("quantity", 1)
-        
-        logger.info(f"Buy: {player_id} buying {quantity}x {item_id} from {shop_id}")
-        
-        # Find character
-        character = next((c for c in current_state.characters if c.id == player_id), None)
-        if not character:
-            return {"success": False, "error": "Character not found"}
-            
-        # Get Shop Data (Importing here to avoid circular imports if possible, or move to top)
-        from .modules.story_pkg.shop_handler import get_shop_inventory
-        try:
-            shop = get_shop_inventory(shop_id)
-        except ValueError:
-            return {"success": False, "error": "Shop not found"}
-            
-        shop_item = shop["inventory"].get(item_id)
-        if not shop_item:
-            return {"success": False, "error": "Item not in shop"}
-            
-        if shop_item["quantity"] < quantity:
-            return {"success": False, "error": "Not enough stock"}
-            
-        cost = shop_item["price"] * quantity
-        
-        # Check funds
-        # Ensure inventory exists
-        if not character.inventory: character.inventory = {}
-        current_gold = character.inventory.get("currency", 0)
-        
-        if current_gold < cost:
-            return {"success": False, "error": "Not enough gold"}
-            
-        # Transaction
-        character.inventory["currency"] = current_gold - cost
-        shop_item["quantity"] -= quantity
-        
-        # Add item
-        # If it's gear, it goes to 'carried_gear' usually? 
-        # The schema says 'inventory' is Dict[str, Any]. 
-        # Let's assume flat structure or nested 'carried_gear' depending on usage.
-        # ShopScreen expects `char_context.inventory['carried_gear']`.
-        # So we should respect that structure.
-        
-        if "carried_gear" not in character.inventory:
-            character.inventory["carried_gear"] = {}
-            
-        character.inventory["carried_gear"][item_id] = character.inventory["carried_gear"].get(item_id, 0) + quantity
-        
-        self.state_manager.save_current_game()
+        character = character.model_copy(update={"inventory": inventory})
+        self.state_manager.apply_state_change(
+            assoc_in(current_state, ("characters", player_id), character), label=f"buy:{player_id}"
+        )
         
         await self.event_bus.publish("action.buy", {
             "player_id": player_id,
@@ -1021,11 +915,9 @@ class Orchestrator:
         except ValueError:
             return {"success": False, "error": "Shop not found"}
             
-        # Check player inventory
-        if not character.inventory: character.inventory = {}
-        
         # Check carried gear
-        carried = character.inventory.get("carried_gear", {})
+        inventory = dict(character.inventory or {})
+        carried = dict(inventory.get("carried_gear") or {})
         if item_id not in carried or carried[item_id] < quantity:
             return {"success": False, "error": "Item not in inventory"}
             
@@ -1044,13 +936,16 @@ class Orchestrator:
         if carried[item_id] <= 0:
             del carried[item_id]
             
-        current_gold = character.inventory.get("currency", 0)
-        character.inventory["currency"] = current_gold + total_value
+        inventory["carried_gear"] = carried
+        inventory["currency"] = inventory.get("currency", 0) + total_value
         
         # Shop gets item? (Optional, maybe shop has infinite space or we add it)
         # For now, items just vanish into the economy.
         
-        self.state_manager.save_current_game()
+        character = character.model_copy(update={"inventory": inventory})
+        self.state_manager.apply_state_change(
+            assoc_in(current_state, ("characters", player_id), character), label=f"sell:{player_id}"
+        )
         
         await self.event_bus.publish("action.sell", {
             "player_id": player_id,
@@ -1091,7 +986,7 @@ class Orchestrator:
         if self.campaign_director:
             # Check pacing
             if self.campaign_director.check_pacing(state):
-                beat = self.campaign_director.generate_next_beat(state)
+                beat = await self.campaign_director.generate_next_beat_async(state)
                 if beat:
                     # Add new quest to state
                     from .modules.save_schemas import QuestSave
@@ -1103,11 +998,11 @@ class Orchestrator:
                         objectives=[{"text": obj, "completed": False} for obj in beat.get("objectives", [])],
                         rewards={"xp": 100, "gold": 50} # Simplified
                     )
-                    state.quests.append(new_quest)
+                    state = state.model_copy(update={"quests": [*state.quests, new_quest]})
                     events.append(f"New Quest: {new_quest.title}")
                     
         # Save changes
-        self.state_manager.save_current_game()
+        self.state_manager.apply_state_change(state, label=f"advance_time:{hours}h")
         
         return {
             "success": True,
@@ -1155,203 +1050,12 @@ class Orchestrator:
             if new_pos:
                 char = self.state_manager.get_active_player()
                 if char and char.id == player_id:
-                    char.position_x = new_pos[0]
-                    char.position_y = new_pos[1]
-            return {"success": False, "error": "Not enough gold"}
-            
-        # Transaction
-        character.inventory["currency"] = current_gold - cost
-        shop_item["quantity"] -= quantity
-        
-        # Add item
-        # If it's gear, it goes to 'carried_gear' usually? 
-        # The schema says 'inventory' is Dict[str, Any]. 
-        # Let's assume flat structure or nested 'carried_gear' depending on usage.
-        # ShopScreen expects `char_context.inventory['carried_gear']`.
-        # So we should respect that structure.
-        
-        if "carried_gear" not in character.inventory:
-            character.inventory["carried_gear"] = {}
-            
-        character.inventory["carried_gear"][item_id] = character.inventory["carried_gear"].get(item_id, 0) + quantity
-        
-        self.state_manager.save_current_game()
-        
-        await self.event_bus.publish("action.buy", {
-            "player_id": player_id,
-            "shop_id": shop_id,
-            "item_id": item_id,
-            "quantity": quantity,
-            "cost": cost
-        })
-        
-        return {
-            "success": True,
-            "message": f"Bought {quantity}x {item_id}",
-            "character": character
-        }
-
-    async def _handle_sell(
-        self,
-        current_state: SaveGameData,
-        player_id: str,
-        data: dict
-    ) -> Dict[str, Any]:
-        """Handle selling an item."""
-        shop_id = data.get("shop_id")
-        item_id = data.get("item_id")
-        quantity = data.get("quantity", 1)
-        
-        logger.info(f"Sell: {player_id} selling {quantity}x {item_id} to {shop_id}")
-        
-        # Find character
-        character = next((c for c in current_state.characters if c.id == player_id), None)
-        if not character:
-            return {"success": False, "error": "Character not found"}
-            
-        # Get Shop Data
-        from .modules.story_pkg.shop_handler import get_shop_inventory
-        try:
-            shop = get_shop_inventory(shop_id)
-        except ValueError:
-            return {"success": False, "error": "Shop not found"}
-            
-        # Check player inventory
-        if not character.inventory: character.inventory = {}
-        
-        # Check carried gear
-        carried = character.inventory.get("carried_gear", {})
-        if item_id not in carried or carried[item_id] < quantity:
-            return {"success": False, "error": "Item not in inventory"}
-            
-        # Calculate value (simplified: 50% of buy price)
-        # We need item data to know price.
-        # For now, let's assume we can get it from shop if they sell it, or rule engine.
-        # Fallback: 10 gold per item if unknown.
-        
-        shop_item = shop["inventory"].get(item_id)
-        base_price = shop_item["price"] if shop_item else 20
-        sell_price = int(base_price * 0.5)
-        total_value = sell_price * quantity
-        
-        # Transaction
-        carried[item_id] -= quantity
-        if carried[item_id] <= 0:
-            del carried[item_id]
-            
-        current_gold = character.inventory.get("currency", 0)
-        character.inventory["currency"] = current_gold + total_value
-        
-        # Shop gets item? (Optional, maybe shop has infinite space or we add it)
-        # For now, items just vanish into the economy.
-        
-        self.state_manager.save_current_game()
-        
-        await self.event_bus.publish("action.sell", {
-            "player_id": player_id,
-            "shop_id": shop_id,
-            "item_id": item_id,
-            "quantity": quantity,
-            "value": total_value
-        })
-        
-        return {
-            "success": True,
-            "message": f"Sold {quantity}x {item_id} for {total_value} gold",
-            "character": character
-        }
-
-    # -------------------------------------------------------------------------
-    # Time & Simulation
-    # -------------------------------------------------------------------------
-
-    async def advance_time(self, hours: int = 8) -> Dict[str, Any]:
-        """
-        Advances game time, triggering world simulation and story checks.
-        """
-        logger.info(f"Advancing time by {hours} hours...")
-        
-        state = self.state_manager.current_state
-        if not state:
-            return {"success": False, "error": "No active game state"}
-            
-        events = []
-        
-        # 1. Run World Simulation
-        if self.world_sim:
-            sim_events = self.world_sim.process_turn(state)
-            events.extend(sim_events)
-            
-        # 2. Run Story Director
-        if self.campaign_director:
-            # Check pacing
-            if self.campaign_director.check_pacing(state):
-                beat = self.campaign_director.generate_next_beat(state)
-                if beat:
-                    # Add new quest to state
-                    from .modules.save_schemas import QuestSave
-                    new_quest = QuestSave(
-                        id=f"quest_{len(state.quests) + 1}",
-                        title=beat.get("title", "Unknown Quest"),
-                        description=beat.get("description", ""),
-                        status="active",
-                        objectives=[{"text": obj, "completed": False} for obj in beat.get("objectives", [])],
-                        rewards={"xp": 100, "gold": 50} # Simplified
+                    self.state_manager.update_state(
+                        ("characters", player_id),
+                        lambda c: c.model_copy(update={"position_x": new_pos[0], "position_y": new_pos[1]}),
+                        auto_save=False,
+                        label=f"move:{player_id}"
                     )
-                    state.quests.append(new_quest)
-                    events.append(f"New Quest: {new_quest.title}")
-                    
-        # Save changes
-        self.state_manager.save_current_game()
-        
-        return {
-            "success": True,
-            "hours_passed": hours,
-            "events": events
-        }
-
-    async def _on_player_action(self, topic: str, payload: Dict[str, Any]) -> None:
-        """
-        Listens for 'player_action' events from the Map Core (or other modules).
-        Triggers the AI DM to interpret the action and generate a response/tool call.
-        """
-        logger.info(f"[Orchestrator] Received player_action: {payload.get('action_type')} from {payload.get('player_id')}")
-        
-        # In a real implementation, we would call the AI DM service here.
-        # For now, we'll just log it or maybe trigger a placeholder response.
-        # The next step (AI Tools) will implement the actual logic in llm_service.py
-        
-        # Example:
-        # response = await ai_client.process_action(payload)
-        # await self.event_bus.publish("ai_response", response)
-        pass
-
-    def register_listeners(self):
-        """Register internal listeners."""
-        self.event_bus.subscribe("player_action", self._on_player_action)
-
-    # -------------------------------------------------------------------------
-    # Public API for Frontend
-    # -------------------------------------------------------------------------
-
-    async def handle_player_move(self, player_id: str, x: int, y: int) -> Dict[str, Any]:
-        """
-        Public API for frontend to request player movement.
-        Delegates to map_pkg.core.process_move.
-        """
-        # Import here to avoid circular dependency at top level if necessary
-        from .modules.map_pkg import core as map_core
-        # Call the map core logic
-        result = await map_core.process_move(player_id, x, y)
-        
-        if result.get("success"):
-            # Update local state
-            new_pos = result.get("new_position")
-            if new_pos:
-                char = self.state_manager.get_active_player()
-                if char and char.id == player_id:
-                    char.position_x = new_pos[0]
-                    char.position_y = new_pos[1]
                     logger.info(f"Updated character {char.name} position to {new_pos}")
             
         return result
@@ -50,11 +50,14 @@ def safe_update(target: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
 import functools
 from typing import Callable
 
+from .storage import current_session
+
 def with_db_session(session_factory):
     """
     Decorator to inject a database session into a function.
     
     If 'db' is already present in kwargs, it is used.
+    Inside a storage.session_scope(), the scope's session for this database is used.
     Otherwise, a new session is created from session_factory and closed after execution.
     """
     def decorator(func: Callable):
@@ -64,6 +67,12 @@ def with_db_session(session_factory):
             if "db" in kwargs and kwargs["db"] is not None:
                 return func(*args, **kwargs)
             
+            # Join the enclosing request/action scope; it owns commit and close
+            scoped = current_session(session_factory)
+            if scoped is not None:
+                kwargs["db"] = scoped
+                return func(*args, **kwargs)
+            
             # Otherwise, create a new session
             db = session_factory()
             try:
@@ -0,0 +1,221 @@
+"""
+Storage layer shared by the per-module SQLite databases.
+
+character_pkg, world_pkg, story_pkg and simulation_pkg each keep their own
+SQLite file, but they all build their engine through this module so that:
+
+- every connection gets the same pragmas (WAL journaling, relaxed fsync,
+  a larger page cache, in-memory temp tables, a busy timeout)
+- modules sharing a file (world + simulation) share one engine and pool
+- connections are pooled and checked out per thread instead of reopened
+
+`session_scope()` opens a request/action scope. Inside it, functions
+decorated with `shared.with_db_session` join the scope's session for their
+database instead of opening and closing their own; the scope commits once
+on exit (or rolls back on error). The crud helpers' own `db.commit()` calls
+only flush while a scope owns the session. With `attach=True` the module
+databases are ATTACHed to one connection so cross-module work shares a
+single session and transaction.
+
+A scope belongs to the thread that opened it. Worker threads (including
+`asyncio.to_thread`, which copies the context) do not join it and open
+their own sessions, since a Session must not be shared between threads.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger("monolith.storage")
+
+# Applied to every new DBAPI connection
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),   # Safe with WAL; fsync only at checkpoints
+    ("cache_size", "-16000"),    # 16 MB page cache per connection
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", "5000"),    # ms to wait on a locked database
+)
+POOL_SIZE = 8
+MAX_OVERFLOW = 8
+
+# The attached connection uses this database as "main"
+_ATTACH_MAIN = "world"
+
+_engines: Dict[str, Engine] = {}
+_databases: Dict[str, Path] = {}
+_attached_engine: Optional[Engine] = None
+_attached_sessions: Optional[sessionmaker] = None
+_registry_lock = threading.Lock()
+
+_current_scope: ContextVar[Optional["_Scope"]] = ContextVar("monolith_storage_scope", default=None)
+
+
+def _apply_pragmas(dbapi_connection, attach: Dict[str, Path]):
+    cursor = dbapi_connection.cursor()
+    try:
+        for schema, path in attach.items():
+            cursor.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+        # journal_mode is per database file, so set it on each attached one too
+        for schema in attach:
+            cursor.execute(f"PRAGMA {schema}.journal_mode=WAL")
+    finally:
+        cursor.close()
+
+
+def _build_engine(db_path: Path, attach: Optional[Dict[str, Path]] = None) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, attach or {})
+
+    return engine
+
+
+def get_engine(name: str, db_path: Path) -> Engine:
+    """Return the shared engine for a database file, creating it on first use.
+
+    Args:
+        name: Logical database name (used as the ATTACH schema name)
+        db_path: Path to the SQLite file
+
+    Returns:
+        Engine configured with the shared pragmas and pool settings
+    """
+    key = str(Path(db_path).resolve())
+    with _registry_lock:
+        if key not in _engines:
+            _engines[key] = _build_engine(Path(db_path))
+            logger.info(f"Storage: opened '{name}' database at {db_path}")
+        _databases[name] = Path(db_path).resolve()
+        return _engines[key]
+
+
+def get_attached_sessionmaker() -> sessionmaker:
+    """Session factory for one connection with every module database ATTACHed.
+
+    The world database is "main"; the others are attached under their
+    registered names. Table names are unique across the module databases, so
+    unqualified ORM queries resolve to the right file.
+    """
+    global _attached_engine, _attached_sessions
+    with _registry_lock:
+        if _attached_sessions is None:
+            main_path = _databases[_ATTACH_MAIN]
+            attach: Dict[str, Path] = {}
+            for name, path in _databases.items():
+                # Modules sharing a file (world + simulation) are attached once
+                if path != main_path and path not in attach.values():
+                    attach[name] = path
+            _attached_engine = _build_engine(main_path, attach)
+            _attached_sessions = sessionmaker(autocommit=False, autoflush=False, bind=_attached_engine)
+        return _attached_sessions
+
+
+def _bind_of(session_factory: Any) -> Any:
+    kw = getattr(session_factory, "kw", None)
+    return kw.get("bind", session_factory) if kw else session_factory
+
+
+class ScopeSession(Session):
+    """Session owned by a session_scope(): `commit()` only flushes, the scope commits on exit."""
+
+    def commit(self) -> None:
+        self.flush()
+
+    def commit_scope(self) -> None:
+        super().commit()
+
+
+class _Scope:
+    """Sessions opened inside one session_scope(), keyed by engine."""
+
+    def __init__(self, attach: bool):
+        self.attach = attach
+        self.thread = threading.get_ident()
+        self.closed = False
+        self.sessions: Dict[Any, Session] = {}
+
+    def session_for(self, session_factory) -> Session:
+        bind = _bind_of(session_factory)
+        if self.attach and bind in _engines.values():
+            key, factory = "attached", get_attached_sessionmaker()
+        else:
+            key, factory = bind, session_factory
+        if key not in self.sessions:
+            kw = getattr(factory, "kw", None)
+            self.sessions[key] = ScopeSession(**kw) if kw is not None else factory()
+        return self.sessions[key]
+
+    def rollback(self) -> None:
+        for session in self.sessions.values():
+            session.rollback()
+
+
+def _active_scope() -> Optional[_Scope]:
+    scope = _current_scope.get()
+    # The context is copied into worker threads and into tasks started inside the
+    # scope; threads must not use this thread's sessions, and tasks that outlive
+    # the scope get their own sessions (its commit has already happened)
+    if scope is None or scope.closed or scope.thread != threading.get_ident():
+        return None
+    return scope
+
+
+def current_session(session_factory) -> Optional[Session]:
+    """Return the active scope's session for this factory's database, if a scope is open."""
+    scope = _active_scope()
+    return scope.session_for(session_factory) if scope else None
+
+
+def rollback_scope() -> None:
+    """Discard everything written in the active scope so far; the scope stays open."""
+    scope = _active_scope()
+    if scope is not None:
+        scope.rollback()
+
+
+@contextmanager
+def session_scope(attach: bool = False) -> Iterator[None]:
+    """Share sessions across every with_db_session call made inside the block.
+
+    Nested scopes join the outermost one. Sessions are created lazily, so a
+    scope that touches no database costs nothing.
+
+    Args:
+        attach: Run all module databases on one ATTACHed connection so the
+            whole scope is a single transaction. Note that SQLite only
+            guarantees per-file atomicity for attached WAL databases.
+    """
+    if _active_scope() is not None:
+        yield
+        return
+
+    scope = _Scope(attach)
+    token = _current_scope.set(scope)
+    try:
+        yield
+        for session in scope.sessions.values():
+            session.commit_scope()
+    except BaseException:
+        scope.rollback()
+        raise
+    finally:
+        scope.closed = True
+        _current_scope.reset(token)
+        for session in scope.sessions.values():
+            session.close()
@@ -0,0 +1,78 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from monolith.modules import save_manager
+from monolith.modules.autosave import AutosaveService
+from monolith.modules.save_schemas import SaveGameData, CharacterSave
+
+
+def _make_state(hp: int = 10) -> SaveGameData:
+    return SaveGameData(
+        characters=[CharacterSave(id="char_1", name="Tester", current_hp=hp, max_hp=10)],
+        factions=[], regions=[], locations=[], npcs=[], items=[],
+        traps=[], campaigns=[], quests=[]
+    )
+
+
+class TestAutosaveService(unittest.TestCase):
+    def setUp(self):
+        self.save_dir = Path(tempfile.mkdtemp())
+        self.patcher = patch.object(save_manager, "SAVE_DIR", self.save_dir)
+        self.patcher.start()
+        self.writes = []
+
+        def counting_writer(save_file, snapshot):
+            self.writes.append(save_file.save_name)
+            return save_manager.write_save_file(save_file, snapshot)
+
+        self.service = AutosaveService(debounce_seconds=0.05, writer=counting_writer)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.patcher.stop()
+        shutil.rmtree(self.save_dir, ignore_errors=True)
+
+    def test_request_returns_before_write(self):
+        result = self.service.request_save(_make_state(), "slot_a")
+        self.assertTrue(result["success"])
+        self.assertTrue(result["queued"])
+        self.assertTrue(result["path"].endswith("slot_a.json"))
+
+    def test_burst_is_coalesced_into_one_write(self):
+        for hp in range(1, 6):
+            self.service.request_save(_make_state(hp), "slot_a")
+        results = self.service.flush()
+
+        self.assertEqual(self.writes, ["slot_a"])
+        self.assertTrue(results["slot_a"]["success"])
+        saved = json.loads((self.save_dir / "slot_a.json").read_text(encoding="utf-8"))
+        self.assertEqual(saved["data"]["characters"][0]["current_hp"], 5)
+
+    def test_snapshot_is_isolated_from_later_mutation(self):
+        state = _make_state(7)
+        self.service.request_save(state, "slot_a")
+        state.characters[0].current_hp = 1
+        self.service.flush()
+
+        saved = json.loads((self.save_dir / "slot_a.json").read_text(encoding="utf-8"))
+        self.assertEqual(saved["data"]["characters"][0]["current_hp"], 7)
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        self.service.request_save(_make_state(), "slot_a")
+        self.service.flush()
+        names = [p.name for p in self.save_dir.iterdir() if p.name != save_manager.INDEX_FILENAME]
+        self.assertEqual(names, ["slot_a.json"])
+
+    def test_shutdown_flushes_pending(self):
+        self.service.debounce_seconds = 60
+        self.service.request_save(_make_state(), "slot_b")
+        self.service.shutdown()
+        self.assertTrue((self.save_dir / "slot_b.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from monolith.modules.ai_dm_pkg.batch_content_generator import BatchContentPipeline
+from monolith.modules.ai_dm_pkg.llm_client import AsyncLLMClient
+from monolith.modules.ai_dm_pkg.llm_service import LLMService
+from monolith.modules.world_pkg import database as world_db
+from monolith.modules.world_pkg import models, snapshots
+
+LINES = {"lines": ["Well met.", "Mind the road.", "Coin first.", "Off with you."]}
+
+
+class _ScriptedClient(AsyncLLMClient):
+    backend = "scripted"
+
+    def __init__(self):
+        super().__init__(model="test", backoff=0.01, max_concurrency=16)
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def _complete(self, prompt, config, timeout):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if "Name: Broken" in prompt:
+            return "Dark."  # too short: rejected
+        if "dialogue lines" in prompt:
+            return json.dumps(LINES)
+        return "A quiet place where the wind carries old songs."
+
+
+class TestBatchContentPipeline(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        world_db.Base.metadata.create_all(bind=self.engine)
+        self.updates = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE"):
+                self.updates.append(len(parameters) if executemany else 1)
+
+        db = sessionmaker(bind=self.engine)()
+        db.add(models.Region(id=1, name="Vale"))
+        for i in range(1, 11):
+            db.add(models.Location(id=i, name="Broken" if i == 4 else f"Glade {i}", region_id=1,
+                                   tags=["forest"], exits={}))
+        db.add(models.Location(id=11, name="Inn", region_id=1, tags=[], exits={}, description="Warm."))
+        db.add(models.NpcInstance(id=1, template_id="goblin_raider", location_id=1,
+                                  ai_annotations={"mood": "surly"}))
+        db.add(models.NpcInstance(id=2, template_id="guard", name_override="Bram", location_id=2,
+                                  ai_annotations={"canned_dialogue": ["Halt."]}))
+        db.commit()
+        db.close()
+
+        self.service = LLMService()
+        self.service.model = _ScriptedClient()
+        self.service.cache = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = Path(self.tmp.name) / "checkpoint.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        self.engine.dispose()
+        snapshots.bump_world_epoch()
+
+    def _pipeline(self, **kwargs):
+        kwargs = {"page_size": 4, "batch_size": 2, "concurrency": 3, **kwargs}
+        return BatchContentPipeline(engine=self.engine, service=self.service,
+                                    checkpoint_path=self.checkpoint, **kwargs)
+
+    def _descriptions(self):
+        with self.engine.connect() as conn:
+            return dict(conn.execute(models.Location.__table__.select().with_only_columns(
+                models.Location.id, models.Location.description)).all())
+
+    def test_generates_concurrently_and_writes_in_batches(self):
+        key = snapshots.cache_key(1)
+        report = asyncio.run(self._pipeline().run(["location", "npc"]))
+
+        self.assertEqual(self.service.model.peak, 3)
+        self.assertEqual((report["location"]["generated"], report["location"]["failed"]), (9, 1))
+        self.assertEqual(report["location"]["written"], 9)
+        self.assertGreater(report["location"]["items_per_s"], 0)
+        self.assertGreater(report["location"]["prompt_tokens"], 0)
+        # Batches of up to 2 rows per UPDATE, never one statement per entity for full batches
+        self.assertEqual(sum(self.updates), 10)
+        self.assertLess(len(self.updates), 10)
+
+        descriptions = self._descriptions()
+        self.assertIsNone(descriptions[4])
+        self.assertEqual(descriptions[11], "Warm.")
+        self.assertTrue(all(descriptions[i].startswith("A quiet place") for i in (1, 2, 3, 5, 10)))
+        self.assertGreater(snapshots.cache_key(1), key)
+
+        # Existing annotations are kept; NPCs that already have dialogue are skipped
+        self.assertEqual(report["npc"]["generated"], 1)
+        with self.engine.connect() as conn:
+            annotations = dict(conn.execute(models.NpcInstance.__table__.select().with_only_columns(
+                models.NpcInstance.id, models.NpcInstance.ai_annotations)).all())
+        self.assertEqual(annotations[1], {"mood": "surly", "canned_dialogue": LINES["lines"]})
+        self.assertEqual(annotations[2], {"canned_dialogue": ["Halt."]})
+
+        state = json.loads(self.checkpoint.read_text())
+        self.assertEqual(state["location"], {"after_id": 10, "failed": [4]})
+
+    def test_resumes_from_the_checkpoint(self):
+        asyncio.run(self._pipeline().run(["location"], limit=4))
+        self.assertEqual(self.service.model.calls, 4)
+        self.assertEqual(json.loads(self.checkpoint.read_text())["location"]["after_id"], 4)
+
+        # A new run (e.g. after a crash) picks up after the last page
+        report = asyncio.run(self._pipeline().run(["location"]))
+        self.assertEqual(report["location"]["generated"], 6)
+        self.assertEqual(self.service.model.calls, 10)
+
+        # Nothing left to do; a restart only retries what still needs content
+        self.assertEqual(asyncio.run(self._pipeline().run(["location"]))["location"]["generated"], 0)
+        pipeline = self._pipeline()
+        pipeline.checkpoint.reset()
+        report = asyncio.run(pipeline.run(["location"]))
+        self.assertEqual((report["location"]["generated"], report["location"]["failed"]), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from monolith.modules.character_pkg.database import Base
+from monolith.modules.character_pkg import context_cache, crud, models, services
+
+
+class TestCharacterContextCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(models.Character(
+            id="ctx_char", name="Cached", kingdom="Test", level=1,
+            stats={"Might": 10, "Vitality": 8}, skills={}, max_hp=20, current_hp=20,
+            max_composure=10, current_composure=10, resource_pools={},
+            talents=[], abilities=[], inventory={}, equipment={}, status_effects=[], injuries=[],
+            position_x=1, position_y=1
+        ))
+        self.db.commit()
+        self.character = self.db.get(models.Character, "ctx_char")
+
+    def tearDown(self):
+        self.db.close()
+        context_cache.clear()
+
+    def test_unchanged_reads_return_cached_context(self):
+        first = services.get_character_context(self.character)
+        self.assertIs(services.get_character_context(self.character), first)
+        self.assertIs(context_cache.get_cached("ctx_char"), first)
+
+    def test_write_refreshes_context(self):
+        services.get_character_context(self.character)
+        crud.apply_damage_to_character(self.db, self.character, 5)
+        self.assertIsNone(context_cache.get_cached("ctx_char"))
+        self.assertEqual(services.get_character_context(self.character).current_hp, 15)
+
+    def test_status_change_only_recomputes_temp_modifiers(self):
+        services.get_character_context(self.character)
+        with patch.object(services, "get_talent_modifiers", wraps=services.get_talent_modifiers) as talents, \
+                patch.object(services, "get_passive_modifiers", wraps=services.get_passive_modifiers) as equipment:
+            crud.apply_status_to_character(self.db, self.character, "TempDebuff_Might_-2_1")
+            context = services.get_character_context(self.character)
+
+        self.assertEqual(context.stats["Might"], 8)
+        talents.assert_not_called()
+        equipment.assert_not_called()
+
+    def test_unflushed_edits_bypass_cache(self):
+        cached = services.get_character_context(self.character)
+        self.character.current_hp = 3
+        fresh = services.get_character_context(self.character)
+        self.assertIsNot(fresh, cached)
+        self.assertEqual(fresh.current_hp, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
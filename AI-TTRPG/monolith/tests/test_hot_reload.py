@@ -0,0 +1,115 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from monolith.modules.hot_reload import HotReloader, publish_ruleset
+from monolith.modules.map_pkg import data_loader as map_loader
+from monolith.modules.rules_pkg import data_loader
+from monolith.modules.rules_pkg.ruleset import DATA_DIR, get_ruleset, load_ruleset, pin_ruleset
+
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.rules_dir = self.tmp / "rules"
+        self.map_dir = self.tmp / "map"
+        shutil.copytree(DATA_DIR, self.rules_dir)
+        shutil.copytree(map_loader.DATA_DIR, self.map_dir)
+
+        self.original = get_ruleset()
+        publish_ruleset(load_ruleset(self.rules_dir))
+        self.addCleanup(self._restore_map_data)  # runs after the DATA_DIR patch is undone
+        patcher = mock.patch.object(map_loader, "DATA_DIR", str(self.map_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reloader = HotReloader(rules_dir=self.rules_dir)
+
+    def tearDown(self):
+        publish_ruleset(self.original)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _restore_map_data(self):
+        with mock.patch("builtins.print"):
+            map_loader.load_data()
+
+    def _edit_status_effects(self, name="Dazzled"):
+        path = self.rules_dir / "status_effects.json"
+        effects = json.loads(path.read_text(encoding="utf-8"))
+        effects[name] = {"name": name, "description": "Test", "effects": []}
+        path.write_text(json.dumps(effects), encoding="utf-8")
+
+    def test_poll_reloads_only_changed_indexes(self):
+        before = get_ruleset()
+        self._edit_status_effects()
+
+        self.assertIsNone(self.reloader.poll())  # waits one poll for the file to settle
+        result = self.reloader.poll()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["rules"]["rebuilt"], ["status_effects", "statuses"])
+        after = get_ruleset()
+        self.assertIsNotNone(after.get_status("Dazzled"))
+        self.assertIsNone(before.get_status("Dazzled"))
+        self.assertIs(after.abilities, before.abilities)
+        self.assertIs(after.talent_data, before.talent_data)
+        self.assertIs(data_loader.STATUS_EFFECTS, after.status_effects)
+        self.assertIsNone(self.reloader.poll())
+
+    def test_pinned_action_keeps_its_version(self):
+        with pin_ruleset() as pinned:
+            self._edit_status_effects()
+            self.assertTrue(self.reloader.reload()["success"])
+            self.assertIs(get_ruleset(), pinned)
+            self.assertIsNone(get_ruleset().get_status("Dazzled"))
+            self.assertIs(data_loader.STATUS_EFFECTS, pinned.status_effects)
+            self.assertNotIn("Dazzled", data_loader.STATUS_EFFECTS)
+        self.assertIsNotNone(get_ruleset().get_status("Dazzled"))
+        self.assertIn("Dazzled", data_loader.STATUS_EFFECTS)
+
+    def test_invalid_file_is_rejected(self):
+        live = get_ruleset()
+        (self.rules_dir / "talents.json").write_text("{ not json", encoding="utf-8")
+
+        result = self.reloader.reload()
+        self.assertFalse(result["success"])
+        self.assertEqual(result["rules"]["files"], ["talents.json"])
+        self.assertIs(get_ruleset(), live)
+
+        # A rejected version is not retried until the file changes again
+        self.reloader.poll()
+        self.assertIsNone(self.reloader.poll())
+
+    def test_map_config_is_swapped(self):
+        old_algorithms = map_loader.GENERATION_ALGORITHMS
+        path = self.map_dir / "generation_algorithms.json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["algorithms"] = data["algorithms"][:1]
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+        with mock.patch("builtins.print"):
+            result = self.reloader.reload()
+
+        self.assertTrue(result["map"]["success"])
+        self.assertIsNone(result["rules"])
+        self.assertEqual(len(map_loader.GENERATION_ALGORITHMS), 1)
+        self.assertGreater(len(old_algorithms), 1)
+
+    def test_pinned_action_keeps_its_map_config(self):
+        path = self.map_dir / "generation_algorithms.json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["algorithms"] = data["algorithms"][:1]
+
+        with map_loader.pin_data():
+            before = map_loader.GENERATION_ALGORITHMS
+            path.write_text(json.dumps(data), encoding="utf-8")
+            with mock.patch("builtins.print"):
+                self.assertTrue(self.reloader.reload()["map"]["success"])
+            self.assertIs(map_loader.GENERATION_ALGORITHMS, before)
+        self.assertEqual(len(map_loader.GENERATION_ALGORITHMS), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
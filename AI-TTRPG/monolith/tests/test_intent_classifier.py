@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from monolith.modules import ai_dm, story
+from monolith.modules.ai_dm_pkg.benchmark import benchmark_classifier
+from monolith.modules.ai_dm_pkg.keyword_handler import classify_intent, match_intents
+
+
+class TestIntentClassifier(unittest.TestCase):
+    def test_word_boundaries_and_case(self):
+        self.assertEqual(classify_intent("I HIT the troll").intent_type, "combat_action")
+        for prompt in ("I hitch a ride", "She is asking around", "a checkered past", "I dance"):
+            self.assertEqual(classify_intent(prompt).intent_type, "narrative_request", prompt)
+            self.assertFalse(classify_intent(prompt).is_deterministic, prompt)
+        self.assertEqual(classify_intent("talk   to\tBram").payload["matched_phrase"], "talk to")
+
+    def test_every_intent_is_returned_in_priority_order(self):
+        intent = classify_intent("I ask the guard for directions, then attack the bandit")
+        self.assertEqual(intent.intent_type, "combat_action")
+        self.assertEqual(intent.action_tags, ["combat_action", "dialogue_action"])
+        self.assertEqual([(m.phrase, m.target) for m in intent.matches], [("attack", "bandit"), ("ask", "guard")])
+
+        # The longest phrase wins at a position
+        self.assertEqual(classify_intent("look at myself").intent_type, "self_status")
+        self.assertEqual(classify_intent("look at the map").intent_type, "inspect_item")
+
+    def test_arguments(self):
+        self.assertEqual(classify_intent("Buy 2 small health potions and leave").payload, {
+            "matched_phrase": "buy", "target": "small health potions", "target_id": "item_health_potion_small",
+            "quantity": 2})
+        self.assertEqual(classify_intent("sell my ropes").payload["target_id"], "item_rope")
+        self.assertEqual(classify_intent("Can I talk to the old hermit about the war?").payload["target"], "old hermit")
+        self.assertEqual(classify_intent("examine door").payload["target"], "door")
+        # Only targets naming an item or NPC template get an id
+        self.assertNotIn("target_id", classify_intent("examine door").payload)
+        self.assertEqual(classify_intent("What is the hit chance against the orc?").payload["target"], "chance")
+        self.assertEqual(classify_intent("look at the map on the wall").payload["target"], "map")
+        self.assertNotIn("target", classify_intent("I attack it").payload)
+        self.assertEqual([m.target for m in match_intents("strike, then fight")], [None, None])
+
+
+class TestDeterministicRouting(unittest.TestCase):
+    CHAR = {"name": "Ash", "current_hp": 7, "max_hp": 10, "status_effects": []}
+    LOC = {"description": "A damp cellar.", "npcs": [{"template_id": "rat"}], "items": []}
+
+    def setUp(self):
+        patcher = mock.patch.object(ai_dm, "_narration_context", return_value=(self.CHAR, self.LOC, None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_state_queries_skip_the_llm(self):
+        with mock.patch.object(ai_dm, "get_narrative_response") as llm:
+            looked = story.handle_narrative_prompt("hero", "I look around")
+            checked = story.handle_narrative_prompt("hero", "check self")
+        llm.assert_not_called()
+        self.assertEqual(looked["message"], "A damp cellar.\nYou see rat.")
+        self.assertEqual(looked["intent"]["type"], "look_around")
+        self.assertIn("7/10 HP", checked["message"])
+
+    def test_routed_actions_carry_their_arguments(self):
+        routed = story.handle_narrative_prompt("hero", "I attack the Goblin Scout")
+        self.assertIn("attack goblin scout", routed["message"])
+        self.assertEqual(routed["intent"]["target_id"], "goblin_scout")
+
+    def test_async_prompts_await_the_ai_dm(self):
+        with mock.patch.object(ai_dm, "get_narrative_response") as blocking, \
+                mock.patch.object(ai_dm, "_mark_narrated"), \
+                mock.patch.object(ai_dm.llm_handler, "generate_dm_response_async",
+                                  new=mock.AsyncMock(return_value="You dance.")), \
+                mock.patch.object(story, "get_orchestrator") as orchestrator:
+            orchestrator.return_value.should_ai_be_called.return_value = True
+            result = asyncio.run(story.ahandle_narrative_prompt("hero", "I dance a jig"))
+        blocking.assert_not_called()
+        self.assertEqual(result, {"success": True, "message": "You dance."})
+
+    def test_bus_prompts_use_the_async_path(self):
+        published = []
+
+        async def publish(topic, payload):
+            published.append((topic, payload))
+
+        with mock.patch.object(story, "handle_narrative_prompt") as blocking, \
+                mock.patch.object(story, "ahandle_narrative_prompt",
+                                  new=mock.AsyncMock(return_value={"success": True, "message": "You dance."})), \
+                mock.patch.object(story, "get_event_bus") as bus:
+            bus.return_value.publish = publish
+            asyncio.run(story._on_command_narrative_prompt(
+                "command.story.narrative_prompt", {"actor_id": "hero", "prompt_text": "I dance", "request_id": "r1"}))
+            story.ahandle_narrative_prompt.assert_awaited_once_with("hero", "I dance")
+        blocking.assert_not_called()
+        self.assertEqual(published, [("story.narrative_response", {
+            "request_id": "r1", "actor_id": "hero", "success": True, "message": "You dance."})])
+
+
+class TestClassifierBenchmark(unittest.TestCase):
+    def test_compiled_classifier_beats_the_per_phrase_scan(self):
+        report = benchmark_classifier(rounds=30)
+        self.assertLess(report["compiled_us"], report["legacy_us"])
+
+
+if __name__ == "__main__":
+    unittest.main()
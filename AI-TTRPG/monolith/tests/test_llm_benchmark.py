@@ -0,0 +1,75 @@
+import asyncio
+import json
+import time
+import unittest
+
+import httpx
+
+from monolith.modules.ai_dm_pkg.benchmark import SCENARIOS, format_report, percentile, run_benchmark
+from monolith.modules.ai_dm_pkg.llm_client import OllamaClient
+from monolith.modules.ai_dm_pkg.stub_llm import StubLLMServer, tokenize
+
+
+class TestStubLLMServer(unittest.TestCase):
+    def _server(self, **kwargs):
+        server = StubLLMServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        client = OllamaClient(model="stub", base_url=server.url, timeout=5.0, backoff=0.01)
+        self.addCleanup(client.close)
+        return server, client
+
+    def test_plain_and_streamed_responses(self):
+        server, client = self._server(rules=[("weather", "Rain, request {request}, {prompt_chars} chars.")])
+        self.assertEqual(client.generate_content("weather?").text, "Rain, request 1, 8 chars.")
+
+        async def collect():
+            return [chunk async for chunk in client.stream("more weather")]
+
+        self.assertEqual(asyncio.run(collect()), ["Rain, ", "request ", "2, ", "12 ", "chars."])
+        self.assertEqual(server.stats(), {"requests": 2, "streamed": 1, "max_in_flight": 1, "prompt_chars": [8, 12]})
+
+    def test_default_rules_answer_the_ai_dm_prompts_with_json(self):
+        server, _ = self._server()
+        flavor = json.loads(server.respond('{"environment_description": "string"}', 3))
+        self.assertIn("stub #3", flavor["environment_description"])
+        self.assertEqual(json.loads(server.respond('Respond in JSON {"message": "..."}'))["success"], True)
+        self.assertEqual(len(json.loads(server.respond("Available Tools:\n{}"))["tool_calls"]), 2)
+        self.assertIn("(request 5)", server.respond("Hello", 5))
+
+    def test_simulated_latency_and_token_rate(self):
+        server, client = self._server(latency=0.1, tokens_per_s=50, rules=[("", "one two three four five")])
+        started = time.perf_counter()
+        client.generate_content("x")
+        # 0.1s to the first token, then 5 tokens at 50/s
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+        self.assertEqual(len(tokenize("one two three four five")), 5)
+
+    def test_protocol_errors(self):
+        server, _ = self._server()
+        self.assertEqual(httpx.post(f"{server.url}/api/chat", json={}).status_code, 404)
+        self.assertEqual(httpx.post(f"{server.url}/api/generate", json={"model": "stub"}).status_code, 400)
+        reply = httpx.post(f"{server.url}/api/generate", json={"prompt": "hi", "stream": False}).json()
+        self.assertEqual((reply["done"], reply["eval_count"]), (True, len(tokenize(reply["response"]))))
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3, 6, 7, 8, 9, 10]
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile([7], 95)), (5, 10, 7))
+
+    def test_every_scenario_runs_offline(self):
+        report = run_benchmark(iterations=4, concurrency=2)
+        self.assertEqual(set(report), set(SCENARIOS))
+        for name, row in report.items():
+            self.assertEqual(row["errors"], 0, name)
+            self.assertLessEqual(row["p50_ms"], row["p95_ms"])
+            self.assertGreater(row["prompt_tokens_mean"], 0, name)
+        # The tool calls plus one narration of their results
+        self.assertEqual(report["player_action"]["llm_requests"], 8)
+        self.assertEqual(report["dm_response"]["llm_requests"], 4)
+        self.assertIn("first_text_p50_ms", report["dm_stream"])
+        self.assertIn("player_action", format_report(report))
+
+
+if __name__ == "__main__":
+    unittest.main()
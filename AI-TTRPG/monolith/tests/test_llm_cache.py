@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from monolith.modules.ai_dm_pkg import llm_cache
+from monolith.modules.ai_dm_pkg.llm_cache import LLMResponseCache, make_key
+from monolith.modules.ai_dm_pkg.llm_service import LLMService, OllamaClient
+
+FLAVOR = """{"environment_description": "Mist.", "visuals": ["Fog"], "sounds": [], "smells": [],
+"combat_hits": [], "combat_misses": [], "spell_casts": [], "enemy_intros": []}"""
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.path = self.tmp / "llm.sqlite3"
+
+    def _cache(self, **kwargs):
+        cache = LLMResponseCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_persists_across_instances(self):
+        key = make_key("Describe the gate.", "ollama/llama3")
+        self._cache().put(key, "A rusted gate.", "narrative")
+        cache = self._cache()
+        self.assertEqual(cache.get(key, "narrative"), "A rusted gate.")
+        self.assertEqual(cache.stats()["bytes"], len("A rusted gate."))
+
+    def test_key_ignores_layout_but_not_model_or_config(self):
+        key = make_key("Line one\n    Line two\n", "gemini/flash", {"a": 1, "b": 2})
+        self.assertEqual(key, make_key("  Line one\n\nLine two", "gemini/flash", {"b": 2, "a": 1}))
+        self.assertNotEqual(key, make_key("Line one\nLine 2", "gemini/flash", {"a": 1, "b": 2}))
+        self.assertNotEqual(key, make_key("Line one\nLine two", "ollama/llama3", {"a": 1, "b": 2}))
+        self.assertNotEqual(key, make_key("Line one\nLine two", "gemini/flash"))
+
+    def test_entries_expire_per_category(self):
+        cache = self._cache(ttls={"narrative": 60, "map_flavor": 3600})
+        cache.put("n", "reply", "narrative")
+        cache.put("m", "flavor", "map_flavor")
+        later = llm_cache.time.time() + 120
+        with mock.patch.object(llm_cache.time, "time", return_value=later):
+            self.assertIsNone(cache.get("n", "narrative"))
+            self.assertEqual(cache.get("m", "map_flavor"), "flavor")
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["categories"]["narrative"]["expired"], 1)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = self._cache(max_bytes=25)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        self.assertEqual(cache.get("a"), "x" * 10)  # "b" is now the oldest
+        cache.put("c", "z" * 10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 10)
+        self.assertEqual(cache.get("c"), "z" * 10)
+        stats = cache.stats()
+        self.assertEqual(stats["bytes"], 20)
+        self.assertEqual(stats["categories"]["general"]["evicted"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+
+
+class TestLLMServiceCaching(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.service = LLMService()
+        self.service.model = OllamaClient(model="test-model")
+        self.service.cache = LLMResponseCache(Path(tmp) / "llm.sqlite3")
+        self.addCleanup(self.service.cache.close)
+
+    def _respond(self, *texts):
+        return mock.patch.object(
+            OllamaClient, "generate_content", side_effect=[SimpleNamespace(text=t) for t in texts])
+
+    def test_identical_generation_is_served_from_cache(self):
+        with self._respond(FLAVOR) as generate:
+            first = self.service.generate_map_flavor(["Forest", "dark"])
+            second = self.service.generate_map_flavor(["dark", "forest"])
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first["environment_description"], "Mist.")
+        self.assertEqual(self.service.cache.stats()["categories"]["map_flavor"]["hits"], 1)
+
+    def test_invalid_responses_are_not_cached(self):
+        with self._respond("{ not json", FLAVOR) as generate:
+            self.assertEqual(self.service.generate_map_flavor(["cave"]), self.service._get_fallback_flavor())
+            self.assertEqual(self.service.generate_map_flavor(["cave"])["environment_description"], "Mist.")
+        self.assertEqual(generate.call_count, 2)
+
+    def test_unidentified_models_and_opt_out_bypass_cache(self):
+        with self._respond("one", "two"):
+            self.assertEqual(self.service.generate("Roll?", use_cache=False), "one")
+            self.assertEqual(self.service.generate("Roll?", use_cache=False), "two")
+        self.service.model = mock.MagicMock()
+        self.service.model.generate_content.return_value = SimpleNamespace(text="three")
+        self.service.generate("Roll?")
+        self.assertEqual(self.service.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from monolith.modules.ai_dm_pkg.llm_client import LLMClientError, LLMTimeoutError, OllamaClient
+from monolith.modules.ai_dm_pkg.llm_service import LLMService
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    """Minimal /api/generate: answers "echo:<prompt>", streams it word by word."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status = server.failures.pop(0) if server.failures else 200
+        try:
+            time.sleep(server.delay)
+            if status != 200:
+                self._send(status, b'{"error": "busy"}')
+            elif body.get("stream"):
+                self._stream(body["prompt"].split())
+            else:
+                self._send(200, json.dumps({"response": f"echo:{body['prompt']}", "done": True}).encode())
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, words):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"response": w + " ", "done": False} for w in words] + [{"response": "", "done": True}]
+        for line in lines:
+            data = (json.dumps(line) + "\n").encode()
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class TestOllamaClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = self.server.requests = 0
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.failures = []
+        self.server.delay = 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = self._client()
+
+    def _client(self, **kwargs):
+        options = {"timeout": 5.0, "backoff": 0.01, **kwargs}
+        client = OllamaClient(model="stub", base_url=f"http://127.0.0.1:{self.server.server_port}", **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_sync_and_async_calls_share_pooled_connections(self):
+        self.assertEqual(self.client.generate_content("hello").text, "echo:hello")
+
+        async def calls():
+            return [await self.client.generate_async(f"p{i}") for i in range(4)]
+
+        self.assertEqual(asyncio.run(calls()), [f"echo:p{i}" for i in range(4)])
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_transient_errors_are_retried_and_others_are_not(self):
+        self.server.failures = [503, 429]
+        self.assertEqual(self.client.generate_content("again").text, "echo:again")
+        self.assertEqual(self.server.requests, 3)
+
+        self.server.failures = [400]
+        with self.assertRaises(LLMClientError):
+            self.client.generate_content("bad")
+        self.assertEqual(self.server.requests, 4)
+
+    def test_request_timeout(self):
+        self.server.delay = 0.5
+        client = self._client(timeout=0.1, max_retries=0)
+        started = time.monotonic()
+        with self.assertRaises(LLMTimeoutError):
+            asyncio.run(client.generate_async("slow"))
+        self.assertLess(time.monotonic() - started, 0.4)
+
+    def test_concurrency_limit(self):
+        self.server.delay = 0.05
+        client = self._client(max_concurrency=2)
+
+        async def burst():
+            return await asyncio.gather(*(client.generate_async(f"p{i}") for i in range(6)))
+
+        self.assertEqual(len(asyncio.run(burst())), 6)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_stream_yields_chunks(self):
+        async def collect():
+            return [chunk async for chunk in self.client.stream("the dark forest")]
+
+        self.assertEqual(asyncio.run(collect()), ["the ", "dark ", "forest "])
+
+    def test_service_does_not_block_the_event_loop(self):
+        self.server.delay = 0.3
+        service = LLMService()
+        service.model = self.client
+        service.cache = None
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            text = await service.agenerate("hello")
+            streamed = [chunk async for chunk in service.astream("a b")]
+            task.cancel()
+            return text, streamed, ticks
+
+        text, streamed, ticks = asyncio.run(scenario())
+        self.assertEqual((text, streamed), ("echo:hello", ["a ", "b "]))
+        self.assertGreater(ticks, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
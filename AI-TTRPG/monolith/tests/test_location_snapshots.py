@@ -0,0 +1,79 @@
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from monolith.modules.world_pkg import database as world_db
+from monolith.modules.world_pkg import crud, models, schemas, snapshots
+
+
+class TestLocationSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        world_db.Base.metadata.create_all(bind=self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            self.queries += 1
+
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        self.db.add(models.Region(id=1, name="Vale"))
+        self.db.add(models.Location(id=1, name="Clearing", region_id=1, tags=["forest"], exits={},
+                                    generated_map_data=[[0, 1], [1, 0]]))
+        self.db.add(models.NpcInstance(id=1, template_id="goblin", current_hp=5, max_hp=5,
+                                       status_effects=[], location_id=1))
+        self.db.add(models.ItemInstance(id=1, template_id="potion", quantity=1, location_id=1))
+        self.db.add(models.TrapInstance(id=1, template_id="spikes", location_id=1))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        snapshots.bump_world_epoch()
+
+    def test_context_is_plain_dicts_without_lazy_loads(self):
+        self.db.expunge_all()
+        self.queries = 0
+        ctx = crud.get_location_context(self.db, 1)
+
+        self.assertEqual(ctx["npcs"][0]["template_id"], "goblin")
+        self.assertEqual(ctx["items"][0]["template_id"], "potion")
+        self.assertEqual(ctx["trap_instances"][0]["template_id"], "spikes")
+        self.assertEqual(ctx["region_name"], "Vale")
+        # Location+region, NPCs, NPC items, ground items, traps
+        self.assertLessEqual(self.queries, 5)
+
+    def test_repeat_reads_hit_cache(self):
+        first = crud.get_location_context(self.db, 1)
+        self.queries = 0
+        second = crud.get_location_context(self.db, 1)
+        self.assertEqual(self.queries, 0)
+        self.assertEqual(first, second)
+
+    def test_writes_bump_version(self):
+        crud.get_location_context(self.db, 1)
+        crud.update_npc(self.db, 1, schemas.NpcUpdate(current_hp=2))
+        ctx = crud.get_location_context(self.db, 1)
+        self.assertEqual(ctx["npcs"][0]["current_hp"], 2)
+
+    def test_moving_an_npc_invalidates_both_locations(self):
+        self.db.add(models.Location(id=2, name="Cave", region_id=1, tags=[], exits={},
+                                    generated_map_data=[[0]]))
+        self.db.commit()
+        crud.get_location_context(self.db, 1)
+        crud.get_location_context(self.db, 2)
+
+        npc = self.db.get(models.NpcInstance, 1)
+        npc.location_id = 2
+        self.db.commit()
+
+        self.assertEqual(crud.get_location_context(self.db, 1)["npcs"], [])
+        self.assertEqual(len(crud.get_location_context(self.db, 2)["npcs"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
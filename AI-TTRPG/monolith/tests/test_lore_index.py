@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from monolith.modules import lore
+from monolith.modules.lore import LoreManager, chunk_text, estimate_tokens, get_lore_index
+
+
+class TestLoreIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        (self.tmp / "foundations.txt").write_text("The world shattered long ago.", encoding="utf-8")
+        (self.tmp / "Canopy_Clans.txt").write_text(
+            "Canopy Life\n\nThe clans live high in the great trees.\n\n"
+            "Rituals\n\nEvery clan sings to the forest spirits at dusk.", encoding="utf-8")
+        (self.tmp / "Economy.txt").write_text(
+            "Dragonstone\n\n" + " ".join(["Dragonstone powers every airship engine."] * 60), encoding="utf-8")
+
+    def test_index_is_shared_and_rebuilt_only_on_change(self):
+        index = get_lore_index(str(self.tmp))
+        builds = index.builds
+        with mock.patch("builtins.open", side_effect=AssertionError("lore file re-read")):
+            manager = LoreManager(str(self.tmp))
+            manager.get_lore_context(["forest"])
+        self.assertIs(manager.index, index)
+        self.assertEqual(index.builds, builds)
+
+        path = self.tmp / "Canopy_Clans.txt"
+        path.write_text("Canopy Life\n\nThe clans now live underground.", encoding="utf-8")
+        os.utime(path, ns=(1, 1))
+        self.assertIn("underground", manager.get_lore_context(["canopy"]))
+        self.assertEqual(index.builds, builds + 1)
+
+    def test_unreadable_files_are_retried_only_when_changed(self):
+        path = self.tmp / "Broken.txt"
+        path.write_bytes(b"Lost \xff\xfe tales")
+        index = lore.LoreIndex(self.tmp)
+        self.assertTrue(index.refresh())
+        self.assertNotIn("Broken.txt", index.texts)
+        self.assertFalse(index.refresh())
+        self.assertEqual(index.builds, 1)
+
+        path.write_text("Lost tales of the deep.", encoding="utf-8")
+        os.utime(path, ns=(1, 1))
+        self.assertTrue(index.refresh())
+        self.assertEqual(index.texts["Broken.txt"], "Lost tales of the deep.")
+
+    def test_ranks_passages_by_tags_and_query(self):
+        manager = LoreManager(str(self.tmp))
+        context = manager.get_lore_context(["jungle"], query="spirits at dusk", top_k=1)
+        self.assertIn("forest spirits", context)
+        self.assertNotIn("great trees", context)
+        self.assertNotIn("Dragonstone", context)
+
+    def test_context_fits_token_budget(self):
+        manager = LoreManager(str(self.tmp))
+        context = manager.get_lore_context(["economy"], query="airship engine", token_budget=250)
+        self.assertIn("Dragonstone", context)
+        self.assertLessEqual(estimate_tokens(context), 250)
+        self.assertGreater(len(chunk_text("Economy.txt", manager.lore_cache["Economy.txt"])), 1)
+
+    def test_no_match_falls_back_to_foundations(self):
+        manager = LoreManager(str(self.tmp))
+        self.assertIn("The world shattered", manager.get_lore_context(["nothing-here"]))
+        self.assertIn("The world shattered", manager.get_lore_context())
+
+    def test_default_directory_is_the_packaged_lore(self):
+        self.assertTrue((lore.DEFAULT_LORE_DIR / "foundations.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from monolith.modules.rules_pkg import rules_snapshot
+from monolith.modules.rules_pkg.mods import ModOverlay, main
+from monolith.modules.rules_pkg.ruleset import DATA_DIR, get_ruleset
+
+PUSH = "Control (External Movement)"  # Force branch holding "Minor Shove"
+
+
+def _write(directory: Path, filename: str, data) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / filename).write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestModOverlay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.base = get_ruleset()
+        self.out_dir = self.tmp / "compiled"
+        self.low = self.tmp / "low"
+        self.high = self.tmp / "high"
+
+        _write(self.low, "mod.json", {"name": "Low", "priority": 1})
+        _write(self.low, "abilities.json", {
+            "Force": {"branches": [{"branch": PUSH, "tiers": [{"name": "Minor Shove", "description": "Low"}]}]},
+            "Pyromancy": {"resource": "Heat", "associated_stat": "Logic", "branches": [
+                {"branch": "Flame", "tiers": [{"name": "Spark", "description": "A spark"}]}]},
+        })
+        _write(self.low, "status_effects.json", {"Dazzled": {"name": "Dazzled", "effects": []}})
+        _write(self.high, "mod.json", {"name": "High", "priority": 5})
+        _write(self.high, "abilities.json", {
+            "Force": {"branches": [{"branch": PUSH, "tiers": [{"name": "Minor Shove", "description": "High"}]}]},
+        })
+        _write(self.high, "talents.json", {"single_stat_mastery": [
+            {"stat": "Might", "talent_name": "Iron Grip", "score": 12, "effect": "Hold on.", "modifiers": []}]})
+
+    def _overlay(self, *dirs):
+        # Listed high first: priority decides, not the configured order
+        return ModOverlay(dirs or (self.high, self.low), DATA_DIR, self.out_dir)
+
+    def test_entries_merge_by_priority_and_conflicts_are_reported(self):
+        rules = self._overlay().load()
+
+        self.assertEqual(rules.mod_packs, ("Low", "High"))
+        self.assertEqual(rules.get_ability("Minor Shove")["description"], "High")
+        self.assertEqual(rules.get_ability("Spark")["_school_resource"], "Heat")
+        self.assertIsNotNone(rules.get_status("Dazzled"))
+        self.assertIsNotNone(rules.get_talent("Iron Grip"))
+        self.assertIn("Iron Grip", [t.name for t in rules.talent_index.eligible({"Might": 12}, {})])
+        self.assertEqual(len(rules.abilities), len(self.base.abilities) + 1)
+        self.assertEqual(len(rules.get_talent("Overpowering Presence")), len(self.base.get_talent("Overpowering Presence")))
+
+        self.assertEqual(rules.mod_conflicts, ({
+            "file": "abilities.json", "entry": f"Force/{PUSH}/Minor Shove", "packs": ["Low", "High"], "winner": "High",
+        },))
+        # The base RuleSet is not modified
+        self.assertNotEqual(self.base.get_ability("Minor Shove")["description"], "High")
+        self.assertIsNone(self.base.get_ability("Spark"))
+
+    def test_only_changed_packs_are_remerged(self):
+        overlay = self._overlay()
+        first = overlay.load()
+        _write(self.low, "status_effects.json", {"Blinded": {"name": "Blinded", "effects": []}})
+
+        with mock.patch.object(ModOverlay, "_merge", autospec=True, side_effect=ModOverlay._merge) as merge:
+            second, rebuilt = overlay.build()
+        self.assertEqual([call.args[1] for call in merge.call_args_list], ["status_effects"])
+        self.assertIn("status_effects", rebuilt)
+        self.assertNotIn("ability_data", rebuilt)
+        self.assertIs(second.ability_data, first.ability_data)
+        self.assertIsNotNone(second.get_status("Blinded"))
+        self.assertIsNone(second.get_status("Dazzled"))
+        self.assertIs(overlay.load(), second)
+
+    def test_merged_rules_are_cached_by_input_hash(self):
+        built = self._overlay().load()
+        with mock.patch.object(rules_snapshot, "load_compiled", side_effect=AssertionError("base reparsed")):
+            cached = self._overlay().load()
+        self.assertEqual(cached.source_hash, built.source_hash)
+        self.assertEqual(cached.mod_conflicts, built.mod_conflicts)
+        self.assertEqual(cached.summary(), built.summary())
+
+    def test_broken_pack_file_is_skipped_or_rejected(self):
+        (self.high / "talents.json").write_text("{ not json", encoding="utf-8")
+        overlay = self._overlay()
+        rules = overlay.load()
+        self.assertIsNone(rules.get_talent("Iron Grip"))
+        self.assertEqual([e["file"] for e in rules.load_errors], ["High/talents.json"])
+        with self.assertRaises(ValueError):
+            self._overlay().build(strict=True)
+
+    def test_report_cli(self):
+        with mock.patch("builtins.print") as printed:
+            self.assertEqual(main(["report", str(self.low), str(self.high)]), 0)
+        output = "\n".join(str(call.args[0]) for call in printed.call_args_list)
+        self.assertIn(f"Force/{PUSH}/Minor Shove", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import pickle
+import unittest
+
+from monolith.modules import rules
+from monolith.modules.rules_pkg.name_index import NameIndex
+from monolith.modules.rules_pkg.ruleset import get_ruleset
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.fireball = {"name": "Fireball"}
+        self.index = NameIndex([
+            (("Fireball",), self.fireball),
+            (("Fire Shield", "Flame Ward"), {"name": "Fire Shield"}),
+            (("Frost Bolt",), {"name": "Frost Bolt"}),
+            (("Fireball",), {"name": "Duplicate"}),
+        ])
+
+    def test_exact_alias_and_case_insensitive(self):
+        self.assertEqual(self.index.get("Fireball"), self.fireball)
+        self.assertEqual(self.index.get("  fireBALL "), self.fireball)
+        self.assertEqual(self.index.get("flame ward")["name"], "Fire Shield")
+        self.assertIsNone(self.index.get("Meteor"))
+        self.assertEqual(len(self.index), 4)
+
+    def test_results_are_read_only_views(self):
+        view = self.index.get("Fireball")
+        with self.assertRaises(TypeError):
+            view["name"] = "Changed"
+        self.fireball["cost"] = 3
+        self.assertEqual(view["cost"], 3)
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual(self.index.prefix("fir"), ["Fire Shield", "Fireball"])
+        self.assertEqual(self.index.prefix("fire s"), ["Fire Shield"])
+        self.assertEqual(self.index.fuzzy("Frost Blot"), ["Frost Bolt"])
+        self.assertEqual(self.index.search("shield"), ["Fire Shield"])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_rules_lookups(self):
+        rs = get_ruleset()
+        for name, talent in rs.talents.items():
+            self.assertEqual(rules.get_talent_details(name), talent)
+            self.assertEqual(rs.get_talent(name.lower()), talent)
+        for name, ability in rs.abilities.items():
+            self.assertEqual(rules.get_ability_data(name), ability)
+        nested = rs.talent_data["single_skill_mastery"]
+        skill_talent = next(iter(nested.values()))[0]["talents"][0]
+        name = skill_talent.get("talent_name") or skill_talent.get("name")
+        self.assertIn(name, rules.search_talents(name[:4], limit=50))
+
+        restored = pickle.loads(pickle.dumps(rs.ability_names))
+        self.assertEqual(restored.names(), rs.ability_names.names())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from monolith.event_bus import get_event_bus
+from monolith.modules import ai_dm
+from monolith.modules.ai_dm_pkg import llm_handler
+from monolith.modules.ai_dm_pkg.llm_client import AsyncLLMClient
+from monolith.modules.ai_dm_pkg.narration_stream import NARRATION_CHUNK, NARRATION_DONE, MessageExtractor
+
+
+class _ScriptedClient(AsyncLLMClient):
+    """Streams a fixed response in the given pieces."""
+    backend = "scripted"
+
+    def __init__(self, pieces):
+        super().__init__(model="test")
+        self.pieces = pieces
+
+    async def _chunks(self, prompt, config, timeout):
+        for piece in self.pieces:
+            await asyncio.sleep(0)
+            yield piece
+
+
+def _split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestMessageExtractor(unittest.TestCase):
+    def _feed(self, pieces):
+        extractor = MessageExtractor()
+        return "".join(extractor.feed(piece) for piece in pieces)
+
+    def test_decodes_message_across_any_chunk_boundary(self):
+        message = 'The "gate" creaks\\open.\nA chill — ❄ and 🐉 stir.\t/end'
+        response = json.dumps({"mood": "grim", "message": message, "tags": ["x"]})
+        for size in (1, 2, 3, 5, 7, len(response)):
+            self.assertEqual(self._feed(_split(response, size)), message, size)
+
+    def test_unicode_escapes(self):
+        response = json.dumps({"message": "Café 🐉"}, ensure_ascii=True)
+        self.assertEqual(self._feed(_split(response, 1)), "Café 🐉")
+
+    def test_fenced_json_and_plain_text(self):
+        self.assertEqual(self._feed(["```json\n{\"mess", "age\": \"Hi\"}\n```"]), "Hi")
+        self.assertEqual(self._feed(["The torch ", "gutters."]), "The torch gutters.")
+
+
+class TestStreamedNarration(unittest.TestCase):
+    RESPONSE = json.dumps({"success": True, "message": "Rain drums on the roof of the inn."})
+
+    def setUp(self):
+        for name, value in (("model", _ScriptedClient(_split(self.RESPONSE, 4))), ("cache", None)):
+            patcher = mock.patch.object(llm_handler.ai_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stream_dm_response_reports_text_as_it_arrives(self):
+        pieces = []
+
+        async def on_text(text):
+            pieces.append(text)
+
+        message = asyncio.run(llm_handler.stream_dm_response("Look around", {"name": "Ash"}, {"name": "Inn"}, on_text))
+        self.assertEqual(message, "Rain drums on the roof of the inn.")
+        self.assertGreater(len(pieces), 5)
+        self.assertEqual("".join(pieces), message)
+
+    def test_narration_events_on_the_bus(self):
+        bus = get_event_bus()
+        events = []
+
+        async def collect(topic, payload):
+            events.append((topic, payload))
+
+        async def scenario():
+            bus.subscribe(NARRATION_CHUNK, collect)
+            bus.subscribe(NARRATION_DONE, collect)
+            try:
+                result = await ai_dm.stream_narrative_response("char-1", "Look around", request_id="r1")
+                await asyncio.sleep(0.01)  # let the subscriber tasks run
+                return result
+            finally:
+                bus.unsubscribe(NARRATION_CHUNK, collect)
+                bus.unsubscribe(NARRATION_DONE, collect)
+
+        context = ({"name": "Ash"}, {"name": "Inn"}, None, None)
+        with mock.patch.object(ai_dm, "_narration_context", return_value=context), \
+                mock.patch.object(ai_dm, "_mark_narrated") as mark:
+            result = asyncio.run(scenario())
+
+        chunks = [payload["text"] for topic, payload in events if topic == NARRATION_CHUNK]
+        self.assertEqual("".join(chunks), result["message"])
+        self.assertEqual(events[-1], (NARRATION_DONE, result))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["request_id"], "r1")
+        self.assertLessEqual(result["first_text_ms"], result["total_ms"])
+        mark.assert_called_once_with("char-1", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import asyncio
+import time
+import unittest
+
+from monolith.event_bus import EventBus
+from monolith.modules.ai_dm_pkg.llm_client import AsyncLLMClient, speculative
+from monolith.modules.ai_dm_pkg.llm_service import LLMService
+from monolith.modules.ai_dm_pkg.prefetch import KINDS, PrefetchScheduler, predict_actions
+
+CHAR = {"name": "Ash", "position_x": 1, "position_y": 1}
+LOC = {
+    "name": "Crossroads",
+    # Wall to the north, open to the south, east and west
+    "generated_map_data": {"tiles": [[0, 1, 0], [0, 0, 0], [0, 0, 0]], "impassable": [1]},
+    "exits": {"east": 7},
+    "npcs": [
+        {"template_id": "old_hermit", "coordinates": [2, 2], "current_hp": 5},
+        {"template_id": "guard", "coordinates": [1, 0], "current_hp": 9},
+        {"template_id": "distant_rider", "coordinates": [40, 40], "current_hp": 9},
+        {"template_id": "dead_bandit", "coordinates": [1, 2], "current_hp": 0},
+        {"template_id": "peddler", "name_override": "Willow", "coordinates": [0, 0], "current_hp": 4,
+         "behavior_tags": ["merchant"]},
+    ],
+    "ai_annotations": {"bakery_door": {"type": "shop"}},
+}
+COMBAT = {"is_active": True, "participants": [
+    {"id": "p1", "name": "Ash", "team": "player", "hp": 10},
+    {"id": "e1", "name": "Goblin", "team": "enemy", "hp": 4},
+    {"id": "e2", "name": "Wolf", "team": "enemy", "hp": 0},
+]}
+
+
+class TestPredictions(unittest.TestCase):
+    def test_predicts_moves_npcs_shops_and_combat(self):
+        predictions = predict_actions(CHAR, LOC, COMBAT)
+        self.assertEqual(predictions, [
+            ("move", "I head south."), ("move", "I head east."), ("move", "I head west."),
+            ("move", "I take the east exit."),
+            ("npc", "I approach guard."),
+            ("npc", "I approach old hermit."),
+            ("npc", "I approach Willow."), ("shop", "I browse Willow's wares."),
+            ("shop", "I step into the bakery door."),
+            ("combat", "I charge Goblin."),
+        ])
+
+    def test_no_combat_predictions_without_an_encounter(self):
+        self.assertNotIn("combat", {kind for kind, _ in predict_actions(CHAR, LOC)})
+
+
+class _TimedClient(AsyncLLMClient):
+    backend = "timed"
+
+    def __init__(self, delays, **kwargs):
+        super().__init__(model="test", backoff=0.01, **kwargs)
+        self.delays = delays
+        self.finished = []
+
+    async def _complete(self, prompt, config, timeout):
+        await asyncio.sleep(self.delays.get(prompt, 0.05))
+        self.finished.append(prompt)
+        return prompt
+
+
+class TestRequestPriority(unittest.TestCase):
+    def test_interactive_requests_are_served_first(self):
+        client = _TimedClient({"a": 0.1}, max_concurrency=1)
+
+        async def scenario():
+            first = asyncio.create_task(client.generate_async("a"))
+            await asyncio.sleep(0.02)
+            with speculative():
+                later = asyncio.create_task(client.generate_async("s"))
+            await asyncio.sleep(0.02)
+            await asyncio.gather(first, later, client.generate_async("b"))
+
+        asyncio.run(scenario())
+        self.assertEqual(client.finished, ["a", "b", "s"])
+
+    def test_interactive_request_preempts_a_speculative_one(self):
+        client = _TimedClient({"slow": 2.0}, max_concurrency=1)
+
+        async def scenario():
+            with speculative():
+                background = asyncio.create_task(client.generate_async("slow"))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            text = await client.generate_async("now")
+            elapsed = time.monotonic() - started
+            with self.assertRaises(asyncio.CancelledError):
+                await background
+            return text, elapsed
+
+        text, elapsed = asyncio.run(scenario())
+        self.assertEqual(text, "now")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(client._slots.preempted, 1)
+
+    def test_joining_a_speculative_generation_makes_it_interactive(self):
+        service = LLMService()
+        service.model = _TimedClient({"p": 0.2}, max_concurrency=1)
+        service.cache = None
+
+        async def scenario():
+            with speculative():
+                prefetch = asyncio.create_task(service.agenerate("p"))
+            await asyncio.sleep(0.05)
+
+            async def read():
+                return [chunk async for chunk in service.astream("p")]
+
+            streamed = asyncio.create_task(read())
+            await asyncio.sleep(0.02)
+            other = await service.agenerate("q")
+            return await prefetch, await streamed, other
+
+        self.assertEqual(asyncio.run(scenario()), ("p", ["p"], "q"))
+        self.assertEqual(service.model.finished, ["p", "q"])
+        self.assertEqual(service.model._slots.preempted, 0)
+
+
+class TestPrefetchScheduler(unittest.TestCase):
+    def setUp(self):
+        self.generated = []
+        self.delay = 0.0
+        self.scheduler = PrefetchScheduler(generate=self._generate, kinds=KINDS, idle_delay=0, max_speculations=20)
+
+    async def _generate(self, prompt, char_context, loc_context, recent_changes=None):
+        await asyncio.sleep(self.delay)
+        self.generated.append(prompt)
+        return "narration"
+
+    def _attach(self):
+        bus = EventBus()
+        self.scheduler.attach(bus, lambda actor_id: (CHAR, LOC, actor_id, None))
+        return bus
+
+    def test_idle_time_generates_predictions_and_hits_are_counted(self):
+        async def scenario():
+            self._attach()
+            self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.1)
+            return self.scheduler.record_request("hero", "I head south. "), \
+                self.scheduler.record_request("hero", "i HEAD south."), \
+                self.scheduler.record_request("hero", "I dance a jig.")
+
+        hit, other_case, miss = asyncio.run(scenario())
+        self.assertEqual(self.generated, [prompt for _, prompt in predict_actions(CHAR, LOC)])
+        # Matched like the response cache key: trailing space ignored, case is not
+        self.assertEqual((hit, other_case, miss), (True, False, False))
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["requests"], stats["hits"], stats["hit_rate"]), (3, 1, 0.333))
+        self.assertEqual(stats["kinds"]["move"]["hits"], 1)
+        self.assertEqual(stats["kinds"]["move"]["generated"], 4)
+
+    def test_state_changes_cancel_stale_speculations(self):
+        self.delay = 0.2
+
+        async def scenario():
+            bus = self._attach()
+            self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.05)  # the first speculation is running
+            await bus.publish("combat.started", COMBAT)
+            self.delay = 0.0
+            await asyncio.sleep(0.1)  # replanned with the encounter
+            return self.scheduler.stats()["kinds"]
+
+        stale = asyncio.run(scenario())
+        self.assertEqual(stale["move"]["stale"], 4)
+        self.assertEqual(stale["npc"]["stale"], 3)
+        self.assertEqual(stale["combat"]["generated"], 1)
+        self.assertEqual(self.generated, [prompt for _, prompt in predict_actions(CHAR, LOC, COMBAT)])
+
+    def test_requests_interrupt_speculation(self):
+        self.delay = 0.2
+
+        async def scenario():
+            self._attach()
+            self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.05)
+            # The running speculation is the one asked for: it is kept, the rest is dropped
+            self.assertTrue(self.scheduler.record_request("hero", "I head south."))
+            await asyncio.sleep(0.3)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.generated, ["I head south."])
+        self.assertEqual(self.scheduler.stats()["pending"], 0)
+
+    def test_recent_requests_are_predicted_by_default(self):
+        self.scheduler = PrefetchScheduler(generate=self._generate, idle_delay=0)
+
+        async def scenario():
+            self._attach()
+            for prompt in ("I search the altar.", "I pray.", "I search the altar."):
+                self.scheduler.record_request("hero", prompt)
+                self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.1)
+            return self.scheduler.record_request("hero", "I pray.")
+
+        self.assertTrue(asyncio.run(scenario()))
+        # Most often sent first; no template predictions
+        self.assertEqual(self.generated, ["I search the altar.", "I pray."])
+
+    def test_kinds_below_the_hit_rate_are_gated(self):
+        self.scheduler = PrefetchScheduler(generate=self._generate, kinds=("move",), idle_delay=0,
+                                           min_hit_rate=0.5, probe_size=4)
+
+        async def scenario():
+            self._attach()
+            self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.1)
+            self.scheduler.narration_done("hero")
+            await asyncio.sleep(0.1)
+            return self.scheduler.stats()["kinds"]["move"]
+
+        move = asyncio.run(scenario())
+        self.assertEqual((move["generated"], move["hits"], move["gated"]), (4, 0, True))
+        self.assertEqual(len(self.generated), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from types import MappingProxyType
+from unittest import mock
+
+from monolith.modules.rules_pkg import rules_snapshot
+from monolith.modules.rules_pkg.ruleset import DATA_DIR, hash_sources
+from monolith.modules.rules_pkg.rules_snapshot import load_compiled, main, snapshot_path
+
+
+class TestRulesSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.data_dir = self.tmp / "data"
+        self.out_dir = self.tmp / "compiled"
+        shutil.copytree(DATA_DIR, self.data_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_second_load_uses_snapshot(self):
+        built = load_compiled(self.data_dir, self.out_dir)
+        self.assertTrue(snapshot_path(built.source_hash, self.out_dir).exists())
+
+        with mock.patch.object(rules_snapshot, "load_ruleset", side_effect=AssertionError("JSON reparsed")):
+            loaded = load_compiled(self.data_dir, self.out_dir)
+
+        self.assertEqual(loaded.summary(), built.summary())
+        self.assertEqual(loaded.talent_data, built.talent_data)
+        self.assertIsInstance(loaded.talents, MappingProxyType)
+        # Index entries still share identity with the raw documents
+        first = loaded.talent_data["single_stat_mastery"][0]
+        self.assertIs(loaded.talents[first["talent_name"]], first)
+
+    def test_changed_source_rebuilds(self):
+        old = load_compiled(self.data_dir, self.out_dir)
+        path = self.data_dir / "status_effects.json"
+        effects = json.loads(path.read_text(encoding="utf-8"))
+        effects["Dazzled"] = {"name": "Dazzled", "description": "Test", "effects": []}
+        path.write_text(json.dumps(effects), encoding="utf-8")
+
+        new = load_compiled(self.data_dir, self.out_dir)
+        self.assertNotEqual(new.source_hash, old.source_hash)
+        self.assertEqual(new.source_hash, hash_sources(self.data_dir))
+        self.assertIsNotNone(new.get_status("Dazzled"))
+
+    def test_corrupt_snapshot_falls_back(self):
+        built = load_compiled(self.data_dir, self.out_dir)
+        snapshot_path(built.source_hash, self.out_dir).write_bytes(b"SHRS garbage")
+        loaded = load_compiled(self.data_dir, self.out_dir)
+        self.assertEqual(loaded.summary(), built.summary())
+
+    def test_cli_build_and_check(self):
+        args = ["--data-dir", str(self.data_dir), "--out-dir", str(self.out_dir)]
+        with mock.patch("builtins.print"):
+            self.assertEqual(main(["check"] + args), 1)
+            self.assertEqual(main(["build"] + args), 0)
+            self.assertEqual(main(["check"] + args), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
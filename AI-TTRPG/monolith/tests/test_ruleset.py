@@ -0,0 +1,86 @@
+import dataclasses
+import unittest
+from unittest import mock
+
+from monolith.modules import rules
+from monolith.modules.rules_pkg import data_loader, ruleset
+from monolith.modules.rules_pkg.data_loader_enhanced import get_rules, load_and_validate_all
+from monolith.modules.rules_pkg.ruleset import get_ruleset, load_ruleset
+
+
+class TestRuleSet(unittest.TestCase):
+    def test_indexes_are_built(self):
+        rs = get_ruleset()
+        self.assertIn("Might", rs.stats_list)
+        self.assertTrue(rs.skills)
+        self.assertTrue(rs.abilities)
+        ability = next(iter(rs.abilities.values()))
+        self.assertIn("_school_name", ability)
+        self.assertEqual(rs.get_injury("Head", "Skull", 1), rs.injury_effects["Head"]["Skull"]["1"])
+        self.assertEqual(rs.load_errors, ())
+
+    def test_indexes_leave_the_raw_documents_alone(self):
+        rs = load_ruleset()
+        for school in rs.ability_data.values():
+            for branch in school.get("branches", []):
+                for tier in branch.get("tiers", []):
+                    self.assertNotIn("_school_name", tier)
+        # The name indexes hold the entries of the indexes they were built from
+        name = next(iter(rs.abilities))
+        self.assertEqual(rs.get_ability(name), rs.abilities[name])
+        self.assertIs(rs.ability_names._entries[name], rs.abilities[name])
+        for category in rs.talent_data.values():
+            for entry in category if isinstance(category, list) else []:
+                self.assertNotIn("_category", entry)
+        talent = next(iter(rs.talents))
+        self.assertIs(rs.talent_names._entries[talent], rs.talents[talent])
+
+    def test_nested_skill_mastery_talents_are_indexed(self):
+        rs = get_ruleset()
+        group = next(iter(rs.talent_data["single_skill_mastery"].values()))[0]
+        nested = group["talents"][0]
+        name = nested.get("talent_name") or nested.get("name")
+        self.assertEqual(rs.talents[name], {**nested, "_category": "single_skill_mastery"})
+        self.assertEqual(rs.get_talent(name), rs.talents[name])
+        self.assertEqual(rules.get_talent_details(name), rs.talents[name])
+        self.assertNotIn("_category", nested)
+
+    def test_is_immutable(self):
+        rs = get_ruleset()
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            rs.talent_data = {}
+        with self.assertRaises(TypeError):
+            rs.talents["New Talent"] = {}
+
+    def test_loaders_share_one_instance(self):
+        rs = get_ruleset()
+        data_loader.load_data()
+        load_and_validate_all()
+        container = get_rules()
+        self.assertIs(container.ruleset, rs)
+        self.assertIs(data_loader.TALENT_DATA, rs.talent_data)
+        self.assertIs(data_loader.ABILITY_MAP, rs.abilities)
+        self.assertIs(data_loader.STATUS_EFFECTS, container.status_effects)
+        self.assertIs(container.item_templates, rs.item_templates)
+
+    def test_lookups_never_read_files(self):
+        get_ruleset()
+        data_loader.load_data()
+        with mock.patch.object(ruleset, "_read_json", side_effect=AssertionError("rules file read")), \
+                mock.patch("builtins.open", side_effect=AssertionError("file opened")):
+            for key in ("talents", "all_skills", "stats_list", "injury_effects", "skill_mappings"):
+                self.assertTrue(rules._get_data(key), key)
+            rules.get_injury_effects("Torso", "major")
+            rules.get_ability_data(next(iter(get_ruleset().abilities)))
+            talents = rules.find_eligible_talents_api({"stats": {s: 20 for s in get_ruleset().stats_list}, "skills": {}})
+            self.assertTrue(talents)
+            data_loader.load_data()
+
+    def test_fresh_load_matches_shared(self):
+        rs = load_ruleset()
+        self.assertIsNot(rs, get_ruleset())
+        self.assertEqual(rs.summary(), get_ruleset().summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
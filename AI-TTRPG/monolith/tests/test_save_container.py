@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from monolith.modules import save_manager, save_container
+from monolith.modules.save_schemas import SaveGameData, CharacterSave, LocationSave, RegionSave
+
+
+def _make_state() -> SaveGameData:
+    locations = [
+        LocationSave(
+            id=loc_id, name=f"Loc {loc_id}", tags=["forest"], exits={}, region_id=1,
+            generated_map_data=[[(x + y + loc_id) % 7 for x in range(40)] for y in range(30)]
+        )
+        for loc_id in (1, 2, 3)
+    ]
+    # A location whose map is not an int grid must survive as plain JSON
+    locations.append(LocationSave(id=4, name="Odd", tags=[], exits={}, region_id=1,
+                                  generated_map_data={"layers": [[1, 2]]}))
+    return SaveGameData(
+        characters=[CharacterSave(id="char_1", name="Tester", current_location_id=2)],
+        factions=[], regions=[RegionSave(id=1, name="Vale")], locations=locations,
+        npcs=[], items=[], traps=[], campaigns=[], quests=[]
+    )
+
+
+class TestSaveContainer(unittest.TestCase):
+    def setUp(self):
+        self.save_dir = Path(tempfile.mkdtemp())
+        self.patcher = patch.object(save_manager, "SAVE_DIR", self.save_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.save_dir, ignore_errors=True)
+
+    def _save_binary(self, state):
+        save_file = save_manager.build_save_file(state, "bin_slot")
+        return save_manager.write_save_file(save_file, save_manager.snapshot_save_file(save_file, "binary"))
+
+    def test_round_trip_matches_json(self):
+        state = _make_state()
+        result = self._save_binary(state)
+        self.assertTrue(result["success"])
+        self.assertTrue(result["path"].endswith(".sav"))
+
+        loaded = save_manager.load_game("bin_slot")
+        self.assertTrue(loaded["success"], loaded.get("error"))
+        self.assertEqual(loaded["save_file"].data.model_dump(), state.model_dump())
+
+    def test_only_current_location_is_decoded_eagerly(self):
+        self._save_binary(_make_state())
+        data = save_manager.load_game("bin_slot")["save_file"].data
+
+        self.assertIsInstance(data.locations, save_container.LazyList)
+        self.assertEqual(data.locations.loaded_count, 1)
+        self.assertEqual(data.locations[2].id, 3)
+        self.assertEqual(data.locations.loaded_count, 2)
+
+    def test_resaving_a_loaded_game_keeps_locations_lazy(self):
+        self._save_binary(_make_state())
+        data = save_manager.load_game("bin_slot")["save_file"].data
+
+        summary = save_manager.build_save_summary(data, "char_1")
+        self.assertEqual(summary["location"], {"id": 2, "name": "Loc 2"})
+        self.assertEqual(data.locations.loaded_count, 1)
+
+    def test_binary_is_smaller_than_json(self):
+        state = _make_state()
+        self._save_binary(state)
+        binary_size = (self.save_dir / "bin_slot.sav").stat().st_size
+        json_size = len(state.model_dump_json(indent=2))
+        self.assertLess(binary_size * 10, json_size)
+
+    def test_header_is_readable_without_sections(self):
+        self._save_binary(_make_state())
+        header = save_container.read_header_from_file(self.save_dir / "bin_slot.sav")
+        self.assertEqual(header["active_character_name"], "Tester")
+        self.assertEqual(header["current_location_id"], 2)
+
+    def test_json_saves_still_load(self):
+        state = _make_state()
+        save_manager.save_game(state, "json_slot")
+        loaded = save_manager.load_game("json_slot")
+        self.assertTrue(loaded["success"])
+        self.assertEqual(len(loaded["save_file"].data.locations), 4)
+
+    def test_writing_one_format_removes_the_other(self):
+        state = _make_state()
+        save_manager.save_game(state, "bin_slot")
+        self._save_binary(state)
+        names = sorted(p.name for p in self.save_dir.iterdir() if p.name != save_manager.INDEX_FILENAME)
+        self.assertEqual(names, ["bin_slot.sav"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from monolith.modules import save_manager, save_api
+from monolith.modules.save_schemas import SaveGameData, CharacterSave, LocationSave
+
+
+def _make_state() -> SaveGameData:
+    return SaveGameData(
+        characters=[
+            CharacterSave(id="char_1", name="Aria", level=3, current_location_id=1),
+            CharacterSave(id="char_2", name="Bram", level=2, current_location_id=1),
+        ],
+        factions=[], regions=[],
+        locations=[LocationSave(id=1, name="Clearing", tags=[], exits={}, region_id=1)],
+        npcs=[], items=[], traps=[], campaigns=[], quests=[]
+    )
+
+
+class TestSaveIndex(unittest.TestCase):
+    def setUp(self):
+        self.save_dir = Path(tempfile.mkdtemp())
+        self.char_dir = Path(tempfile.mkdtemp())
+        self.patchers = [
+            patch.object(save_manager, "SAVE_DIR", self.save_dir),
+            patch.object(save_manager, "CHARACTER_DIR", self.char_dir),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        shutil.rmtree(self.save_dir, ignore_errors=True)
+        shutil.rmtree(self.char_dir, ignore_errors=True)
+
+    def test_scan_uses_index_without_reading_saves(self):
+        save_manager.save_game(_make_state(), "slot_a")
+        self.assertTrue((self.save_dir / save_manager.INDEX_FILENAME).exists())
+
+        with patch.object(save_manager, "read_save_metadata", side_effect=AssertionError("file was read")):
+            saves = save_manager.scan_saves()
+
+        self.assertEqual(len(saves), 1)
+        self.assertEqual(saves[0]["name"], "slot_a")
+        self.assertEqual(saves[0]["summary"]["party"], [{"name": "Aria", "level": 3}, {"name": "Bram", "level": 2}])
+        self.assertEqual(saves[0]["summary"]["location"], {"id": 1, "name": "Clearing"})
+
+    def test_stale_entry_is_rebuilt_from_file(self):
+        save_manager.save_game(_make_state(), "slot_a")
+        path = self.save_dir / "slot_a.json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["active_character_name"] = "Edited"
+        data.pop("summary")
+        path.write_text(json.dumps(data), encoding="utf-8")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10_000_000))
+
+        saves = save_manager.scan_saves()
+        self.assertEqual(saves[0]["active_character"], "Edited")
+        self.assertEqual(saves[0]["summary"]["location"]["name"], "Clearing")
+
+    def test_delete_removes_index_entry(self):
+        save_manager.save_game(_make_state(), "slot_a")
+        save_manager.delete_save("slot_a")
+        index = json.loads((self.save_dir / save_manager.INDEX_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(index["entries"], {})
+        self.assertEqual(save_manager.scan_saves(), [])
+
+    def test_list_save_games_reports_summary(self):
+        save_manager.save_game(_make_state(), "slot_a")
+        listed = save_api.list_save_games()
+        self.assertEqual(listed[0]["char"], "Aria")
+        self.assertEqual(listed[0]["summary"]["party"][0]["level"], 3)
+
+    def test_scan_characters_uses_index(self):
+        save_manager.save_character_to_json(CharacterSave(id="c9", name="Cora", level=4, kingdom="Vale"))
+        with patch.object(save_manager, "_read_character_metadata", side_effect=AssertionError("file was read")):
+            characters = save_manager.scan_characters()
+        self.assertEqual(characters[0]["name"], "Cora")
+        self.assertEqual(characters[0]["level"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from monolith.modules.ai_dm_pkg.llm_service import LLMService, OllamaClient
+from monolith.modules.ai_dm_pkg.single_flight import SingleFlight
+
+FLAVOR = """{"environment_description": "Mist.", "visuals": ["Fog"], "sounds": [], "smells": [],
+"combat_hits": [], "combat_misses": [], "spell_casts": [], "enemy_intros": []}"""
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = 0
+        self.cancelled = threading.Event()
+
+    async def _generate(self, result="text", delay=0.05):
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def test_concurrent_callers_share_one_generation(self):
+        async def burst():
+            return await asyncio.gather(*(self.flights.run("k", self._generate) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(burst()), ["text"] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flights.stats(), {"in_flight": 0, "started": 1, "joined": 4, "abandoned": 0})
+
+        # Finished flights are not reused: the next call generates again
+        asyncio.run(self.flights.run("k", self._generate))
+        self.assertEqual(self.calls, 2)
+
+    def test_errors_reach_every_waiter(self):
+        async def burst():
+            return await asyncio.gather(
+                *(self.flights.run("k", lambda: self._generate(ValueError("bad"))) for _ in range(3)),
+                return_exceptions=True)
+
+        results = asyncio.run(burst())
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    def test_generation_survives_until_the_last_waiter_cancels(self):
+        async def scenario():
+            first = asyncio.create_task(self.flights.run("k", lambda: self._generate(delay=0.2)))
+            second = asyncio.create_task(self.flights.run("k", lambda: self._generate(delay=0.2)))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            result = await second
+            self.assertTrue(first.cancelled())
+            return result
+
+        self.assertEqual(asyncio.run(scenario()), "text")
+        self.assertFalse(self.cancelled.is_set())
+
+        async def abandon():
+            waiters = [asyncio.create_task(self.flights.run("k", lambda: self._generate(delay=5))) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+        asyncio.run(abandon())
+        self.assertTrue(self.cancelled.wait(1))
+        self.assertEqual(self.flights.stats()["abandoned"], 1)
+        self.assertEqual(self.flights.stats()["in_flight"], 0)
+
+    def test_blocking_callers_share_one_call(self):
+        def fn():
+            self.calls += 1
+            time.sleep(0.1)
+            return "text"
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: self.flights.run_sync("k", fn), range(4)))
+        self.assertEqual(results, ["text"] * 4)
+        self.assertEqual(self.calls, 1)
+
+
+class TestLLMServiceSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.service = LLMService()
+        self.service.model = OllamaClient(model="test-model")
+        self.service.cache = None  # deduplication does not depend on the response cache
+
+    def test_identical_map_flavor_requests_are_sent_once(self):
+        def slow_response(*args, **kwargs):
+            time.sleep(0.1)
+            return SimpleNamespace(text=FLAVOR)
+
+        with mock.patch.object(OllamaClient, "generate_content", side_effect=slow_response) as generate:
+            with ThreadPoolExecutor(3) as pool:
+                results = list(pool.map(self.service.generate_map_flavor, [["Forest", "dark"], ["dark", "forest"], ["forest", "Dark"]]))
+        self.assertEqual(generate.call_count, 1)
+        self.assertTrue(all(r["environment_description"] == "Mist." for r in results))
+
+    def test_concurrent_agenerate_and_opt_out(self):
+        async def respond(prompt, config=None):
+            await asyncio.sleep(0.05)
+            return f"echo:{prompt}"
+
+        async def burst(use_cache):
+            return await asyncio.gather(*(self.service.agenerate("Roll?", use_cache=use_cache) for _ in range(3)))
+
+        with mock.patch.object(OllamaClient, "generate_async", side_effect=respond) as generate:
+            self.assertEqual(asyncio.run(burst(True)), ["echo:Roll?"] * 3)
+            self.assertEqual(generate.call_count, 1)
+            asyncio.run(burst(False))
+            self.assertEqual(generate.call_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from monolith.modules import ai_dm
+from monolith.modules import character as character_api
+
+from monolith.modules.save_container import LazyList
+from monolith.modules.save_schemas import CharacterSave, LocationSave, SaveGameData
+from monolith.modules.state_history import StateHistory, assoc_in, diff_states, dissoc_in, get_in, update_in
+from monolith.orchestrator import GameStateManager
+
+
+def _make_state(lazy_locations=False):
+    characters = [
+        CharacterSave(id=f"player_{i}", name=f"Hero {i}", max_hp=20, current_hp=20,
+                      inventory={"currency": 10, "carried_gear": {"rope": 1}}, equipment={})
+        for i in range(3)
+    ]
+    locations = [
+        LocationSave(id=i, name=f"Loc {i}", tags=[], exits={}, region_id=1,
+                     generated_map_data=[[0] * 20 for _ in range(20)])
+        for i in range(1, 4)
+    ]
+    state = SaveGameData(characters=characters, factions=[], regions=[], locations=locations,
+                         npcs=[], items=[], traps=[], campaigns=[], quests=[])
+    if lazy_locations:
+        # Same shape as a binary save: locations decoded on first access
+        by_id = {loc.id: loc for loc in locations}
+        state = state.model_copy(update={"locations": LazyList(list(by_id), by_id.__getitem__)})
+    return state
+
+
+class TestPathCopying(unittest.TestCase):
+    def test_update_copies_only_the_path(self):
+        state = _make_state()
+        new = assoc_in(state, ("characters", "player_1", "inventory", "currency"), 4)
+
+        self.assertEqual(get_in(state, ("characters", "player_1", "inventory", "currency")), 10)
+        self.assertEqual(get_in(new, ("characters", "player_1", "inventory", "currency")), 4)
+        self.assertIsNot(new.characters, state.characters)
+        self.assertIs(new.characters[0], state.characters[0])
+        self.assertIs(new.characters[1].inventory["carried_gear"], state.characters[1].inventory["carried_gear"])
+        self.assertIs(new.locations, state.locations)
+
+    def test_lazy_locations_stay_undecoded(self):
+        state = _make_state(lazy_locations=True)
+        new = update_in(state, ("locations", 2, "name"), lambda name: name + " (burned)")
+
+        # Only the edited location is decoded; the other two stay packed in both states
+        self.assertEqual(new.locations.loaded_count, 1)
+        self.assertEqual(state.locations.loaded_count, 1)
+        self.assertEqual(diff_states(state, new), {("locations", 2, "name"): ("Loc 2", "Loc 2 (burned)")})
+
+    def test_diff_and_dissoc(self):
+        state = _make_state()
+        new = dissoc_in(state, ("characters", "player_2", "inventory", "carried_gear", "rope"))
+        new = assoc_in(new, ("characters", "player_0", "current_hp"), 15)
+
+        self.assertEqual(diff_states(state, new), {
+            ("characters", "player_0", "current_hp"): (20, 15),
+            ("characters", "player_2", "inventory", "carried_gear", "rope"): (1, None),
+        })
+        self.assertEqual(diff_states(new, new), {})
+
+
+class TestStateHistory(unittest.TestCase):
+    def test_ring_is_bounded_and_rewinds(self):
+        history = StateHistory(capacity=3)
+        state = _make_state()
+        history.reset(state)
+        for hp in (19, 18, 17, 16):
+            state = assoc_in(state, ("characters", "player_0", "current_hp"), hp)
+            history.record(state, f"hp {hp}")
+
+        self.assertEqual([s.label for s in history.snapshots()], ["hp 18", "hp 17", "hp 16"])
+        self.assertEqual(history.rewind(5).label, "hp 18")
+        self.assertEqual(history.redo().label, "hp 17")
+        self.assertIsNone(history.rewind_to(1))
+
+    def test_manager_undo_and_marks(self):
+        manager = GameStateManager(history=StateHistory())
+        manager.load_state(_make_state())
+        manager.history.mark("narrated")
+        manager.update_state(("characters", "player_0", "current_hp"), lambda hp: hp - 5, auto_save=False)
+
+        before, after = manager.history.character_since("player_0", "narrated")
+        self.assertEqual((before.current_hp, after.current_hp), (20, 15))
+        self.assertEqual(list(manager.history.diff_since("narrated")), [("characters", "player_0", "current_hp")])
+
+        manager.undo(auto_save=False)
+        self.assertEqual(manager.get_active_player().current_hp, 20)
+        manager.redo(auto_save=False)
+        self.assertEqual(manager.get_active_player().current_hp, 15)
+
+    def test_combat_writes_reach_the_narration_diff(self):
+        manager = GameStateManager(history=StateHistory())
+        manager.load_state(_make_state())
+        manager.history.mark("narrated:player_1")
+        # What the character row looks like after combat_handler applied damage and a status
+        db_char = SimpleNamespace(id="1", current_hp=12, temp_hp=0, current_composure=10, resource_pools={},
+                                  status_effects=["Bleeding"], injuries=[])
+
+        character_api.add_combat_listener(manager.record_combat_result)
+        self.addCleanup(character_api.remove_combat_listener, manager.record_combat_result)
+        with mock.patch.object(ai_dm, "get_state_history", return_value=manager.history):
+            character_api._publish_combat_result("player_1", db_char)
+            changes = ai_dm._changes_since_last_narration("player_1")
+
+        self.assertEqual(changes["hp_change"], -8)
+        self.assertEqual(changes["status_gained"], ["Bleeding"])
+        self.assertEqual(manager.history.head.label, "combat:player_1")
+
+
+    def test_concurrent_updates_are_not_lost(self):
+        manager = GameStateManager(history=StateHistory())
+        manager.load_state(_make_state())
+
+        def heal():
+            for _ in range(200):
+                manager.update_state(("characters", "player_0", "current_hp"), lambda hp: hp + 1, auto_save=False)
+
+        workers = [threading.Thread(target=heal) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(manager.get_active_player().current_hp, 20 + 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
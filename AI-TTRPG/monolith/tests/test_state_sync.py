@@ -0,0 +1,157 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from monolith.modules.character_pkg import database as char_db
+from monolith.modules.character_pkg import models as char_models
+from monolith.modules.world_pkg import database as world_db
+from monolith.modules.world_pkg import models as world_models
+from monolith.modules.save_schemas import SaveGameData, CharacterSave, LocationSave, RegionSave
+from monolith.modules.save_container import LazyList
+from monolith.modules.state_history import update_in
+from monolith.modules.state_sync import StateSynchronizer, changed_rows, state_rows
+from monolith.orchestrator import Orchestrator
+
+
+def _memory_sessionmaker(base):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _make_state() -> SaveGameData:
+    return SaveGameData(
+        characters=[
+            CharacterSave(id=f"char_{i}", name=f"Hero {i}", current_hp=10, max_hp=10)
+            for i in range(3)
+        ],
+        factions=[], regions=[RegionSave(id=1, name="Vale")],
+        locations=[
+            LocationSave(id=loc_id, name=f"Loc {loc_id}", tags=["forest"], exits={}, region_id=1,
+                         generated_map_data=[[loc_id] * 8 for _ in range(8)])
+            for loc_id in (1, 2)
+        ],
+        npcs=[], items=[], traps=[], campaigns=[], quests=[]
+    )
+
+
+class TestStateSynchronizer(unittest.TestCase):
+    def setUp(self):
+        self.char_sessions = _memory_sessionmaker(char_db.Base)
+        self.world_sessions = _memory_sessionmaker(world_db.Base)
+        self.sync = StateSynchronizer({"characters": self.char_sessions, "world": self.world_sessions})
+
+    def test_first_sync_inserts_everything(self):
+        stats = self.sync.sync(_make_state().model_dump(mode="json"))
+        self.assertEqual(stats["characters"]["inserted"], 3)
+        self.assertEqual(stats["regions"]["inserted"], 1)
+        self.assertEqual(stats["locations"]["inserted"], 2)
+
+        db = self.world_sessions()
+        try:
+            loc = db.get(world_models.Location, 2)
+            self.assertEqual(loc.generated_map_data[0][0], 2)
+        finally:
+            db.close()
+
+    def test_unchanged_state_writes_nothing(self):
+        data = _make_state().model_dump(mode="json")
+        self.sync.sync(data)
+        stats = self.sync.sync(data)
+        for table in ("characters", "regions", "locations"):
+            self.assertEqual(stats[table]["inserted"] + stats[table]["updated"], 0, table)
+
+    def test_single_change_updates_one_row(self):
+        state = _make_state()
+        self.sync.sync(state.model_dump(mode="json"))
+        state.characters[1].current_hp = 4
+
+        stats = self.sync.sync(state.model_dump(mode="json"))
+        self.assertEqual(stats["characters"], {"inserted": 0, "updated": 1, "unchanged": 2})
+        self.assertEqual(stats["locations"]["updated"], 0)
+
+        db = self.char_sessions()
+        try:
+            self.assertEqual(db.get(char_models.Character, "char_1").current_hp, 4)
+        finally:
+            db.close()
+
+    def test_verify_detects_external_writes(self):
+        data = _make_state().model_dump(mode="json")
+        self.sync.sync(data)
+
+        db = self.char_sessions()
+        try:
+            db.get(char_models.Character, "char_0").current_hp = 1
+            db.commit()
+        finally:
+            db.close()
+
+        self.assertEqual(self.sync.sync(data, tables=("characters",))["characters"]["updated"], 0)
+        stats = self.sync.sync(data, tables=("characters",), verify=True)
+        self.assertEqual(stats["characters"]["updated"], 1)
+
+    def test_changed_rows_carry_only_dirty_columns(self):
+        state = _make_state()
+        self.sync.sync(state.model_dump(mode="json"))
+        # Another module writes to the database in the meantime
+        db = self.char_sessions()
+        try:
+            db.get(char_models.Character, "char_1").current_hp = 2
+            db.commit()
+        finally:
+            db.close()
+
+        new = update_in(state, ("characters", "char_1", "status_effects"), lambda s: [*(s or []), "Prone"])
+        rows = changed_rows(state, new)
+        self.assertEqual(rows, {"characters": [{"id": "char_1", "status_effects": ["Prone"]}]})
+        self.assertEqual(self.sync.sync(rows)["characters"], {"inserted": 0, "updated": 1, "unchanged": 0})
+
+        db = self.char_sessions()
+        try:
+            char = db.get(char_models.Character, "char_1")
+            self.assertEqual((char.current_hp, char.status_effects), (2, ["Prone"]))
+        finally:
+            db.close()
+
+    def test_failed_autosave_sync_is_retried_in_full(self):
+        orchestrator = SimpleNamespace(state_sync=self.sync, _sync_lock=threading.Lock(), _synced_state=None)
+        orchestrator._sync_state_to_db = lambda state: Orchestrator._sync_state_to_db(orchestrator, state)
+        state = _make_state()
+        Orchestrator._on_autosave_written(orchestrator, state)
+        self.assertIs(orchestrator._synced_state, state)
+
+        hurt = update_in(state, ("characters", "char_1", "current_hp"), lambda hp: 3)
+        with mock.patch.object(self.sync, "_sync_table", side_effect=RuntimeError("disk I/O error")):
+            Orchestrator._on_autosave_written(orchestrator, hurt)
+        self.assertIsNone(orchestrator._synced_state)
+
+        # A later, unrelated change still carries the failed one to the database
+        later = update_in(hurt, ("characters", "char_0", "current_hp"), lambda hp: 9)
+        Orchestrator._on_autosave_written(orchestrator, later)
+        self.assertIs(orchestrator._synced_state, later)
+        db = self.char_sessions()
+        try:
+            self.assertEqual(db.get(char_models.Character, "char_1").current_hp, 3)
+        finally:
+            db.close()
+
+    def test_state_rows_leave_lazy_locations_undecoded(self):
+        state = _make_state()
+        by_id = {loc.id: loc for loc in state.locations}
+        lazy = state.model_copy(update={"locations": LazyList(list(by_id), by_id.__getitem__)})
+
+        chunks = list(state_rows(lazy, chunk_size=1))
+        self.assertEqual(sum(len(rows.get("locations", [])) for rows in chunks), 2)
+        self.assertEqual(lazy.locations.loaded_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import flag_modified
+
+from monolith.modules.character_pkg.database import Base as CharBase
+from monolith.modules.character_pkg import crud as char_crud
+from monolith.modules.character_pkg import models as char_models
+from monolith.modules.world_pkg.database import Base as WorldBase
+from monolith.modules.world_pkg import crud as world_crud
+from monolith.modules.world_pkg import models as world_models
+
+
+class TestNpcStateTables(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        WorldBase.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(world_models.Region(id=1, name="Vale"))
+        for loc_id in (7, 8):
+            self.db.add(world_models.Location(id=loc_id, name=f"Loc {loc_id}", region_id=1))
+        for npc_id, loc_id in ((1, 7), (2, 7), (3, 8)):
+            self.db.add(world_models.NpcInstance(id=npc_id, template_id="goblin", current_hp=5, max_hp=5,
+                                                 status_effects=[], injuries=[], location_id=loc_id))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def _status_rows(self):
+        return sorted((r.npc_id, r.status_id) for r in self.db.query(world_models.NpcStatus))
+
+    def test_status_query_by_location(self):
+        for npc_id in (1, 3):
+            world_crud.apply_status_to_npc(self.db, npc_id, "Poisoned")
+        poisoned_here = world_crud.get_npcs_with_status(self.db, "Poisoned", location_id=7)
+        self.assertEqual([npc.id for npc in poisoned_here], [1])
+        self.assertEqual(len(world_crud.get_npcs_with_status(self.db, "Poisoned")), 2)
+
+    def test_mutations_touch_single_rows(self):
+        world_crud.apply_status_to_npc(self.db, 1, "Poisoned")
+        statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith(("INSERT INTO npc_statuses", "DELETE FROM npc_statuses",
+                                      "SELECT npc_statuses")):
+                statements.append(statement.split()[0])
+
+        world_crud.apply_status_to_npc(self.db, 1, "Prone")
+        world_crud.remove_status_from_npc(self.db, 1, "Poisoned")
+
+        # The delta comes from the attribute history: no read of the child table
+        self.assertEqual(statements, ["INSERT", "DELETE"])
+        self.assertEqual(self._status_rows(), [(1, "Prone")])
+
+    def test_injuries_and_delete(self):
+        world_crud.apply_injury_to_npc(self.db, 2, {"location": "Arm", "severity": "Major"})
+        world_crud.apply_injury_to_npc(self.db, 2, {"location": "Leg", "severity": "Minor"})
+        world_crud.remove_injury_from_npc(self.db, 2, "Major")
+        injuries = self.db.query(world_models.NpcInjury).all()
+        self.assertEqual([(i.body_location, i.severity) for i in injuries], [("Leg", "Minor")])
+
+        world_crud.apply_status_to_npc(self.db, 2, "Burning")
+        world_crud.delete_npc(self.db, 2)
+        self.assertEqual(self.db.query(world_models.NpcInjury).count(), 0)
+        self.assertEqual(self._status_rows(), [])
+
+
+class TestCharacterStateTables(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        CharBase.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.character = char_models.Character(
+            id="tables_char", name="Rows", stats={}, status_effects=["Blessed"], injuries=[], inventory={}
+        )
+        self.db.add(self.character)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_insert_and_inventory_changes(self):
+        self.assertEqual([c.id for c in char_crud.get_characters_with_status(self.db, "Blessed")], ["tables_char"])
+
+        char_crud.add_item_to_inventory(self.db, self.character, "potion", 2)
+        char_crud.add_item_to_inventory(self.db, self.character, "potion", 1)
+        entries = self.db.query(char_models.CharacterInventoryEntry).all()
+        self.assertEqual([(e.item_id, e.quantity) for e in entries], [("potion", 3)])
+        self.assertEqual(len(char_crud.get_characters_holding_item(self.db, "potion")), 1)
+
+        char_crud.remove_item_from_inventory(self.db, self.character, "potion", 3)
+        self.assertEqual(self.db.query(char_models.CharacterInventoryEntry).count(), 0)
+
+    def _inventory_rows(self):
+        return sorted((e.item_id, e.quantity) for e in self.db.query(char_models.CharacterInventoryEntry))
+
+    def test_shop_inventory_shape(self):
+        self.character.inventory = {"currency": 120, "carried_gear": {"rope": 1, "torch": 3}}
+        self.db.commit()
+        self.assertEqual(self._inventory_rows(), [("rope", 1), ("torch", 3)])
+
+        self.character.inventory = {"currency": 95, "carried_gear": {"rope": 1, "torch": 2, "lantern": 1}}
+        self.db.commit()
+        self.assertEqual(self._inventory_rows(), [("lantern", 1), ("rope", 1), ("torch", 2)])
+
+    def test_in_place_mutation_falls_back_to_table_diff(self):
+        self.character.inventory = {"carried_gear": [{"template_id": "rope", "quantity": 2}]}
+        self.db.commit()
+        self.character.inventory["carried_gear"].append({"template_id": "torch"})
+        flag_modified(self.character, "inventory")
+        self.db.commit()
+        self.assertEqual(self._inventory_rows(), [("rope", 2), ("torch", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
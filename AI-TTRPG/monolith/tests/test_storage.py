@@ -0,0 +1,147 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from monolith import storage
+from monolith.shared import with_db_session
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.alpha = sessionmaker(bind=storage.get_engine("test_alpha", self.tmp / "alpha.db"))
+        self.beta = sessionmaker(bind=storage.get_engine("test_beta", self.tmp / "beta.db"))
+        for factory, table in ((self.alpha, "alpha_rows"), (self.beta, "beta_rows")):
+            with factory() as db:
+                db.execute(text(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, value TEXT)"))
+                db.commit()
+
+    def tearDown(self):
+        for path in self.tmp.iterdir():
+            storage._engines.pop(str(path.resolve()), None)
+        storage._databases.pop("test_alpha", None)
+        storage._databases.pop("test_beta", None)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_pragmas_applied(self):
+        with self.alpha() as db:
+            self.assertEqual(db.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(db.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+
+    def test_same_file_shares_engine(self):
+        engine = storage.get_engine("test_alias", self.tmp / "alpha.db")
+        storage._databases.pop("test_alias", None)
+        self.assertIs(engine, self.alpha.kw["bind"])
+
+    def test_nested_calls_join_scope_session(self):
+        seen = []
+
+        @with_db_session(self.alpha)
+        def insert(value, db=None):
+            seen.append(db)
+            db.execute(text("INSERT INTO alpha_rows (value) VALUES (:v)"), {"v": value})
+
+        with storage.session_scope():
+            insert("a")
+            with storage.session_scope():
+                insert("b")
+
+        self.assertIs(seen[0], seen[1])
+        with self.alpha() as db:
+            self.assertEqual(db.execute(text("SELECT COUNT(*) FROM alpha_rows")).scalar(), 2)
+
+    def test_scope_rolls_back_on_error(self):
+        @with_db_session(self.alpha)
+        def insert(db=None):
+            db.execute(text("INSERT INTO alpha_rows (value) VALUES ('x')"))
+
+        with self.assertRaises(RuntimeError):
+            with storage.session_scope():
+                insert()
+                raise RuntimeError("boom")
+
+        with self.alpha() as db:
+            self.assertEqual(db.execute(text("SELECT COUNT(*) FROM alpha_rows")).scalar(), 0)
+
+    def test_commits_inside_a_scope_only_flush(self):
+        @with_db_session(self.alpha)
+        def insert(value, db=None):
+            db.execute(text("INSERT INTO alpha_rows (value) VALUES (:v)"), {"v": value})
+            db.commit()  # what the crud helpers do
+
+        with storage.session_scope():
+            insert("kept?")
+            with self.alpha() as other:
+                self.assertEqual(other.execute(text("SELECT COUNT(*) FROM alpha_rows")).scalar(), 0)
+            storage.rollback_scope()
+            insert("kept")
+
+        with self.alpha() as db:
+            self.assertEqual(db.execute(text("SELECT value FROM alpha_rows")).scalars().all(), ["kept"])
+
+    def test_worker_threads_do_not_share_the_scope_session(self):
+        @with_db_session(self.alpha)
+        def session_of(db=None):
+            return db
+
+        async def main():
+            with storage.session_scope():
+                here = session_of()
+                there = await asyncio.to_thread(session_of)
+                return here, there
+
+        here, there = asyncio.run(main())
+        self.assertIsInstance(here, storage.ScopeSession)
+        self.assertNotIsInstance(there, storage.ScopeSession)
+
+    def test_tasks_outliving_the_scope_still_commit(self):
+        @with_db_session(self.alpha)
+        def insert(value, db=None):
+            db.execute(text("INSERT INTO alpha_rows (value) VALUES (:v)"), {"v": value})
+            db.commit()
+            return db
+
+        async def main():
+            go = asyncio.Event()
+
+            async def subscriber():  # like an event bus subscriber started by publish()
+                await go.wait()
+                return insert("late")
+
+            with storage.session_scope():
+                task = asyncio.create_task(subscriber())
+                insert("early")
+            go.set()
+            return await task
+
+        late_session = asyncio.run(main())
+        self.assertNotIsInstance(late_session, storage.ScopeSession)
+        with self.alpha() as db:
+            self.assertEqual(db.execute(text("SELECT value FROM alpha_rows ORDER BY id")).scalars().all(),
+                             ["early", "late"])
+
+    def test_attached_scope_uses_one_session(self):
+        databases = {"world": (self.tmp / "alpha.db").resolve(), "beta": (self.tmp / "beta.db").resolve()}
+        with patch.object(storage, "_databases", databases), \
+                patch.object(storage, "_attached_sessions", None), \
+                patch.object(storage, "_attached_engine", None):
+            with storage.session_scope(attach=True):
+                a = storage.current_session(self.alpha)
+                b = storage.current_session(self.beta)
+                self.assertIs(a, b)
+                a.execute(text("INSERT INTO alpha_rows (value) VALUES ('a')"))
+                b.execute(text("INSERT INTO beta_rows (value) VALUES ('b')"))
+            storage._attached_engine.dispose()
+
+        with self.beta() as db:
+            self.assertEqual(db.execute(text("SELECT value FROM beta_rows")).scalar(), "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
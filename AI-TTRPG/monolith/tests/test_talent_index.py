@@ -0,0 +1,87 @@
+import pickle
+import random
+import unittest
+
+from pydantic import ValidationError
+
+from monolith.modules import rules
+from monolith.modules.rules_pkg import core
+from monolith.modules.rules_pkg.ruleset import get_ruleset
+from monolith.modules.rules_pkg.talent_index import TalentIndex
+
+
+def _scan(talent_data, stats, skills, known_skills):
+    """Reference linear scan over talents.json."""
+    names = []
+    for t in talent_data.get("single_stat_mastery", []):
+        if stats.get(t["stat"], 0) >= t["score"]:
+            names.append(t["talent_name"])
+    for t in talent_data.get("dual_stat_focus", []):
+        a, b = t["stats"]
+        if min(stats.get(a, 0), stats.get(b, 0)) >= t.get("score", 99):
+            names.append(t["talent_name"])
+    for groups in talent_data.get("single_skill_mastery", {}).values():
+        for group in groups:
+            if group.get("skill") not in known_skills:
+                continue
+            for t in group.get("talents", []):
+                tier = t.get("tier", t.get("prerequisite_mt")) or ""
+                required = int(tier[2:]) if tier.startswith("MT") and tier[2:].isdigit() else 99
+                if skills.get(group["skill"], 0) >= required:
+                    names.append(t.get("talent_name") or t.get("name"))
+    return names
+
+
+class TestTalentIndex(unittest.TestCase):
+    def setUp(self):
+        self.rules = get_ruleset()
+        self.index = self.rules.talent_index
+        self.rng = random.Random(7)
+
+    def _random_character(self):
+        stats = {s: self.rng.randint(8, 20) for s in self.rules.stats_list}
+        skills = {s: self.rng.randint(0, 6) for s in self.rng.sample(sorted(self.rules.skills), 25)}
+        return stats, skills
+
+    def test_matches_linear_scan(self):
+        for _ in range(50):
+            stats, skills = self._random_character()
+            expected = _scan(self.rules.talent_data, stats, skills, self.rules.skills)
+            self.assertEqual([t.name for t in self.index.eligible(stats, skills)], expected)
+
+    def test_delta_matches_full_recompute(self):
+        for _ in range(50):
+            stats, skills = self._random_character()
+            stat_delta = {s: self.rng.randint(-3, 3) for s in self.rng.sample(self.rules.stats_list, 3)}
+            skill_delta = {s: self.rng.randint(-2, 2) for s in self.rng.sample(sorted(skills), 3)}
+            after_stats = {s: v + stat_delta.get(s, 0) for s, v in stats.items()}
+            after_skills = {s: v + skill_delta.get(s, 0) for s, v in skills.items()}
+
+            before = {t.name for t in self.index.eligible(stats, skills)}
+            after = {t.name for t in self.index.eligible(after_stats, after_skills)}
+            delta = self.index.delta(stats, skills, stat_delta, skill_delta)
+            self.assertEqual({t.name for t in delta.unlocked}, after - before)
+            self.assertEqual({t.name for t in delta.lost}, before - after)
+
+    def test_talent_objects_are_shared_and_frozen(self):
+        stats = {s: 20 for s in self.rules.stats_list}
+        first = core.find_eligible_talents(stats, {}, self.rules.talent_data, list(self.rules.stats_list), self.rules.skills)
+        second = core.find_eligible_talents(stats, {}, self.rules.talent_data, list(self.rules.stats_list), self.rules.skills)
+        self.assertTrue(first)
+        self.assertIs(first[0], second[0])
+        with self.assertRaises(ValidationError):
+            first[0].name = "Renamed"
+
+    def test_api_and_pickling(self):
+        stats = {s: 14 for s in self.rules.stats_list}
+        changes = rules.find_talent_changes_api({"stats": stats, "skills": {}, "stat_delta": {"Might": -1}})
+        self.assertIn("Overpowering Presence", [t["name"] for t in changes["lost"]])
+        self.assertEqual(changes["unlocked"], [])
+
+        restored = pickle.loads(pickle.dumps(self.index))
+        self.assertIsInstance(restored, TalentIndex)
+        self.assertEqual([t.name for t in restored.eligible(stats, {})], [t.name for t in self.index.eligible(stats, {})])
+
+
+if __name__ == "__main__":
+    unittest.main()
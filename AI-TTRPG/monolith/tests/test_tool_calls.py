@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+import unittest
+
+from pydantic import BaseModel
+
+from monolith.modules.ai_dm_pkg import tools
+from monolith.modules.ai_dm_pkg.llm_client import AsyncLLMClient
+from monolith.modules.ai_dm_pkg.llm_service import LLMService
+
+
+class _Wait(BaseModel):
+    label: str
+    seconds: float = 0.2
+
+
+class TestToolRegistry(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+
+        def wait(label, seconds):
+            time.sleep(seconds)
+            self.log.append(label)
+            return f"{label} done"
+
+        async def wait_async(label, seconds):
+            await asyncio.sleep(seconds)
+            self.log.append(label)
+            return f"{label} done"
+
+        tools.register_tool("wait", _Wait, wait, "Blocks for a while.")
+        tools.register_tool("wait_async", _Wait, wait_async, "Awaits for a while.")
+        self.addCleanup(tools.AI_TOOLS.pop, "wait")
+        self.addCleanup(tools.AI_TOOLS.pop, "wait_async")
+
+    def test_manifest_is_built_once_per_registry_version(self):
+        manifest = tools.tool_manifest()
+        self.assertIs(tools.tool_manifest(), manifest)
+        self.assertIn("wait_async", json.loads(manifest))
+
+        tools.AI_TOOLS.pop("wait_async")
+        self.assertNotIn("wait_async", json.loads(tools.tool_manifest()))
+        tools.register_tool("wait_async", _Wait, lambda label, seconds: label, "Replaced.")
+        self.assertEqual(json.loads(tools.tool_manifest())["wait_async"]["description"], "Replaced.")
+
+    def test_independent_calls_run_concurrently(self):
+        calls = [
+            {"tool": "wait", "arguments": {"label": "a"}},
+            {"tool": "wait", "arguments": {"label": "b"}},
+            {"tool": "wait_async", "arguments": {"label": "c"}},
+            {"tool": "wait", "arguments": {"label": "d", "seconds": 0.05}, "depends_on": [0, 1]},
+        ]
+        started = time.perf_counter()
+        results = asyncio.run(tools.run_tool_calls(calls))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.45)  # 0.2s in parallel + 0.05s after its dependencies
+        self.assertEqual([r["result"] for r in results], ["a done", "b done", "c done", "d done"])
+        self.assertEqual(self.log[-1], "d")
+
+    def test_failures_are_reported_as_results(self):
+        results = asyncio.run(tools.run_tool_calls([
+            {"tool": "wait", "arguments": {"seconds": 0}},
+            {"tool": "teleport", "arguments": {}},
+        ]))
+        self.assertTrue(results[0]["result"].startswith("Tool execution failed"))
+        self.assertEqual(results[1]["result"], "Unknown tool 'teleport'.")
+
+    def test_malformed_entries_do_not_sink_the_others(self):
+        results = asyncio.run(tools.run_tool_calls([
+            "wait",
+            {"tool": "wait", "arguments": {"label": "a", "seconds": 0}, "depends_on": 0},
+            {"tool": "wait", "arguments": {"label": "b", "seconds": 0}, "depends_on": [0, 1]},
+        ]))
+        self.assertEqual(results[0], {"tool": None, "arguments": {}, "result": "Malformed tool call: 'wait'."})
+        self.assertEqual([r["result"] for r in results[1:]], ["a done", "b done"])
+
+
+class _ScriptedClient(AsyncLLMClient):
+    backend = "scripted"
+
+    def __init__(self, responses):
+        super().__init__(model="test")
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def _complete(self, prompt, config, timeout):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class TestProcessPlayerAction(unittest.TestCase):
+    def setUp(self):
+        tools.register_tool("wait", _Wait, lambda label, seconds: time.sleep(seconds) or f"{label} done",
+                            "Blocks for a while.")
+        self.addCleanup(tools.AI_TOOLS.pop, "wait")
+        self.service = LLMService()
+        self.service.cache = None
+
+    def _run(self, *responses):
+        self.service.model = _ScriptedClient(responses)
+        return asyncio.run(self.service.process_player_action(
+            {"player_id": "ash", "action_type": "search", "context_data": {}}))
+
+    def test_several_tool_calls_are_narrated_in_one_follow_up(self):
+        decision = {"tool_calls": [{"tool": "wait", "arguments": {"label": f"t{i}"}} for i in range(3)]}
+        started = time.perf_counter()
+        result = self._run(json.dumps(decision), '{"narrative": "All done."}')
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(result["narrative"], "All done.")
+        self.assertEqual([r["result"] for r in result["tool_results"]], ["t0 done", "t1 done", "t2 done"])
+        prompts = self.service.model.prompts
+        self.assertEqual(len(prompts), 2)
+        self.assertTrue(all(f"t{i} done" in prompts[1] for i in range(3)))
+
+    def test_single_call_form_and_unknown_tools(self):
+        result = self._run('{"tool_call": "wait", "arguments": {"label": "x", "seconds": 0}}', '{"narrative": "Ok."}')
+        self.assertEqual(result["tool_results"][0]["result"], "x done")
+
+        result = self._run('{"tool_call": "teleport", "arguments": {}}')
+        self.assertEqual(result["narrative"], "The DM tries to do something strange (teleport), but fails.")
+
+    def test_malformed_calls_are_narrated_with_the_rest(self):
+        decision = {"tool_calls": [None, {"tool": "wait", "arguments": {"label": "x", "seconds": 0}}]}
+        result = self._run(json.dumps(decision), '{"narrative": "Ok."}')
+        self.assertEqual(result["narrative"], "Ok.")
+        self.assertEqual([r["result"] for r in result["tool_results"]], ["Malformed tool call: None.", "x done"])
+
+
+if __name__ == "__main__":
+    unittest.main()
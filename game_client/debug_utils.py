@@ -5,6 +5,7 @@ from monolith.modules.world_pkg import schemas as world_schemas
 from monolith.modules.world_pkg.database import SessionLocal as WorldSession
 from monolith.modules.character_pkg import services as char_services
 from monolith.modules.character_pkg.database import SessionLocal as CharSession
+from monolith.modules.state_history import get_in, update_in
 
 def teleport_to_construct(app):
     """Teleports the active character (and party) to the Construct (Loc 999)."""
@@ -46,16 +47,17 @@ def teleport_to_construct(app):
         
         # 2. Move Party (Update Orchestrator State)
         if app.orchestrator and app.orchestrator.state_manager.current_state:
-            state = app.orchestrator.state_manager.current_state
+            state_manager = app.orchestrator.state_manager
+            state = state_manager.current_state
             
-            # Update all characters to new location
+            # Update all characters to new location (states are immutable; build the next one)
             for char in state.characters:
-                char.current_location_id = target_loc_id
-                char.position_x = 10
-                char.position_y = 10
+                state = update_in(state, ("characters", char.id), lambda c: c.model_copy(
+                    update={"current_location_id": target_loc_id, "position_x": 10, "position_y": 10}))
+            state_manager.apply_state_change(state, auto_save=False, label="debug:teleport")
                 
             # Save and Refresh
-            app.orchestrator.state_manager.save_current_game()
+            state_manager.save_current_game()
             
             # Also sync to DB for consistency (optional but good)
             from monolith.modules import character as character_api
@@ -97,9 +99,9 @@ def spawn_npc(app, template_id):
         
         # 2. Update Orchestrator State
         if app.orchestrator and app.orchestrator.state_manager.current_state:
-            state = app.orchestrator.state_manager.current_state
-            # Find location
-            location = next((l for l in state.locations if l.id == loc_id), None)
+            state_manager = app.orchestrator.state_manager
+            # Find location (by id, without decoding the other locations)
+            location = get_in(state_manager.current_state, ("locations", loc_id))
             if location:
                 # Convert DB model to Pydantic/Dict
                 # This is tricky without full schemas, but let's try to append a dict
@@ -111,10 +113,10 @@ def spawn_npc(app, template_id):
                     "hp": npc.current_hp,
                     "max_hp": npc.max_hp
                 }
-                if not location.npcs: location.npcs = []
-                location.npcs.append(npc_dict)
+                state_manager.update_state(("locations", loc_id, "npcs"), lambda npcs: [*(npcs or []), npc_dict],
+                                           auto_save=False, label="debug:spawn")
                 
-                app.orchestrator.state_manager.save_current_game()
+                state_manager.save_current_game()
                 app.event_bus.publish("state_updated", {})
         
         main_screen.update_log(f"Spawned {template_id}.")
@@ -140,14 +142,17 @@ def grant_test_items(app):
         
         # 2. Update Orchestrator State
         if app.orchestrator and app.orchestrator.state_manager.current_state:
-            state = app.orchestrator.state_manager.current_state
-            char = next((c for c in state.characters if c.id == char_id), None)
-            if char:
-                if not char.inventory: char.inventory = {}
-                char.inventory["test_sword"] = char.inventory.get("test_sword", 0) + 1
-                char.inventory["test_potion"] = char.inventory.get("test_potion", 0) + 5
-                
-                app.orchestrator.state_manager.save_current_game()
+            state_manager = app.orchestrator.state_manager
+            if get_in(state_manager.current_state, ("characters", char_id)) is not None:
+                def grant(inventory):
+                    inventory = dict(inventory or {})
+                    inventory["test_sword"] = inventory.get("test_sword", 0) + 1
+                    inventory["test_potion"] = inventory.get("test_potion", 0) + 5
+                    return inventory
+
+                state_manager.update_state(("characters", char_id, "inventory"), grant,
+                                           auto_save=False, label="debug:grant_items")
+                state_manager.save_current_game()
                 app.event_bus.publish("state_updated", {})
 
         main_screen.update_log("Granted Test Sword and Potions.")
@@ -165,11 +170,13 @@ def heal_party(app):
     # We can use the rest mechanic or just hack the stats
     # Update Orchestrator State directly
     if app.orchestrator and app.orchestrator.state_manager.current_state:
-        state = app.orchestrator.state_manager.current_state
+        state_manager = app.orchestrator.state_manager
+        state = state_manager.current_state
         for char in state.characters:
-            char.current_hp = char.max_hp
+            state = update_in(state, ("characters", char.id), lambda c: c.model_copy(update={"current_hp": c.max_hp}))
+        state_manager.apply_state_change(state, auto_save=False, label="debug:heal")
             
-        app.orchestrator.state_manager.save_current_game()
+        state_manager.save_current_game()
         
         # Sync to DB
         db = CharSession()
@@ -68,14 +68,18 @@ class LoadGameScreen(Screen):
                 # Format display text
                 slot_name = save_data.get("name", "Unknown")
                 save_time = save_data.get("timestamp", "Unknown")
-                # num_chars is not in the scan_saves output currently, so we skip it or default
                 
                 btn_text = f"{slot_name}\n({save_time})"
+                summary = save_data.get("summary") or {}
+                party = ", ".join(f"{p.get('name')} Lv{p.get('level', 1)}" for p in summary.get("party", []))
+                location = (summary.get("location") or {}).get("name")
+                if party:
+                    btn_text += f"\n{party}" + (f" @ {location}" if location else "")
                 
                 save_btn = Button(
                     text=btn_text,
                     size_hint_y=None,
-                    height='60dp',
+                    height='80dp',
                     halign='center'
                 )
                 save_btn.bind(on_release=partial(self.load_selected_game, slot_name))
@@ -17,6 +17,8 @@ from functools import partial
 from typing import Optional, List
 import datetime # <-- Import datetime for save game popup
 import threading
+import asyncio
+import uuid
 from kivy.clock import mainthread
 
 # --- Monolith Imports ---
@@ -25,11 +27,13 @@ try:
     from monolith.modules.story_pkg import schemas as story_schemas
     from monolith.modules.camp_pkg import schemas as camp_schemas
     from monolith.modules import story as story_api
+    from monolith.modules.ai_dm_pkg.narration_stream import NARRATION_CHUNK, NARRATION_DONE
 except ImportError as e:
     logging.error(f"MAIN_INTERFACE: Failed to import monolith modules: {e}")
     story_schemas = None
     camp_schemas = None
     story_api = None
+    NARRATION_CHUNK = NARRATION_DONE = None
 
 # --- Client Imports ---
 try:
@@ -221,6 +225,10 @@ class MainInterfaceScreen(Screen, AsyncHelper):
     # This is bound to the UI panel
     party_list = ListProperty([])
 
+    # The narration request whose streamed text is currently shown
+    _narration_request = None
+    _narration_streaming = False
+
     def __init__(self, **kwargs):
         """
         Initializes the screen layout and widget bindings.
@@ -251,6 +259,9 @@ class MainInterfaceScreen(Screen, AsyncHelper):
             app.event_bus.subscribe("turn_changed", self.on_turn_changed)
             app.event_bus.subscribe("ability_result", self.on_ability_result)
             app.event_bus.subscribe("state_updated", self.on_state_updated)
+            if NARRATION_CHUNK:
+                app.event_bus.subscribe(NARRATION_CHUNK, self._on_narration_chunk)
+                app.event_bus.subscribe(NARRATION_DONE, self._on_narration_done)
         else:
             logging.warning("MainInterfaceScreen could not subscribe to events: Event Bus not found.")
 
@@ -515,8 +526,40 @@ class MainInterfaceScreen(Screen, AsyncHelper):
         # Switch Screen
         app.root.current = 'combat_screen'
 
-    def update_narration(self, message: str):
-        self.ids.narration_label.text = message
+    def update_narration(self, message: str, append: bool = False):
+        """Show a message in the narration box; `append` adds streamed text to the current narration."""
+        if append and self._narration_streaming:
+            self.ids.narration_label.text += message
+        else:
+            self.ids.narration_label.text = message
+            self._narration_streaming = append
+
+    # Narration event handlers run on the backend loop; widgets are only touched on the UI thread
+
+    async def _on_narration_chunk(self, topic, payload):
+        if payload.get("request_id") == self._narration_request:
+            self._append_narration(payload["request_id"], payload["text"])
+
+    async def _on_narration_done(self, topic, payload):
+        if payload.get("request_id") == self._narration_request:
+            self._finish_narration(payload)
+
+    @mainthread
+    def _append_narration(self, request_id, text):
+        if request_id == self._narration_request:
+            self.update_narration(text, append=True)
+
+    @mainthread
+    def _finish_narration(self, response):
+        # The final message has passed validation and replaces the streamed text
+        if response.get("request_id") != self._narration_request:
+            return
+        self._narration_streaming = False
+        self._narration_request = None
+        self.update_narration(response.get("message", "An error occurred."))
+        logging.info(f"Narration: first text after {response.get('first_text_ms')} ms, done after {response.get('total_ms')} ms")
+        if "events" in response:
+            self.process_story_events(response["events"])
 
     def update_log(self, message: str):
         """Appends a message to the game log."""
@@ -709,6 +752,17 @@ class MainInterfaceScreen(Screen, AsyncHelper):
         self.update_log(f"You: {prompt_text}")
         self.update_narration("The DM is thinking...")
 
+        app = App.get_running_app()
+        loop = getattr(app, 'loop', None)
+        if NARRATION_DONE and loop is not None and loop.is_running():
+            # Streamed: the text arrives word by word through the narration events
+            self._narration_request = uuid.uuid4().hex
+            future = asyncio.run_coroutine_threadsafe(
+                story_api.stream_narrative_prompt(actor_id, prompt_text, self._narration_request), loop)
+            future.add_done_callback(
+                lambda f: f.exception() and logging.error(f"Error handling narrative prompt: {f.exception()}"))
+            return
+
         def background_task():
             return story_api.handle_narrative_prompt(actor_id, prompt_text)
 